@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from .models import TxRow
+from .normalization import category_label, normalize_merchant
+
+DAY_SECONDS = 86400
+
+DIM_MERCHANT = "merchant"
+DIM_CATEGORY = "category"
+
+_Key = tuple[str, str]
+_Event = tuple[int, int, int]
+
+
+def _median_of_sorted(vals: Sequence[int]) -> int:
+    n = len(vals)
+    if n == 0:
+        return 0
+    mid = n // 2
+    if n % 2:
+        return int(vals[mid])
+    return int((vals[mid - 1] + vals[mid]) / 2)
+
+
+class SortedWindow:
+    """
+    Multiset of ints kept in sorted order, so the median is O(1) and the MAD is a
+    linear two-pointer walk outwards from the median instead of a re-sort.
+    """
+
+    __slots__ = ("_vals",)
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        self._vals: list[int] = sorted(int(v) for v in values)
+
+    def __len__(self) -> int:
+        return len(self._vals)
+
+    def values(self) -> list[int]:
+        return list(self._vals)
+
+    def add(self, value: int) -> None:
+        insort(self._vals, int(value))
+
+    def remove(self, value: int) -> None:
+        i = bisect_left(self._vals, int(value))
+        if i < len(self._vals) and self._vals[i] == int(value):
+            del self._vals[i]
+
+    def median(self) -> int:
+        return _median_of_sorted(self._vals)
+
+    def mad(self, center: int) -> int:
+        vals = self._vals
+        n = len(vals)
+        if n == 0:
+            return 0
+
+        lo = bisect_left(vals, center) - 1
+        hi = lo + 1
+        prev = cur = 0
+        for _ in range(n // 2 + 1):
+            if hi >= n or (lo >= 0 and center - vals[lo] <= vals[hi] - center):
+                d = center - vals[lo]
+                lo -= 1
+            else:
+                d = vals[hi] - center
+                hi += 1
+            prev, cur = cur, d
+        return int(cur) if n % 2 else int((prev + cur) / 2)
+
+
+@dataclass(frozen=True)
+class LabelBaseline:
+    dim: str
+    label: str
+    last_day_cents: int
+    median_cents: int
+    mad_cents: int
+    hist_days: int
+    seen_before: bool
+    first_seq: int
+
+
+class _LabelDay:
+    __slots__ = ("events", "total")
+
+    def __init__(self) -> None:
+        self.events: list[_Event] = []
+        self.total = 0
+
+
+class DailyBaselines:
+    """
+    Per-label spend baselines over a lookback, built in one pass over both dimensions.
+
+    Spend is kept in `lookback_days + 1` day slots (label -> events), and every label
+    has a SortedWindow of its daily totals for the whole days strictly inside the
+    lookback. The partially covered oldest day and the rolling last-24h window are
+    resolved at query time from the slot events, so results match a scan at any
+    (unaligned) `now_ts`.
+
+    Rows at or after `now_ts`, or older than the lookback, are ignored.
+    """
+
+    def __init__(self, *, now_ts: int, lookback_days: int = 28) -> None:
+        self.lookback_days = max(7, min(int(lookback_days), 90))
+        self._size = self.lookback_days + 1
+        self._slot_days: list[int | None] = [None] * self._size
+        self._slots: list[dict[_Key, _LabelDay]] = [{} for _ in range(self._size)]
+        self._windows: dict[_Key, SortedWindow] = {}
+        self._now_ts = int(now_ts)
+        first = self._hist_start() // DAY_SECONDS + 1
+        last = (self._now_ts - DAY_SECONDS - 1) // DAY_SECONDS
+        self._interior = (first, last)
+        self._seq = 0
+        self._merchant_cache: dict[str, str] = {}
+        self._category_cache: dict[int | None, str] = {}
+
+    @property
+    def now_ts(self) -> int:
+        return self._now_ts
+
+    def _hist_start(self) -> int:
+        return self._now_ts - self.lookback_days * DAY_SECONDS
+
+    def _slot(self, day: int) -> dict[_Key, _LabelDay] | None:
+        i = day % self._size
+        if self._slot_days[i] != day:
+            return None
+        return self._slots[i]
+
+    def _slot_for_write(self, day: int) -> dict[_Key, _LabelDay]:
+        i = day % self._size
+        if self._slot_days[i] != day:
+            self._slot_days[i] = day
+            self._slots[i] = {}
+        return self._slots[i]
+
+    def _append(self, t: int, cents: int, merchant: str, category: str) -> None:
+        slot = self._slot_for_write(t // DAY_SECONDS)
+        seq = self._seq
+        self._seq += 1
+
+        for key in ((DIM_MERCHANT, merchant), (DIM_CATEGORY, category)):
+            if key[1] == "unknown":
+                continue
+            ld = slot.get(key)
+            if ld is None:
+                ld = slot[key] = _LabelDay()
+            insort(ld.events, (t, seq, cents))
+            ld.total += cents
+
+    def _labels(self, r: TxRow) -> tuple[str, str]:
+        merchant = self._merchant_cache.get(r.description)
+        if merchant is None:
+            merchant = normalize_merchant(r.description)
+            merchant = self._merchant_cache[r.description] = str(merchant or "unknown")
+        category = self._category_cache.get(r.mcc)
+        if category is None:
+            category = self._category_cache[r.mcc] = str(category_label(r.mcc) or "unknown")
+        return merchant, category
+
+    def add_rows(self, rows: Iterable[TxRow]) -> None:
+        """
+        Appends the spend rows inside the lookback, then rebuilds the windows once.
+        """
+        lo, hi = self._hist_start(), self._now_ts
+        for r in rows:
+            if r.kind != "spend":
+                continue
+            t = int(r.ts)
+            if not (lo <= t < hi):
+                continue
+            merchant, category = self._labels(r)
+            self._append(t, abs(int(r.amount)), merchant, category)
+        self._rebuild_windows()
+
+    def _rebuild_windows(self) -> None:
+        values: dict[_Key, list[int]] = {}
+        for d in range(self._interior[0], self._interior[1] + 1):
+            for key, ld in (self._slot(d) or {}).items():
+                values.setdefault(key, []).append(ld.total)
+        self._windows = {key: SortedWindow(v) for key, v in values.items()}
+
+    def touched(self) -> list[LabelBaseline]:
+        """
+        Baselines for labels with spend in the last 24h before the clock, ordered by
+        dimension (merchants first) and then by first appearance in that window.
+        """
+        now = self._now_ts
+        hist_start = self._hist_start()
+        last_day_start = now - DAY_SECONDS
+        last_day_day = last_day_start // DAY_SECONDS
+        oldest_day = hist_start // DAY_SECONDS
+        lastday_in_window = self._interior[0] <= last_day_day <= self._interior[1]
+
+        recent: dict[_Key, list[int]] = {}
+        for day in range(last_day_day, (now - 1) // DAY_SECONDS + 1):
+            for key, ld in (self._slot(day) or {}).items():
+                i = bisect_left(ld.events, (last_day_start, -1, 0))
+                if i >= len(ld.events):
+                    continue
+                cents = sum(e[2] for e in ld.events[i:])
+                first_seq = min(e[1] for e in ld.events[i:])
+                acc = recent.get(key)
+                if acc is None:
+                    recent[key] = [cents, first_seq]
+                else:
+                    acc[0] += cents
+                    acc[1] = min(acc[1], first_seq)
+
+        oldest = self._slot(oldest_day) or {}
+        lastday_slot = self._slot(last_day_day) or {}
+
+        out: list[LabelBaseline] = []
+        for key, (last_cents, first_seq) in recent.items():
+            w = self._windows.get(key)
+            clipped: int | None = None
+            old_ld = oldest.get(key)
+            if old_ld is not None:
+                i = bisect_left(old_ld.events, (hist_start, -1, 0))
+                if i < len(old_ld.events):
+                    clipped = sum(e[2] for e in old_ld.events[i:])
+
+            window = w if w is not None else SortedWindow()
+            if clipped is not None:
+                window.add(clipped)
+            med = window.median()
+            mad = window.mad(med)
+            hist_days = len(window)
+            if clipped is not None:
+                window.remove(clipped)
+
+            seen_before = clipped is not None
+            if not seen_before:
+                ld = lastday_slot.get(key) if lastday_in_window else None
+                earlier_days = len(window) - (1 if ld is not None else 0)
+                seen_before = earlier_days > 0 or (
+                    ld is not None and ld.events[0][0] < last_day_start
+                )
+
+            out.append(
+                LabelBaseline(
+                    dim=key[0],
+                    label=key[1],
+                    last_day_cents=int(last_cents),
+                    median_cents=int(med),
+                    mad_cents=int(mad),
+                    hist_days=int(hist_days),
+                    seen_before=bool(seen_before),
+                    first_seq=int(first_seq),
+                )
+            )
+
+        out.sort(key=lambda b: (b.dim != DIM_MERCHANT, b.first_seq))
+        return out
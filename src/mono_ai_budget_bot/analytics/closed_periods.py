@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Protocol
+
+from ..storage.tx_store import TxRecord
+
+FACTS_LOGIC_VERSION = 1
+SETTLED_HORIZON_SECONDS = 2 * 24 * 60 * 60
+
+
+class ClosedFactsCache(Protocol):
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def put(self, key: str, facts: dict[str, Any]) -> None: ...
+
+
+def is_settled(end_ts: int, *, wall_ts: int | None = None) -> bool:
+    """
+    A window is closed once it ended more than SETTLED_HORIZON_SECONDS ago; only those
+    are worth caching, since later syncs rarely touch them.
+    """
+    wall = int(wall_ts if wall_ts is not None else time.time())
+    return int(end_ts) <= wall - SETTLED_HORIZON_SECONDS
+
+
+def ledger_version(records: list[TxRecord]) -> str:
+    """
+    Digest of exactly the records a window's facts are computed from (after refund
+    exclusion, in input order). A late transaction, a newly paired refund or a shifted
+    window edge that changes the set changes the version.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for r in records:
+        parts = (r.id, r.time, r.account_id, r.amount, r.mcc, r.description)
+        h.update("\x1f".join(map(str, parts)).encode())
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def closed_facts_key(kind: str, records: list[TxRecord]) -> str:
+    return f"{kind}-v{FACTS_LOGIC_VERSION}-{ledger_version(records)}"
@@ -6,9 +6,11 @@ from typing import Any
 
 from mono_ai_budget_bot.analytics.categories import category_from_mcc
 from mono_ai_budget_bot.analytics.classify import classify_kind
-from mono_ai_budget_bot.nlq.text_norm import norm
+from mono_ai_budget_bot.core.text_norm import match_key
 from mono_ai_budget_bot.storage.tx_store import TxRecord
 
+from . import vectorized
+
 
 def pct_change(current: float, prev: float) -> float | None:
     if prev == 0:
@@ -67,20 +69,18 @@ def compare_yesterday_to_baseline(
     lookback_days = max(7, min(int(lookback_days), 90))
 
     today0 = (now_ts // 86400) * 86400
-    y0 = today0 - 86400
     hist_start = today0 - lookback_days * 86400
 
     terms: list[str] = []
     if isinstance(merchant_contains, list):
-        terms = [_match_key(x) for x in merchant_contains if isinstance(x, str) and x.strip()]
+        terms = [match_key(x) for x in merchant_contains if isinstance(x, str) and x.strip()]
     else:
-        s = _match_key(merchant_contains or "")
+        s = match_key(merchant_contains or "")
         terms = [s] if s else []
 
     terms = [t for t in terms if t]
     cat = (category or "").strip()
 
-    y_sum = 0
     daily: dict[int, int] = {}
 
     for r in rows:
@@ -102,17 +102,24 @@ def compare_yesterday_to_baseline(
 
         cents = -amt
 
-        if y0 <= t < today0:
-            y_sum += cents
-
         if hist_start <= t < today0:
             d = t // 86400
             daily[d] = daily.get(d, 0) + cents
 
+    return compare_daily_yesterday_to_baseline(daily, today_day=today0 // 86400)
+
+
+def compare_daily_yesterday_to_baseline(daily: dict[int, int], *, today_day: int) -> CompareResult:
+    """
+    compare_yesterday_to_baseline() from {day: spend cents} of the lookback days
+    before `today_day`.
+    """
+    y_day = int(today_day) - 1
+    y_sum = int(daily.get(y_day, 0))
+
     vals = list(daily.values())
     overall = int(median(vals)) if vals else 0
 
-    y_day = y0 // 86400
     y_wd = (y_day + 4) % 7
 
     weekday_vals: list[int] = []
@@ -137,10 +144,6 @@ class WindowBaselineCompareResult:
     delta_cents: int
 
 
-def _match_key(s: str) -> str:
-    return norm(s).replace(" ", "")
-
-
 def compare_window_to_baseline(
     rows: list[TxRecord],
     start_ts: int,
@@ -161,35 +164,66 @@ def compare_window_to_baseline(
     filt = (merchant_contains or "").strip().lower()
     cat = (category or "").strip()
 
-    start_day0 = (start_ts // 86400) * 86400
-    end_day0 = (end_ts // 86400) * 86400
-    window_days = max(1, int((end_day0 - start_day0) // 86400) or 1)
-    window_sec = window_days * 86400
+    hist_start = (start_ts // 86400) * 86400 - lookback_days * 86400
 
-    hist_start = start_day0 - lookback_days * 86400
+    def keep(description: str, mcc: int | None) -> bool:
+        if filt and filt not in match_key(description or ""):
+            return False
+        return not cat or category_from_mcc(mcc) == cat
 
     daily: dict[int, int] = {}
-    for r in rows:
-        t = int(r.time)
-        if t < hist_start or t >= end_ts:
-            continue
+    if vectorized.enabled(len(rows)):
+        daily = vectorized.spend_by_day(rows, ts_from=hist_start, ts_to=end_ts, keep=keep)
+    else:
+        for r in rows:
+            t = int(r.time)
+            if t < hist_start or t >= end_ts:
+                continue
 
-        amt = int(r.amount)
-        kind = classify_kind(amt, r.mcc, r.description)
-        if kind != "spend":
-            continue
+            amt = int(r.amount)
+            if classify_kind(amt, r.mcc, r.description) != "spend":
+                continue
+            if not keep(r.description, r.mcc):
+                continue
 
-        desc = _match_key(r.description or "")
-        if filt and filt not in desc:
-            continue
+            d = t // 86400
+            daily[d] = daily.get(d, 0) + (-amt)
+
+    return compare_daily_window_to_baseline(
+        daily,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        lookback_days=lookback_days,
+        max_windows=max_windows,
+    )
 
-        if cat:
-            c = category_from_mcc(r.mcc)
-            if c != cat:
-                continue
 
-        d = t // 86400
-        daily[d] = daily.get(d, 0) + (-amt)
+def compare_daily_window_to_baseline(
+    daily: dict[int, int],
+    *,
+    start_ts: int,
+    end_ts: int,
+    lookback_days: int = 90,
+    max_windows: int = 12,
+) -> WindowBaselineCompareResult:
+    """
+    compare_window_to_baseline() from {day: spend cents} of the lookback days and the
+    window itself.
+    """
+    start_ts = int(start_ts)
+    end_ts = int(end_ts)
+    if end_ts <= start_ts:
+        return WindowBaselineCompareResult(current_cents=0, baseline_median_cents=0, delta_cents=0)
+
+    lookback_days = max(7, min(int(lookback_days), 180))
+    max_windows = max(3, min(int(max_windows), 24))
+
+    start_day0 = (start_ts // 86400) * 86400
+    end_day0 = (end_ts // 86400) * 86400
+    window_days = max(1, int((end_day0 - start_day0) // 86400) or 1)
+    window_sec = window_days * 86400
+
+    hist_start = start_day0 - lookback_days * 86400
 
     def sum_window(day_start: int, day_end: int) -> int:
         s = 0
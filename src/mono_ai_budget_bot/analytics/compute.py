@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Any
+from typing import Any, Mapping
 
+from . import vectorized
 from .categories import category_from_mcc
 from .models import TxRow
 
@@ -18,6 +19,9 @@ def _shares(amounts_uah: dict[str, float], total_uah: float) -> dict[str, float]
 
 
 def compute_facts(rows: list[TxRow]) -> dict[str, Any]:
+    if vectorized.enabled(len(rows)):
+        return facts_from_sums(**vectorized.facts_sums(rows))
+
     tx_count = len(rows)
 
     spend_total = 0
@@ -67,6 +71,36 @@ def compute_facts(rows: list[TxRow]) -> dict[str, Any]:
             transfer_in_total += r.amount
             by_account[r.account_id]["transfer_in"] += r.amount
 
+    return facts_from_sums(
+        tx_count=tx_count,
+        spend_total=spend_total,
+        income_total=income_total,
+        transfer_out_total=transfer_out_total,
+        transfer_in_total=transfer_in_total,
+        by_account=by_account,
+        merchant_spend=merchant_spend,
+        mcc_spend=mcc_spend,
+        category_real_spend=category_real_spend,
+        uncategorized_real_spend=uncategorized_real_spend,
+    )
+
+
+def facts_from_sums(
+    *,
+    tx_count: int,
+    spend_total: int,
+    income_total: int,
+    transfer_out_total: int,
+    transfer_in_total: int,
+    by_account: Mapping[str, Mapping[str, int]],
+    merchant_spend: Mapping[str, int],
+    mcc_spend: Mapping[str, int],
+    category_real_spend: Mapping[str, int],
+    uncategorized_real_spend: int,
+) -> dict[str, Any]:
+    """
+    Builds the facts dict from minor-unit sums; compute_facts and the daily cube share it.
+    """
     cash_out_total = spend_total + transfer_out_total
     real_spend_total = spend_total
 
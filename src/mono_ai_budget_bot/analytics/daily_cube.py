@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..storage.tx_store import TxRecord, tx_record_from_list, tx_record_to_list
+from .categories import category_from_mcc
+from .compute import facts_from_sums
+from .from_ledger import rows_from_ledger
+from .models import TxRow
+from .normalization import category_label
+from .refunds import merge_refund_candidates
+from .whatif import CAFES_LABEL, WhatIfSums, keyword_groups
+
+SECONDS_IN_DAY = 24 * 60 * 60
+CUBE_VERSION = 2
+TOP_MERCHANTS_TRACKED = 50
+TOP_MERCHANTS_IN_FACTS = 10
+
+_ACCOUNT_FIELDS = ("count", "income", "spend", "transfer_in", "transfer_out")
+
+
+@dataclass(frozen=True)
+class WindowSums:
+    facts_kwargs: dict[str, Any]
+    whatif: WhatIfSums
+    merchants_exact: bool
+
+
+def _row_sums(r: TxRow) -> Iterator[tuple[str, int]]:
+    """
+    (key, value) contributions of one row, except the merchant and lbld keys.
+    """
+    yield "n", 1
+    yield f"acc|count|{r.account_id}", 1
+
+    if r.kind == "spend":
+        amt = abs(r.amount)
+        yield "spend", amt
+        yield f"acc|spend|{r.account_id}", amt
+        if r.mcc is not None:
+            yield f"mcc|{r.mcc}", amt
+        cat = category_from_mcc(r.mcc)
+        yield ("uncat" if cat is None else f"cat|{cat}"), amt
+        label = category_label(r.mcc)
+        yield f"lbl|{label}", amt
+        yield f"lbln|{label}", 1
+        is_taxi, is_delivery = keyword_groups(r.description)
+        if is_taxi:
+            yield "kw|taxi", amt
+        if is_delivery:
+            yield "kw|delivery", amt
+
+    elif r.kind in ("income", "transfer_in"):
+        yield r.kind, r.amount
+        yield f"acc|{r.kind}|{r.account_id}", r.amount
+
+    elif r.kind == "transfer_out":
+        amt = abs(r.amount)
+        yield "transfer_out", amt
+        yield f"acc|transfer_out|{r.account_id}", amt
+
+
+@dataclass
+class DailyCube:
+    """
+    Per-user daily aggregates over [first_day, first_day + n_days) UTC days.
+
+    `daily` maps a namespaced key to sparse {day_offset: minor units}:
+      n, income, spend, transfer_in, transfer_out, uncat
+      cat|<category>, mcc|<mcc>, acc|<field>|<account_id>
+      mer|<description>       (merchants tracked when the cube was built, the
+                               TOP_MERCHANTS_TRACKED largest at the time)
+      lbl|<label>, lbln|<label>, lbld|<label> (spend / spend count / active-day flag
+                               per category_label)
+      kw|taxi, kw|delivery
+
+    Range totals are prefix-sum differences (prefixes are built lazily per key).
+
+    The sums include every transaction. Refund pairing depends on the window a report
+    loads, so the cube keeps `refund_records`, every transaction that could take part
+    in a pair (refund_candidate_ids); reports pair those within their own range and
+    subtract the paired ones (window_sums(exclude=...)).
+
+    `offsets` are the ledger byte offsets already folded in (TxStore.load_appended):
+    add_records() folds in new transactions and roll_to() moves the window forward.
+    `merchant_totals` are whole-cube spend per merchant, an upper bound once days have
+    rolled out (they are not decreased).
+    """
+
+    first_day: int
+    n_days: int
+    daily: dict[str, dict[int, int]] = field(default_factory=dict)
+    merchant_totals: dict[str, int] = field(default_factory=dict)
+    refund_records: list[TxRecord] = field(default_factory=list)
+    offsets: dict[str, int] = field(default_factory=dict)
+    _prefix: dict[str, list[int]] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def start_ts(self) -> int:
+        return self.first_day * SECONDS_IN_DAY
+
+    @property
+    def end_ts(self) -> int:
+        return (self.first_day + self.n_days) * SECONDS_IN_DAY
+
+    @property
+    def untracked_merchant_max(self) -> int:
+        return max(
+            (v for k, v in self.merchant_totals.items() if f"mer|{k}" not in self.daily),
+            default=0,
+        )
+
+    def covers(self, start_ts: int, end_ts: int) -> bool:
+        if start_ts % SECONDS_IN_DAY or end_ts % SECONDS_IN_DAY:
+            return False
+        return self.start_ts <= int(start_ts) <= int(end_ts) <= self.end_ts
+
+    def keys(self, prefix: str) -> list[str]:
+        return sorted(k for k in self.daily if k.startswith(prefix))
+
+    def _cum(self, key: str) -> list[int]:
+        cum = self._prefix.get(key)
+        if cum is None:
+            per_day = [0] * self.n_days
+            for off, v in (self.daily.get(key) or {}).items():
+                per_day[off] = v
+            cum = [0] * (self.n_days + 1)
+            acc = 0
+            for i, v in enumerate(per_day):
+                acc += v
+                cum[i + 1] = acc
+            self._prefix[key] = cum
+        return cum
+
+    def range_sum(self, key: str, start_ts: int, end_ts: int) -> int:
+        if key not in self.daily:
+            return 0
+        cum = self._cum(key)
+        i = int(start_ts) // SECONDS_IN_DAY - self.first_day
+        j = int(end_ts) // SECONDS_IN_DAY - self.first_day
+        return cum[j] - cum[i]
+
+    def day_value(self, key: str, ts: int) -> int:
+        return (self.daily.get(key) or {}).get(int(ts) // SECONDS_IN_DAY - self.first_day, 0)
+
+    def refund_records_between(self, start_ts: int, end_ts: int) -> list[TxRecord]:
+        """
+        Refund candidates with start_ts <= time <= end_ts (load_range semantics).
+        """
+        return [r for r in self.refund_records if int(start_ts) <= int(r.time) <= int(end_ts)]
+
+    def _add(self, key: str, off: int, v: int) -> None:
+        m = self.daily.get(key)
+        if m is None:
+            m = self.daily[key] = {}
+        m[off] = m.get(off, 0) + v
+
+    def add_records(self, records: list[TxRecord]) -> None:
+        """
+        Folds transactions into the daily sums (those outside the cube are skipped).
+        Merchants seen for the first time are tracked only while the cube is empty.
+        """
+        start_ts, end_ts = self.start_ts, self.end_ts
+        in_range = [r for r in records if start_ts <= int(r.time) < end_ts]
+        rows = rows_from_ledger(in_range)
+
+        track_new = not self.merchant_totals
+        spend_by_merchant: dict[str, int] = {}
+        for r in rows:
+            if r.kind == "spend":
+                spend_by_merchant[r.description] = spend_by_merchant.get(r.description, 0) + abs(
+                    r.amount
+                )
+        for desc, amt in spend_by_merchant.items():
+            self.merchant_totals[desc] = self.merchant_totals.get(desc, 0) + amt
+        if track_new:
+            ranked = sorted(self.merchant_totals.items(), key=lambda x: (-x[1], x[0]))
+            for desc, _ in ranked[:TOP_MERCHANTS_TRACKED]:
+                self.daily[f"mer|{desc}"] = {}
+
+        for r in rows:
+            off = int(r.ts) // SECONDS_IN_DAY - self.first_day
+            for key, v in _row_sums(r):
+                self._add(key, off, v)
+            if r.kind == "spend":
+                self.daily.setdefault(f"lbld|{category_label(r.mcc)}", {})[off] = 1
+                if f"mer|{r.description}" in self.daily:
+                    self._add(f"mer|{r.description}", off, abs(r.amount))
+        self._prefix.clear()
+
+    def add_refund_candidates(self, records: list[TxRecord]) -> None:
+        self.refund_records = merge_refund_candidates(
+            self.refund_records, records, start_ts=self.start_ts, end_ts=self.end_ts
+        )
+
+    def roll_to(self, first_day: int) -> bool:
+        """
+        Moves the window forward to start at `first_day`, dropping the days that left
+        it. False if that is not possible (moving back, or no day would be kept).
+        """
+        shift = int(first_day) - self.first_day
+        if shift < 0 or shift >= self.n_days:
+            return False
+        if shift == 0:
+            return True
+        daily: dict[str, dict[int, int]] = {}
+        for key, per_day in self.daily.items():
+            kept = {off - shift: v for off, v in per_day.items() if off >= shift}
+            if kept or key.startswith("mer|"):
+                daily[key] = kept
+        self.daily = daily
+        self.first_day = int(first_day)
+        self.refund_records = [r for r in self.refund_records if int(r.time) >= self.start_ts]
+        self._prefix.clear()
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CUBE_VERSION,
+            "first_day": self.first_day,
+            "n_days": self.n_days,
+            "daily": {k: sorted(v.items()) for k, v in self.daily.items()},
+            "merchant_totals": self.merchant_totals,
+            "refund_records": [tx_record_to_list(r) for r in self.refund_records],
+            "offsets": self.offsets,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DailyCube | None:
+        if not isinstance(data, dict) or data.get("version") != CUBE_VERSION:
+            return None
+        try:
+            return cls(
+                first_day=int(data["first_day"]),
+                n_days=int(data["n_days"]),
+                daily={
+                    str(k): {int(off): int(v) for off, v in pairs}
+                    for k, pairs in dict(data["daily"]).items()
+                },
+                merchant_totals={
+                    str(k): int(v) for k, v in dict(data.get("merchant_totals") or {}).items()
+                },
+                refund_records=[tx_record_from_list(v) for v in data.get("refund_records") or []],
+                offsets={str(k): int(v) for k, v in dict(data.get("offsets") or {}).items()},
+            )
+        except Exception:
+            return None
+
+
+def build_daily_cube(records: list[TxRecord], *, first_day: int, n_days: int) -> DailyCube:
+    cube = DailyCube(first_day=first_day, n_days=n_days)
+    cube.add_records(records)
+    cube.add_refund_candidates(records)
+    return cube
+
+
+def window_sums(
+    cube: DailyCube, start_ts: int, end_ts: int, *, exclude: Iterable[TxRecord] = ()
+) -> WindowSums:
+    """
+    All facts/what-if aggregates for a day-aligned window, from prefix sums only, less
+    the `exclude`d transactions inside it (refund pairs).
+
+    Top merchants are exact when the 10th largest tracked merchant beats every
+    untracked merchant's whole-cube total; otherwise `merchants_exact` is False and the
+    caller recomputes merchants from raw records.
+    """
+    excluded = rows_from_ledger([r for r in exclude if start_ts <= int(r.time) < end_ts])
+    less: dict[str, int] = {}
+    label_days: dict[tuple[str, int], int] = {}
+    for r in excluded:
+        for key, v in _row_sums(r):
+            less[key] = less.get(key, 0) + v
+        if r.kind == "spend":
+            less[f"mer|{r.description}"] = less.get(f"mer|{r.description}", 0) + abs(r.amount)
+            day_key = (category_label(r.mcc), int(r.ts) // SECONDS_IN_DAY)
+            label_days[day_key] = label_days.get(day_key, 0) + 1
+    for (label, day), n in label_days.items():
+        if cube.day_value(f"lbln|{label}", day * SECONDS_IN_DAY) <= n:
+            less[f"lbld|{label}"] = less.get(f"lbld|{label}", 0) + 1
+
+    def s(key: str) -> int:
+        return cube.range_sum(key, start_ts, end_ts) - less.get(key, 0)
+
+    by_account: dict[str, dict[str, int]] = {}
+    for key in cube.keys("acc|count|"):
+        acc_id = key.split("|", 2)[2]
+        if s(key) <= 0:
+            continue
+        by_account[acc_id] = {f: s(f"acc|{f}|{acc_id}") for f in _ACCOUNT_FIELDS}
+
+    merchant_spend: dict[str, int] = {}
+    for key in cube.keys("mer|"):
+        v = s(key)
+        if v > 0:
+            merchant_spend[key.split("|", 1)[1]] = v
+    top = sorted(merchant_spend.values(), reverse=True)
+    merchants_exact = cube.untracked_merchant_max <= 0 or (
+        len(top) >= TOP_MERCHANTS_IN_FACTS
+        and top[TOP_MERCHANTS_IN_FACTS - 1] > cube.untracked_merchant_max
+    )
+
+    def by_prefix(prefix: str) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for key in cube.keys(prefix):
+            v = s(key)
+            if v:
+                out[key[len(prefix) :]] = v
+        return out
+
+    labels = by_prefix("lbl|")
+    spend_total = s("spend")
+    facts_kwargs: dict[str, Any] = {
+        "tx_count": s("n"),
+        "spend_total": spend_total,
+        "income_total": s("income"),
+        "transfer_out_total": s("transfer_out"),
+        "transfer_in_total": s("transfer_in"),
+        "by_account": by_account,
+        "merchant_spend": merchant_spend,
+        "mcc_spend": by_prefix("mcc|"),
+        "category_real_spend": by_prefix("cat|"),
+        "uncategorized_real_spend": s("uncat"),
+    }
+    whatif = WhatIfSums(
+        taxi_minor=s("kw|taxi"),
+        delivery_minor=s("kw|delivery"),
+        cafes_minor=labels.get(CAFES_LABEL, 0),
+        total_spend_minor=spend_total,
+        category_minor=labels,
+        category_active_days={k: s(f"lbld|{k}") for k in labels},
+    )
+    return WindowSums(facts_kwargs=facts_kwargs, whatif=whatif, merchants_exact=merchants_exact)
+
+
+def facts_from_window(sums: WindowSums) -> dict[str, Any]:
+    return facts_from_sums(**sums.facts_kwargs)
@@ -1,13 +1,51 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable
 
 from ..storage.tx_store import TxRecord
 from .anomalies import detect_anomalies
+from .closed_periods import ClosedFactsCache
+from .compare import compare_categories, compare_totals
+from .daily_cube import DailyCube, facts_from_window, window_sums
 from .from_ledger import rows_from_ledger
-from .period_report import build_period_report_from_ledger
+from .models import TxRow
+from .period_report import SECONDS_IN_DAY, _to_iso_utc, build_period_report_from_ledger
 from .refunds import build_refund_insights, detect_refund_pairs, refund_ignore_ids
 from .trends import compute_trends
+from .whatif import build_whatif_suggestions_from_sums
+
+
+def _add_trends_and_anomalies(
+    current_facts: dict[str, Any],
+    *,
+    trend_rows: list[TxRow],
+    rows: list[TxRow],
+    now_ts: int,
+    trends_window_days: int,
+    anomalies_lookback_days: int,
+    anomalies_min_threshold_cents: int,
+) -> None:
+    current_facts["trends"] = compute_trends(
+        trend_rows,
+        now_ts=now_ts,
+        window_days=trends_window_days,
+    )
+
+    a = detect_anomalies(
+        rows,
+        now_ts=now_ts,
+        lookback_days=anomalies_lookback_days,
+        min_threshold_cents=anomalies_min_threshold_cents,
+    )
+    current_facts["anomalies"] = [
+        {
+            "label": x.label,
+            "last_day_uah": x.last_day_cents / 100.0,
+            "baseline_median_uah": x.baseline_median_cents / 100.0,
+            "reason": x.reason,
+        }
+        for x in a
+    ]
 
 
 def enrich_period_facts(
@@ -18,15 +56,22 @@ def enrich_period_facts(
     trends_window_days: int = 7,
     anomalies_lookback_days: int = 28,
     anomalies_min_threshold_cents: int = 20000,
+    closed_facts: ClosedFactsCache | None = None,
 ) -> dict[str, Any]:
-    report = build_period_report_from_ledger(records, days_back=days_back, now_ts=now_ts)
+    pairs = detect_refund_pairs(records)
+    report = build_period_report_from_ledger(
+        records,
+        days_back=days_back,
+        now_ts=now_ts,
+        refund_pairs=pairs,
+        closed_facts=closed_facts,
+    )
     current_facts: dict[str, Any] = report["current"]
 
     cur = report["period"]["current"]
     cur_start = int(cur["start_ts"])
     cur_end = int(cur["end_ts"])
 
-    pairs = detect_refund_pairs(records)
     current_facts["refunds"] = build_refund_insights(pairs, start_ts=cur_start, end_ts=cur_end)
 
     current_records = [r for r in records if cur_start <= int(r.time) < cur_end]
@@ -36,30 +81,15 @@ def enrich_period_facts(
         current_records = [r for r in current_records if r.id not in ignore_ids]
         trend_records = [r for r in trend_records if r.id not in ignore_ids]
 
-    trend_rows = rows_from_ledger(trend_records)
-    rows = rows_from_ledger(current_records)
-
-    current_facts["trends"] = compute_trends(
-        trend_rows,
-        now_ts=now_ts,
-        window_days=trends_window_days,
-    )
-
-    a = detect_anomalies(
-        rows,
+    _add_trends_and_anomalies(
+        current_facts,
+        trend_rows=rows_from_ledger(trend_records),
+        rows=rows_from_ledger(current_records),
         now_ts=now_ts,
-        lookback_days=anomalies_lookback_days,
-        min_threshold_cents=anomalies_min_threshold_cents,
+        trends_window_days=trends_window_days,
+        anomalies_lookback_days=anomalies_lookback_days,
+        anomalies_min_threshold_cents=anomalies_min_threshold_cents,
     )
-    current_facts["anomalies"] = [
-        {
-            "label": x.label,
-            "last_day_uah": x.last_day_cents / 100.0,
-            "baseline_median_uah": x.baseline_median_cents / 100.0,
-            "reason": x.reason,
-        }
-        for x in a
-    ]
 
     current_facts["comparison"] = {
         "prev_period": {
@@ -73,3 +103,80 @@ def enrich_period_facts(
     }
 
     return current_facts
+
+
+def enrich_period_facts_from_cube(
+    cube: DailyCube,
+    *,
+    days_back: int,
+    now_ts: int,
+    load_records: Callable[[int, int], list[TxRecord]],
+    trends_window_days: int = 7,
+    anomalies_lookback_days: int = 28,
+    anomalies_min_threshold_cents: int = 20000,
+) -> dict[str, Any]:
+    """
+    enrich_period_facts for a day-aligned window that `cube` covers (including the
+    equal-length previous window and the day before it). Totals, categories, accounts
+    and what-if come from the cube; refunds are paired over the cube's refund candidates
+    loaded by the per-window path, so the same pairs are dropped. Raw records are loaded
+    only for the recent tail that trends and anomalies look at, and for the whole window
+    only if top merchants are not exact.
+    """
+    cur_start = int(now_ts) - int(days_back) * SECONDS_IN_DAY
+    prev_start = cur_start - int(days_back) * SECONDS_IN_DAY
+    lookback_from = prev_start - SECONDS_IN_DAY
+    if not cube.covers(lookback_from, now_ts):
+        raise ValueError("daily cube does not cover the requested window")
+
+    pairs = detect_refund_pairs(cube.refund_records_between(lookback_from, now_ts))
+    ignore_ids = refund_ignore_ids(pairs)
+    paired = [r for r in cube.refund_records if r.id in ignore_ids]
+    cur = window_sums(cube, cur_start, now_ts, exclude=paired)
+    prev = window_sums(cube, prev_start, cur_start, exclude=paired)
+
+    tail_days = max(anomalies_lookback_days, 2 * trends_window_days) + 1
+    tail_from = int(now_ts) - min(2 * int(days_back) + 1, tail_days) * SECONDS_IN_DAY
+    load_from = tail_from if cur.merchants_exact else min(tail_from, cur_start)
+    records = [r for r in load_records(load_from, now_ts) if r.id not in ignore_ids]
+
+    if not cur.merchants_exact:
+        merchant_spend: dict[str, int] = {}
+        for r in rows_from_ledger([x for x in records if cur_start <= int(x.time) < now_ts]):
+            if r.kind == "spend":
+                merchant_spend[r.description] = merchant_spend.get(r.description, 0) + abs(r.amount)
+        cur.facts_kwargs["merchant_spend"] = merchant_spend
+
+    current_facts = facts_from_window(cur)
+    prev_facts = facts_from_window(prev)
+    current_facts["whatif_suggestions"] = build_whatif_suggestions_from_sums(
+        cur.whatif, period_days=days_back
+    )
+    current_facts["refunds"] = build_refund_insights(pairs, start_ts=cur_start, end_ts=int(now_ts))
+
+    tail = [r for r in records if tail_from <= int(r.time)]
+    _add_trends_and_anomalies(
+        current_facts,
+        trend_rows=rows_from_ledger(tail),
+        rows=rows_from_ledger([r for r in tail if cur_start <= int(r.time) < now_ts]),
+        now_ts=now_ts,
+        trends_window_days=trends_window_days,
+        anomalies_lookback_days=anomalies_lookback_days,
+        anomalies_min_threshold_cents=anomalies_min_threshold_cents,
+    )
+
+    current_facts["comparison"] = {
+        "prev_period": {
+            "dt_from": _to_iso_utc(prev_start),
+            "dt_to": _to_iso_utc(cur_start),
+            "totals": prev_facts.get("totals", {}),
+            "categories_real_spend": prev_facts.get("categories_real_spend", {}),
+        },
+        "totals": compare_totals(current=current_facts, prev=prev_facts),
+        "categories": compare_categories(
+            current=current_facts.get("categories_real_spend", {}),
+            prev=prev_facts.get("categories_real_spend", {}),
+        ),
+    }
+
+    return current_facts
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 from ..storage.tx_store import TxRecord
+from .closed_periods import ClosedFactsCache, closed_facts_key, is_settled
 from .compare import compare_categories, compare_totals
 from .compute import compute_facts
 from .from_ledger import rows_from_ledger
-from .refunds import detect_refund_pairs, refund_ignore_ids
+from .refunds import RefundPair, detect_refund_pairs, refund_ignore_ids
 from .whatif import build_whatif_suggestions
 
 SECONDS_IN_DAY = 24 * 60 * 60
@@ -58,32 +59,64 @@ def build_period_windows(
     )
 
 
+def _cached_window_facts(
+    kind: str,
+    window: PeriodWindow,
+    records: list[TxRecord],
+    compute: Callable[[], dict[str, Any]],
+    closed_facts: ClosedFactsCache | None,
+) -> dict[str, Any]:
+    if closed_facts is None or not is_settled(window.end_ts):
+        return compute()
+
+    key = closed_facts_key(kind, records)
+    facts = closed_facts.get(key)
+    if facts is None:
+        facts = compute()
+        closed_facts.put(key, facts)
+    return facts
+
+
 def build_period_report_from_ledger(
     records: list[TxRecord],
     days_back: int,
     now_ts: int | None = None,
+    *,
+    refund_pairs: list[RefundPair] | None = None,
+    closed_facts: ClosedFactsCache | None = None,
 ) -> dict[str, Any]:
     """
     Unifies week/month (and any N-day) reports.
 
     Input: ledger TxRecord list (can be multiple accounts, mixed)
     Output: dict with period windows, current/previous facts, compare blocks.
+    `refund_pairs` lets callers that already paired `records` skip re-pairing.
+    With `closed_facts`, facts of settled windows are reused across refreshes.
     """
     current_w, prev_w = build_period_windows(days_back=days_back, now_ts=now_ts)
-    pairs = detect_refund_pairs(records)
+    pairs = refund_pairs if refund_pairs is not None else detect_refund_pairs(records)
     ignore_ids = refund_ignore_ids(pairs)
     current_records = _filter_records(records, current_w)
     prev_records = _filter_records(records, prev_w)
     if ignore_ids:
         current_records = [r for r in current_records if r.id not in ignore_ids]
         prev_records = [r for r in prev_records if r.id not in ignore_ids]
-    current_rows = rows_from_ledger(current_records)
-    prev_rows = rows_from_ledger(prev_records)
 
-    current_facts = compute_facts(current_rows)
-    prev_facts = compute_facts(prev_rows)
-    current_facts["whatif_suggestions"] = build_whatif_suggestions(
-        current_rows, period_days=days_back
+    def _current() -> dict[str, Any]:
+        current_rows = rows_from_ledger(current_records)
+        facts = compute_facts(current_rows)
+        facts["whatif_suggestions"] = build_whatif_suggestions(current_rows, period_days=days_back)
+        return facts
+
+    current_facts = _cached_window_facts(
+        f"current{days_back}", current_w, current_records, _current, closed_facts
+    )
+    prev_facts = _cached_window_facts(
+        "previous",
+        prev_w,
+        prev_records,
+        lambda: compute_facts(rows_from_ledger(prev_records)),
+        closed_facts,
     )
 
     compare_block: dict[str, Any] = {
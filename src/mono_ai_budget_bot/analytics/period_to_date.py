@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..core.time_ranges import KYIV_TZ, calendar_period_bounds
+from ..storage.tx_store import TxRecord, tx_record_from_list, tx_record_to_list
+from .categories import category_from_mcc
+from .compare import compare_categories, compare_totals
+from .compute import facts_from_sums
+from .from_ledger import rows_from_ledger
+from .models import TxRow
+from .period_report import _to_iso_utc
+from .refunds import (
+    RefundPair,
+    build_refund_insights,
+    detect_refund_pairs,
+    merge_refund_candidates,
+    refund_ignore_ids,
+)
+
+TO_DATE_VERSION = 2
+TO_DATE_KINDS = ("week", "month")
+
+_ACCOUNT_FIELDS = ("spend", "income", "transfer_out", "transfer_in", "count")
+
+
+def _local_day(ts: int) -> datetime:
+    local = datetime.fromtimestamp(int(ts), tz=KYIV_TZ)
+    return datetime.combine(local.date(), datetime.min.time(), tzinfo=KYIV_TZ)
+
+
+@dataclass
+class PeriodToDate:
+    """
+    Running compute_facts() sums for one calendar week/month (Kyiv time).
+
+    `offsets` are the ledger byte offsets already folded in (TxStore.load_appended), so
+    a refresh only reads what was appended since. The ledger dedupes by tx id, which
+    makes every appended line a new transaction. `as_of_ts` is the latest of the
+    refresh time and any folded-in tx time.
+
+    The sums include every transaction; `refund_records` keeps the period's refund
+    candidates and facts() drops the pairs found among them, as period reports do.
+    `daily` holds the totals/category sums per Kyiv day of the period, and `previous`
+    is the whole previous calendar period, so facts() compares with its same-length
+    start without reading the ledger.
+    """
+
+    kind: str
+    start_ts: int
+    end_ts: int
+    as_of_ts: int
+    offsets: dict[str, int]
+    tx_count: int = 0
+    spend_total: int = 0
+    income_total: int = 0
+    transfer_out_total: int = 0
+    transfer_in_total: int = 0
+    by_account: dict[str, dict[str, int]] = field(default_factory=dict)
+    merchant_spend: dict[str, int] = field(default_factory=dict)
+    mcc_spend: dict[str, int] = field(default_factory=dict)
+    category_real_spend: dict[str, int] = field(default_factory=dict)
+    uncategorized_real_spend: int = 0
+    daily: dict[str, dict[int, int]] = field(default_factory=dict)
+    refund_records: list[TxRecord] = field(default_factory=list)
+    previous: PeriodToDate | None = None
+
+    @classmethod
+    def empty(cls, kind: str, now_ts: int, offsets: dict[str, int]) -> PeriodToDate:
+        start_ts, end_ts = calendar_period_bounds(kind, now_ts)
+        return cls(
+            kind=kind,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            as_of_ts=int(now_ts),
+            offsets=dict(offsets),
+        )
+
+    @classmethod
+    def empty_with_previous(cls, kind: str, now_ts: int, offsets: dict[str, int]) -> PeriodToDate:
+        acc = cls.empty(kind, now_ts, offsets)
+        acc.previous = cls.empty(kind, acc.start_ts - 1, {})
+        acc.previous.as_of_ts = acc.start_ts
+        return acc
+
+    def _day(self, ts: int) -> int:
+        return (_local_day(ts) - _local_day(self.start_ts)).days
+
+    def _fold(self, rows: list[TxRow], sign: int = 1) -> None:
+        def add(m: dict[Any, int], key: Any, v: int) -> None:
+            m[key] = m.get(key, 0) + v
+            if sign < 0 and not m[key]:
+                del m[key]
+
+        def add_daily(key: str, day: int, v: int) -> None:
+            add(self.daily.setdefault(key, {}), day, v)
+
+        for r in rows:
+            day = self._day(r.ts)
+            self.tx_count += sign
+            acc = self.by_account.get(r.account_id)
+            if acc is None:
+                acc = self.by_account[r.account_id] = dict.fromkeys(_ACCOUNT_FIELDS, 0)
+            acc["count"] += sign
+
+            if r.kind == "spend":
+                amt = sign * abs(r.amount)
+                self.spend_total += amt
+                acc["spend"] += amt
+                add(self.merchant_spend, r.description, amt)
+                if r.mcc is not None:
+                    add(self.mcc_spend, str(r.mcc), amt)
+                cat = category_from_mcc(r.mcc)
+                if cat is None:
+                    self.uncategorized_real_spend += amt
+                else:
+                    add(self.category_real_spend, cat, amt)
+                    add_daily(f"cat|{cat}", day, amt)
+                add_daily("spend", day, amt)
+
+            elif r.kind in ("income", "transfer_in"):
+                amt = sign * r.amount
+                if r.kind == "income":
+                    self.income_total += amt
+                else:
+                    self.transfer_in_total += amt
+                acc[r.kind] += amt
+                add_daily(r.kind, day, amt)
+
+            elif r.kind == "transfer_out":
+                amt = sign * abs(r.amount)
+                self.transfer_out_total += amt
+                acc["transfer_out"] += amt
+                add_daily("transfer_out", day, amt)
+
+            if sign < 0 and not acc["count"]:
+                del self.by_account[r.account_id]
+
+    def add_records(self, records: list[TxRecord]) -> None:
+        """
+        O(len(records)); records of the previous period go to `previous`, the rest
+        outside [start_ts, end_ts) are ignored.
+        """
+        prev = self.previous
+        in_period: list[TxRecord] = []
+        in_previous: list[TxRecord] = []
+        for r in records:
+            t = int(r.time)
+            if t > self.as_of_ts:
+                self.as_of_ts = t
+            if self.start_ts <= t < self.end_ts:
+                in_period.append(r)
+            elif prev is not None and prev.start_ts <= t < prev.end_ts:
+                in_previous.append(r)
+        self._fold(rows_from_ledger(in_period))
+        if prev is not None and in_previous:
+            prev._fold(rows_from_ledger(in_previous))
+
+    def add_refund_candidates(self, records: list[TxRecord]) -> None:
+        self.refund_records = merge_refund_candidates(
+            self.refund_records, records, start_ts=self.start_ts, end_ts=self.end_ts
+        )
+        if self.previous is not None:
+            self.previous.add_refund_candidates(records)
+
+    def _net(self, until_ts: int | None = None) -> tuple[list[RefundPair], PeriodToDate]:
+        """
+        Refund pairs among the candidates before `until_ts`, and a copy of the sums
+        without them.
+        """
+        candidates = [r for r in self.refund_records if until_ts is None or int(r.time) < until_ts]
+        pairs = detect_refund_pairs(candidates)
+        ignore_ids = refund_ignore_ids(pairs)
+        net = copy.deepcopy(
+            PeriodToDate(**{**self.__dict__, "refund_records": [], "previous": None})
+        )
+        net._fold(rows_from_ledger([r for r in candidates if r.id in ignore_ids]), -1)
+        return pairs, net
+
+    def _sums(self) -> dict[str, Any]:
+        return {
+            "tx_count": self.tx_count,
+            "spend_total": self.spend_total,
+            "income_total": self.income_total,
+            "transfer_out_total": self.transfer_out_total,
+            "transfer_in_total": self.transfer_in_total,
+            "by_account": self.by_account,
+            "merchant_spend": self.merchant_spend,
+            "mcc_spend": self.mcc_spend,
+            "category_real_spend": self.category_real_spend,
+            "uncategorized_real_spend": self.uncategorized_real_spend,
+        }
+
+    def _comparison(self, facts: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Compares with the first as many Kyiv days of the previous period as have
+        started in this one (e.g. March 1-15 with February 1-15).
+        """
+        prev = self.previous
+        if prev is None:
+            return None
+        days = self._day(self.as_of_ts) + 1
+        cut_ts = min(
+            prev.end_ts, int((_local_day(prev.start_ts) + timedelta(days=days)).timestamp())
+        )
+        _, net = prev._net(until_ts=cut_ts)
+
+        def s(key: str) -> int:
+            return sum(v for d, v in (net.daily.get(key) or {}).items() if d < days)
+
+        prev_facts = facts_from_sums(
+            tx_count=0,
+            spend_total=s("spend"),
+            income_total=s("income"),
+            transfer_out_total=s("transfer_out"),
+            transfer_in_total=s("transfer_in"),
+            by_account={},
+            merchant_spend={},
+            mcc_spend={},
+            category_real_spend={
+                k[len("cat|") :]: v for k in net.daily if k.startswith("cat|") if (v := s(k))
+            },
+            uncategorized_real_spend=0,
+        )
+        return {
+            "prev_period": {
+                "dt_from": _to_iso_utc(prev.start_ts),
+                "dt_to": _to_iso_utc(cut_ts),
+                "totals": prev_facts.get("totals", {}),
+                "categories_real_spend": prev_facts.get("categories_real_spend", {}),
+            },
+            "totals": compare_totals(current=facts, prev=prev_facts),
+            "categories": compare_categories(
+                current=facts.get("categories_real_spend", {}),
+                prev=prev_facts.get("categories_real_spend", {}),
+            ),
+        }
+
+    def facts(self) -> dict[str, Any]:
+        pairs, net = self._net()
+        facts = facts_from_sums(**net._sums())
+        facts["refunds"] = build_refund_insights(pairs, start_ts=self.start_ts, end_ts=self.end_ts)
+        comparison = self._comparison(facts)
+        if comparison is not None:
+            facts["comparison"] = comparison
+        facts["period_to_date"] = {
+            "kind": self.kind,
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+            "as_of_ts": self.as_of_ts,
+        }
+        return facts
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": TO_DATE_VERSION,
+            "kind": self.kind,
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+            "as_of_ts": self.as_of_ts,
+            "offsets": self.offsets,
+            **self._sums(),
+            "daily": {k: sorted(v.items()) for k, v in self.daily.items()},
+            "refund_records": [tx_record_to_list(r) for r in self.refund_records],
+            "previous": self.previous.to_dict() if self.previous is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PeriodToDate | None:
+        if not isinstance(data, dict) or data.get("version") != TO_DATE_VERSION:
+            return None
+        try:
+            previous = None
+            if data.get("previous") is not None:
+                previous = cls.from_dict(data["previous"])
+                if previous is None:
+                    return None
+            return cls(
+                kind=str(data["kind"]),
+                start_ts=int(data["start_ts"]),
+                end_ts=int(data["end_ts"]),
+                as_of_ts=int(data["as_of_ts"]),
+                offsets={str(k): int(v) for k, v in dict(data["offsets"]).items()},
+                tx_count=int(data["tx_count"]),
+                spend_total=int(data["spend_total"]),
+                income_total=int(data["income_total"]),
+                transfer_out_total=int(data["transfer_out_total"]),
+                transfer_in_total=int(data["transfer_in_total"]),
+                by_account={
+                    str(k): {f: int(v.get(f, 0)) for f in _ACCOUNT_FIELDS}
+                    for k, v in dict(data["by_account"]).items()
+                },
+                merchant_spend={str(k): int(v) for k, v in dict(data["merchant_spend"]).items()},
+                mcc_spend={str(k): int(v) for k, v in dict(data["mcc_spend"]).items()},
+                category_real_spend={
+                    str(k): int(v) for k, v in dict(data["category_real_spend"]).items()
+                },
+                uncategorized_real_spend=int(data["uncategorized_real_spend"]),
+                daily={
+                    str(k): {int(d): int(v) for d, v in pairs}
+                    for k, pairs in dict(data["daily"]).items()
+                },
+                refund_records=[tx_record_from_list(v) for v in data["refund_records"]],
+                previous=previous,
+            )
+        except Exception:
+            return None
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from statistics import mean, median
+from typing import Any
 
 from mono_ai_budget_bot.analytics.classify import classify_kind
 from mono_ai_budget_bot.storage.tx_store import TxRecord
 
+from . import vectorized
+from .compare import (
+    CompareResult,
+    WindowBaselineCompareResult,
+    compare_daily_window_to_baseline,
+    compare_daily_yesterday_to_baseline,
+)
+
+SECONDS_IN_DAY = 86400
+PROFILE_LOOKBACK_DAYS = 90
+SPENDING_BASELINE_VERSION = 1
+
 
 @dataclass(frozen=True)
 class Baseline:
@@ -21,24 +34,23 @@ class Baseline:
 def compute_baseline(rows: list[TxRecord], window_days: int = 28) -> Baseline:
     window_days = max(7, min(int(window_days), 90))
 
-    spend_rows: list[TxRecord] = []
-    spend_by_kind: dict[str, int] = {}
+    by_day: dict[int, int] = {}
+    if vectorized.enabled(len(rows)):
+        by_day = vectorized.spend_by_day(rows)
+    else:
+        for r in rows:
+            if classify_kind(r.amount, r.mcc, r.description) != "spend":
+                continue
+            day = int(r.time) // 86400
+            by_day[day] = by_day.get(day, 0) + (-int(r.amount))
 
-    for r in rows:
-        kind = classify_kind(r.amount, r.mcc, r.description)
-        if kind != "spend":
-            continue
-        spend_rows.append(r)
-        spend_by_kind["spend"] = spend_by_kind.get("spend", 0) + (-int(r.amount))
+    return _baseline_from_days(by_day, window_days)
 
-    total = sum(-int(r.amount) for r in spend_rows)
-    daily_avg = int(total / window_days) if window_days > 0 else 0
 
-    by_day: dict[int, int] = {}
-    for r in spend_rows:
-        t = int(r.time)
-        day = t // 86400
-        by_day[day] = by_day.get(day, 0) + (-int(r.amount))
+def _baseline_from_days(by_day: dict[int, int], window_days: int) -> Baseline:
+    total = sum(by_day.values())
+    spend_by_kind: dict[str, int] = {"spend": total} if by_day else {}
+    daily_avg = int(total / window_days) if window_days > 0 else 0
 
     min_day = min(by_day.keys()) if by_day else 0
     daily_vals = [by_day.get(min_day + i, 0) for i in range(window_days)]
@@ -69,10 +81,192 @@ def compute_baseline(rows: list[TxRecord], window_days: int = 28) -> Baseline:
 
 
 def build_user_profile(rows: list[TxRecord], window_days: int = 28) -> dict[str, int]:
-    b = compute_baseline(rows, window_days=window_days)
+    return _profile_fields(compute_baseline(rows, window_days=window_days))
+
+
+def _profile_fields(b: Baseline) -> dict[str, int]:
     return {
         "window_days": b.window_days,
         "total_spend_cents": b.total_spend_cents,
         "daily_avg_cents": b.daily_avg_cents,
         "daily_median_cents": b.daily_median_cents,
     }
+
+
+@dataclass
+class SpendingBaseline:
+    """
+    Incrementally maintained input of compute_baseline(): daily spend totals of the
+    last `lookback_days` UTC days (today included) in a ring buffer, plus running
+    total and per-weekday sums.
+
+    `offsets` are the ledger byte offsets already folded in (TxStore.load_appended), so
+    a refresh only classifies the appended transactions; `advance()` drops the days
+    that left the window. A slot is None for a day without spend rows.
+    """
+
+    first_day: int
+    offsets: dict[str, int]
+    lookback_days: int = PROFILE_LOOKBACK_DAYS
+    daily: list[int | None] = field(default_factory=list)
+    total_cents: int = 0
+    weekday_sum_cents: list[int] = field(default_factory=lambda: [0] * 7)
+    weekday_days: list[int] = field(default_factory=lambda: [0] * 7)
+
+    def __post_init__(self) -> None:
+        if len(self.daily) != self.lookback_days:
+            self.daily = [None] * self.lookback_days
+
+    @classmethod
+    def empty(
+        cls, now_ts: int, offsets: dict[str, int], *, lookback_days: int = PROFILE_LOOKBACK_DAYS
+    ) -> SpendingBaseline:
+        today = int(now_ts) // SECONDS_IN_DAY
+        return cls(
+            first_day=today - lookback_days + 1, offsets=dict(offsets), lookback_days=lookback_days
+        )
+
+    @property
+    def last_day(self) -> int:
+        return self.first_day + self.lookback_days - 1
+
+    def _slot(self, day: int) -> int:
+        return day % self.lookback_days
+
+    def advance(self, now_ts: int) -> None:
+        first_day = int(now_ts) // SECONDS_IN_DAY - self.lookback_days + 1
+        if first_day <= self.first_day:
+            return
+        for day in range(self.first_day, min(first_day, self.last_day + 1)):
+            i = self._slot(day)
+            cents = self.daily[i]
+            if cents is None:
+                continue
+            self.total_cents -= cents
+            self.weekday_sum_cents[(day + 4) % 7] -= cents
+            self.weekday_days[(day + 4) % 7] -= 1
+            self.daily[i] = None
+        self.first_day = first_day
+
+    def add_records(self, records: list[TxRecord]) -> None:
+        """
+        O(len(records)); records outside the window are ignored.
+        """
+        for r in records:
+            day = int(r.time) // SECONDS_IN_DAY
+            if day < self.first_day or day > self.last_day:
+                continue
+            if classify_kind(r.amount, r.mcc, r.description) != "spend":
+                continue
+            cents = -int(r.amount)
+            i = self._slot(day)
+            wd = (day + 4) % 7
+            if self.daily[i] is None:
+                self.daily[i] = 0
+                self.weekday_days[wd] += 1
+            self.daily[i] += cents
+            self.total_cents += cents
+            self.weekday_sum_cents[wd] += cents
+
+    def spend_by_day(
+        self, first_day: int | None = None, end_day: int | None = None
+    ) -> dict[int, int]:
+        """
+        {day: spend cents} for the days in [first_day, end_day) that had spend rows.
+        """
+        lo = self.first_day if first_day is None else max(self.first_day, first_day)
+        hi = self.last_day + 1 if end_day is None else min(self.last_day + 1, end_day)
+        out: dict[int, int] = {}
+        for day in range(lo, hi):
+            cents = self.daily[self._slot(day)]
+            if cents is not None:
+                out[day] = cents
+        return out
+
+    def baseline(self, window_days: int = 28) -> Baseline:
+        """
+        Same result as compute_baseline() over the window's transactions; totals and
+        weekday averages come from the running sums.
+        """
+        window_days = max(7, min(int(window_days), 90))
+        by_day = self.spend_by_day()
+        b = _baseline_from_days(by_day, window_days)
+        total = self.total_cents
+        return Baseline(
+            window_days=b.window_days,
+            total_spend_cents=total,
+            daily_avg_cents=int(total / window_days),
+            daily_median_cents=b.daily_median_cents,
+            spend_by_kind_cents={"spend": total} if by_day else {},
+            weekday_median_cents=b.weekday_median_cents,
+            weekday_avg_cents={
+                wd: int(self.weekday_sum_cents[wd] / n)
+                for wd, n in enumerate(self.weekday_days)
+                if n > 0
+            },
+        )
+
+    def profile(self, window_days: int = 28) -> dict[str, int]:
+        return _profile_fields(self.baseline(window_days))
+
+    def compare_yesterday(self, now_ts: int, lookback_days: int = 28) -> CompareResult:
+        """
+        compare_yesterday_to_baseline() without filters, from the daily totals.
+        """
+        today = int(now_ts) // SECONDS_IN_DAY
+        lookback_days = max(7, min(int(lookback_days), self.lookback_days - 1))
+        return compare_daily_yesterday_to_baseline(
+            self.spend_by_day(today - lookback_days, today), today_day=today
+        )
+
+    def compare_window(
+        self, start_ts: int, end_ts: int, lookback_days: int = 60, max_windows: int = 12
+    ) -> WindowBaselineCompareResult:
+        """
+        compare_window_to_baseline() without filters for windows ending today, from
+        the daily totals (whole days; the lookback is capped by the ring).
+        """
+        start_day = int(start_ts) // SECONDS_IN_DAY
+        lookback_days = max(7, min(int(lookback_days), start_day - self.first_day))
+        return compare_daily_window_to_baseline(
+            self.spend_by_day(start_day - lookback_days),
+            start_ts=start_ts,
+            end_ts=end_ts,
+            lookback_days=lookback_days,
+            max_windows=max_windows,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": SPENDING_BASELINE_VERSION,
+            "first_day": self.first_day,
+            "lookback_days": self.lookback_days,
+            "offsets": self.offsets,
+            "daily": self.daily,
+            "total_cents": self.total_cents,
+            "weekday_sum_cents": self.weekday_sum_cents,
+            "weekday_days": self.weekday_days,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SpendingBaseline | None:
+        if not isinstance(data, dict) or data.get("version") != SPENDING_BASELINE_VERSION:
+            return None
+        try:
+            lookback_days = int(data["lookback_days"])
+            daily = [None if v is None else int(v) for v in data["daily"]]
+            weekday_sum = [int(v) for v in data["weekday_sum_cents"]]
+            weekday_days = [int(v) for v in data["weekday_days"]]
+            if len(daily) != lookback_days or len(weekday_sum) != 7 or len(weekday_days) != 7:
+                return None
+            return cls(
+                first_day=int(data["first_day"]),
+                offsets={str(k): int(v) for k, v in dict(data["offsets"]).items()},
+                lookback_days=lookback_days,
+                daily=daily,
+                total_cents=int(data["total_cents"]),
+                weekday_sum_cents=weekday_sum,
+                weekday_days=weekday_days,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Any
+
+from ..storage.tx_store import TxRecord
+from .classify import classify_kind
+from .normalization import normalize_merchant
+
+SECONDS_IN_DAY = 86400
+RECURRING_INDEX_VERSION = 1
+
+# Occurrences kept per series; cadence and amount band look at the newest ones.
+MAX_EVENTS = 24
+AMOUNT_BAND_EVENTS = 6
+# Series with shorter cadences (daily coffee) are habits, not recurring payments.
+MIN_CADENCE_DAYS = 5
+MIN_CONFIDENCE = 0.6
+
+_KIND_PREFIX = {"spend": "merchant", "transfer_out": "recipient"}
+
+
+def series_key(kind: str, description: str | None) -> str | None:
+    prefix = _KIND_PREFIX.get(kind)
+    if prefix is None:
+        return None
+    name = normalize_merchant(description)
+    if name == "unknown":
+        return None
+    return f"{prefix}:{name}"
+
+
+@dataclass
+class RecurringSeries:
+    """
+    Outgoing payments to one normalized merchant/recipient: the newest MAX_EVENTS
+    occurrences ([ts, cents], oldest first) and the estimates derived from them.
+    """
+
+    label: str
+    events: list[list[int]] = field(default_factory=list)
+    cadence_days: int = 0
+    amount_cents: int = 0
+    amount_low_cents: int = 0
+    amount_high_cents: int = 0
+    confidence: float = 0.0
+
+    @property
+    def last_ts(self) -> int:
+        return int(self.events[-1][0]) if self.events else 0
+
+    @property
+    def next_ts(self) -> int | None:
+        if not self.events or self.cadence_days <= 0:
+            return None
+        return self.last_ts + self.cadence_days * SECONDS_IN_DAY
+
+    @property
+    def is_recurring(self) -> bool:
+        return self.cadence_days >= MIN_CADENCE_DAYS and self.confidence >= MIN_CONFIDENCE
+
+    def is_active(self, now_ts: int) -> bool:
+        """
+        Recurring and not lapsed: at most one expected charge was missed.
+        """
+        if not self.is_recurring:
+            return False
+        grace = 2 * self.cadence_days * SECONDS_IN_DAY + 2 * SECONDS_IN_DAY
+        return int(now_ts) - self.last_ts <= grace
+
+    def add(self, ts: int, cents: int, label: str) -> None:
+        event = [int(ts), int(cents)]
+        if event in self.events:
+            return
+        if not self.events or event[0] >= self.events[-1][0]:
+            self.events.append(event)
+            self.label = label
+        else:
+            self.events.append(event)
+            self.events.sort()
+        del self.events[:-MAX_EVENTS]
+
+    def refresh(self) -> None:
+        """
+        Cadence is the median gap between distinct charge days; confidence is the
+        share of gaps within tolerance of it, damped for short histories and for
+        amounts outside a +-25% band around the typical amount.
+        """
+        days = sorted({ts // SECONDS_IN_DAY for ts, _ in self.events})
+        gaps = [b - a for a, b in zip(days, days[1:], strict=False)]
+        amounts = [abs(c) for _, c in self.events[-AMOUNT_BAND_EVENTS:]]
+
+        self.amount_cents = int(median(amounts)) if amounts else 0
+        self.amount_low_cents = min(amounts) if amounts else 0
+        self.amount_high_cents = max(amounts) if amounts else 0
+        if len(gaps) < 2:
+            self.cadence_days = int(gaps[0]) if gaps else 0
+            self.confidence = 0.0
+            return
+
+        cadence = int(median(gaps))
+        tolerance = max(2, cadence // 5)
+        regular = sum(1 for g in gaps if abs(g - cadence) <= tolerance) / len(gaps)
+        typical = self.amount_cents
+        stable = sum(1 for a in amounts if abs(a - typical) * 4 <= typical) / len(amounts)
+        history = min(1.0, len(gaps) / 3)
+
+        self.cadence_days = cadence
+        self.confidence = round(regular * history * (0.5 + 0.5 * stable), 2)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "events": self.events,
+            "cadence_days": self.cadence_days,
+            "amount_cents": self.amount_cents,
+            "amount_low_cents": self.amount_low_cents,
+            "amount_high_cents": self.amount_high_cents,
+            "confidence": self.confidence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RecurringSeries:
+        return cls(
+            label=str(data["label"]),
+            events=[[int(ts), int(c)] for ts, c in data["events"]],
+            cadence_days=int(data["cadence_days"]),
+            amount_cents=int(data["amount_cents"]),
+            amount_low_cents=int(data["amount_low_cents"]),
+            amount_high_cents=int(data["amount_high_cents"]),
+            confidence=float(data["confidence"]),
+        )
+
+
+@dataclass
+class RecurringIndex:
+    """
+    Recurring-series index over a user's ledgers, keyed by series_key().
+
+    `offsets` are the ledger byte offsets already folded in (TxStore.load_appended), so
+    a refresh only looks at the appended transactions and re-estimates the series they
+    touched. Queries are O(series).
+    """
+
+    offsets: dict[str, int]
+    series: dict[str, RecurringSeries] = field(default_factory=dict)
+
+    def add_records(self, records: list[TxRecord]) -> None:
+        touched: set[str] = set()
+        for r in records:
+            kind = classify_kind(r.amount, r.mcc, r.description)
+            key = series_key(kind, r.description)
+            if key is None:
+                continue
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = RecurringSeries(label=str(r.description or ""))
+            s.add(int(r.time), -int(r.amount), str(r.description or ""))
+            touched.add(key)
+        for key in touched:
+            self.series[key].refresh()
+
+    def recurring(self, now_ts: int) -> list[tuple[str, RecurringSeries]]:
+        """
+        Active recurring series, largest typical amount first.
+        """
+        out = [(k, s) for k, s in self.series.items() if s.is_active(now_ts)]
+        out.sort(key=lambda item: (-item[1].amount_cents, item[0]))
+        return out
+
+    def upcoming(self, now_ts: int, until_ts: int) -> list[tuple[str, RecurringSeries]]:
+        """
+        Active recurring series whose next charge is expected by `until_ts` (including
+        ones already due), soonest first.
+        """
+        out = [
+            (k, s)
+            for k, s in self.series.items()
+            if s.is_active(now_ts) and s.next_ts is not None and s.next_ts <= until_ts
+        ]
+        out.sort(key=lambda item: (item[1].next_ts or 0, item[0]))
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": RECURRING_INDEX_VERSION,
+            "offsets": self.offsets,
+            "series": {k: s.to_dict() for k, s in self.series.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> RecurringIndex | None:
+        if not isinstance(data, dict) or data.get("version") != RECURRING_INDEX_VERSION:
+            return None
+        try:
+            return cls(
+                offsets={str(k): int(v) for k, v in dict(data["offsets"]).items()},
+                series={
+                    str(k): RecurringSeries.from_dict(v) for k, v in dict(data["series"]).items()
+                },
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
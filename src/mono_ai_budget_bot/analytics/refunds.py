@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import math
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from mono_ai_budget_bot.analytics.classify import classify_kind
+from mono_ai_budget_bot.core.text_norm import memoized
 from mono_ai_budget_bot.storage.tx_store import TxRecord
 
 
@@ -35,9 +38,13 @@ _STOP = {
 }
 
 
-def _tokens(s: str) -> list[str]:
+_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9а-яіїєґ]+", flags=re.IGNORECASE)
+
+
+@memoized("refund_tokens")
+def _tokens(s: str) -> tuple[str, ...]:
     s = (s or "").lower()
-    s = re.sub(r"[^a-z0-9а-яіїєґ]+", " ", s, flags=re.IGNORECASE)
+    s = _TOKEN_SPLIT_RE.sub(" ", s)
     parts = [p.strip() for p in s.split() if p.strip()]
     out: list[str] = []
     for p in parts:
@@ -46,7 +53,12 @@ def _tokens(s: str) -> list[str]:
         if len(p) < 3:
             continue
         out.append(p)
-    return out[:12]
+    return tuple(out[:12])
+
+
+@memoized("refund_token_sets")
+def _token_set(s: str) -> frozenset[str]:
+    return frozenset(_tokens(s))
 
 
 def _merchant_key(desc: str) -> str:
@@ -54,9 +66,7 @@ def _merchant_key(desc: str) -> str:
     return " ".join(t[:8])
 
 
-def _match_merchant(a: str, b: str) -> bool:
-    ta = set(_tokens(a))
-    tb = set(_tokens(b))
+def _match_tokens(ta: frozenset[str], tb: frozenset[str]) -> bool:
     if not ta or not tb:
         return False
     inter = ta & tb
@@ -69,24 +79,96 @@ def _match_merchant(a: str, b: str) -> bool:
     return False
 
 
+def _match_merchant(a: str, b: str) -> bool:
+    return _match_tokens(_token_set(a), _token_set(b))
+
+
+def _amount_tolerance(purchase_abs: int) -> int:
+    return max(100, int(purchase_abs * 0.01))
+
+
 def _amount_close(purchase_abs: int, refund_amt: int) -> bool:
     if purchase_abs <= 0 or refund_amt <= 0:
         return False
-    tol = max(100, int(purchase_abs * 0.01))
+    tol = _amount_tolerance(purchase_abs)
     return abs(purchase_abs - refund_amt) <= tol
 
 
-def detect_refund_pairs(
-    records: list[TxRecord],
-    *,
-    max_days: int = 14,
-) -> list[RefundPair]:
-    if not records:
-        return []
+REFUND_MAX_DAYS = 14
+
+_LINEAR_BAND_CENTS = 64
+_LINEAR_BAND_LIMIT = 8192
+_LOG_BANDS_PER_DOUBLING = 64
+
+
+def _amount_band(amount: int) -> int:
+    """
+    Monotone amount -> band id, narrow enough that the ±tolerance range of a purchase
+    spans only a few bands: 64-cent linear bands below 81.92 UAH (where the 1 UAH
+    minimum tolerance dominates), ~1.1% geometric bands above.
+    """
+    a = int(amount)
+    if a < _LINEAR_BAND_LIMIT:
+        return a // _LINEAR_BAND_CENTS
+    ratio = math.log2(a / _LINEAR_BAND_LIMIT)
+    return _LINEAR_BAND_LIMIT // _LINEAR_BAND_CENTS + int(ratio * _LOG_BANDS_PER_DOUBLING)
+
+
+_Candidate = tuple[int, int, TxRecord, frozenset[str]]
 
+
+class _RefundIndex:
+    """
+    Refund candidates bucketed by (account_id, mcc, amount band). Each bucket is a
+    time-sorted list searched with bisect.
+    """
+
+    def __init__(self, pos: list[TxRecord]) -> None:
+        buckets: dict[tuple[str, int | None, int], list[_Candidate]] = {}
+        mccs: dict[str, set[int | None]] = {}
+        for order, r in enumerate(pos):
+            mcc = int(r.mcc) if r.mcc is not None else None
+            key = (r.account_id, mcc, _amount_band(int(r.amount)))
+            buckets.setdefault(key, []).append(
+                (int(r.time), order, r, _token_set(r.description or ""))
+            )
+            mccs.setdefault(r.account_id, set()).add(mcc)
+
+        self._buckets = buckets
+        self._bucket_ts = {k: [c[0] for c in v] for k, v in buckets.items()}
+        self._mccs = mccs
+
+    def candidates(self, p: TxRecord, p_abs: int, lo_ts: int, hi_ts: int) -> Iterator[_Candidate]:
+        account_mccs = self._mccs.get(p.account_id)
+        if not account_mccs:
+            return
+        if p.mcc is None:
+            mccs: Iterable[int | None] = account_mccs
+        else:
+            mccs = [m for m in (int(p.mcc), None) if m in account_mccs]
+
+        tol = _amount_tolerance(p_abs)
+        band_lo = _amount_band(max(0, p_abs - tol))
+        band_hi = _amount_band(p_abs + tol)
+
+        for mcc in mccs:
+            for band in range(band_lo, band_hi + 1):
+                key = (p.account_id, mcc, band)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                ts = self._bucket_ts[key]
+                i = bisect_left(ts, lo_ts)
+                j = bisect_right(ts, hi_ts)
+                yield from bucket[i:j]
+
+
+def _split(records: list[TxRecord]) -> tuple[list[TxRecord], list[TxRecord]]:
+    """
+    Time-sorted purchases and refund candidates (positive income / transfer_in).
+    """
     spend: list[TxRecord] = []
     pos: list[TxRecord] = []
-
     for r in records:
         desc = (r.description or "").strip()
         k = classify_kind(amount=r.amount, mcc=r.mcc, description=desc)
@@ -94,49 +176,110 @@ def detect_refund_pairs(
             spend.append(r)
         elif r.amount > 0 and k in {"income", "transfer_in"}:
             pos.append(r)
-
     spend.sort(key=lambda r: int(r.time))
     pos.sort(key=lambda r: int(r.time))
+    return spend, pos
+
+
+def _compatible(p: TxRecord, r: TxRecord, r_tokens: frozenset[str], p_abs: int) -> bool:
+    return _amount_close(p_abs, int(r.amount)) and _match_tokens(
+        _token_set(p.description or ""), r_tokens
+    )
+
+
+def refund_candidate_ids(records: list[TxRecord], *, max_days: int = REFUND_MAX_DAYS) -> set[str]:
+    """
+    Ids of the records that could take part in some refund pair: purchases with at
+    least one matching refund within `max_days`, and those refunds. Pairing any subset
+    of `records` that keeps its candidates gives the same pairs as pairing the subset
+    with every record.
+    """
+    spend, pos = _split(records)
+    if not spend or not pos:
+        return set()
+
+    index = _RefundIndex(pos)
+    max_dt = int(max_days) * 24 * 60 * 60
+    out: set[str] = set()
+    for p in spend:
+        p_ts = int(p.time)
+        p_abs = abs(int(p.amount))
+        if p_abs <= 0:
+            continue
+        for _ts, _order, r, r_tokens in index.candidates(p, p_abs, p_ts - max_dt, p_ts + max_dt):
+            if _compatible(p, r, r_tokens, p_abs):
+                out.add(p.id)
+                out.add(r.id)
+    return out
+
+
+def merge_refund_candidates(
+    known: list[TxRecord], records: list[TxRecord], *, start_ts: int, end_ts: int
+) -> list[TxRecord]:
+    """
+    `known` plus the refund candidates of `records` in [start_ts, end_ts) not seen yet,
+    time-sorted. Lets incremental aggregates re-pair refunds per window.
+    """
+    ids = refund_candidate_ids(records)
+    if not ids:
+        return known
+    seen = {r.id for r in known}
+    fresh = [
+        r
+        for r in records
+        if r.id in ids and r.id not in seen and int(start_ts) <= int(r.time) < int(end_ts)
+    ]
+    if not fresh:
+        return known
+    return sorted(known + fresh, key=lambda r: int(r.time))
+
+
+def detect_refund_pairs(
+    records: list[TxRecord],
+    *,
+    max_days: int = REFUND_MAX_DAYS,
+) -> list[RefundPair]:
+    """
+    Greedy purchase -> refund pairing in purchase time order. Each purchase takes the
+    best-scoring unused refund (earliest on ties) from the indexed candidate buckets.
+    """
+    spend, pos = _split(records)
+    if not spend or not pos:
+        return []
+
+    index = _RefundIndex(pos)
 
     max_dt = int(max_days) * 24 * 60 * 60
     used_refunds: set[str] = set()
     pairs: list[RefundPair] = []
 
-    j0 = 0
     for p in spend:
         p_ts = int(p.time)
         p_abs = abs(int(p.amount))
         if p_abs <= 0:
             continue
 
-        while j0 < len(pos) and int(pos[j0].time) < (p_ts - max_dt):
-            j0 += 1
-
+        p_tokens: frozenset[str] | None = None
         best: TxRecord | None = None
-        best_score = -1
+        best_key = (-1, 0)
 
-        for j in range(j0, len(pos)):
-            r = pos[j]
-            r_ts = int(r.time)
-            if r_ts > (p_ts + max_dt):
-                break
+        for r_ts, order, r, r_tokens in index.candidates(p, p_abs, p_ts - max_dt, p_ts + max_dt):
             if r.id in used_refunds:
                 continue
-            if r.account_id != p.account_id:
-                continue
-            if p.mcc is not None and r.mcc is not None and int(p.mcc) != int(r.mcc):
-                continue
             if not _amount_close(p_abs, int(r.amount)):
                 continue
-            if not _match_merchant(p.description or "", r.description or ""):
+            if p_tokens is None:
+                p_tokens = _token_set(p.description or "")
+            if not _match_tokens(p_tokens, r_tokens):
                 continue
 
             score = 0
             score += 5
             score -= int(abs(p_abs - int(r.amount)) / 100)
             score -= int(abs(r_ts - p_ts) / (6 * 3600))
-            if score > best_score:
-                best_score = score
+            key = (score, -order)
+            if key > best_key:
+                best_key = key
                 best = r
 
         if best is None:
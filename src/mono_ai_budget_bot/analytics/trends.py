@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Sequence
 
+from . import vectorized
 from .models import TxRow
 from .normalization import category_label, normalize_merchant
 
@@ -25,32 +26,69 @@ def _pct_change(cur: float, prev: float) -> float | None:
     return round(((cur - prev) / prev) * 100.0, 2)
 
 
-def _sum_by_label(
-    rows: list[TxRow],
-    start_ts: int,
-    end_ts: int,
-    label_fn: Callable[[TxRow], str],
-) -> tuple[dict[str, int], dict[str, set[int]]]:
-    totals: dict[str, int] = {}
-    days: dict[str, set[int]] = {}
-
-    for r in rows:
-        t = int(r.ts)
-        if not (start_ts <= t < end_ts):
-            continue
+_Buckets = tuple[dict[str, int], dict[str, set[int]]]
 
+
+def _aggregate_windows(
+    rows: Sequence[TxRow],
+    *,
+    cur_start: int,
+    cur_end: int,
+    prev_start: int,
+    prev_end: int,
+    category_labels: Sequence[str] | None = None,
+    merchant_labels: Sequence[str] | None = None,
+) -> dict[tuple[str, str], _Buckets]:
+    """
+    One pass over rows, bucketing spend into (window, dimension) -> label totals/active days.
+
+    Labels come from the precomputed columns when given (aligned with rows); otherwise
+    they are derived once per distinct mcc / description.
+    """
+    out: dict[tuple[str, str], _Buckets] = {
+        (win, dim): ({}, {}) for win in ("cur", "prev") for dim in ("category", "merchant")
+    }
+    cur_parts = (*out[("cur", "category")], *out[("cur", "merchant")])
+    prev_parts = (*out[("prev", "category")], *out[("prev", "merchant")])
+    cat_cache: dict[int | None, str] = {}
+    mer_cache: dict[str, str] = {}
+
+    for i, r in enumerate(rows):
         if r.kind != "spend":
             continue
 
-        label = label_fn(r) or "unknown"
-        if label == "unknown":
+        t = int(r.ts)
+        if cur_start <= t < cur_end:
+            cat_tot, cat_days, mer_tot, mer_days = cur_parts
+        elif prev_start <= t < prev_end:
+            cat_tot, cat_days, mer_tot, mer_days = prev_parts
+        else:
             continue
 
+        if category_labels is not None:
+            cat = category_labels[i]
+        else:
+            cat = cat_cache.get(r.mcc)
+            if cat is None:
+                cat = cat_cache[r.mcc] = category_label(r.mcc)
+
+        if merchant_labels is not None:
+            mer = merchant_labels[i]
+        else:
+            mer = mer_cache.get(r.description)
+            if mer is None:
+                mer = mer_cache[r.description] = normalize_merchant(r.description)
+
         cents = abs(int(r.amount))
-        totals[label] = totals.get(label, 0) + cents
-        days.setdefault(label, set()).add(t // 86400)
+        day = t // 86400
+        if cat and cat != "unknown":
+            cat_tot[cat] = cat_tot.get(cat, 0) + cents
+            cat_days.setdefault(cat, set()).add(day)
+        if mer and mer != "unknown":
+            mer_tot[mer] = mer_tot.get(mer, 0) + cents
+            mer_days.setdefault(mer, set()).add(day)
 
-    return totals, days
+    return out
 
 
 def _build_items(
@@ -106,7 +144,13 @@ def compute_trends(
     min_prev_uah: float = 200.0,
     min_abs_delta_uah: float = 150.0,
     min_active_days: int = 2,
+    category_labels: Sequence[str] | None = None,
+    merchant_labels: Sequence[str] | None = None,
 ) -> dict[str, Any]:
+    """
+    category_labels / merchant_labels: optional precomputed label columns aligned
+    with rows (category_label(mcc) / normalize_merchant(description)).
+    """
     now_ts = int(now_ts)
     w = max(3, min(int(window_days), 30))
 
@@ -114,31 +158,20 @@ def compute_trends(
     prev_start = now_ts - 2 * w * 86400
     prev_end = cur_start
 
-    cat_cur, cat_days_cur = _sum_by_label(
-        rows,
-        start_ts=cur_start,
-        end_ts=now_ts,
-        label_fn=lambda r: category_label(r.mcc),
-    )
-    cat_prev, cat_days_prev = _sum_by_label(
-        rows,
-        start_ts=prev_start,
-        end_ts=prev_end,
-        label_fn=lambda r: category_label(r.mcc),
-    )
-
-    mer_cur, mer_days_cur = _sum_by_label(
-        rows,
-        start_ts=cur_start,
-        end_ts=now_ts,
-        label_fn=lambda r: normalize_merchant(r.description),
-    )
-    mer_prev, mer_days_prev = _sum_by_label(
+    aggregate = vectorized.trend_buckets if vectorized.enabled(len(rows)) else _aggregate_windows
+    buckets = aggregate(
         rows,
-        start_ts=prev_start,
-        end_ts=prev_end,
-        label_fn=lambda r: normalize_merchant(r.description),
+        cur_start=cur_start,
+        cur_end=now_ts,
+        prev_start=prev_start,
+        prev_end=prev_end,
+        category_labels=category_labels,
+        merchant_labels=merchant_labels,
     )
+    cat_cur, cat_days_cur = buckets[("cur", "category")]
+    cat_prev, cat_days_prev = buckets[("prev", "category")]
+    mer_cur, mer_days_cur = buckets[("cur", "merchant")]
+    mer_prev, mer_days_prev = buckets[("prev", "merchant")]
 
     cat_items = _build_items(
         "category",
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Any, Callable, Sequence
+
+from ..storage.tx_store import TxRecord
+from .baselines import DAY_SECONDS, DIM_CATEGORY, DIM_MERCHANT, LabelBaseline, _median_of_sorted
+from .categories import category_from_mcc
+from .classify import is_transfer
+from .models import TxRow
+from .normalization import category_label, normalize_merchant
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Below this many rows, converting to arrays costs more than the pure-Python loops.
+MIN_ROWS = 2000
+
+_KIND_CODES = {"spend": 0, "income": 1, "transfer_out": 2, "transfer_in": 3}
+_SPEND = 0
+
+_get_kind = attrgetter("kind")
+_get_amount = attrgetter("amount")
+_get_account = attrgetter("account_id")
+_get_description = attrgetter("description")
+_get_mcc = attrgetter("mcc")
+_get_ts = attrgetter("ts")
+_get_time = attrgetter("time")
+
+
+def available() -> bool:
+    return np is not None
+
+
+def enabled(n_rows: int) -> bool:
+    """
+    True when numpy is importable and the input is large enough to be worth it.
+    """
+    return np is not None and n_rows >= MIN_ROWS
+
+
+def _column(rows: Sequence[Any], getter: Callable[[Any], int]) -> Any:
+    return np.fromiter(map(getter, rows), dtype=np.int64, count=len(rows))
+
+
+def _kinds(rows: Sequence[TxRow]) -> Any:
+    codes = map(_KIND_CODES.__getitem__, map(_get_kind, rows))
+    return np.fromiter(codes, dtype=np.int8, count=len(rows))
+
+
+def _factorize(values: list) -> tuple[Any, list]:
+    """
+    Integer codes for `values`; uniques are in first-seen order.
+    """
+    uniques = list(dict.fromkeys(values))
+    index = {v: i for i, v in enumerate(uniques)}
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+    return codes, uniques
+
+
+def _ordered_sums(codes, positions, values, uniques: list) -> dict[Any, int]:
+    """
+    {unique: sum of values} ordered by each code's first position, i.e. the insertion
+    order a row-by-row dict accumulation would produce.
+    """
+    if not len(codes):
+        return {}
+    k = len(uniques)
+    sums = np.zeros(k, dtype=np.int64)
+    np.add.at(sums, codes, values)
+    never = np.iinfo(np.int64).max
+    first = np.full(k, never, dtype=np.int64)
+    np.minimum.at(first, codes, positions)
+    present = np.flatnonzero(first != never)
+    order = present[np.argsort(first[present])]
+    return dict(zip([uniques[c] for c in order.tolist()], sums[order].tolist(), strict=True))
+
+
+def facts_sums(rows: Sequence[TxRow]) -> dict[str, Any]:
+    """
+    compute_facts() aggregates as keyword arguments for facts_from_sums().
+    """
+    n = len(rows)
+    kind = _kinds(rows)
+    amount = _column(rows, _get_amount)
+    acc_codes, accounts = _factorize(list(map(_get_account, rows)))
+
+    by_account = {acc: dict.fromkeys(_KIND_CODES, 0) for acc in accounts}
+    for acc, cnt in zip(
+        accounts, np.bincount(acc_codes, minlength=len(accounts)).tolist(), strict=True
+    ):
+        by_account[acc]["count"] = cnt
+
+    totals: dict[str, int] = {}
+    for name, code in _KIND_CODES.items():
+        sel = kind == code
+        vals = amount[sel]
+        if name in ("spend", "transfer_out"):
+            vals = np.abs(vals)
+        totals[name] = int(vals.sum())
+        sums = np.zeros(len(accounts), dtype=np.int64)
+        np.add.at(sums, acc_codes[sel], vals)
+        for acc, v in zip(accounts, sums.tolist(), strict=True):
+            by_account[acc][name] = v
+
+    spend_idx = np.flatnonzero(kind == _SPEND)
+    spend_amt = np.abs(amount[spend_idx])
+
+    desc_codes, descs = _factorize(list(map(_get_description, rows)))
+    merchant_spend = _ordered_sums(desc_codes[spend_idx], spend_idx, spend_amt, descs)
+
+    mcc_codes, mccs = _factorize(list(map(_get_mcc, rows)))
+    spend_mcc = mcc_codes[spend_idx]
+    has_mcc = np.array([m is not None for m in mccs], dtype=bool)[spend_mcc]
+    mcc_spend = _ordered_sums(
+        spend_mcc[has_mcc], spend_idx[has_mcc], spend_amt[has_mcc], [str(m) for m in mccs]
+    )
+
+    cat_of_mcc = [category_from_mcc(m) for m in mccs]
+    cats = list(dict.fromkeys(c for c in cat_of_mcc if c is not None))
+    cat_index = {c: i for i, c in enumerate(cats)}
+    cat_lookup = np.array([cat_index.get(c, -1) for c in cat_of_mcc], dtype=np.int64)
+    spend_cat = cat_lookup[spend_mcc]
+    known = spend_cat >= 0
+    category_real_spend = _ordered_sums(spend_cat[known], spend_idx[known], spend_amt[known], cats)
+
+    return {
+        "tx_count": n,
+        "spend_total": totals["spend"],
+        "income_total": totals["income"],
+        "transfer_out_total": totals["transfer_out"],
+        "transfer_in_total": totals["transfer_in"],
+        "by_account": by_account,
+        "merchant_spend": merchant_spend,
+        "mcc_spend": mcc_spend,
+        "category_real_spend": category_real_spend,
+        "uncategorized_real_spend": int(spend_amt[~known].sum()),
+    }
+
+
+def _label_column(values: list, label: Callable[[Any], str]) -> list[str]:
+    cache = {v: label(v) for v in dict.fromkeys(values)}
+    return list(map(cache.__getitem__, values))
+
+
+def trend_buckets(
+    rows: Sequence[TxRow],
+    *,
+    cur_start: int,
+    cur_end: int,
+    prev_start: int,
+    prev_end: int,
+    category_labels: Sequence[str] | None = None,
+    merchant_labels: Sequence[str] | None = None,
+) -> dict[tuple[str, str], tuple[dict[str, int], dict[str, set[int]]]]:
+    """
+    Same result as trends._aggregate_windows.
+    """
+    out: dict[tuple[str, str], tuple[dict[str, int], dict[str, set[int]]]] = {
+        (win, dim): ({}, {}) for win in ("cur", "prev") for dim in ("category", "merchant")
+    }
+    n = len(rows)
+    spend = _kinds(rows) == _SPEND
+    ts = _column(rows, _get_ts)
+    win = np.full(n, -1, dtype=np.int8)
+    win[(ts >= prev_start) & (ts < prev_end)] = 1
+    win[(ts >= cur_start) & (ts < cur_end)] = 0
+    sel = np.flatnonzero(spend & (win >= 0))
+    if not len(sel):
+        return out
+
+    sel_list = sel.tolist()
+    picked = list(map(rows.__getitem__, sel_list))
+    cents = np.abs(_column(picked, _get_amount))
+    days = ts[sel] // DAY_SECONDS
+    wsel = win[sel]
+
+    if category_labels is not None:
+        cat_col = [category_labels[i] for i in sel_list]
+    else:
+        cat_col = _label_column(list(map(_get_mcc, picked)), category_label)
+    if merchant_labels is not None:
+        mer_col = [merchant_labels[i] for i in sel_list]
+    else:
+        mer_col = _label_column(list(map(_get_description, picked)), normalize_merchant)
+
+    day0 = int(days.min())
+    span = int(days.max()) - day0 + 1
+    positions = np.arange(len(sel_list), dtype=np.int64)
+    for dim, col in (("category", cat_col), ("merchant", mer_col)):
+        codes, uniques = _factorize(col)
+        valid = np.array([bool(u) and u != "unknown" for u in uniques], dtype=bool)[codes]
+        for w, name in ((0, "cur"), (1, "prev")):
+            m = valid & (wsel == w)
+            totals = _ordered_sums(codes[m], positions[m], cents[m], uniques)
+            day_sets: dict[str, set[int]] = {lab: set() for lab in totals}
+            pairs = np.unique(codes[m] * span + (days[m] - day0))
+            for code, day in zip(
+                (pairs // span).tolist(), (pairs % span + day0).tolist(), strict=True
+            ):
+                day_sets[uniques[code]].add(day)
+            out[(name, dim)] = (totals, day_sets)
+    return out
+
+
+def spend_by_day(
+    records: Sequence[TxRecord],
+    *,
+    ts_from: int | None = None,
+    ts_to: int | None = None,
+    keep: Callable[[str, int | None], bool] | None = None,
+) -> dict[int, int]:
+    """
+    {utc_day: spend cents} for records classified as spend with ts_from <= time < ts_to.
+
+    The transfer check (and the optional `keep(description, mcc)` filter) runs once per
+    distinct (mcc, description) pair instead of once per record.
+    """
+    ts = _column(records, _get_time)
+    amount = _column(records, _get_amount)
+    mask = amount < 0
+    if ts_from is not None:
+        mask &= ts >= int(ts_from)
+    if ts_to is not None:
+        mask &= ts < int(ts_to)
+    idx = np.flatnonzero(mask)
+    if not len(idx):
+        return {}
+
+    picked = list(map(records.__getitem__, idx.tolist()))
+    desc_codes, descs = _factorize(list(map(_get_description, picked)))
+    mcc_codes, mccs = _factorize(list(map(_get_mcc, picked)))
+    pairs, inv = np.unique(desc_codes * len(mccs) + mcc_codes, return_inverse=True)
+    flags = []
+    for p in pairs.tolist():
+        desc, mcc = descs[p // len(mccs)], mccs[p % len(mccs)]
+        flags.append(not is_transfer(mcc, desc) and (keep is None or keep(desc, mcc)))
+    sel = idx[np.array(flags, dtype=bool)[inv]]
+    if not len(sel):
+        return {}
+
+    day_keys, inv = np.unique(ts[sel] // DAY_SECONDS, return_inverse=True)
+    sums = np.zeros(len(day_keys), dtype=np.int64)
+    np.add.at(sums, inv, -amount[sel])
+    return dict(zip(day_keys.tolist(), sums.tolist(), strict=True))
+
+
+def label_baselines(
+    rows: Sequence[TxRow], now_ts: int, *, lookback_days: int = 28
+) -> list[LabelBaseline]:
+    """
+    Same result as DailyBaselines(now_ts=now_ts, lookback_days=...) fed `rows` and
+    asked for touched().
+    """
+    lookback = max(7, min(int(lookback_days), 90))
+    now = int(now_ts)
+    hist_start = now - lookback * DAY_SECONDS
+
+    spend = _kinds(rows) == _SPEND
+    ts = _column(rows, _get_ts)
+    sel = np.flatnonzero(spend & (ts >= hist_start) & (ts < now))
+    if not len(sel):
+        return []
+
+    picked = list(map(rows.__getitem__, sel.tolist()))
+    t = ts[sel]
+    cents = np.abs(_column(picked, _get_amount))
+    day = t // DAY_SECONDS
+    seq = np.arange(len(picked), dtype=np.int64)
+
+    oldest_day = hist_start // DAY_SECONDS
+    first_day = oldest_day + 1
+    last_day = (now - DAY_SECONDS - 1) // DAY_SECONDS
+    last_day_start = now - DAY_SECONDS
+    last_day_day = last_day_start // DAY_SECONDS
+    lastday_in_window = first_day <= last_day_day <= last_day
+    span = (now - 1) // DAY_SECONDS - oldest_day + 1
+
+    columns = (
+        (
+            DIM_MERCHANT,
+            _label_column(
+                list(map(_get_description, picked)),
+                lambda d: str(normalize_merchant(d) or "unknown"),
+            ),
+        ),
+        (
+            DIM_CATEGORY,
+            _label_column(
+                list(map(_get_mcc, picked)), lambda m: str(category_label(m) or "unknown")
+            ),
+        ),
+    )
+
+    out: list[LabelBaseline] = []
+    for dim, col in columns:
+        codes, uniques = _factorize(col)
+        valid = np.array([u != "unknown" for u in uniques], dtype=bool)[codes]
+        recent = valid & (t >= last_day_start)
+        if not recent.any():
+            continue
+
+        k = len(uniques)
+        last_cents = np.zeros(k, dtype=np.int64)
+        np.add.at(last_cents, codes[recent], cents[recent])
+        never = np.iinfo(np.int64).max
+        first_seq = np.full(k, never, dtype=np.int64)
+        np.minimum.at(first_seq, codes[recent], seq[recent])
+
+        keys, inv = np.unique(codes[valid] * span + (day[valid] - oldest_day), return_inverse=True)
+        day_totals = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(day_totals, inv, cents[valid])
+        early = set(codes[valid & (day == last_day_day) & (t < last_day_start)].tolist())
+
+        for code in np.flatnonzero(first_seq != never).tolist():
+            lo, hi = np.searchsorted(keys, [code * span, (code + 1) * span])
+            key_days = (keys[lo:hi] % span + oldest_day).tolist()
+            totals = day_totals[lo:hi].tolist()
+
+            interior = [
+                v for d, v in zip(key_days, totals, strict=True) if first_day <= d <= last_day
+            ]
+            clipped = totals[0] if key_days and key_days[0] == oldest_day else None
+            vals = sorted(interior if clipped is None else [*interior, clipped])
+            med = _median_of_sorted(vals)
+            mad = _median_of_sorted(sorted(abs(v - med) for v in vals))
+
+            seen_before = clipped is not None
+            if not seen_before:
+                ld = lastday_in_window and last_day_day in key_days
+                earlier_days = len(interior) - (1 if ld else 0)
+                seen_before = earlier_days > 0 or (ld and code in early)
+
+            out.append(
+                LabelBaseline(
+                    dim=dim,
+                    label=uniques[code],
+                    last_day_cents=int(last_cents[code]),
+                    median_cents=int(med),
+                    mad_cents=int(mad),
+                    hist_days=len(vals),
+                    seen_before=bool(seen_before),
+                    first_seq=int(first_seq[code]),
+                )
+            )
+
+    out.sort(key=lambda b: (b.dim != DIM_MERCHANT, b.first_seq))
+    return out
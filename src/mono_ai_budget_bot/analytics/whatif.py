@@ -62,14 +62,64 @@ def scenario_presets(share_pct: float | None = None) -> list[int]:
     return [10, 20]
 
 
-def _sum_spend_uah(rows: list[TxRow], pred) -> float:
-    total_minor = 0
+TAXI_KEYWORDS = frozenset({"uber", "bolt", "uklon", "taxi", "такси", "таксі"})
+DELIVERY_KEYWORDS = frozenset(
+    {"glovo", "wolt", "raketa", "bolt food", "uber eats", "ubereats", "delivery"}
+)
+CAFES_LABEL = "Кафе/Ресторани"
+
+
+@dataclass(frozen=True)
+class WhatIfSums:
+    """
+    Period spend aggregates that what-if suggestions are derived from (minor units).
+    """
+
+    taxi_minor: int
+    delivery_minor: int
+    cafes_minor: int
+    total_spend_minor: int
+    category_minor: dict[str, int]
+    category_active_days: dict[str, int]
+
+
+def keyword_groups(description: str) -> tuple[bool, bool]:
+    d = normalize_text(description)
+    return any(k in d for k in TAXI_KEYWORDS), any(k in d for k in DELIVERY_KEYWORDS)
+
+
+def whatif_sums(rows: list[TxRow]) -> WhatIfSums:
+    taxi = delivery = cafes = total = 0
+    category_minor: dict[str, int] = {}
+    category_days: dict[str, set[int]] = {}
+
     for r in rows:
         if r.kind != "spend":
             continue
-        if pred(r):
-            total_minor += abs(int(r.amount))
-    return round(total_minor / 100.0, 2)
+
+        cents = abs(int(r.amount))
+        total += cents
+
+        is_taxi, is_delivery = keyword_groups(r.description)
+        if is_taxi:
+            taxi += cents
+        if is_delivery:
+            delivery += cents
+
+        cat = category_label(r.mcc)
+        if cat == CAFES_LABEL:
+            cafes += cents
+        category_minor[cat] = category_minor.get(cat, 0) + cents
+        category_days.setdefault(cat, set()).add(int(r.ts) // 86400)
+
+    return WhatIfSums(
+        taxi_minor=taxi,
+        delivery_minor=delivery,
+        cafes_minor=cafes,
+        total_spend_minor=total,
+        category_minor=category_minor,
+        category_active_days={k: len(v) for k, v in category_days.items()},
+    )
 
 
 def _project_monthly(period_spend_uah: float, period_days: int) -> float:
@@ -78,17 +128,10 @@ def _project_monthly(period_spend_uah: float, period_days: int) -> float:
     return round(period_spend_uah * (30.0 / float(period_days)), 2)
 
 
-def _build_keyword_suggestions(rows: list[TxRow], period_days: int) -> list[dict[str, Any]]:
-    taxi_kw = {"uber", "bolt", "uklon", "taxi", "такси", "таксі"}
-    delivery_kw = {"glovo", "wolt", "raketa", "bolt food", "uber eats", "ubereats", "delivery"}
-
-    taxi_spend = _sum_spend_uah(
-        rows, lambda r: any(k in normalize_text(r.description) for k in taxi_kw)
-    )
-    delivery_spend = _sum_spend_uah(
-        rows, lambda r: any(k in normalize_text(r.description) for k in delivery_kw)
-    )
-    cafes_spend = _sum_spend_uah(rows, lambda r: category_label(r.mcc) == "Кафе/Ресторани")
+def _build_keyword_suggestions(sums: WhatIfSums, period_days: int) -> list[dict[str, Any]]:
+    taxi_spend = round(sums.taxi_minor / 100.0, 2)
+    delivery_spend = round(sums.delivery_minor / 100.0, 2)
+    cafes_spend = round(sums.cafes_minor / 100.0, 2)
 
     out: list[dict[str, Any]] = []
 
@@ -139,29 +182,20 @@ def _build_keyword_suggestions(rows: list[TxRow], period_days: int) -> list[dict
 
 
 def build_whatif_suggestions(rows: list[TxRow], period_days: int) -> list[dict[str, Any]]:
+    if int(period_days) <= 0:
+        return []
+    return build_whatif_suggestions_from_sums(whatif_sums(rows), period_days)
+
+
+def build_whatif_suggestions_from_sums(sums: WhatIfSums, period_days: int) -> list[dict[str, Any]]:
     period_days = int(period_days)
     if period_days <= 0:
         return []
 
     suggestions: list[dict[str, Any]] = []
-    suggestions.extend(_build_keyword_suggestions(rows, period_days))
-
-    total_spend_minor = 0
-    category_minor: dict[str, int] = {}
-    category_days: dict[str, set[int]] = {}
-
-    for r in rows:
-        if r.kind != "spend":
-            continue
-
-        cents = abs(int(r.amount))
-        total_spend_minor += cents
-
-        cat = category_label(r.mcc)
-        category_minor[cat] = category_minor.get(cat, 0) + cents
+    suggestions.extend(_build_keyword_suggestions(sums, period_days))
 
-        day = int(r.ts) // 86400
-        category_days.setdefault(cat, set()).add(day)
+    total_spend_minor = sums.total_spend_minor
 
     if total_spend_minor == 0:
 
@@ -176,9 +210,9 @@ def build_whatif_suggestions(rows: list[TxRow], period_days: int) -> list[dict[s
 
     existing_keys = {s.get("key") for s in suggestions}
 
-    for cat, cents in category_minor.items():
+    for cat, cents in sums.category_minor.items():
         share = cents / total_spend_minor
-        active_days = len(category_days.get(cat, set()))
+        active_days = int(sums.category_active_days.get(cat, 0))
 
         if share < 0.15:
             continue
@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING
 from mono_ai_budget_bot.analytics.compute import compute_facts
 from mono_ai_budget_bot.analytics.enrich import enrich_period_facts
 from mono_ai_budget_bot.analytics.from_ledger import rows_from_ledger
+from mono_ai_budget_bot.core.job_queue import LANE_BOT, JobQueue
 from mono_ai_budget_bot.core.time_ranges import range_today
 from mono_ai_budget_bot.monobank import MonobankClient
 from mono_ai_budget_bot.storage.report_store import ReportStore
@@ -26,7 +27,7 @@ from ..storage.uncat_store import UncatStore
 from ..storage.user_store import UserConfig, UserStore
 from ..uncat.pending import UncatPendingStore
 from . import templates
-from .report_flow_helpers import compute_and_cache_reports_for_user
+from .report_flow_helpers import closed_facts_store, compute_and_cache_reports_for_user
 
 if TYPE_CHECKING:
     pass
@@ -106,7 +107,12 @@ async def refresh_period_for_user(period: str, cfg, store: ReportStore) -> None:
     ts_to = now_ts
 
     records = tx_store.load_range(cfg.telegram_user_id, account_ids, ts_from, ts_to)
-    current_facts = enrich_period_facts(records, days_back=days_back, now_ts=now_ts)
+    current_facts = enrich_period_facts(
+        records,
+        days_back=days_back,
+        now_ts=now_ts,
+        closed_facts=closed_facts_store.bind(cfg.telegram_user_id),
+    )
 
     req_from = now_ts - days_back * 24 * 60 * 60
     req_to = now_ts
@@ -123,49 +129,7 @@ async def refresh_period_for_user(period: str, cfg, store: ReportStore) -> None:
     store.save(cfg.telegram_user_id, period, current_facts)
 
 
-async def main() -> None:
-    settings = load_bot_runtime_settings()
-
-    from aiogram import Bot, Dispatcher
-    from aiogram.client.default import DefaultBotProperties
-
-    setup_logging(settings.log_level)
-    profile_store = ProfileStore(Path(".cache") / "profiles")
-    taxonomy_store = TaxonomyStore(Path(".cache") / "taxonomy")
-    reports_store = ReportsStore(Path(".cache") / "reports")
-
-    def render_report_for_user(
-        tg_id: int,
-        period: str,
-        facts: dict,
-        *,
-        ai_block: str | None = None,
-    ) -> str:
-        return _render_report_for_user(
-            reports_store,
-            tg_id,
-            period,
-            facts,
-            ai_block=ai_block,
-        )
-
-    uncat_store = UncatStore(Path(".cache") / "uncat")
-    rules_store = RulesStore(Path(".cache") / "rules")
-    uncat_pending_store = UncatPendingStore(Path(".cache") / "uncat_pending")
-
-    bot = Bot(
-        token=settings.telegram_bot_token,
-        default=DefaultBotProperties(parse_mode="Markdown"),
-    )
-
-    dp = Dispatcher()
-
-    user_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
-
-    users = UserStore()
-
-    logger = logging.getLogger("mono_ai_budget_bot.bot")
-
+def build_sync_user_ledger(tx_store: TxStore):
     async def sync_user_ledger(tg_id: int, cfg: UserConfig, *, days_back: int) -> object:
         from ..monobank.sync import sync_accounts_ledger
 
@@ -187,18 +151,53 @@ async def main() -> None:
 
         return await asyncio.to_thread(_run)
 
-    from .scheduler import create_scheduler, start_jobs
+    return sync_user_ledger
 
-    scheduler = create_scheduler(logger)
-    loop = asyncio.get_running_loop()
 
-    start_jobs(
+def build_report_renderer(reports_store: ReportsStore):
+    def render_report_for_user(
+        tg_id: int,
+        period: str,
+        facts: dict,
+        *,
+        ai_block: str | None = None,
+    ) -> str:
+        return _render_report_for_user(
+            reports_store,
+            tg_id,
+            period,
+            facts,
+            ai_block=ai_block,
+        )
+
+    return render_report_for_user
+
+
+def start_job_pipeline(
+    *,
+    bot,
+    users: UserStore,
+    job_queue: JobQueue,
+    profile_store: ProfileStore,
+    uncat_store: UncatStore,
+    render_report_text,
+    sync_user_ledger,
+    logger: logging.Logger,
+) -> tuple[object, asyncio.Task]:
+    """
+    Start the scheduler (enqueues per-user jobs) and a consumer for the durable job queue.
+    Used by `monobot bot` (unless --no-jobs) and by `monobot worker`.
+    """
+    from .scheduler import create_scheduler, run_job_worker, start_jobs
+
+    scheduler = create_scheduler(logger)
+    runtime = start_jobs(
         scheduler,
-        loop=loop,
+        loop=asyncio.get_running_loop(),
         bot=bot,
         users=users,
         report_store=store,
-        render_report_text=render_report_for_user,
+        render_report_text=render_report_text,
         logger=logger,
         sync_user_ledger=sync_user_ledger,
         recompute_reports_for_user=lambda tg_id, account_ids: compute_and_cache_reports_for_user(
@@ -206,13 +205,72 @@ async def main() -> None:
         ),
         profile_store=profile_store,
         uncat_store=uncat_store,
+        job_queue=job_queue,
+    )
+    worker_task = asyncio.create_task(
+        run_job_worker(job_queue, runtime["run_queued_job"], logger=logger)
+    )
+    return scheduler, worker_task
+
+
+async def main(*, run_jobs: bool = True) -> None:
+    settings = load_bot_runtime_settings()
+
+    from aiogram import Bot, Dispatcher
+    from aiogram.client.default import DefaultBotProperties
+
+    setup_logging(settings.log_level)
+    profile_store = ProfileStore(Path(".cache") / "profiles")
+    taxonomy_store = TaxonomyStore(Path(".cache") / "taxonomy")
+    reports_store = ReportsStore(Path(".cache") / "reports")
+    render_report_for_user = build_report_renderer(reports_store)
+
+    uncat_store = UncatStore(Path(".cache") / "uncat")
+    rules_store = RulesStore(Path(".cache") / "rules")
+    uncat_pending_store = UncatPendingStore(Path(".cache") / "uncat_pending")
+
+    bot = Bot(
+        token=settings.telegram_bot_token,
+        default=DefaultBotProperties(parse_mode="Markdown"),
     )
 
+    dp = Dispatcher()
+
+    user_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    users = UserStore()
+
+    logger = logging.getLogger("mono_ai_budget_bot.bot")
+
+    sync_user_ledger = build_sync_user_ledger(tx_store)
+
+    from .send_queue import PRIORITY_BROADCAST, PRIORITY_INTERACTIVE, SendQueue
+
+    send_queue = SendQueue(bot, logger=logger)
+    bot.session.middleware(send_queue.throttle_request)
+
+    job_queue = JobQueue()
+    scheduler = None
+    worker_task: asyncio.Task | None = None
+    if run_jobs:
+        scheduler, worker_task = start_job_pipeline(
+            bot=send_queue.as_bot(priority=PRIORITY_BROADCAST),
+            users=users,
+            job_queue=job_queue,
+            profile_store=profile_store,
+            uncat_store=uncat_store,
+            render_report_text=render_report_for_user,
+            sync_user_ledger=sync_user_ledger,
+            logger=logger,
+        )
+    else:
+        logger.info("Jobs disabled (--no-jobs); run `monobot worker` for sync/reports.")
+
     from .handlers import register_handlers
 
-    register_handlers(
+    run_interactive_job = register_handlers(
         dp,
-        bot=bot,
+        bot=send_queue.as_bot(priority=PRIORITY_INTERACTIVE),
         settings=settings,
         users=users,
         store=store,
@@ -227,10 +285,27 @@ async def main() -> None:
         logger=logger,
         sync_user_ledger=sync_user_ledger,
         render_report_for_user=render_report_for_user,
+        job_queue=job_queue,
+    )
+
+    from .scheduler import flush_proactive_state, run_job_worker
+
+    interactive_task = asyncio.create_task(
+        run_job_worker(job_queue, run_interactive_job, logger=logger, lanes=(LANE_BOT,))
     )
 
     logger.info("Starting Telegram bot polling...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        interactive_task.cancel()
+        if worker_task is not None:
+            worker_task.cancel()
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+            flush_proactive_state()
+        logger.info("Send queue stats: %s", send_queue.stats.to_dict())
+        await send_queue.stop()
 
 
 if __name__ == "__main__":
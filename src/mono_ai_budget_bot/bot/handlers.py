@@ -20,9 +20,11 @@ from .handlers_runtime import build_handler_runtime
 from .handlers_start import register_start_handlers
 from .handlers_text import register_text_handlers
 from .handlers_uncat import register_uncat_handlers
+from .interactive_jobs import build_interactive_job_runner
 
 if TYPE_CHECKING:
     from ..config import Settings
+    from ..core.job_queue import JobQueue
     from ..storage.profile_store import ProfileStore
     from ..storage.report_store import ReportStore
     from ..storage.reports_store import ReportsStore
@@ -52,7 +54,8 @@ def register_handlers(
     logger: logging.Logger,
     sync_user_ledger,
     render_report_for_user,
-) -> None:
+    job_queue: JobQueue | None = None,
+):
     runtime = build_handler_runtime(
         bot=bot,
         settings=settings,
@@ -185,7 +188,9 @@ def register_handlers(
         send_period_report=_send_period_report,
         monobank_client_factory=_monobank_client_factory,
         handle_nlq_fn=_handle_nlq_fn,
+        job_queue=job_queue,
     )
+    ctx.run_interactive_job = build_interactive_job_runner(ctx)
 
     register_start_handlers(dp, ctx=ctx)
     register_menu_handlers(dp, ctx=ctx)
@@ -194,3 +199,4 @@ def register_handlers(
     register_report_handlers(dp, ctx=ctx)
     register_text_handlers(dp, ctx=ctx)
     register_dev_handlers(dp, ctx=ctx)
+    return ctx.run_interactive_job
@@ -33,3 +33,5 @@ class HandlerContext:
     send_period_report: Any
     monobank_client_factory: Any
     handle_nlq_fn: Any
+    job_queue: Any = None
+    run_interactive_job: Any = None
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime
 
 from aiogram.filters import Command
 from aiogram.types import Message
 
+from mono_ai_budget_bot.core.job_queue import JOB_KIND_SYNC
 from mono_ai_budget_bot.nlq import memory_store
 
 from ..monobank import MonobankClient
@@ -13,8 +13,8 @@ from . import templates
 from .accounts_ui import mask_secret, render_accounts_screen
 from .errors import map_monobank_error
 from .handlers_common import HandlerContext
+from .interactive_jobs import submit_interactive_job
 from .renderers import md_escape
-from .report_flow_helpers import compute_and_cache_reports_for_user
 from .ui import build_main_menu_keyboard, build_onboarding_resume_keyboard
 
 
@@ -172,47 +172,12 @@ def register_dev_handlers(dp, *, ctx: HandlerContext) -> None:
 
         await message.answer(templates.refresh_started_message(days_back))
 
-        chat_id = message.chat.id
-        token = cfg.mono_token
-
-        async def job() -> None:
-            try:
-                async with ctx.user_locks[tg_id]:
-                    from ..monobank.sync import sync_accounts_ledger
-
-                    def _run_sync() -> object:
-                        mb = MonobankClient(token=token)
-                        try:
-                            return sync_accounts_ledger(
-                                mb=mb,
-                                tx_store=ctx.tx_store,
-                                telegram_user_id=tg_id,
-                                account_ids=account_ids,
-                                days_back=days_back,
-                            )
-                        finally:
-                            mb.close()
-
-                    res = await asyncio.to_thread(_run_sync)
-
-                    await compute_and_cache_reports_for_user(tg_id, account_ids, ctx.profile_store)
-
-                    await ctx.bot.send_message(
-                        chat_id,
-                        templates.refresh_done_message(
-                            accounts=res.accounts,
-                            fetched_requests=res.fetched_requests,
-                            appended=res.appended,
-                        ),
-                    )
-            except Exception as e:
-                msg = map_monobank_error(e)
-                await ctx.bot.send_message(
-                    chat_id,
-                    templates.error(f"Помилка оновлення: {md_escape(msg or str(e))}"),
-                )
-
-        asyncio.create_task(job())
+        await submit_interactive_job(
+            ctx,
+            JOB_KIND_SYNC,
+            user_id=tg_id,
+            payload={"chat_id": message.chat.id, "days_back": days_back},
+        )
 
     @dp.message(Command("aliases"))
     async def cmd_aliases(message: Message) -> None:
@@ -4,6 +4,7 @@ from collections.abc import Callable
 
 from aiogram.types import CallbackQuery
 
+from mono_ai_budget_bot.core.job_queue import JOB_KIND_TAXONOMY_MIGRATION
 from mono_ai_budget_bot.nlq import memory_store
 from mono_ai_budget_bot.taxonomy.models import (
     apply_subcategory_migration_choice,
@@ -14,7 +15,9 @@ from mono_ai_budget_bot.taxonomy.rules import Rule
 
 from . import templates
 from .handlers_common import HandlerContext
+from .interactive_jobs import submit_interactive_job
 from .menu_flow import render_menu_screen
+from .report_flow_helpers import preview_rules_for_user
 from .ui import (
     build_back_keyboard,
     build_categories_leaf_picker_keyboard,
@@ -394,6 +397,7 @@ def register_categories_handlers(
         kind = str(item.get("kind") or "")
         value = str(item.get("value") or "").strip()
 
+        impact = None
         if kind in {"merchant_rule", "recipient_rule"}:
             rules = ctx.rules_store.load(tg_id)
             new_rules: list[Rule] = []
@@ -411,6 +415,14 @@ def register_categories_handlers(
                         tx_kinds=r.tx_kinds,
                     )
                 )
+            impact = preview_rules_for_user(
+                tg_id,
+                tax=tax,
+                before=rules,
+                after=new_rules,
+                users=ctx.users,
+                tx_store=ctx.tx_store,
+            )
             ctx.rules_store.save(tg_id, new_rules)
         else:
             alias_terms = load_alias_terms(tax)
@@ -432,6 +444,11 @@ def register_categories_handlers(
                 kind_label=rules_alias_kind_label(kind),
                 value=value,
                 leaf_name=leaf_name_by_id(tax, leaf_id),
+                impact_line=(
+                    templates.rule_impact_line(count=impact.count, amount_minor=impact.amount)
+                    if impact is not None
+                    else None
+                ),
             ),
             reply_markup=build_back_keyboard("menu:categories:rules"),
         )
@@ -721,6 +738,8 @@ def register_categories_handlers(
                             leaf_id=decision.target_leaf_id,
                             merchant_contains=rule.merchant_contains,
                             recipient_contains=rule.recipient_contains,
+                            mcc_in=rule.mcc_in,
+                            tx_kinds=rule.tx_kinds,
                         )
                     )
                     changed = True
@@ -767,6 +786,20 @@ def register_categories_handlers(
             reply_markup=build_back_keyboard("menu:categories"),
         )
 
+        if decision is not None:
+            await submit_interactive_job(
+                ctx,
+                JOB_KIND_TAXONOMY_MIGRATION,
+                user_id=tg_id,
+                payload={
+                    "chat_id": query.message.chat.id if query.message else None,
+                    "source_leaf_id": decision.source_leaf_id,
+                    "source_leaf_name": decision.source_leaf_name,
+                    "target_leaf_id": decision.target_leaf_id,
+                    "target_leaf_name": decision.target_leaf_name,
+                },
+            )
+
     @dp.callback_query(
         lambda c: isinstance(c.data, str)
         and c.data == "menu:categories:add_subcategory:migrate:cancel"
@@ -184,6 +184,7 @@ def register_data_handlers(dp, *, ctx: HandlerContext, monobank_client_cls_facto
             rules_store=ctx.rules_store,
             uncat_store=ctx.uncat_store,
             uncat_pending_store=ctx.uncat_pending_store,
+            profile_store=ctx.profile_store,
         )
 
         await render_menu_screen(
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import asyncio
 from typing import TYPE_CHECKING
 
 from aiogram.types import CallbackQuery
 
+from mono_ai_budget_bot.core.job_queue import JOB_KIND_BACKFILL
 from mono_ai_budget_bot.nlq import memory_store
 from mono_ai_budget_bot.reports.config import ReportsConfig, build_reports_preset
 from mono_ai_budget_bot.settings.onboarding import apply_onboarding_settings
@@ -16,15 +16,18 @@ from . import templates
 from .accounts_ui import render_accounts_screen, save_selected_accounts
 from .errors import map_monobank_error
 from .handlers_common import HandlerContext
+from .interactive_jobs import (
+    BOOTSTRAP_SOURCE_DATA_MENU,
+    BOOTSTRAP_SOURCE_ONBOARDING,
+    BOOTSTRAP_SOURCE_TOKEN_RESET,
+    submit_interactive_job,
+)
 from .onboarding_flow import begin_manual_token_entry
-from .renderers import md_escape
-from .report_flow_helpers import compute_and_cache_reports_for_user
 from .ui import (
     build_back_keyboard,
     build_bootstrap_picker_keyboard,
     build_reports_custom_blocks_keyboard,
     build_reports_custom_period_keyboard,
-    build_rows_keyboard,
     build_saved_to_root_keyboard,
     build_vertical_options_keyboard,
 )
@@ -185,6 +188,7 @@ def register_onboarding_handlers(dp, *, ctx: HandlerContext) -> None:
                 rules_store=ctx.rules_store,
                 uncat_store=ctx.uncat_store,
                 uncat_pending_store=ctx.uncat_pending_store,
+                profile_store=ctx.profile_store,
             )
 
         if isinstance(mem, dict):
@@ -348,83 +352,25 @@ def register_onboarding_handlers(dp, *, ctx: HandlerContext) -> None:
                     reply_markup=kb2,
                 )
 
-        chat_id = query.message.chat.id if query.message else None
-        token = cfg.mono_token
-
-        async def job() -> None:
-            try:
-                async with ctx.user_locks[tg_id]:
-                    from ..monobank.sync import sync_accounts_ledger
-
-                    def _run_sync() -> object:
-                        mb = MonobankClient(token=token)
-                        try:
-                            return sync_accounts_ledger(
-                                mb=mb,
-                                tx_store=ctx.tx_store,
-                                telegram_user_id=tg_id,
-                                account_ids=account_ids,
-                                days_back=days,
-                            )
-                        finally:
-                            mb.close()
-
-                    res = await asyncio.to_thread(_run_sync)
-
-                    await compute_and_cache_reports_for_user(
-                        tg_id,
-                        account_ids,
-                        ctx.profile_store,
-                    )
-
-                    if chat_id is not None:
-                        if from_data_menu:
-                            text = templates.menu_data_bootstrap_done_message(
-                                months_label=months_label,
-                                accounts=res.accounts,
-                                fetched_requests=res.fetched_requests,
-                                appended=res.appended,
-                            )
-                            await ctx.bot.send_message(chat_id, text)
-                        elif from_token_reset:
-                            text = templates.bootstrap_done_message(
-                                accounts=res.accounts,
-                                fetched_requests=res.fetched_requests,
-                                appended=res.appended,
-                            )
-                            await ctx.bot.send_message(
-                                chat_id,
-                                text,
-                                reply_markup=build_saved_to_root_keyboard(),
-                            )
-                        else:
-                            ctx.sync_onboarding_progress(tg_id)
-                            onboarding_done = ctx.onboarding_done(tg_id)
-
-                            if onboarding_done:
-                                text = templates.bootstrap_done_message(
-                                    accounts=res.accounts,
-                                    fetched_requests=res.fetched_requests,
-                                    appended=res.appended,
-                                )
-                            else:
-                                text = templates.bootstrap_done_onboarding_message()
-
-                            await ctx.bot.send_message(chat_id, text)
-
-            except Exception as e:
-                if chat_id is not None:
-                    msg = map_monobank_error(e)
-                    retry_callback = str(query.data or "boot_90")
-                    await ctx.bot.send_message(
-                        chat_id,
-                        templates.error(f"Помилка bootstrap: {md_escape(msg or str(e))}"),
-                        reply_markup=build_rows_keyboard(
-                            [[("🔁 Спробувати ще раз", retry_callback)]]
-                        ),
-                    )
-
-        asyncio.create_task(job())
+        if from_data_menu:
+            source = BOOTSTRAP_SOURCE_DATA_MENU
+        elif from_token_reset:
+            source = BOOTSTRAP_SOURCE_TOKEN_RESET
+        else:
+            source = BOOTSTRAP_SOURCE_ONBOARDING
+
+        await submit_interactive_job(
+            ctx,
+            JOB_KIND_BACKFILL,
+            user_id=tg_id,
+            payload={
+                "chat_id": query.message.chat.id if query.message else None,
+                "days": days,
+                "months_label": months_label,
+                "source": source,
+                "retry_callback": str(query.data or "boot_90"),
+            },
+        )
 
     @dp.callback_query(
         lambda c: c.data in ("tax_preset_min", "tax_preset_max", "tax_preset_custom")
@@ -5,7 +5,7 @@ from datetime import date, datetime, timezone
 
 from aiogram.types import CallbackQuery, Message
 
-from mono_ai_budget_bot.analytics.enrich import enrich_period_facts
+from mono_ai_budget_bot.analytics.enrich import enrich_period_facts, enrich_period_facts_from_cube
 from mono_ai_budget_bot.nlq import memory_store
 from mono_ai_budget_bot.nlq.types import NLQRequest
 from mono_ai_budget_bot.settings.ai_features import (
@@ -21,7 +21,15 @@ from . import templates
 from .clarify import validate_ok_or_alert
 from .errors import map_llm_error
 from .handlers_common import HandlerContext
-from .report_flow_helpers import build_ai_block, compute_and_cache_reports_for_user
+from .report_flow_helpers import (
+    CUSTOM_REPORT_CUBE_MIN_DAYS,
+    CUSTOM_REPORT_MAX_DAYS,
+    build_ai_block,
+    closed_facts_store,
+    compute_and_cache_reports_for_user,
+    daily_cube_store,
+    load_or_update_daily_cube,
+)
 from .ui import (
     build_back_keyboard,
     build_report_mode_keyboard,
@@ -108,9 +116,9 @@ async def _finalize_custom_report(
     want_ai: bool,
 ) -> None:
     day_count = ((int(end_day_start_ts) - int(start_ts)) // 86400) + 1
-    if day_count > 366:
+    if day_count > CUSTOM_REPORT_MAX_DAYS:
         await message.answer(
-            templates.menu_reports_custom_invalid_range_message(366),
+            templates.menu_reports_custom_invalid_range_message(CUSTOM_REPORT_MAX_DAYS),
             reply_markup=build_back_keyboard("menu:reports"),
         )
         return
@@ -137,19 +145,31 @@ async def _finalize_custom_report(
         return
 
     end_exclusive_ts = int(end_day_start_ts) + 86400
-    lookback_from_ts = end_exclusive_ts - ((2 * day_count + 1) * 86400)
+    account_ids = list(cfg.selected_account_ids or [])
 
-    records = ctx.tx_store.load_range(
-        user_id,
-        list(cfg.selected_account_ids or []),
-        lookback_from_ts,
-        end_exclusive_ts,
-    )
-    facts = enrich_period_facts(
-        records,
-        days_back=day_count,
-        now_ts=end_exclusive_ts,
-    )
+    lookback_from_ts = end_exclusive_ts - ((2 * day_count + 1) * 86400)
+    cube = None
+    if day_count >= CUSTOM_REPORT_CUBE_MIN_DAYS:
+        cube = load_or_update_daily_cube(
+            user_id, account_ids, tx_store=ctx.tx_store, cube_store=daily_cube_store
+        )
+    if cube is not None and cube.covers(lookback_from_ts, end_exclusive_ts):
+        facts = enrich_period_facts_from_cube(
+            cube,
+            days_back=day_count,
+            now_ts=end_exclusive_ts,
+            load_records=lambda ts_from, ts_to: ctx.tx_store.load_range(
+                user_id, account_ids, ts_from, ts_to
+            ),
+        )
+    else:
+        records = ctx.tx_store.load_range(user_id, account_ids, lookback_from_ts, end_exclusive_ts)
+        facts = enrich_period_facts(
+            records,
+            days_back=day_count,
+            now_ts=end_exclusive_ts,
+            closed_facts=closed_facts_store.bind(user_id),
+        )
 
     cov = ctx.tx_store.aggregated_coverage_window(user_id, list(cfg.selected_account_ids or []))
     if cov is not None and isinstance(facts, dict):
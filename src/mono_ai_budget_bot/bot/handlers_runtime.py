@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 from aiogram.types import CallbackQuery, Message
 
-from mono_ai_budget_bot.currency import MonobankPublicClient
+from mono_ai_budget_bot.currency import MonobankPublicClient, currency_rate_service
 from mono_ai_budget_bot.monobank import MonobankClient
 from mono_ai_budget_bot.nlq.pipeline import handle_nlq
 from mono_ai_budget_bot.settings.ai_features import (
@@ -266,23 +267,12 @@ def build_handler_runtime(
         )
 
     async def _send_currency_screen(message: Message, *, force_refresh: bool) -> None:
-        pub = None
         try:
-            pub = monobank_public_client_cls()
-            if hasattr(pub, "currency_snapshot"):
-                snapshot = pub.currency_snapshot(force_refresh=force_refresh)
-                text = render_currency_screen_text(snapshot)
-            else:
-                rates = pub.currency(force_refresh=force_refresh)
-                text = render_currency_screen_text(rates)
+            rates = currency_rate_service(monobank_public_client_cls)
+            snapshot = await asyncio.to_thread(rates.snapshot, force_refresh=force_refresh)
+            text = render_currency_screen_text(snapshot)
         except Exception as e:
             text = templates.error(f"Не вдалося отримати курси валют: {e}")
-        finally:
-            try:
-                if pub is not None:
-                    pub.close()
-            except Exception:
-                pass
 
         kb = build_currency_screen_keyboard()
         await message.edit_text(text, reply_markup=kb)
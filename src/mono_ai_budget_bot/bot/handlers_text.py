@@ -24,6 +24,7 @@ from .errors import map_monobank_error
 from .handlers_common import HandlerContext
 from .handlers_reports import handle_reports_custom_manual_input
 from .onboarding_flow import submit_manual_token
+from .report_flow_helpers import preview_rules_for_user
 from .ui import (
     build_back_keyboard,
     build_coverage_cta_keyboard,
@@ -186,16 +187,26 @@ def register_text_handlers(dp, *, ctx: HandlerContext) -> None:
 
                 base = f"{leaf_id}:{item.description.lower().strip()}"
                 rid = hashlib.sha1(base.encode("utf-8")).hexdigest()[:10]
-                ctx.rules_store.add(
+                rule = Rule(id=rid, leaf_id=leaf_id, merchant_contains=item.description)
+                rules = ctx.rules_store.load(user_id)
+                impact = preview_rules_for_user(
                     user_id,
-                    Rule(id=rid, leaf_id=leaf_id, merchant_contains=item.description),
+                    tax=tax,
+                    before=rules,
+                    after=[r for r in rules if r.id != rule.id] + [rule],
+                    users=ctx.users,
+                    tx_store=ctx.tx_store,
                 )
+                ctx.rules_store.add(user_id, rule)
 
                 description_key = item.description.lower().strip()
+                recategorized = set(impact.tx_ids) if impact is not None else set()
                 remaining = [
                     x
                     for x in items
-                    if x.tx_id != item.tx_id and x.description.lower().strip() != description_key
+                    if x.tx_id != item.tx_id
+                    and x.description.lower().strip() != description_key
+                    and x.tx_id not in recategorized
                 ]
                 ctx.uncat_store.save(user_id, remaining)
                 ctx.uncat_pending_store.mark_used(user_id)
@@ -205,6 +216,13 @@ def register_text_handlers(dp, *, ctx: HandlerContext) -> None:
                     templates.uncat_category_created_and_applied_message(
                         category_name=text_raw,
                         description=item.description,
+                        impact_line=(
+                            templates.rule_impact_line(
+                                count=impact.count, amount_minor=impact.amount
+                            )
+                            if impact is not None
+                            else None
+                        ),
                     )
                 )
                 await ctx.send_next_uncat(message, user_id)
@@ -358,8 +376,10 @@ def register_text_handlers(dp, *, ctx: HandlerContext) -> None:
             leaf_name = str(state.get("leaf_name") or "").strip() or leaf_id
             mode = str(state.get("mode") or "").strip()
 
+            impact = None
             if kind in {"merchant_rule", "recipient_rule"}:
-                rules = ctx.rules_store.load(user_id)
+                before = ctx.rules_store.load(user_id)
+                rules = list(before)
                 old_id = str(state.get("entry_id") or "").strip()
 
                 if old_id:
@@ -376,6 +396,14 @@ def register_text_handlers(dp, *, ctx: HandlerContext) -> None:
                         recipient_contains=value if kind == "recipient_rule" else None,
                     )
                 )
+                impact = preview_rules_for_user(
+                    user_id,
+                    tax=ctx.taxonomy_store.load(user_id) or {},
+                    before=before,
+                    after=rules,
+                    users=ctx.users,
+                    tx_store=ctx.tx_store,
+                )
                 ctx.rules_store.save(user_id, rules)
             elif kind == "alias":
                 tax = ctx.taxonomy_store.load(user_id) or {}
@@ -423,6 +451,11 @@ def register_text_handlers(dp, *, ctx: HandlerContext) -> None:
                     }.get(kind, "Rule"),
                     value=value,
                     leaf_name=leaf_name,
+                    impact_line=(
+                        templates.rule_impact_line(count=impact.count, amount_minor=impact.amount)
+                        if impact is not None
+                        else None
+                    ),
                 ),
                 reply_markup=build_back_keyboard("menu:categories:rules"),
             )
@@ -12,6 +12,7 @@ from mono_ai_budget_bot.uncat.ui import list_leaf_options
 from . import templates
 from .clarify import validate_uncat_pending_or_alert
 from .handlers_common import HandlerContext
+from .report_flow_helpers import preview_rules_for_user
 from .ui import build_uncat_leaf_picker_keyboard
 
 
@@ -37,16 +38,26 @@ def register_uncat_handlers(dp, *, ctx: HandlerContext) -> None:
 
         base = f"{leaf_id}:{item.description.lower().strip()}"
         rid = hashlib.sha1(base.encode("utf-8")).hexdigest()[:10]
-        ctx.rules_store.add(
+        rule = Rule(id=rid, leaf_id=leaf_id, merchant_contains=item.description)
+        rules = ctx.rules_store.load(tg_id)
+        impact = preview_rules_for_user(
             tg_id,
-            Rule(id=rid, leaf_id=leaf_id, merchant_contains=item.description),
+            tax=tax,
+            before=rules,
+            after=[r for r in rules if r.id != rule.id] + [rule],
+            users=ctx.users,
+            tx_store=ctx.tx_store,
         )
+        ctx.rules_store.add(tg_id, rule)
 
         description_key = item.description.lower().strip()
+        recategorized = set(impact.tx_ids) if impact is not None else set()
         remaining = [
             x
             for x in items
-            if x.tx_id != item.tx_id and x.description.lower().strip() != description_key
+            if x.tx_id != item.tx_id
+            and x.description.lower().strip() != description_key
+            and x.tx_id not in recategorized
         ]
         ctx.uncat_store.save(tg_id, remaining)
 
@@ -58,6 +69,11 @@ def register_uncat_handlers(dp, *, ctx: HandlerContext) -> None:
                 templates.uncat_saved_mapping_message(
                     description=item.description,
                     leaf_name=(leaf_name or "категорія"),
+                    impact_line=(
+                        templates.rule_impact_line(count=impact.count, amount_minor=impact.amount)
+                        if impact is not None
+                        else None
+                    ),
                 )
             )
             await ctx.send_next_uncat(query.message, tg_id)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from ..core.job_queue import (
+    JOB_KIND_BACKFILL,
+    JOB_KIND_SYNC,
+    JOB_KIND_TAXONOMY_MIGRATION,
+    LANE_BOT,
+    PRIORITY_BACKFILL,
+    PRIORITY_INTERACTIVE,
+    Job,
+)
+from ..monobank import MonobankClient
+from ..taxonomy.models import TaxonomyMigrationDecision
+from . import templates
+from .errors import map_monobank_error
+from .handlers_common import HandlerContext
+from .renderers import md_escape
+from .report_flow_helpers import (
+    categorization_store,
+    compute_and_cache_reports_for_user,
+    migrate_categorizations,
+)
+from .ui import build_rows_keyboard, build_saved_to_root_keyboard
+
+BOOTSTRAP_SOURCE_DATA_MENU = "data_menu"
+BOOTSTRAP_SOURCE_TOKEN_RESET = "token_reset"
+BOOTSTRAP_SOURCE_ONBOARDING = "onboarding"
+
+MIGRATION_PROGRESS_INTERVAL_SEC = 2.0
+# Queued interactive jobs retry with backoff; the chat only hears about the final failure.
+INTERACTIVE_MAX_ATTEMPTS = 3
+
+
+def build_interactive_job_runner(ctx: HandlerContext):
+    """
+    Executes user-triggered jobs from the "bot" lane (/refresh, bootstrap, taxonomy
+    migrations) and reports the outcome into the user's chat. Tokens are read from
+    UserStore at run time, never from the queue payload.
+    """
+
+    async def _sync(tg_id: int, days_back: int) -> tuple[object, list[str]]:
+        from ..monobank.sync import sync_accounts_ledger
+
+        cfg = ctx.users.load(tg_id)
+        if cfg is None or not cfg.mono_token:
+            raise RuntimeError("Monobank is not connected")
+        account_ids = list(cfg.selected_account_ids or [])
+        token = cfg.mono_token
+
+        def _run_sync() -> object:
+            mb = MonobankClient(token=token)
+            try:
+                return sync_accounts_ledger(
+                    mb=mb,
+                    tx_store=ctx.tx_store,
+                    telegram_user_id=tg_id,
+                    account_ids=account_ids,
+                    days_back=days_back,
+                )
+            finally:
+                mb.close()
+
+        res = await asyncio.to_thread(_run_sync)
+        await compute_and_cache_reports_for_user(tg_id, account_ids, ctx.profile_store)
+        return res, account_ids
+
+    async def run_refresh(job: Job) -> None:
+        tg_id = int(job.user_id or 0)
+        chat_id = int(job.payload["chat_id"])
+        days_back = int(job.payload.get("days_back") or 8)
+
+        try:
+            async with ctx.user_locks[tg_id]:
+                res, _ = await _sync(tg_id, days_back)
+                await ctx.bot.send_message(
+                    chat_id,
+                    templates.refresh_done_message(
+                        accounts=res.accounts,
+                        fetched_requests=res.fetched_requests,
+                        appended=res.appended,
+                    ),
+                )
+        except Exception as e:
+            if job.is_last_attempt:
+                msg = map_monobank_error(e)
+                await ctx.bot.send_message(
+                    chat_id,
+                    templates.error(f"Помилка оновлення: {md_escape(msg or str(e))}"),
+                )
+            raise
+
+    async def run_bootstrap(job: Job) -> None:
+        tg_id = int(job.user_id or 0)
+        chat_id = job.payload.get("chat_id")
+        days = int(job.payload.get("days") or 90)
+        months_label = str(job.payload.get("months_label") or "")
+        source = str(job.payload.get("source") or BOOTSTRAP_SOURCE_ONBOARDING)
+
+        try:
+            async with ctx.user_locks[tg_id]:
+                res, _ = await _sync(tg_id, days)
+
+                if chat_id is None:
+                    return
+                if source == BOOTSTRAP_SOURCE_DATA_MENU:
+                    text = templates.menu_data_bootstrap_done_message(
+                        months_label=months_label,
+                        accounts=res.accounts,
+                        fetched_requests=res.fetched_requests,
+                        appended=res.appended,
+                    )
+                    await ctx.bot.send_message(chat_id, text)
+                elif source == BOOTSTRAP_SOURCE_TOKEN_RESET:
+                    text = templates.bootstrap_done_message(
+                        accounts=res.accounts,
+                        fetched_requests=res.fetched_requests,
+                        appended=res.appended,
+                    )
+                    await ctx.bot.send_message(
+                        chat_id,
+                        text,
+                        reply_markup=build_saved_to_root_keyboard(),
+                    )
+                else:
+                    ctx.sync_onboarding_progress(tg_id)
+                    if ctx.onboarding_done(tg_id):
+                        text = templates.bootstrap_done_message(
+                            accounts=res.accounts,
+                            fetched_requests=res.fetched_requests,
+                            appended=res.appended,
+                        )
+                    else:
+                        text = templates.bootstrap_done_onboarding_message()
+
+                    await ctx.bot.send_message(chat_id, text)
+
+        except Exception as e:
+            if chat_id is not None and job.is_last_attempt:
+                msg = map_monobank_error(e)
+                retry_callback = str(job.payload.get("retry_callback") or "boot_90")
+                await ctx.bot.send_message(
+                    chat_id,
+                    templates.error(f"Помилка bootstrap: {md_escape(msg or str(e))}"),
+                    reply_markup=build_rows_keyboard([[("🔁 Спробувати ще раз", retry_callback)]]),
+                )
+            raise
+
+    async def run_taxonomy_migration(job: Job) -> None:
+        tg_id = int(job.user_id or 0)
+        chat_id = job.payload.get("chat_id")
+        migration = TaxonomyMigrationDecision(
+            source_leaf_id=str(job.payload["source_leaf_id"]),
+            source_leaf_name=str(job.payload.get("source_leaf_name") or ""),
+            target_leaf_id=str(job.payload["target_leaf_id"]),
+            target_leaf_name=str(job.payload.get("target_leaf_name") or ""),
+        )
+        names = {
+            "source_name": migration.source_leaf_name,
+            "target_name": migration.target_leaf_name,
+        }
+        progress = {"done": 0, "total": 0}
+
+        def _on_progress(done: int, total: int) -> None:
+            progress["done"], progress["total"] = done, total
+
+        async def _report_progress(status) -> None:
+            shown = (0, 0)
+            while True:
+                await asyncio.sleep(MIGRATION_PROGRESS_INTERVAL_SEC)
+                current = (progress["done"], progress["total"])
+                if current == shown or current[1] <= 0:
+                    continue
+                shown = current
+                try:
+                    await ctx.bot.edit_message_text(
+                        templates.taxonomy_migration_progress_message(
+                            **names, done=current[0], total=current[1]
+                        ),
+                        chat_id=chat_id,
+                        message_id=status.message_id,
+                    )
+                except Exception:
+                    pass
+
+        try:
+            async with ctx.user_locks[tg_id]:
+                cfg = ctx.users.load(tg_id)
+                account_ids = list(getattr(cfg, "selected_account_ids", None) or [])
+                tax = ctx.taxonomy_store.load(tg_id)
+                if not account_ids or not isinstance(tax, dict):
+                    return
+                rules = ctx.rules_store.load(tg_id)
+
+                reporter = None
+                if chat_id is not None:
+                    status = await ctx.bot.send_message(
+                        chat_id, templates.taxonomy_migration_started_message(**names)
+                    )
+                    reporter = asyncio.create_task(_report_progress(status))
+                try:
+                    moved = await asyncio.to_thread(
+                        migrate_categorizations,
+                        tg_id,
+                        account_ids,
+                        migration,
+                        tax=tax,
+                        rules=rules,
+                        tx_store=ctx.tx_store,
+                        categorization_store=categorization_store,
+                        uncat_store=ctx.uncat_store,
+                        progress=_on_progress,
+                    )
+                finally:
+                    if reporter is not None:
+                        reporter.cancel()
+
+                if chat_id is not None:
+                    await ctx.bot.send_message(
+                        chat_id,
+                        templates.taxonomy_migration_done_message(
+                            target_name=migration.target_leaf_name, moved=moved
+                        ),
+                    )
+        except Exception as e:
+            if chat_id is not None and job.is_last_attempt:
+                await ctx.bot.send_message(
+                    chat_id,
+                    templates.error(f"Помилка міграції категорій: {md_escape(str(e))}"),
+                )
+            raise
+
+    async def run(job: Job) -> None:
+        if job.kind == JOB_KIND_TAXONOMY_MIGRATION:
+            await run_taxonomy_migration(job)
+            return
+        if job.kind == JOB_KIND_SYNC:
+            await run_refresh(job)
+            return
+        if job.kind == JOB_KIND_BACKFILL:
+            await run_bootstrap(job)
+            return
+        raise ValueError(f"Unknown interactive job kind: {job.kind}")
+
+    return run
+
+
+async def submit_interactive_job(
+    ctx: HandlerContext,
+    kind: str,
+    *,
+    user_id: int,
+    payload: dict[str, Any],
+) -> None:
+    """
+    Enqueue a user-triggered job into the durable "bot" lane. Without a queue
+    (tests, ad-hoc runs) the job runs in-process.
+
+    Pending jobs of the same kind coalesce per user, except taxonomy migrations:
+    each one moves different transactions, so they are keyed per migration.
+    """
+    priority = PRIORITY_BACKFILL if kind == JOB_KIND_BACKFILL else PRIORITY_INTERACTIVE
+    dedupe_key = None
+    if kind == JOB_KIND_TAXONOMY_MIGRATION:
+        dedupe_key = (
+            f"{LANE_BOT}:{kind}:{int(user_id)}:"
+            f"{payload.get('source_leaf_id')}:{payload.get('target_leaf_id')}"
+        )
+
+    if ctx.job_queue is not None:
+        await asyncio.to_thread(
+            ctx.job_queue.enqueue,
+            kind,
+            user_id=user_id,
+            payload=payload,
+            priority=priority,
+            lane=LANE_BOT,
+            dedupe_key=dedupe_key,
+            max_attempts=INTERACTIVE_MAX_ATTEMPTS,
+        )
+        return
+
+    job = Job(
+        id=0,
+        kind=kind,
+        user_id=user_id,
+        payload=payload,
+        priority=priority,
+        attempts=1,
+        created_at=time.time(),
+        lane=LANE_BOT,
+        max_attempts=1,
+    )
+
+    async def _run_detached() -> None:
+        try:
+            await ctx.run_interactive_job(job)
+        except Exception as e:
+            ctx.logger.warning("Interactive %s job failed for user=%s: %s", kind, user_id, e)
+
+    asyncio.create_task(_run_detached())
@@ -198,6 +198,7 @@ async def submit_manual_token(
             rules_store=rules_store,
             uncat_store=uncat_store,
             uncat_pending_store=uncat_pending_store,
+            profile_store=profile_store,
         )
 
     users.save(user_id, mono_token=mono_token, selected_account_ids=[])
@@ -1,28 +1,501 @@
 from __future__ import annotations
 
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Callable
 
 from mono_ai_budget_bot.analytics.compute import compute_facts
+from mono_ai_budget_bot.analytics.daily_cube import SECONDS_IN_DAY, DailyCube, build_daily_cube
 from mono_ai_budget_bot.analytics.enrich import enrich_period_facts
 from mono_ai_budget_bot.analytics.from_ledger import rows_from_ledger
-from mono_ai_budget_bot.core.time_ranges import range_today
-from mono_ai_budget_bot.currency import MonobankPublicClient, normalize_records_to_uah
+from mono_ai_budget_bot.analytics.period_to_date import TO_DATE_KINDS, PeriodToDate
+from mono_ai_budget_bot.analytics.refunds import REFUND_MAX_DAYS
+from mono_ai_budget_bot.core.time_ranges import calendar_period_bounds, range_today
+from mono_ai_budget_bot.currency import currency_rate_service
+from mono_ai_budget_bot.currency.history import load_fx_history, normalize_records_by_day
+from mono_ai_budget_bot.currency.normalize import UAH_CODE
 
-from ..analytics.profile import build_user_profile
+from ..analytics.profile import SpendingBaseline
+from ..analytics.recurring import RecurringIndex
+from ..storage.categorization_store import CategorizationStore
+from ..storage.closed_facts_store import ClosedFactsStore
+from ..storage.daily_cube_store import DailyCubeStore
+from ..storage.fx_amount_store import FxAmountStore
+from ..storage.fx_history_store import FxHistoryStore
+from ..storage.period_to_date_store import PeriodToDateStore
 from ..storage.profile_store import ProfileStore
+from ..storage.recurring_store import RecurringStore
 from ..storage.report_store import ReportStore
 from ..storage.rules_store import RulesStore
 from ..storage.taxonomy_store import TaxonomyStore
-from ..storage.tx_store import TxStore
+from ..storage.tx_store import TxRecord, TxStore
 from ..storage.uncat_store import UncatStore
+from ..taxonomy.categorization_cache import CategorizationCache
+from ..taxonomy.ledger_index import LedgerIndex, RuleImpact, preview_rules_change
+from ..taxonomy.models import TaxonomyMigrationDecision
 from ..taxonomy.presets import build_taxonomy_preset
-from ..uncat.queue import build_uncat_queue
+from ..taxonomy.rules import Rule
+from ..uncat.queue import build_uncat_queue, uncat_queue_delta
 from . import templates
 from .renderers import md_escape
 
 store = ReportStore()
 tx_store = TxStore()
+daily_cube_store = DailyCubeStore()
+closed_facts_store = ClosedFactsStore()
+to_date_store = PeriodToDateStore()
+categorization_store = CategorizationStore()
+fx_history_store = FxHistoryStore()
+fx_amount_store = FxAmountStore()
+recurring_store = RecurringStore()
+
+CUSTOM_REPORT_MAX_DAYS = 366
+# Shorter custom reports load their few weeks of records directly.
+CUSTOM_REPORT_CUBE_MIN_DAYS = 15
+DAILY_CUBE_DAYS = 2 * CUSTOM_REPORT_MAX_DAYS + 1
+CATEGORIZATION_WINDOW_DAYS = 90
+
+
+def load_or_update_daily_cube(
+    tg_id: int,
+    account_ids: list[str],
+    *,
+    tx_store: TxStore,
+    cube_store: DailyCubeStore,
+    now_ts: int | None = None,
+) -> DailyCube:
+    """
+    Returns the user's daily cube covering the last DAILY_CUBE_DAYS UTC days (enough
+    for a max-length custom report plus its previous window), rolled forward to today
+    with only the ledger lines appended since the last call folded in.
+
+    Built on demand by custom-range reports, not by the background refresh: the first
+    build (and a rebuild on account changes or a rewritten ledger) reads the whole cube
+    window.
+    """
+    now = int(now_ts if now_ts is not None else time.time())
+    first_day = now // SECONDS_IN_DAY - DAILY_CUBE_DAYS + 1
+
+    raw = cube_store.load(tg_id)
+    cube = DailyCube.from_dict(raw) if raw is not None else None
+    rolled = cube is not None and cube.first_day != first_day
+    if cube is not None and (
+        cube.n_days != DAILY_CUBE_DAYS
+        or sorted(cube.offsets) != sorted(account_ids)
+        or not cube.roll_to(first_day)
+    ):
+        cube = None
+
+    appended = None
+    if cube is not None:
+        appended = _read_appended(tg_id, account_ids, cube.offsets, tx_store=tx_store)
+    if cube is not None and appended is not None:
+        records, offsets = appended
+        changed = rolled or bool(records) or offsets != cube.offsets
+        in_range = [r for r in records if cube.start_ts <= int(r.time) < cube.end_ts]
+        cube.add_records(in_range)
+        if in_range:
+            margin = (REFUND_MAX_DAYS + 1) * SECONDS_IN_DAY
+            cube.add_refund_candidates(
+                tx_store.load_range(
+                    tg_id,
+                    account_ids,
+                    max(cube.start_ts, min(int(r.time) for r in in_range) - margin),
+                    max(int(r.time) for r in in_range) + margin,
+                )
+            )
+        cube.offsets = offsets
+        if changed:
+            cube_store.save(tg_id, cube.to_dict())
+        return cube
+
+    offsets = tx_store.ledger_offsets(tg_id, account_ids)
+    start_ts = first_day * SECONDS_IN_DAY
+    records = tx_store.load_range(
+        tg_id, account_ids, start_ts, start_ts + DAILY_CUBE_DAYS * SECONDS_IN_DAY - 1
+    )
+    cube = build_daily_cube(records, first_day=first_day, n_days=DAILY_CUBE_DAYS)
+    cube.offsets = offsets
+    cube_store.save(tg_id, cube.to_dict())
+    return cube
+
+
+def _read_appended(
+    tg_id: int, account_ids: list[str], offsets: dict[str, int], *, tx_store: TxStore
+) -> tuple[list[TxRecord], dict[str, int]] | None:
+    records: list[TxRecord] = []
+    new_offsets: dict[str, int] = {}
+    for acc_id in account_ids:
+        tail = tx_store.load_appended(tg_id, acc_id, offsets.get(acc_id, 0))
+        if tail is None:
+            return None
+        records.extend(tail[0])
+        new_offsets[acc_id] = tail[1]
+    return records, new_offsets
+
+
+def load_or_update_period_to_date(
+    tg_id: int,
+    account_ids: list[str],
+    kind: str,
+    *,
+    tx_store: TxStore,
+    to_date_store: PeriodToDateStore,
+    now_ts: int | None = None,
+) -> PeriodToDate:
+    """
+    Returns the user's calendar week/month-to-date accumulator (with the previous
+    period it compares against), folding in only the ledger lines appended since the
+    last call. New refund candidates are looked up in the ledger around the appended
+    transactions only.
+
+    At a period boundary the finished period becomes `previous` and the sums restart
+    from zero: every tx of the new period was appended after the old state's
+    `as_of_ts`, unless that already reached into the new period. In that case (as on
+    first use, a skipped period, account changes or a rewritten ledger) the state is
+    rebuilt by reading the ledgers once.
+    """
+    now = int(now_ts if now_ts is not None else time.time())
+    start_ts, _ = calendar_period_bounds(kind, now)
+
+    raw = to_date_store.load(tg_id, kind)
+    acc = PeriodToDate.from_dict(raw) if raw is not None else None
+    if acc is not None and (acc.kind != kind or sorted(acc.offsets) != sorted(account_ids)):
+        acc = None
+    if acc is not None and acc.start_ts != start_ts:
+        if acc.as_of_ts < start_ts and acc.end_ts == start_ts:
+            finished, acc = acc, PeriodToDate.empty(kind, now, acc.offsets)
+            finished.previous = None
+            acc.previous = finished
+        else:
+            acc = None
+
+    appended = None
+    if acc is not None:
+        appended = _read_appended(tg_id, account_ids, acc.offsets, tx_store=tx_store)
+    if acc is None or appended is None:
+        acc = PeriodToDate.empty_with_previous(kind, now, {})
+        records, acc.offsets = _read_appended(tg_id, account_ids, {}, tx_store=tx_store) or ([], {})
+        acc.add_records(records)
+        acc.add_refund_candidates(records)
+    else:
+        records, acc.offsets = appended
+        acc.add_records(records)
+        lo_ts = acc.previous.start_ts if acc.previous is not None else acc.start_ts
+        in_range = [r for r in records if lo_ts <= int(r.time) < acc.end_ts]
+        if in_range:
+            margin = (REFUND_MAX_DAYS + 1) * SECONDS_IN_DAY
+            acc.add_refund_candidates(
+                tx_store.load_range(
+                    tg_id,
+                    account_ids,
+                    max(lo_ts, min(int(r.time) for r in in_range) - margin),
+                    min(acc.end_ts - 1, max(int(r.time) for r in in_range) + margin),
+                )
+            )
+
+    acc.as_of_ts = max(acc.as_of_ts, now)
+    to_date_store.save(tg_id, kind, acc.to_dict())
+    return acc
+
+
+def load_or_update_spending_baseline(
+    tg_id: int,
+    account_ids: list[str],
+    *,
+    tx_store: TxStore,
+    profile_store: ProfileStore,
+    now_ts: int | None = None,
+) -> SpendingBaseline:
+    """
+    Returns the user's spending baseline, advanced to `now_ts` with only the ledger
+    lines appended since the last call folded in. It is rebuilt from the ledgers on
+    first use, account changes or a rewritten ledger.
+    """
+    now = int(now_ts if now_ts is not None else time.time())
+
+    raw = profile_store.load_baseline(tg_id)
+    baseline = SpendingBaseline.from_dict(raw) if raw is not None else None
+    if baseline is not None and sorted(baseline.offsets) != sorted(account_ids):
+        baseline = None
+
+    appended = None
+    if baseline is not None:
+        appended = _read_appended(tg_id, account_ids, baseline.offsets, tx_store=tx_store)
+    if baseline is None or appended is None:
+        baseline = SpendingBaseline.empty(now, {})
+        appended = _read_appended(tg_id, account_ids, {}, tx_store=tx_store) or ([], {})
+
+    records, baseline.offsets = appended
+    baseline.advance(now)
+    baseline.add_records(records)
+    profile_store.save_baseline(tg_id, baseline.to_dict())
+    return baseline
+
+
+def load_or_update_recurring_index(
+    tg_id: int,
+    account_ids: list[str],
+    *,
+    tx_store: TxStore,
+    recurring_store: RecurringStore,
+) -> RecurringIndex:
+    """
+    Returns the user's recurring-series index with only the ledger lines appended
+    since the last call folded in. It is rebuilt from the ledgers on first use,
+    account changes or a rewritten ledger.
+    """
+    raw = recurring_store.load(tg_id)
+    index = RecurringIndex.from_dict(raw) if raw is not None else None
+    if index is not None and sorted(index.offsets) != sorted(account_ids):
+        index = None
+
+    appended = None
+    if index is not None:
+        appended = _read_appended(tg_id, account_ids, index.offsets, tx_store=tx_store)
+    if index is None or appended is None:
+        index = RecurringIndex(offsets={})
+        appended = _read_appended(tg_id, account_ids, {}, tx_store=tx_store) or ([], {})
+
+    records, index.offsets = appended
+    index.add_records(records)
+    recurring_store.save(tg_id, index.to_dict())
+    return index
+
+
+def normalize_records_for_user(
+    tg_id: int,
+    records: list[TxRecord],
+    *,
+    history_store: FxHistoryStore,
+    amount_store: FxAmountStore,
+    rate_map: dict[int, float] | None = None,
+    keep_from_ts: int | None = None,
+) -> list[TxRecord]:
+    """
+    UAH-normalizes `records` with the rate of each transaction's day. Conversions that
+    can no longer change are kept per user, so past amounts stay the same from one
+    report to the next; `rate_map` (current rates) covers currencies without history.
+    Kept conversions of transactions before `keep_from_ts` are dropped.
+    """
+    if all(r.currencyCode in (None, UAH_CODE) for r in records):
+        return records
+    out, fresh = normalize_records_by_day(
+        records,
+        load_fx_history(history_store),
+        fallback_rate_map=rate_map,
+        converted=amount_store.load(tg_id),
+    )
+    keep_from_day = keep_from_ts // SECONDS_IN_DAY if keep_from_ts is not None else None
+    amount_store.add(tg_id, fresh, keep_from_day=keep_from_day)
+    return out
+
+
+def load_or_update_categorizations(
+    tg_id: int,
+    account_ids: list[str],
+    *,
+    tx_store: TxStore,
+    tax: dict[str, Any],
+    rules: list[Rule],
+    categorization_store: CategorizationStore,
+    normalize: Callable[[list[TxRecord]], list[TxRecord]] | None = None,
+    now_ts: int | None = None,
+) -> CategorizationCache:
+    """
+    The user's cached categorizations over the last CATEGORIZATION_WINDOW_DAYS.
+
+    While taxonomy, rules and aliases are unchanged, only the ledger lines appended
+    since the last call are categorized and entries that left the window are pruned.
+    Otherwise (as on first use, account changes or a rewritten ledger) the window is
+    read and refreshed, re-evaluating only what a changed rule/alias could match. The
+    re-evaluated records (passed through `normalize`, e.g. UAH normalization) are in
+    the returned cache's `evaluated`.
+    """
+    to_uah = normalize or (lambda records: records)
+    now = int(now_ts if now_ts is not None else time.time())
+    ts_from = now - CATEGORIZATION_WINDOW_DAYS * SECONDS_IN_DAY
+
+    raw = categorization_store.load(tg_id)
+    cache = CategorizationCache.from_dict(raw) if raw is not None else None
+    appended = None
+    if (
+        cache is not None
+        and sorted(cache.offsets) == sorted(account_ids)
+        and cache.inputs_match(tax=tax, rules=rules)
+    ):
+        appended = _read_appended(tg_id, account_ids, cache.offsets, tx_store=tx_store)
+
+    if cache is not None and appended is not None:
+        records, cache.offsets = appended
+        fresh = [r for r in records if r.time >= ts_from and r.id not in cache.entries]
+        cache.add_records(to_uah(fresh), tax=tax, rules=rules)
+        cache.prune(ts_from)
+    else:
+        cache = cache or CategorizationCache()
+        offsets = tx_store.ledger_offsets(tg_id, account_ids)
+        records = to_uah(tx_store.load_range(tg_id, account_ids, ts_from, now))
+        cache.refresh(records, tax=tax, rules=rules)
+        cache.offsets = offsets
+
+    categorization_store.save(tg_id, cache.to_dict())
+    return cache
+
+
+def update_uncat_queue(
+    tg_id: int,
+    cache: CategorizationCache,
+    *,
+    load_records: Callable[[], list[TxRecord]],
+    tax: dict[str, Any],
+    rules: list[Rule],
+    uncat_store: UncatStore,
+    limit: int = 200,
+) -> None:
+    """
+    Applies only the queue changes caused by the last categorization refresh (pushes
+    and tombstones in the store's log). Falls back to a full rebuild over
+    `load_records()`, from the cached categorizations, when there is no queue yet or
+    everything was re-evaluated.
+    """
+    delta = None
+    if not cache.full_refresh and uncat_store.exists(tg_id):
+        current = uncat_store.load(tg_id)
+        wanted = {it.tx_id for it in current} | {tx.id for tx in cache.evaluated}
+        delta = uncat_queue_delta(
+            current,
+            categorized=cache.categorizations(wanted),
+            evaluated=cache.evaluated,
+            limit=limit,
+        )
+    if delta is None:
+        items = build_uncat_queue(
+            tax=tax,
+            records=load_records(),
+            rules=rules,
+            limit=limit,
+            categorized=cache.categorizations(),
+        )
+        uncat_store.save(tg_id, items)
+        return
+
+    added, removed = delta
+    uncat_store.remove(tg_id, removed)
+    uncat_store.push(tg_id, added)
+
+
+def migrate_categorizations(
+    tg_id: int,
+    account_ids: list[str],
+    migration: TaxonomyMigrationDecision,
+    *,
+    tax: dict[str, Any],
+    rules: list[Rule],
+    tx_store: TxStore,
+    categorization_store: CategorizationStore,
+    uncat_store: UncatStore,
+    now_ts: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Applies a saved subcategory migration to the user's cached categorizations and
+    uncat queue in one pass, re-evaluating only the transactions it can move. Report
+    facts are MCC-based and don't depend on the taxonomy. Returns how many
+    transactions moved from the old leaf to the new subcategory.
+    """
+    now = int(now_ts if now_ts is not None else time.time())
+    ts_from = now - CATEGORIZATION_WINDOW_DAYS * SECONDS_IN_DAY
+    offsets = tx_store.ledger_offsets(tg_id, account_ids)
+    records = tx_store.load_range(tg_id, account_ids, ts_from, now)
+
+    raw = categorization_store.load(tg_id)
+    cache = CategorizationCache.from_dict(raw) if raw is not None else None
+    if cache is None:
+        cache = CategorizationCache()
+    before = {tx_id for tx_id, e in cache.entries.items() if e[1] == migration.source_leaf_id}
+    categorized = cache.refresh(
+        records, tax=tax, rules=rules, migration=migration, progress=progress
+    )
+    cache.offsets = offsets
+    categorization_store.save(tg_id, cache.to_dict())
+    update_uncat_queue(
+        tg_id,
+        cache,
+        load_records=lambda: records,
+        tax=tax,
+        rules=rules,
+        uncat_store=uncat_store,
+    )
+    return sum(
+        1
+        for tx_id in before
+        if tx_id in categorized and categorized[tx_id].leaf_id == migration.target_leaf_id
+    )
+
+
+_MAX_LEDGER_INDEXES = 16
+_ledger_indexes: OrderedDict[int, tuple[Any, LedgerIndex]] = OrderedDict()
+_ledger_indexes_lock = threading.Lock()
+
+
+def load_ledger_index(
+    tg_id: int,
+    account_ids: list[str],
+    *,
+    tx_store: TxStore,
+    now_ts: int | None = None,
+) -> LedgerIndex:
+    """
+    In-process LedgerIndex over the last CATEGORIZATION_WINDOW_DAYS of the user's
+    ledger (the window the uncat queue is built from), rebuilt when the ledger or the
+    day changes. Only the _MAX_LEDGER_INDEXES most recently used users are kept.
+    """
+    now = int(now_ts if now_ts is not None else time.time())
+    key = (tx_store.ledger_fingerprint(tg_id, account_ids), now // SECONDS_IN_DAY)
+    with _ledger_indexes_lock:
+        hit = _ledger_indexes.get(tg_id)
+        if hit is not None and hit[0] == key:
+            _ledger_indexes.move_to_end(tg_id)
+            return hit[1]
+
+    ts_from = now - CATEGORIZATION_WINDOW_DAYS * SECONDS_IN_DAY
+    records = tx_store.load_range(tg_id, account_ids, ts_from, now)
+    index = LedgerIndex(records)
+    with _ledger_indexes_lock:
+        _ledger_indexes[tg_id] = (key, index)
+        _ledger_indexes.move_to_end(tg_id)
+        while len(_ledger_indexes) > _MAX_LEDGER_INDEXES:
+            _ledger_indexes.popitem(last=False)
+    return index
+
+
+def preview_rules_for_user(
+    tg_id: int,
+    *,
+    tax: dict[str, Any],
+    before: list[Rule],
+    after: list[Rule],
+    users: Any,
+    tx_store: TxStore,
+) -> RuleImpact | None:
+    """
+    What replacing the user's rules `before` with `after` would recategorize in their
+    recent ledger; None when it can't be previewed (no selected accounts or recent
+    transactions, invalid leaf, unreadable ledger).
+    """
+    cfg = users.load(tg_id)
+    account_ids = list(getattr(cfg, "selected_account_ids", None) or [])
+    if not account_ids:
+        return None
+    try:
+        index = load_ledger_index(tg_id, account_ids, tx_store=tx_store)
+        if not index.records:
+            return None
+        return preview_rules_change(index, tax=tax, before=before, after=after)
+    except Exception:
+        return None
 
 
 def build_ai_block(summary: str, changes: list[str], recs: list[str], next_step: str) -> str:
@@ -70,24 +543,14 @@ async def compute_and_cache_reports_for_user(
     store.save(tg_id, "today", facts)
 
     now_ts = int(time.time())
-    profile_from = now_ts - 90 * 24 * 60 * 60
-    profile_records = tx_store.load_range(tg_id, account_ids, profile_from, now_ts)
+    baseline = load_or_update_spending_baseline(
+        tg_id, account_ids, tx_store=tx_store, profile_store=profile_store, now_ts=now_ts
+    )
     profile_existing = profile_store.load(tg_id) or {}
-    profile = {**profile_existing, **build_user_profile(profile_records)}
-    pub = None
-    try:
-        pub = MonobankPublicClient()
-        rates = pub.currency()
-        profile_records = normalize_records_to_uah(profile_records, rates)
-    except Exception:
-        pass
-    finally:
-        try:
-            if pub is not None:
-                pub.close()
-        except Exception:
-            pass
-
+    profile = {**profile_existing, **baseline.profile()}
+    load_or_update_recurring_index(
+        tg_id, account_ids, tx_store=tx_store, recurring_store=recurring_store
+    )
     profile_store.save(tg_id, profile)
 
     taxonomy_store = TaxonomyStore(Path(".cache") / "taxonomy")
@@ -100,7 +563,12 @@ async def compute_and_cache_reports_for_user(
         ts_to = now_ts
 
         records = tx_store.load_range(tg_id, account_ids, ts_from, ts_to)
-        current_facts = enrich_period_facts(records, days_back=days_back, now_ts=now_ts)
+        current_facts = enrich_period_facts(
+            records,
+            days_back=days_back,
+            now_ts=now_ts,
+            closed_facts=closed_facts_store.bind(tg_id),
+        )
 
         req_from = now_ts - days_back * 24 * 60 * 60
         req_to = now_ts
@@ -116,10 +584,59 @@ async def compute_and_cache_reports_for_user(
 
         store.save(tg_id, period, current_facts)
 
+    for kind in TO_DATE_KINDS:
+        to_date = load_or_update_period_to_date(
+            tg_id, account_ids, kind, tx_store=tx_store, to_date_store=to_date_store
+        )
+        to_date_facts = to_date.facts()
+        cov = tx_store.aggregated_coverage_window(tg_id, account_ids)
+        if cov is not None:
+            to_date_facts["coverage"] = {
+                "coverage_from_ts": int(cov[0]),
+                "coverage_to_ts": int(cov[1]),
+                "requested_from_ts": int(to_date.start_ts),
+                "requested_to_ts": int(to_date.as_of_ts),
+            }
+        store.save(tg_id, f"{kind}_to_date", to_date_facts)
+
     tax = taxonomy_store.load(tg_id)
     if tax is None:
         tax = build_taxonomy_preset("min")
 
     rules = rules_store.load(tg_id)
-    uncat_items = build_uncat_queue(tax=tax, records=profile_records, rules=rules, limit=200)
-    uncat_store.save(tg_id, uncat_items)
+    window_from = now_ts - CATEGORIZATION_WINDOW_DAYS * SECONDS_IN_DAY
+
+    def to_uah(records: list[TxRecord]) -> list[TxRecord]:
+        # Current rates are only needed (and fetched) for foreign-currency records.
+        if all(r.currencyCode in (None, UAH_CODE) for r in records):
+            return records
+        try:
+            return normalize_records_for_user(
+                tg_id,
+                records,
+                history_store=fx_history_store,
+                amount_store=fx_amount_store,
+                rate_map=currency_rate_service().rate_map_to_uah(),
+                keep_from_ts=window_from,
+            )
+        except Exception:
+            return records
+
+    categorization = load_or_update_categorizations(
+        tg_id,
+        account_ids,
+        tx_store=tx_store,
+        tax=tax,
+        rules=rules,
+        categorization_store=categorization_store,
+        normalize=to_uah,
+        now_ts=now_ts,
+    )
+    update_uncat_queue(
+        tg_id,
+        categorization,
+        load_records=lambda: to_uah(tx_store.load_range(tg_id, account_ids, window_from, now_ts)),
+        tax=tax,
+        rules=rules,
+        uncat_store=uncat_store,
+    )
@@ -8,15 +8,29 @@ import time
 from dataclasses import dataclass
 from datetime import timezone
 from pathlib import Path
+from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from mono_ai_budget_bot.bot.formatting import format_money_uah_pretty
+from mono_ai_budget_bot.analytics.recurring import RecurringIndex
+from mono_ai_budget_bot.bot.formatting import format_money_uah_pretty, format_ts_local
 from mono_ai_budget_bot.bot.ui import build_uncat_prompt_keyboard
+from mono_ai_budget_bot.core import text_norm
+from mono_ai_budget_bot.core.job_queue import (
+    JOB_KIND_RECOMPUTE,
+    JOB_KIND_REPORT,
+    JOB_KIND_SYNC,
+    LANE_DEFAULT,
+    Job,
+    JobQueue,
+    default_worker_id,
+)
+from mono_ai_budget_bot.core.ttl_store import ExpiringStore
 from mono_ai_budget_bot.settings.activity import is_activity_enabled
 from mono_ai_budget_bot.storage.profile_store import ProfileStore
+from mono_ai_budget_bot.storage.recurring_store import RecurringStore
 from mono_ai_budget_bot.storage.uncat_store import UncatStore
 from mono_ai_budget_bot.uncat.prompting import UncatPromptMetaStore, build_uncat_prompt_message
 
@@ -114,8 +128,8 @@ async def safe_send(bot, chat_id: int, text: str, logger: logging.Logger) -> Non
         logger.warning("Failed to send message to chat_id=%s: %s", chat_id, e)
 
 
-_PROACTIVE_COOLDOWN_STATE: dict[tuple[int, str], int] = {}
-_PROACTIVE_DEDUPE_STATE: dict[tuple[int, str], int] = {}
+_PROACTIVE_COOLDOWN_STATE = ExpiringStore()
+_PROACTIVE_DEDUPE_STATE = ExpiringStore()
 
 _PROACTIVE_COOLDOWN_SECONDS = {
     "activity": 6 * 60 * 60,
@@ -130,6 +144,28 @@ _PROACTIVE_DEDUPE_SECONDS = {
 }
 
 
+def configure_proactive_state(base_dir: Path, *, now_ts: int | None = None) -> None:
+    ts = int(now_ts if now_ts is not None else time.time())
+    for state, name in (
+        (_PROACTIVE_COOLDOWN_STATE, "cooldown.json"),
+        (_PROACTIVE_DEDUPE_STATE, "dedupe.json"),
+    ):
+        state.path = base_dir / name
+        state.load()
+        state.evict_expired(ts)
+
+
+def flush_proactive_state(*, now_ts: int | None = None) -> None:
+    """
+    Persist proactive cooldown/dedupe marks set since the last flush, and pick up the
+    ones other processes flushed. Called on a timer and at shutdown rather than per
+    message, so a fan-out costs one write per store.
+    """
+    ts = int(now_ts if now_ts is not None else time.time())
+    _PROACTIVE_COOLDOWN_STATE.flush(now_ts=ts)
+    _PROACTIVE_DEDUPE_STATE.flush(now_ts=ts)
+
+
 def _proactive_signature(text: str) -> str:
     normalized = " ".join((text or "").split()).strip()
     return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
@@ -147,14 +183,16 @@ def should_send_proactive_output(
         return False
 
     signature = _proactive_signature(normalized)
+    _PROACTIVE_COOLDOWN_STATE.refresh(now_ts=now_ts)
+    _PROACTIVE_DEDUPE_STATE.refresh(now_ts=now_ts)
 
     cooldown_key = (user_id, f"{kind}:{signature}")
-    cooldown_until = int(_PROACTIVE_COOLDOWN_STATE.get(cooldown_key, 0) or 0)
+    cooldown_until = int(_PROACTIVE_COOLDOWN_STATE.get(cooldown_key, now_ts=now_ts) or 0)
     if cooldown_until > now_ts:
         return False
 
     dedupe_key = (user_id, f"{kind}:{signature}")
-    dedupe_until = int(_PROACTIVE_DEDUPE_STATE.get(dedupe_key, 0) or 0)
+    dedupe_until = int(_PROACTIVE_DEDUPE_STATE.get(dedupe_key, now_ts=now_ts) or 0)
     if dedupe_until > now_ts:
         return False
 
@@ -176,8 +214,9 @@ def mark_proactive_output_sent(
     dedupe_ttl = int(_PROACTIVE_DEDUPE_SECONDS.get(kind, 24 * 60 * 60))
 
     signature = _proactive_signature(normalized)
-    _PROACTIVE_COOLDOWN_STATE[(user_id, f"{kind}:{signature}")] = now_ts + cooldown_ttl
-    _PROACTIVE_DEDUPE_STATE[(user_id, f"{kind}:{signature}")] = now_ts + dedupe_ttl
+    key = (user_id, f"{kind}:{signature}")
+    _PROACTIVE_COOLDOWN_STATE.set(key, now_ts + cooldown_ttl, now_ts=now_ts)
+    _PROACTIVE_DEDUPE_STATE.set(key, now_ts + dedupe_ttl, now_ts=now_ts)
 
 
 async def maybe_send_guarded_proactive_output(
@@ -209,7 +248,19 @@ async def maybe_send_guarded_proactive_output(
     return True
 
 
-def build_activity_proactive_messages(profile: dict, facts: dict | None) -> list[str]:
+# How far ahead the coach nudge looks for expected recurring charges.
+UPCOMING_CHARGES_DAYS = 3
+
+
+def build_activity_proactive_messages(
+    profile: dict,
+    facts: dict | None,
+    upcoming: list[tuple[str, int, int]] | None = None,
+) -> list[str]:
+    """
+    `upcoming`: expected recurring charges as (label, amount cents, expected ts),
+    soonest first (RecurringIndex.upcoming()).
+    """
     if not isinstance(profile, dict) or not isinstance(facts, dict) or not facts:
         return []
 
@@ -271,6 +322,11 @@ def build_activity_proactive_messages(profile: dict, facts: dict | None) -> list
                         messages.append(
                             f"🧮 Coach nudge\nСпробуй сценарій -{pct}% для '{title}': потенційна економія ~{format_money_uah_pretty(savings)}/міс."
                         )
+        if upcoming:
+            label, amount_cents, expected_ts = upcoming[0]
+            messages.append(
+                f"🔁 Coach nudge\nСкоро регулярне списання: {label} ~{format_money_uah_pretty(amount_cents / 100)} ({format_ts_local(expected_ts)[:10]})."
+            )
 
     return messages
 
@@ -282,6 +338,7 @@ async def maybe_send_activity_proactive_messages(
     profile_store: ProfileStore,
     report_store,
     logger: logging.Logger,
+    recurring_store: RecurringStore | None = None,
 ) -> None:
     if not getattr(u, "autojobs_enabled", True):
         return
@@ -297,7 +354,17 @@ async def maybe_send_activity_proactive_messages(
     )
 
     now_ts = int(time.time())
-    for text in build_activity_proactive_messages(prof, facts):
+    upcoming: list[tuple[str, int, int]] = []
+    raw = recurring_store.load(u.telegram_user_id) if recurring_store is not None else None
+    index = RecurringIndex.from_dict(raw) if raw is not None else None
+    if index is not None:
+        until_ts = now_ts + UPCOMING_CHARGES_DAYS * 86400
+        upcoming = [
+            (s.label, s.amount_cents, max(int(s.next_ts or now_ts), now_ts))
+            for _, s in index.upcoming(now_ts, until_ts)
+        ]
+
+    for text in build_activity_proactive_messages(prof, facts, upcoming):
         await maybe_send_guarded_proactive_output(
             user_id=u.telegram_user_id,
             chat_id=u.chat_id,
@@ -363,10 +430,8 @@ async def maybe_send_scheduled_auto_report(
     )
 
 
-def start_jobs(
-    scheduler: AsyncIOScheduler,
+def build_job_runtime(
     *,
-    loop: asyncio.AbstractEventLoop,
     bot,
     users,
     report_store,
@@ -376,9 +441,16 @@ def start_jobs(
     recompute_reports_for_user,
     profile_store: ProfileStore,
     uncat_store: UncatStore,
-) -> None:
-    cfg = load_schedule_config()
+    job_queue: JobQueue | None = None,
+) -> dict[str, Any]:
+    """
+    Per-user refresh/report pipelines shared by the in-process scheduler and `monobot worker`.
+
+    With a job_queue, the scheduled scans only enqueue one job per user; run_queued_job
+    executes them (in whichever process consumes the queue).
+    """
     uncat_meta = UncatPromptMetaStore(Path(".cache") / "uncat_prompt_meta")
+    recurring_store = RecurringStore()
 
     async def maybe_send_uncat_prompt(u, *, mode: str) -> None:
         if not getattr(u, "autojobs_enabled", True):
@@ -416,11 +488,14 @@ def start_jobs(
         except Exception as e:
             logger.warning("Failed to send uncat prompt to chat_id=%s: %s", u.chat_id, e)
 
-    async def _refresh_user(u, *, days_back: int) -> bool:
+    async def _refresh_user(u, *, days_back: int, raise_errors: bool = False) -> bool:
         """
         Incremental refresh:
         - sync ledger (days_back)
         - recompute today/week/month facts from ledger
+
+        Errors are logged and swallowed in the in-process loop; queued jobs pass
+        raise_errors=True so the worker records the failure and retries with backoff.
         """
         if not getattr(u, "autojobs_enabled", True):
             return False
@@ -438,87 +513,320 @@ def start_jobs(
             await recompute_reports_for_user(u.telegram_user_id, account_ids)
             return True
         except Exception as e:
+            if raise_errors:
+                raise
             logger.warning("Refresh error for user=%s: %s", getattr(u, "telegram_user_id", "?"), e)
             return False
 
+    async def refresh_entry(entry, *, days_back: int, raise_errors: bool = False) -> bool:
+        u = users.load(entry.telegram_user_id) if entry.selected_accounts_count > 0 else None
+        refreshed = u is not None and await _refresh_user(
+            u, days_back=days_back, raise_errors=raise_errors
+        )
+        target = u if u is not None else entry
+        await maybe_send_uncat_prompt(target, mode="refresh")
+        await maybe_send_activity_proactive_messages(
+            target,
+            bot=bot,
+            profile_store=profile_store,
+            report_store=report_store,
+            logger=logger,
+            recurring_store=recurring_store,
+        )
+        return refreshed
+
+    async def report_user(u, *, period: str, days_back: int, raise_errors: bool = False) -> bool:
+        ok = await _refresh_user(u, days_back=days_back, raise_errors=raise_errors)
+        if not ok:
+            return False
+
+        text = build_scheduled_auto_report_text(
+            u,
+            period=period,
+            profile_store=profile_store,
+            report_store=report_store,
+            render_report_text=render_report_text,
+        )
+        if text is None:
+            return False
+
+        await maybe_send_uncat_prompt(u, mode="before_report")
+        await safe_send(bot, u.chat_id, text, logger)
+        return True
+
+    def enqueue_refresh_all_users(*, days_back: int) -> int:
+        queued = 0
+        for entry in users.iter_roster(autojobs_only=True, require_chat=True):
+            job_queue.enqueue(
+                JOB_KIND_SYNC,
+                user_id=entry.telegram_user_id,
+                payload={"days_back": int(days_back)},
+            )
+            queued += 1
+        logger.info("Scheduler: queued refresh for %s users (days_back=%s)", queued, days_back)
+        return queued
+
+    def enqueue_reports(*, period: str, days_back: int) -> int:
+        queued = 0
+        for entry in users.iter_roster(
+            autojobs_only=True, require_chat=True, require_accounts=True
+        ):
+            job_queue.enqueue(
+                JOB_KIND_REPORT,
+                user_id=entry.telegram_user_id,
+                payload={"period": period, "days_back": int(days_back)},
+                dedupe_key=f"{LANE_DEFAULT}:{JOB_KIND_REPORT}:{period}:{entry.telegram_user_id}",
+            )
+            queued += 1
+        logger.info("Scheduler: queued %s report for %s users", period, queued)
+        return queued
+
     async def job_refresh_all_users(*, days_back: int) -> None:
+        if job_queue is not None:
+            enqueue_refresh_all_users(days_back=days_back)
+            return
+
         logger.info("Scheduler: refresh_all_users started (days_back=%s)", days_back)
         refreshed = 0
         scanned = 0
-        for u in users.iter_all():
+        for entry in users.iter_roster(autojobs_only=True, require_chat=True):
             scanned += 1
-            ok = await _refresh_user(u, days_back=days_back)
-            if ok:
+            if await refresh_entry(entry, days_back=days_back):
                 refreshed += 1
-            await maybe_send_uncat_prompt(u, mode="refresh")
-            await maybe_send_activity_proactive_messages(
-                u,
-                bot=bot,
-                profile_store=profile_store,
-                report_store=report_store,
-                logger=logger,
-            )
         logger.info(
             "Scheduler: refresh_all_users done. scanned=%s refreshed=%s (days_back=%s)",
             scanned,
             refreshed,
             days_back,
         )
+        logger.debug("Scheduler: text normalization caches %s", text_norm.cache_stats())
 
-    async def job_weekly_report() -> None:
-        logger.info("Scheduler: weekly_report started")
-        for u in users.iter_all():
-            ok = await _refresh_user(u, days_back=8)
-            if not ok:
-                continue
-
-            text = build_scheduled_auto_report_text(
-                u,
-                period="week",
-                profile_store=profile_store,
-                report_store=report_store,
-                render_report_text=render_report_text,
-            )
-            if text is None:
-                continue
+    async def _job_report(*, period: str, days_back: int) -> None:
+        if job_queue is not None:
+            enqueue_reports(period=period, days_back=days_back)
+            return
 
-            await maybe_send_uncat_prompt(u, mode="before_report")
-            await safe_send(bot, u.chat_id, text, logger)
+        logger.info("Scheduler: %s_report started", period)
+        for entry in users.iter_roster(
+            autojobs_only=True, require_chat=True, require_accounts=True
+        ):
+            u = users.load(entry.telegram_user_id)
+            if u is not None:
+                await report_user(u, period=period, days_back=days_back)
+        logger.info("Scheduler: %s_report done", period)
 
-        logger.info("Scheduler: weekly_report done")
+    async def job_weekly_report() -> None:
+        await _job_report(period="week", days_back=8)
 
     async def job_monthly_report() -> None:
-        logger.info("Scheduler: monthly_report started")
-        for u in users.iter_all():
-            ok = await _refresh_user(u, days_back=32)
-            if not ok:
-                continue
-
-            text = build_scheduled_auto_report_text(
-                u,
-                period="month",
-                profile_store=profile_store,
-                report_store=report_store,
-                render_report_text=render_report_text,
+        await _job_report(period="month", days_back=32)
+
+    async def run_queued_job(job: Job) -> bool:
+        if job.user_id is None:
+            raise ValueError(f"job {job.id} ({job.kind}) has no user_id")
+        days_back = int(job.payload.get("days_back") or 2)
+
+        if job.kind == JOB_KIND_SYNC:
+            entry = users.roster_entry(job.user_id)
+            if entry is None or not entry.autojobs_enabled or not entry.chat_id:
+                return False
+            return await refresh_entry(entry, days_back=days_back, raise_errors=True)
+
+        if job.kind == JOB_KIND_RECOMPUTE:
+            u = users.load(job.user_id)
+            account_ids = list(getattr(u, "selected_account_ids", []) or []) if u else []
+            if not account_ids:
+                return False
+            await recompute_reports_for_user(job.user_id, account_ids)
+            return True
+
+        if job.kind == JOB_KIND_REPORT:
+            period = str(job.payload.get("period") or "week")
+            u = users.load(job.user_id)
+            if u is None:
+                return False
+            return await report_user(u, period=period, days_back=days_back, raise_errors=True)
+
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+    return {
+        "refresh_entry": refresh_entry,
+        "report_user": report_user,
+        "enqueue_refresh_all_users": enqueue_refresh_all_users,
+        "enqueue_reports": enqueue_reports,
+        "job_refresh_all_users": job_refresh_all_users,
+        "job_weekly_report": job_weekly_report,
+        "job_monthly_report": job_monthly_report,
+        "run_queued_job": run_queued_job,
+    }
+
+
+USER_LEASE_BUSY_DELAY_SECONDS = 30.0
+PROACTIVE_FLUSH_SECONDS = 60
+CRON_LEASE_SECONDS = 55.0
+
+
+def user_lease_name(user_id: int) -> str:
+    return f"user:{int(user_id)}"
+
+
+async def _heartbeat_loop(
+    job_queue: JobQueue, job: Job, worker_id: str, *, interval: float, logger: logging.Logger
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(job_queue.heartbeat, job.id, worker_id)
+            if job.user_id is not None:
+                await asyncio.to_thread(
+                    job_queue.acquire_lease,
+                    user_lease_name(job.user_id),
+                    worker_id,
+                    ttl_seconds=job_queue.lease_seconds,
+                )
+        except Exception as e:
+            logger.warning("Heartbeat failed for job %s: %s", job.id, e)
+
+
+async def run_job_worker(
+    job_queue: JobQueue,
+    run_queued_job,
+    *,
+    logger: logging.Logger,
+    worker_id: str | None = None,
+    lanes: tuple[str, ...] = (LANE_DEFAULT,),
+    poll_interval: float = 2.0,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    """
+    Consume jobs from the given lanes. A per-user lease (shared across instances and
+    lanes) ensures only one process touches a user's ledger at a time; job and user
+    leases are renewed while the job runs, so a crashed instance's work is reclaimed
+    once they expire.
+    """
+    wid = worker_id or f"{default_worker_id()}:{'+'.join(lanes)}"
+    stop = stop_event or asyncio.Event()
+    heartbeat_interval = max(1.0, job_queue.lease_seconds / 3)
+    logger.info("Job worker started (worker_id=%s lanes=%s)", wid, ",".join(lanes))
+
+    while not stop.is_set():
+        job = await asyncio.to_thread(job_queue.claim, wid, lanes=lanes)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        lease = user_lease_name(job.user_id) if job.user_id is not None else None
+        if lease is not None and not await asyncio.to_thread(
+            job_queue.acquire_lease, lease, wid, ttl_seconds=job_queue.lease_seconds
+        ):
+            await asyncio.to_thread(
+                job_queue.defer, job.id, wid, delay_seconds=USER_LEASE_BUSY_DELAY_SECONDS
             )
-            if text is None:
-                continue
+            continue
 
-            await maybe_send_uncat_prompt(u, mode="before_report")
-            await safe_send(bot, u.chat_id, text, logger)
+        heartbeat = asyncio.create_task(
+            _heartbeat_loop(job_queue, job, wid, interval=heartbeat_interval, logger=logger)
+        )
+        try:
+            await run_queued_job(job)
+        except Exception as e:
+            retry = await asyncio.to_thread(job_queue.fail, job.id, wid, str(e))
+            logger.warning(
+                "Job %s (%s) failed for user=%s (attempt %s/%s, retry=%s): %s",
+                job.id,
+                job.kind,
+                job.user_id,
+                job.attempts,
+                job.max_attempts,
+                retry,
+                e,
+            )
+        else:
+            await asyncio.to_thread(job_queue.complete, job.id, wid)
+        finally:
+            heartbeat.cancel()
+            if lease is not None:
+                await asyncio.to_thread(job_queue.release_lease, lease, wid)
 
-        logger.info("Scheduler: monthly_report done")
+    logger.info("Job worker stopped (worker_id=%s)", wid)
+
+
+def start_jobs(
+    scheduler: AsyncIOScheduler,
+    *,
+    loop: asyncio.AbstractEventLoop,
+    bot,
+    users,
+    report_store,
+    render_report_text,
+    logger: logging.Logger,
+    sync_user_ledger,
+    recompute_reports_for_user,
+    profile_store: ProfileStore,
+    uncat_store: UncatStore,
+    job_queue: JobQueue | None = None,
+) -> dict[str, Any]:
+    cfg = load_schedule_config()
+    configure_proactive_state(Path(".cache") / "proactive")
+
+    runtime = build_job_runtime(
+        bot=bot,
+        users=users,
+        report_store=report_store,
+        render_report_text=render_report_text,
+        logger=logger,
+        sync_user_ledger=sync_user_ledger,
+        recompute_reports_for_user=recompute_reports_for_user,
+        profile_store=profile_store,
+        uncat_store=uncat_store,
+        job_queue=job_queue,
+    )
+    job_refresh_all_users = runtime["job_refresh_all_users"]
+    job_weekly_report = runtime["job_weekly_report"]
+    job_monthly_report = runtime["job_monthly_report"]
+    instance_id = default_worker_id()
+
+    def _is_leader(trigger_id: str, ttl_seconds: float) -> bool:
+        """
+        Only one instance handles a given firing: the first to take the trigger lease.
+        The lease is left to expire (shorter than the trigger period), not released.
+        """
+        if job_queue.acquire_lease(f"cron:{trigger_id}", instance_id, ttl_seconds=ttl_seconds):
+            return True
+        logger.info("Scheduler: %s already handled by another instance", trigger_id)
+        return False
+
+    interval_ttl = max(30.0, cfg.refresh_minutes * 60 / 2)
 
     def refresh_wrapper_interval() -> None:
+        if job_queue is not None:
+            if _is_leader("refresh_all_users", interval_ttl):
+                runtime["enqueue_refresh_all_users"](days_back=2)
+            return
         loop.create_task(job_refresh_all_users(days_back=2))
 
     def refresh_wrapper_daily() -> None:
+        if job_queue is not None:
+            if _is_leader("daily_refresh_all_users", CRON_LEASE_SECONDS):
+                runtime["enqueue_refresh_all_users"](days_back=8)
+            return
         loop.create_task(job_refresh_all_users(days_back=8))
 
     def weekly_wrapper() -> None:
+        if job_queue is not None:
+            if _is_leader("weekly_report", CRON_LEASE_SECONDS):
+                runtime["enqueue_reports"](period="week", days_back=8)
+            return
         loop.create_task(job_weekly_report())
 
     def monthly_wrapper() -> None:
+        if job_queue is not None:
+            if _is_leader("monthly_report", CRON_LEASE_SECONDS):
+                runtime["enqueue_reports"](period="month", days_back=32)
+            return
         loop.create_task(job_monthly_report())
 
     scheduler.add_job(
@@ -542,6 +850,13 @@ def start_jobs(
     scheduler.add_job(weekly_wrapper, weekly_trigger, id="weekly_report", replace_existing=True)
     scheduler.add_job(monthly_wrapper, monthly_trigger, id="monthly_report", replace_existing=True)
 
+    scheduler.add_job(
+        flush_proactive_state,
+        IntervalTrigger(seconds=PROACTIVE_FLUSH_SECONDS),
+        id="flush_proactive_state",
+        replace_existing=True,
+    )
+
     scheduler.start()
     logger.info(
         "Scheduler started (test_mode=%s). refresh_every=%s min daily='%s' weekly='%s' monthly='%s'",
@@ -551,3 +866,4 @@ def start_jobs(
         cfg.weekly_cron,
         cfg.monthly_cron,
     )
+    return runtime
@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BROADCAST = 10
+
+TELEGRAM_GLOBAL_RATE = 25.0
+TELEGRAM_GLOBAL_BURST = 25
+TELEGRAM_PER_CHAT_RATE = 1.0
+TELEGRAM_PER_CHAT_BURST = 1
+
+MAX_RETRY_AFTER_ATTEMPTS = 5
+
+# Bot API methods that don't count against the outbound budget (long polling).
+UNTHROTTLED_METHODS = frozenset({"getUpdates"})
+
+# Set while the queue worker itself calls the bot, which already took a token.
+_from_queue: contextvars.ContextVar[bool] = contextvars.ContextVar("_from_queue", default=False)
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        *,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def wait_time(self) -> float:
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def block_for(self, seconds: float) -> None:
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - float(seconds) * self.rate
+
+
+@dataclass
+class SendQueueStats:
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    latency_count: int = 0
+    latency_total_s: float = 0.0
+    latency_max_s: float = 0.0
+
+    def observe_latency(self, seconds: float) -> None:
+        s = max(0.0, float(seconds))
+        self.latency_count += 1
+        self.latency_total_s += s
+        if s > self.latency_max_s:
+            self.latency_max_s = s
+
+    @property
+    def latency_avg_s(self) -> float:
+        if self.latency_count <= 0:
+            return 0.0
+        return self.latency_total_s / self.latency_count
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "latency_avg_s": round(self.latency_avg_s, 3),
+            "latency_max_s": round(self.latency_max_s, 3),
+        }
+
+
+@dataclass
+class OutboundMessage:
+    priority: int
+    seq: int
+    chat_id: int
+    text: str
+    kwargs: dict[str, Any]
+    enqueued_at: float
+    future: asyncio.Future
+    not_before: float = 0.0
+    attempts: int = 0
+    sort_key: tuple[int, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sort_key = (self.priority, self.seq)
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    ra = getattr(exc, "retry_after", None)
+    if isinstance(ra, (int, float)) and ra >= 0:
+        return float(ra)
+    return None
+
+
+class SendQueue:
+    """
+    Async outbound Telegram message queue.
+
+    - global token bucket (Telegram allows ~30 msg/s per bot, we keep headroom)
+    - per-chat token bucket (~1 msg/s per chat)
+    - lower priority value is sent first (interactive before broadcast)
+    - RetryAfter (flood wait) reschedules the message instead of dropping it
+
+    Other Bot API calls (handler replies via message.answer / edit_text, callback
+    answers) share the global bucket through throttle_request(), registered as a
+    request middleware on the bot session; they are not paced per chat.
+    """
+
+    def __init__(
+        self,
+        bot,
+        *,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        global_burst: int = TELEGRAM_GLOBAL_BURST,
+        per_chat_rate: float = TELEGRAM_PER_CHAT_RATE,
+        per_chat_burst: int = TELEGRAM_PER_CHAT_BURST,
+        max_retry_after_attempts: int = MAX_RETRY_AFTER_ATTEMPTS,
+        logger: logging.Logger | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._bot = bot
+        self._clock = clock
+        self._global = TokenBucket(rate=global_rate, capacity=global_burst, clock=clock)
+        self._per_chat_rate = float(per_chat_rate)
+        self._per_chat_burst = int(per_chat_burst)
+        self._chats: dict[int, TokenBucket] = {}
+        self._max_attempts = max(1, int(max_retry_after_attempts))
+        self._logger = logger or logging.getLogger("mono_ai_budget_bot.bot.send_queue")
+
+        self._ready: list[tuple[tuple[int, int], OutboundMessage]] = []
+        self._delayed: list[tuple[float, int, OutboundMessage]] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._inflight: OutboundMessage | None = None
+        self.stats = SendQueueStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._ready) + len(self._delayed)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        b = self._chats.get(chat_id)
+        if b is None:
+            b = TokenBucket(
+                rate=self._per_chat_rate, capacity=self._per_chat_burst, clock=self._clock
+            )
+            self._chats[chat_id] = b
+        return b
+
+    def _prune_chats(self) -> None:
+        if len(self._chats) < 1024:
+            return
+        busy = {m.chat_id for _, m in self._ready} | {m.chat_id for _, _, m in self._delayed}
+        for cid in [c for c, b in self._chats.items() if c not in busy and b.is_full()]:
+            self._chats.pop(cid, None)
+
+    def _signal(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _push_ready(self, msg: OutboundMessage) -> None:
+        heapq.heappush(self._ready, (msg.sort_key, msg))
+
+    def _push_delayed(self, msg: OutboundMessage) -> None:
+        heapq.heappush(self._delayed, (msg.not_before, msg.seq, msg))
+
+    def submit(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        priority: int = PRIORITY_BROADCAST,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        msg = OutboundMessage(
+            priority=int(priority),
+            seq=next(self._seq),
+            chat_id=int(chat_id),
+            text=text,
+            kwargs=dict(kwargs),
+            enqueued_at=self._clock(),
+            future=loop.create_future(),
+        )
+        self._push_ready(msg)
+        self.stats.enqueued += 1
+        self._ensure_worker()
+        self._signal()
+        return msg.future
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        priority: int = PRIORITY_BROADCAST,
+        **kwargs: Any,
+    ) -> Any:
+        return await self.submit(chat_id, text, priority=priority, **kwargs)
+
+    def as_bot(self, *, priority: int = PRIORITY_BROADCAST) -> QueuedBot:
+        return QueuedBot(self, priority=priority)
+
+    async def acquire(self) -> None:
+        """
+        Waits for a global token (for a direct Bot API call outside the queue).
+        """
+        while True:
+            wait = self._global.wait_time()
+            if wait <= 0 and self._global.try_take():
+                return
+            await asyncio.sleep(max(wait, 0.001))
+
+    async def throttle_request(self, make_request, bot, method) -> Any:
+        """
+        aiogram request middleware: `bot.session.middleware(queue.throttle_request)`.
+        """
+        if not _from_queue.get():
+            if getattr(method, "__api_method__", None) not in UNTHROTTLED_METHODS:
+                await self.acquire()
+        return await make_request(bot, method)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the worker; messages still pending are cancelled, so their awaiters
+        don't hang.
+        """
+        w = self._worker
+        self._worker = None
+        if w is not None:
+            w.cancel()
+            try:
+                await w
+            except asyncio.CancelledError:
+                pass
+
+        pending = [m for _, m in self._ready] + [m for _, _, m in self._delayed]
+        if self._inflight is not None:
+            pending.append(self._inflight)
+        self._ready.clear()
+        self._delayed.clear()
+        self._inflight = None
+        for msg in pending:
+            if not msg.future.done():
+                msg.future.cancel()
+
+    async def join(self) -> None:
+        while self.depth > 0:
+            await asyncio.sleep(0.01)
+
+    def _promote_due(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, msg = heapq.heappop(self._delayed)
+            self._push_ready(msg)
+
+    def _next_wait(self, now: float) -> float | None:
+        if self._ready:
+            return 0.0
+        if self._delayed:
+            return max(0.0, self._delayed[0][0] - now)
+        return None
+
+    async def _sleep_or_wakeup(self, timeout: float | None) -> None:
+        assert self._wakeup is not None
+        self._wakeup.clear()
+        try:
+            if timeout is None:
+                await self._wakeup.wait()
+            else:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            now = self._clock()
+            self._promote_due(now)
+
+            if not self._ready:
+                await self._sleep_or_wakeup(self._next_wait(now))
+                continue
+
+            _, msg = heapq.heappop(self._ready)
+            if msg.future.done():
+                continue
+
+            chat = self._chat_bucket(msg.chat_id)
+            chat_wait = chat.wait_time()
+            if chat_wait > 0:
+                msg.not_before = now + chat_wait
+                self._push_delayed(msg)
+                continue
+
+            global_wait = self._global.wait_time()
+            if global_wait > 0:
+                self._push_ready(msg)
+                await asyncio.sleep(global_wait)
+                continue
+
+            self._global.try_take()
+            chat.try_take()
+            self._inflight = msg
+            await self._deliver(msg)
+            self._inflight = None
+            self._prune_chats()
+
+    async def _send(self, msg: OutboundMessage) -> Any:
+        token = _from_queue.set(True)
+        try:
+            return await self._bot.send_message(chat_id=msg.chat_id, text=msg.text, **msg.kwargs)
+        finally:
+            _from_queue.reset(token)
+
+    async def _deliver(self, msg: OutboundMessage) -> None:
+        msg.attempts += 1
+        try:
+            res = await self._send(msg)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry_after = _retry_after_seconds(e)
+            if retry_after is not None and msg.attempts < self._max_attempts:
+                self.stats.retried += 1
+                self._chat_bucket(msg.chat_id).block_for(retry_after)
+                msg.not_before = self._clock() + retry_after
+                self._push_delayed(msg)
+                self._logger.info(
+                    "Flood wait for chat_id=%s: retry in %.1fs (attempt %s)",
+                    msg.chat_id,
+                    retry_after,
+                    msg.attempts,
+                )
+                return
+            self.stats.failed += 1
+            self.stats.observe_latency(self._clock() - msg.enqueued_at)
+            if not msg.future.done():
+                msg.future.set_exception(e)
+            return
+
+        self.stats.sent += 1
+        self.stats.observe_latency(self._clock() - msg.enqueued_at)
+        if not msg.future.done():
+            msg.future.set_result(res)
+
+
+class QueuedBot:
+    """
+    Bot facade whose send_message goes through SendQueue; everything else is delegated.
+    """
+
+    def __init__(self, queue: SendQueue, *, priority: int):
+        self._queue = queue
+        self._priority = int(priority)
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> Any:
+        return await self._queue.send(chat_id, text, priority=self._priority, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._queue._bot, name)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from mono_ai_budget_bot.bot.formatting import format_money_uah_pretty, uah_from_minor
+
 
 def menu_categories_message(tree_preview: str) -> str:
     parts = [
@@ -60,20 +62,29 @@ def menu_categories_rule_item_message(
     ).strip()
 
 
+def rule_impact_line(*, count: int, amount_minor: int) -> str:
+    if count <= 0:
+        return "Серед операцій за останні 90 днів правило нічого не змінює."
+    amount = format_money_uah_pretty(uah_from_minor(amount_minor))
+    return f"Перекатегоризовано операцій за 90 днів: {count} на суму {amount}."
+
+
 def menu_categories_rule_saved_message(
     *,
     kind_label: str,
     value: str,
     leaf_name: str,
+    impact_line: str | None = None,
 ) -> str:
-    return "\n".join(
-        [
-            f"✅ {kind_label} збережено.",
-            "",
-            f"Фраза: `{value}`",
-            f"Leaf category: *{leaf_name}*",
-        ]
-    ).strip()
+    lines = [
+        f"✅ {kind_label} збережено.",
+        "",
+        f"Фраза: `{value}`",
+        f"Leaf category: *{leaf_name}*",
+    ]
+    if impact_line:
+        lines.append(impact_line)
+    return "\n".join(lines).strip()
 
 
 def menu_categories_rule_deleted_message(*, kind_label: str, value: str) -> str:
@@ -105,5 +116,22 @@ def taxonomy_migration_applied_message(*, source_name: str, target_name: str) ->
     return f"✅ Міграцію підтверджено: {source_name} → {target_name}"
 
 
-def uncat_category_created_and_applied_message(*, category_name: str, description: str) -> str:
-    return f"✅ Створено категорію *{category_name}* і застосовано до `{description}`"
+def taxonomy_migration_started_message(*, source_name: str, target_name: str) -> str:
+    return f"⏳ Переношу операції: {source_name} → {target_name}…"
+
+
+def taxonomy_migration_progress_message(
+    *, source_name: str, target_name: str, done: int, total: int
+) -> str:
+    return f"⏳ Переношу операції: {source_name} → {target_name} ({done}/{total})…"
+
+
+def taxonomy_migration_done_message(*, target_name: str, moved: int) -> str:
+    return f"✅ Перенесено операцій у *{target_name}*: {moved}"
+
+
+def uncat_category_created_and_applied_message(
+    *, category_name: str, description: str, impact_line: str | None = None
+) -> str:
+    text = f"✅ Створено категорію *{category_name}* і застосовано до `{description}`"
+    return f"{text}\n{impact_line}" if impact_line else text
@@ -89,6 +89,30 @@ def nlq_recurrence_line(
     )
 
 
+def nlq_recurring_payments_message(items: list[tuple[str, str, int, str]]) -> str:
+    """
+    items: (label, typical amount, cadence days, next expected date).
+    """
+    if not items:
+        return "Регулярних платежів поки не знайшов."
+    lines = ["Регулярні платежі:"]
+    for label, amount, cadence_days, next_date in items:
+        lines.append(f"• {label} — ~{amount} кожні {cadence_days} дн., наступний ~{next_date}")
+    return "\n".join(lines)
+
+
+def nlq_upcoming_charges_message(until_date: str, items: list[tuple[str, str, str]]) -> str:
+    """
+    items: (label, typical amount, expected date).
+    """
+    if not items:
+        return f"До {until_date} регулярних списань не очікую."
+    lines = [f"Очікувані регулярні списання до {until_date}:"]
+    for label, amount, date in items:
+        lines.append(f"• {date} — {label}, ~{amount}")
+    return "\n".join(lines)
+
+
 def nlq_share_line(*, prefix: str, label: str, amount: str, share_percent: str) -> str:
     return f"{prefix}: {label} — {amount}, це {share_percent}% від усіх витрат."
 
@@ -198,8 +222,11 @@ def nlq_unknown_alias_option_line(*, idx: int, name: str, amount: str) -> str:
     return f"{idx}) {name} — {amount}"
 
 
-def uncat_saved_mapping_message(*, description: str, leaf_name: str) -> str:
-    return f"✅ Збережено: {description} → {leaf_name}"
+def uncat_saved_mapping_message(
+    *, description: str, leaf_name: str, impact_line: str | None = None
+) -> str:
+    text = f"✅ Збережено: {description} → {leaf_name}"
+    return f"{text}\n{impact_line}" if impact_line else text
 
 
 def manual_mode_hint_recipient() -> str:
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+
+from ..config import load_bot_runtime_settings
+from ..core.job_queue import JobQueue
+from ..logging_setup import setup_logging
+from ..storage.profile_store import ProfileStore
+from ..storage.reports_store import ReportsStore
+from ..storage.uncat_store import UncatStore
+from ..storage.user_store import UserStore
+from .app import build_report_renderer, build_sync_user_ledger, start_job_pipeline, tx_store
+
+
+async def main() -> None:
+    """
+    Background worker: scheduler + sync/recompute/report pipeline, no Telegram polling.
+
+    Pairs with `monobot bot --no-jobs`; both sides share .cache/ and the durable job queue,
+    so either can be restarted independently on the same host.
+    """
+    settings = load_bot_runtime_settings()
+
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+
+    setup_logging(settings.log_level)
+    logger = logging.getLogger("mono_ai_budget_bot.worker")
+
+    profile_store = ProfileStore(Path(".cache") / "profiles")
+    reports_store = ReportsStore(Path(".cache") / "reports")
+    uncat_store = UncatStore(Path(".cache") / "uncat")
+
+    bot = Bot(
+        token=settings.telegram_bot_token,
+        default=DefaultBotProperties(parse_mode="Markdown"),
+    )
+
+    from .scheduler import flush_proactive_state
+    from .send_queue import PRIORITY_BROADCAST, SendQueue
+
+    send_queue = SendQueue(bot, logger=logger)
+    bot.session.middleware(send_queue.throttle_request)
+
+    scheduler, worker_task = start_job_pipeline(
+        bot=send_queue.as_bot(priority=PRIORITY_BROADCAST),
+        users=UserStore(),
+        job_queue=JobQueue(),
+        profile_store=profile_store,
+        uncat_store=uncat_store,
+        render_report_text=build_report_renderer(reports_store),
+        sync_user_ledger=build_sync_user_ledger(tx_store),
+        logger=logger,
+    )
+
+    logger.info("Worker started")
+    try:
+        await worker_task
+    finally:
+        scheduler.shutdown(wait=False)
+        flush_proactive_state()
+        logger.info("Send queue stats: %s", send_queue.stats.to_dict())
+        await send_queue.stop()
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -26,7 +26,7 @@ def build_parser() -> argparse.ArgumentParser:
         "command",
         nargs="?",
         default="health",
-        choices=["health", "status-env", "range", "reset-cache", "bot"],
+        choices=["health", "status-env", "range", "reset-cache", "bot", "worker", "jobs"],
         help="Command to run",
     )
     p.add_argument(
@@ -35,6 +35,11 @@ def build_parser() -> argparse.ArgumentParser:
         default="today",
         help="Calendar period in Kyiv timezone (used with range)",
     )
+    p.add_argument(
+        "--no-jobs",
+        action="store_true",
+        help="Run the bot front-end only; scheduled jobs run in `monobot worker` (used with bot)",
+    )
     return p
 
 
@@ -102,10 +107,34 @@ def cmd_reset_cache() -> int:
     return 0
 
 
-def cmd_bot() -> int:
+def cmd_bot(*, no_jobs: bool = False) -> int:
     from .bot.app import main as bot_main
 
-    asyncio.run(bot_main())
+    asyncio.run(bot_main(run_jobs=not no_jobs))
+    return 0
+
+
+def cmd_jobs() -> int:
+    from .core.job_queue import JobQueue
+
+    rows = JobQueue().stats()
+    if not rows:
+        print("Job queue is empty.")
+        return 0
+
+    print(f"{'lane':<8} {'kind':<10} {'status':<8} {'count':>6} {'oldest_age_s':>12}")
+    for r in rows:
+        print(
+            f"{r['lane']:<8} {r['kind']:<10} {r['status']:<8} "
+            f"{r['count']:>6} {r['oldest_age_s']:>12}"
+        )
+    return 0
+
+
+def cmd_worker() -> int:
+    from .bot.worker import main as worker_main
+
+    asyncio.run(worker_main())
     return 0
 
 
@@ -126,6 +155,10 @@ def main() -> int:
     if args.command == "reset-cache":
         return cmd_reset_cache()
     if args.command == "bot":
-        return cmd_bot()
+        return cmd_bot(no_jobs=args.no_jobs)
+    if args.command == "worker":
+        return cmd_worker()
+    if args.command == "jobs":
+        return cmd_jobs()
 
     return 1
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+class RWLock:
+    """
+    In-process readers-writer lock: many concurrent readers, one writer.
+    Waiting writers block new readers, so writes are not starved.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+_REGISTRY_LOCK = threading.Lock()
+_RW_LOCKS: dict[str, RWLock] = {}
+
+
+def _rw_lock_for(path: Path) -> RWLock:
+    key = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        lock = _RW_LOCKS.get(key)
+        if lock is None:
+            lock = RWLock()
+            _RW_LOCKS[key] = lock
+        return lock
+
+
+def lock_path_for(path: Path) -> Path:
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def _flocked(path: Path, *, exclusive: bool) -> Iterator[None]:
+    """
+    A shared lock on a path that was never written (no target, no sidecar) is skipped,
+    so reads of unknown ids don't leave directories and `.lock` files behind. Writers
+    create the sidecar before the target appears.
+    """
+    if fcntl is None:
+        yield
+        return
+    lp = lock_path_for(path)
+    if not exclusive and not lp.exists() and not path.exists():
+        yield
+        return
+    lp.parent.mkdir(parents=True, exist_ok=True)
+    with open(lp, "a+b") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def read_locked(path: Path) -> Iterator[None]:
+    """
+    Shared lock on `path`: in-process RW lock plus an fcntl advisory lock on
+    `<path>.lock`, so readers in any thread or process run concurrently but not
+    alongside a writer.
+    """
+    rw = _rw_lock_for(path)
+    rw.acquire_read()
+    try:
+        with _flocked(path, exclusive=False):
+            yield
+    finally:
+        rw.release_read()
+
+
+@contextmanager
+def write_locked(path: Path) -> Iterator[None]:
+    """
+    Exclusive lock on `path` (see read_locked). Not reentrant.
+    """
+    rw = _rw_lock_for(path)
+    rw.acquire_write()
+    try:
+        with _flocked(path, exclusive=True):
+            yield
+    finally:
+        rw.release_write()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write via a unique temp file in the same directory + os.replace.
+    Callers that read-modify-write should hold write_locked(path).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def read_text_locked(path: Path) -> str | None:
+    with read_locked(path):
+        if not path.exists():
+            return None
+        return path.read_text(encoding="utf-8")
+
+
+def write_text_locked(path: Path, text: str) -> None:
+    with write_locked(path):
+        atomic_write_text(path, text)
+
+
+def write_json_locked(path: Path, payload: Any, *, indent: int | None = 2) -> None:
+    write_text_locked(path, json.dumps(payload, ensure_ascii=False, indent=indent))
+
+
+def update_json_locked(path: Path, fn: Callable[[Any], Any], *, indent: int | None = 2) -> Any:
+    """
+    Read-modify-write a JSON file under one exclusive lock. `fn` receives the current
+    value (None if missing/corrupt) and returns the value to store.
+    """
+    with write_locked(path):
+        current: Any = None
+        if path.exists():
+            try:
+                current = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                current = None
+        updated = fn(current)
+        atomic_write_text(path, json.dumps(updated, ensure_ascii=False, indent=indent))
+        return updated
@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+JOB_KIND_SYNC = "sync"
+JOB_KIND_RECOMPUTE = "recompute"
+JOB_KIND_BACKFILL = "backfill"
+JOB_KIND_AI_BLOCK = "ai_block"
+JOB_KIND_REPORT = "report"
+JOB_KIND_TAXONOMY_MIGRATION = "taxonomy_migration"
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 10
+PRIORITY_BACKFILL = 20
+
+LANE_DEFAULT = "default"
+LANE_BOT = "bot"
+
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 60 * 60.0
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    user_id INTEGER,
+    payload TEXT NOT NULL DEFAULT '{{}}',
+    priority INTEGER NOT NULL DEFAULT 10,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT {DEFAULT_MAX_ATTEMPTS},
+    lane TEXT NOT NULL DEFAULT 'default',
+    dedupe_key TEXT,
+    available_at REAL NOT NULL,
+    locked_by TEXT,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready_lane ON jobs (lane, status, priority, available_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key)
+    WHERE status = 'pending' AND dedupe_key IS NOT NULL;
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """
+    Exponential backoff: 30s, 60s, 120s, ... capped at 1h.
+    """
+    n = max(1, int(attempts))
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (n - 1)))
+
+
+def _merge_payload(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """
+    Coalesce a duplicate job: numeric fields keep the widest value (e.g. days_back),
+    everything else takes the newer value.
+    """
+    out = dict(old)
+    for k, v in new.items():
+        prev = out.get(k)
+        if (
+            isinstance(prev, (int, float))
+            and isinstance(v, (int, float))
+            and not isinstance(prev, bool)
+            and not isinstance(v, bool)
+        ):
+            out[k] = max(prev, v)
+        else:
+            out[k] = v
+    return out
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    kind: str
+    user_id: int | None
+    payload: dict[str, Any]
+    priority: int
+    attempts: int
+    created_at: float
+    lane: str = LANE_DEFAULT
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+def _load_payload(raw: str | None) -> dict[str, Any]:
+    try:
+        payload = json.loads(raw or "{}")
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _row_to_job(row: sqlite3.Row) -> Job:
+    return Job(
+        id=int(row["id"]),
+        kind=str(row["kind"]),
+        user_id=(int(row["user_id"]) if row["user_id"] is not None else None),
+        payload=_load_payload(row["payload"]),
+        priority=int(row["priority"]),
+        attempts=int(row["attempts"]),
+        created_at=float(row["created_at"]),
+        lane=str(row["lane"]),
+        max_attempts=int(row["max_attempts"]),
+    )
+
+
+class JobQueue:
+    """
+    Durable local job queue shared by the bot front-end and `monobot worker`.
+
+    Stored as SQLite (WAL) under .cache/jobs/queue.sqlite3. A claimed job holds a
+    lease (locked_until); if the worker dies, the job becomes claimable again after
+    the lease expires. Failed jobs are retried with exponential backoff up to
+    max_attempts. At most one pending job exists per dedupe key (default: kind:user_id);
+    duplicates are coalesced into it.
+
+    Lanes separate consumers: "default" is served by the scheduler worker,
+    "bot" by the Telegram front-end (jobs that reply into a chat).
+
+    Named leases (acquire_lease/release_lease) let several instances on one host
+    agree on who runs a cron firing or touches a user's ledger; expired leases of a
+    crashed instance are simply taken over.
+    """
+
+    def __init__(self, path: Path | None = None, *, lease_seconds: int = 600):
+        self.path = path or (Path(".cache") / "jobs" / "queue.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = int(lease_seconds)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        kind: str,
+        *,
+        user_id: int | None = None,
+        payload: dict[str, Any] | None = None,
+        priority: int = PRIORITY_SCHEDULED,
+        delay_seconds: float = 0.0,
+        lane: str = LANE_DEFAULT,
+        dedupe_key: str | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        now: float | None = None,
+    ) -> int:
+        ts = float(now if now is not None else time.time())
+        available_at = ts + max(0.0, float(delay_seconds))
+        payload = dict(payload or {})
+        if dedupe_key is None and user_id is not None:
+            dedupe_key = f"{lane}:{kind}:{int(user_id)}"
+
+        with self._transaction() as conn:
+            row = None
+            if dedupe_key is not None:
+                row = conn.execute(
+                    "SELECT id, payload, priority, available_at FROM jobs "
+                    "WHERE dedupe_key = ? AND status = 'pending'",
+                    (dedupe_key,),
+                ).fetchone()
+
+            if row is not None:
+                merged = _merge_payload(_load_payload(row["payload"]), payload)
+                conn.execute(
+                    "UPDATE jobs SET payload = ?, priority = ?, available_at = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (
+                        json.dumps(merged, ensure_ascii=False),
+                        min(int(row["priority"]), int(priority)),
+                        min(float(row["available_at"]), available_at),
+                        ts,
+                        int(row["id"]),
+                    ),
+                )
+                return int(row["id"])
+
+            cur = conn.execute(
+                "INSERT INTO jobs (kind, user_id, payload, priority, available_at, lane, "
+                "dedupe_key, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(kind),
+                    int(user_id) if user_id is not None else None,
+                    json.dumps(payload, ensure_ascii=False),
+                    int(priority),
+                    available_at,
+                    str(lane),
+                    dedupe_key,
+                    max(1, int(max_attempts)),
+                    ts,
+                    ts,
+                ),
+            )
+            return int(cur.lastrowid)
+
+    def claim(
+        self,
+        worker_id: str,
+        *,
+        lanes: Sequence[str] = (LANE_DEFAULT,),
+        now: float | None = None,
+    ) -> Job | None:
+        ts = float(now if now is not None else time.time())
+        lanes = tuple(lanes) or (LANE_DEFAULT,)
+        marks = ", ".join("?" for _ in lanes)
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE lane IN ({marks}) AND available_at <= ? AND ("
+                " status = 'pending' OR (status = 'running' AND locked_until < ?)"
+                ") ORDER BY priority ASC, available_at ASC, id ASC LIMIT 1",
+                (*lanes, ts, ts),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', locked_by = ?, locked_until = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, ts + self.lease_seconds, ts, int(row["id"])),
+            )
+
+        job = _row_to_job(row)
+        return Job(
+            id=job.id,
+            kind=job.kind,
+            user_id=job.user_id,
+            payload=job.payload,
+            priority=job.priority,
+            attempts=job.attempts + 1,
+            created_at=job.created_at,
+            lane=job.lane,
+            max_attempts=job.max_attempts,
+        )
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        """
+        Delete a finished job. Returns False if worker_id no longer holds it (its lease
+        expired and another worker reclaimed the job).
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM jobs WHERE id = ? AND status = 'running' AND locked_by = ?",
+                (int(job_id), worker_id),
+            )
+            return cur.rowcount > 0
+
+    def _held_row(
+        self, conn: sqlite3.Connection, job_id: int, worker_id: str
+    ) -> sqlite3.Row | None:
+        return conn.execute(
+            "SELECT * FROM jobs WHERE id = ? AND status = 'running' AND locked_by = ?",
+            (int(job_id), worker_id),
+        ).fetchone()
+
+    def _requeue(
+        self,
+        conn: sqlite3.Connection,
+        row: sqlite3.Row,
+        *,
+        available_at: float,
+        attempts: int,
+        error: str | None,
+        ts: float,
+    ) -> None:
+        job_id = int(row["id"])
+        if row["dedupe_key"] is not None:
+            dup = conn.execute(
+                "SELECT id, payload FROM jobs WHERE dedupe_key = ? AND status = 'pending'",
+                (row["dedupe_key"],),
+            ).fetchone()
+            if dup is not None:
+                merged = _merge_payload(
+                    _load_payload(row["payload"]), _load_payload(dup["payload"])
+                )
+                conn.execute(
+                    "UPDATE jobs SET payload = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(merged, ensure_ascii=False), ts, int(dup["id"])),
+                )
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                return
+
+        conn.execute(
+            "UPDATE jobs SET status = 'pending', available_at = ?, attempts = ?, "
+            "locked_by = NULL, locked_until = NULL, last_error = COALESCE(?, last_error), "
+            "updated_at = ? WHERE id = ?",
+            (available_at, attempts, error, ts, job_id),
+        )
+
+    def fail(self, job_id: int, worker_id: str, error: str, *, now: float | None = None) -> bool:
+        """
+        Record a failed attempt. Returns True if the job was rescheduled for retry.
+        No-op if worker_id no longer holds the job.
+        """
+        ts = float(now if now is not None else time.time())
+        with self._transaction() as conn:
+            row = self._held_row(conn, job_id, worker_id)
+            if row is None:
+                return False
+
+            attempts = int(row["attempts"])
+            if attempts < int(row["max_attempts"]):
+                self._requeue(
+                    conn,
+                    row,
+                    available_at=ts + retry_delay_seconds(attempts),
+                    attempts=attempts,
+                    error=str(error)[:500],
+                    ts=ts,
+                )
+                return True
+
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', locked_by = NULL, locked_until = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (str(error)[:500], ts, int(job_id)),
+            )
+        return False
+
+    def defer(
+        self, job_id: int, worker_id: str, *, delay_seconds: float, now: float | None = None
+    ) -> None:
+        """
+        Put a claimed job back without counting the attempt (e.g. the user is busy elsewhere).
+        """
+        ts = float(now if now is not None else time.time())
+        with self._transaction() as conn:
+            row = self._held_row(conn, job_id, worker_id)
+            if row is None:
+                return
+            self._requeue(
+                conn,
+                row,
+                available_at=ts + max(0.0, float(delay_seconds)),
+                attempts=max(0, int(row["attempts"]) - 1),
+                error=None,
+                ts=ts,
+            )
+
+    def heartbeat(self, job_id: int, worker_id: str, *, now: float | None = None) -> bool:
+        """
+        Extend a running job's lease. Returns False if the job is no longer held by worker_id.
+        """
+        ts = float(now if now is not None else time.time())
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET locked_until = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND locked_by = ?",
+                (ts + self.lease_seconds, ts, int(job_id), worker_id),
+            )
+            return cur.rowcount > 0
+
+    def acquire_lease(
+        self,
+        name: str,
+        owner: str,
+        *,
+        ttl_seconds: float,
+        now: float | None = None,
+    ) -> bool:
+        """
+        Named lease shared by all instances on the host. Succeeds if the lease is free,
+        expired, or already held by owner (which renews it).
+        """
+        ts = float(now if now is not None else time.time())
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+            if row is not None and row["owner"] != owner and float(row["expires_at"]) > ts:
+                return False
+            conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, "
+                "expires_at = excluded.expires_at",
+                (name, owner, ts + float(ttl_seconds)),
+            )
+        return True
+
+    def release_lease(self, name: str, owner: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def pending_count(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS n FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()
+        return int(row["n"]) if row is not None else 0
+
+    def stats(self, *, now: float | None = None) -> list[dict[str, Any]]:
+        """
+        Queue depth and oldest-job age per (lane, kind, status).
+        """
+        ts = float(now if now is not None else time.time())
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT lane, kind, status, COUNT(*) AS n, MIN(created_at) AS oldest "
+                "FROM jobs GROUP BY lane, kind, status ORDER BY lane, kind, status"
+            ).fetchall()
+        return [
+            {
+                "lane": str(r["lane"]),
+                "kind": str(r["kind"]),
+                "status": str(r["status"]),
+                "count": int(r["n"]),
+                "oldest_age_s": max(0, int(ts - float(r["oldest"]))),
+            }
+            for r in rows
+        ]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+# The same few thousand descriptions/merchant names are normalized over and over
+# (every report, query and categorization pass), so each normalizer is a bounded LRU
+# keyed by the raw input string.
+MAXSIZE = 16384
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_MEMOIZED: dict[str, Any] = {}
+
+
+def memoized(name: str, *, maxsize: int = MAXSIZE) -> Callable[[_F], _F]:
+    """
+    lru_cache registered under `name` so cache_stats()/clear_caches() see it.
+    The wrapped function must be pure and return an immutable value.
+    """
+
+    def wrap(fn: _F) -> _F:
+        cached = lru_cache(maxsize=maxsize)(fn)
+        _MEMOIZED[name] = cached
+        return cached  # type: ignore[return-value]
+
+    return wrap
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    out: dict[str, dict[str, int]] = {}
+    for name, fn in _MEMOIZED.items():
+        info = fn.cache_info()
+        out[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize or 0,
+        }
+    return out
+
+
+def clear_caches() -> None:
+    for fn in _MEMOIZED.values():
+        fn.cache_clear()
+
+
+_ws_re = re.compile(r"\s+")
+_strip_re = re.compile(r"[^\w\s'&+\-\.]")
+_non_word_re = re.compile(r"[^\w]+")
+
+_tail_id_re = re.compile(
+    r"(?:\s*[#№]\s*\w+|\s+\d{3,}|\s+[a-f0-9]{6,})\s*$",
+    re.IGNORECASE,
+)
+_tail_cut_re = re.compile(r"\b(?:kyiv|kiev|ua|ukraine|terminal|pos)\b", re.IGNORECASE)
+
+
+@memoized("text")
+def normalize_text(text: str | None) -> str:
+    s = (text or "").strip().lower()
+    s = _strip_re.sub(" ", s)
+    s = _ws_re.sub(" ", s).strip()
+    return s
+
+
+@memoized("merchant")
+def normalize_merchant(description: str | None) -> str:
+    s = normalize_text(description)
+    if not s:
+        return "unknown"
+
+    s = _tail_id_re.sub("", s).strip()
+    if not s:
+        return "unknown"
+
+    m = _tail_cut_re.search(s)
+    if m:
+        s = s[: m.start()].strip()
+
+    if not s:
+        return "unknown"
+
+    return s[:48]
+
+
+@memoized("norm")
+def norm(s: str | None) -> str:
+    """
+    Lowercase, '_' and punctuation to spaces, collapsed whitespace (NLQ matching).
+    """
+    t = (s or "").strip().lower()
+    t = t.replace("_", " ")
+    t = _non_word_re.sub(" ", t)
+    t = _ws_re.sub(" ", t).strip()
+    return t
+
+
+@memoized("match_key")
+def match_key(s: str | None) -> str:
+    """
+    norm() without spaces: "Сільпо  #12" and "сільпо12" share a key.
+    """
+    return norm(s).replace(" ", "")
+
+
+@memoized("words")
+def collapse_ws(s: str | None) -> str:
+    """
+    Lowercase with whitespace collapsed; punctuation is kept (taxonomy names/rules).
+    """
+    return " ".join((s or "").strip().lower().split())
+
+
+@memoized("compact")
+def compact(s: str | None) -> str:
+    """
+    collapse_ws() without spaces, for substring rules like merchant_contains.
+    """
+    return "".join((s or "").lower().split())
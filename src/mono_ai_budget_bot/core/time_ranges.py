@@ -47,6 +47,25 @@ def range_month() -> DateRange:
     return range_last_days(30)
 
 
+def calendar_period_bounds(kind: str, ts: int) -> tuple[int, int]:
+    """
+    Kyiv-time calendar period containing `ts` as [start_ts, end_ts):
+    "week" starts on Monday 00:00, "month" on the 1st 00:00.
+    """
+    local = datetime.fromtimestamp(int(ts), tz=KYIV_TZ)
+    if kind == "week":
+        start_day = local.date() - timedelta(days=local.weekday())
+        end_day = start_day + timedelta(days=7)
+    elif kind == "month":
+        start_day = local.date().replace(day=1)
+        end_day = (start_day + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"unknown calendar period: {kind!r}")
+    start = datetime.combine(start_day, datetime.min.time(), tzinfo=KYIV_TZ)
+    end = datetime.combine(end_day, datetime.min.time(), tzinfo=KYIV_TZ)
+    return int(start.timestamp()), int(end.timestamp())
+
+
 def previous_period(dr: DateRange, days: int) -> DateRange:
     """
     Previous period with the same duration ending exactly at dr.dt_from.
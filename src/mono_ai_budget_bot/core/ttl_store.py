@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import heapq
+import json
+from pathlib import Path
+from typing import Hashable
+
+from .file_lock import atomic_write_text, read_text_locked, write_locked
+
+
+def _encode_key(key: Hashable) -> object:
+    if isinstance(key, tuple):
+        return list(key)
+    return key
+
+
+def _decode_key(raw: object) -> Hashable | None:
+    if isinstance(raw, list):
+        return tuple(raw)
+    if isinstance(raw, (str, int)):
+        return raw
+    return None
+
+
+def _parse_entries(text: str | None) -> list[tuple[Hashable, int]]:
+    if not text:
+        return []
+    try:
+        raw = json.loads(text)
+    except Exception:
+        return []
+    if not isinstance(raw, list):
+        return []
+    out: list[tuple[Hashable, int]] = []
+    for item in raw:
+        if not isinstance(item, list) or len(item) != 2:
+            continue
+        key = _decode_key(item[0])
+        if key is None or not isinstance(item[1], (int, float)):
+            continue
+        out.append((key, int(item[1])))
+    return out
+
+
+class ExpiringStore:
+    """
+    Key -> expires_at map with heap-based TTL eviction.
+
+    Lookups are O(1) dict reads; expired entries are evicted from the heap head,
+    so memory is bounded by active entries (plus superseded heap records,
+    which are compacted away). Optionally snapshotted to a JSON file:
+      [[<key>, <expires_at>], ...]
+
+    set() only marks the store dirty; flush() writes it (callers batch writes on a
+    timer). Snapshots merge with the file under a file lock, keeping the latest
+    expiry per key, so processes sharing the file don't drop each other's entries;
+    refresh() merges in entries other processes wrote once the file's mtime changes.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._data: dict[Hashable, int] = {}
+        self._heap: list[tuple[int, int, Hashable]] = []
+        self._seq = 0
+        self._dirty = False
+        self._stamp: tuple[int, int] | None = None
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def _push(self, key: Hashable, expires_at: int) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (int(expires_at), self._seq, key))
+
+    def _compact(self) -> None:
+        if len(self._heap) <= 2 * len(self._data) + 64:
+            return
+        self._heap = []
+        for k, exp in self._data.items():
+            self._push(k, exp)
+
+    def evict_expired(self, now_ts: int) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] <= now_ts:
+            exp, _, key = heapq.heappop(self._heap)
+            if self._data.get(key) == exp:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    def get(self, key: Hashable, *, now_ts: int) -> int | None:
+        exp = self._data.get(key)
+        if exp is None:
+            return None
+        if exp <= now_ts:
+            self.evict_expired(now_ts)
+            return None
+        return exp
+
+    def set(self, key: Hashable, expires_at: int, *, now_ts: int) -> None:
+        self.evict_expired(now_ts)
+        if int(expires_at) <= now_ts:
+            self._data.pop(key, None)
+            return
+        self._data[key] = int(expires_at)
+        self._push(key, int(expires_at))
+        self._dirty = True
+        self._compact()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._heap.clear()
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        # Snapshots replace the file, so a new inode also marks a change.
+        if self.path is None:
+            return None
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino
+
+    def _merge(self, text: str | None) -> None:
+        for key, exp in _parse_entries(text):
+            if exp > self._data.get(key, 0):
+                self._data[key] = exp
+                self._push(key, exp)
+
+    def load(self) -> None:
+        self.clear()
+        self._dirty = False
+        if self.path is None:
+            return
+        self._stamp = self._file_stamp()
+        self._merge(read_text_locked(self.path))
+
+    def refresh(self, *, now_ts: int) -> bool:
+        """
+        Merge in the file's entries if it changed since this store last read or wrote
+        it (one stat() otherwise).
+        """
+        if self.path is None:
+            return False
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        self._merge(read_text_locked(self.path))
+        self.evict_expired(now_ts)
+        return True
+
+    def snapshot(self, *, now_ts: int) -> None:
+        if self.path is None:
+            return
+        with write_locked(self.path):
+            self._merge(self.path.read_text(encoding="utf-8") if self.path.exists() else None)
+            self.evict_expired(now_ts)
+            payload = [[_encode_key(k), exp] for k, exp in self._data.items()]
+            atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False))
+            self._stamp = self._file_stamp()
+            self._dirty = False
+
+    def flush(self, *, now_ts: int) -> bool:
+        """
+        Snapshot if anything was set since the last load/snapshot; otherwise just
+        refresh() from the file. Returns whether the file was written.
+        """
+        if not self._dirty:
+            self.refresh(now_ts=now_ts)
+            return False
+        self.snapshot(now_ts=now_ts)
+        return True
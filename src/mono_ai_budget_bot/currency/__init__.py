@@ -9,9 +9,12 @@ from mono_ai_budget_bot.currency.convert import (
 )
 from mono_ai_budget_bot.currency.models import MonoCurrencyRate
 from mono_ai_budget_bot.currency.normalize import normalize_records_to_uah
+from mono_ai_budget_bot.currency.service import CurrencyRateService, currency_rate_service
 
 __all__ = [
     "MonobankPublicClient",
+    "CurrencyRateService",
+    "currency_rate_service",
     "MonoCurrencyRate",
     "normalize_records_to_uah",
     "ParsedConversion",
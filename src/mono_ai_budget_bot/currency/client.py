@@ -9,7 +9,9 @@ import httpx
 
 from mono_ai_budget_bot.core.cache import JsonDiskCache
 from mono_ai_budget_bot.core.rate_limit import FileRateLimiter
+from mono_ai_budget_bot.currency.history import record_fx_snapshot
 from mono_ai_budget_bot.currency.models import MonoCurrencyRate
+from mono_ai_budget_bot.storage.fx_history_store import FxHistoryStore
 
 
 def _sleep_seconds(attempt: int) -> float:
@@ -30,6 +32,7 @@ class CurrencySnapshot:
     source: Literal["cache", "network", "stale_cache"]
     requested_refresh: bool
     fetch_failed_error: str | None = None
+    expires_at: float | None = None
 
 
 class MonobankPublicClient:
@@ -42,12 +45,14 @@ class MonobankPublicClient:
         *,
         cache_root: Path | None = None,
         http_client: httpx.Client | None = None,
+        history_store: FxHistoryStore | None = None,
     ):
         self._base_url = base_url.rstrip("/")
 
         cache_dir = cache_root or (Path(".cache") / "mono_public")
         self._cache = JsonDiskCache(cache_dir)
         self._limiter = FileRateLimiter(cache_dir / "ratelimit.json")
+        self._history = history_store or FxHistoryStore(cache_dir / "fx_history.json")
 
         self._owns_client = http_client is None
         self._client = http_client or httpx.Client(
@@ -126,6 +131,7 @@ class MonobankPublicClient:
                 source="cache",
                 requested_refresh=False,
                 fetch_failed_error=None,
+                expires_at=cached_entry.get("expires_at"),
             )
 
         try:
@@ -137,11 +143,17 @@ class MonobankPublicClient:
                 raise RuntimeError("Monobank /bank/currency response is not a list")
 
             self._cache.set(cache_key, data, ttl_seconds=self.CURRENCY_TTL)
+            rates = [MonoCurrencyRate.model_validate(x) for x in data]
+            try:
+                record_fx_snapshot(self._history, int(time.time()), rates)
+            except Exception:
+                pass
             return CurrencySnapshot(
-                rates=[MonoCurrencyRate.model_validate(x) for x in data],
+                rates=rates,
                 source="network",
                 requested_refresh=bool(force_refresh),
                 fetch_failed_error=None,
+                expires_at=time.time() + self.CURRENCY_TTL,
             )
         except Exception as e:
             if cached_rates is not None:
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from mono_ai_budget_bot.currency.models import MonoCurrencyRate
+from mono_ai_budget_bot.currency.normalize import UAH_CODE, _build_rate_map_to_uah
+from mono_ai_budget_bot.storage.fx_history_store import FxHistoryStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+SECONDS_IN_DAY = 24 * 60 * 60
+FX_HISTORY_VERSION = 1
+
+
+def day_of(ts: int) -> int:
+    return int(ts) // SECONDS_IN_DAY
+
+
+@dataclass
+class FxHistory:
+    """
+    Daily rate -> UAH table: {utc_day: {currency_code: rate}}. The first snapshot
+    recorded for a day is kept, so a day's rate never changes once written.
+
+    A transaction converts with the rate of its own day, or the nearest earlier
+    recorded day (the earliest one for transactions before the history starts).
+    """
+
+    days: dict[int, dict[int, float]] = field(default_factory=dict)
+    _series: dict[int, tuple[list[int], list[float]]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def record(self, ts: int, rate_map: dict[int, float]) -> bool:
+        day = day_of(ts)
+        if day in self.days or not rate_map:
+            return False
+        self.days[day] = {int(k): float(v) for k, v in rate_map.items()}
+        self._series.clear()
+        return True
+
+    def series(self, code: int) -> tuple[list[int], list[float]]:
+        hit = self._series.get(code)
+        if hit is None:
+            days: list[int] = []
+            rates: list[float] = []
+            for day in sorted(self.days):
+                k = self.days[day].get(code)
+                if k is not None:
+                    days.append(day)
+                    rates.append(k)
+            hit = self._series[code] = (days, rates)
+        return hit
+
+    def rate_on(self, code: int, day: int) -> tuple[float, bool] | None:
+        """
+        (rate, final) for `code` on `day`; final means later snapshots can't change it
+        (`day` lies within the recorded days of this currency). Days before the first
+        snapshot borrow its rate provisionally.
+        """
+        days, rates = self.series(code)
+        if not days:
+            return None
+        i = bisect_right(days, day) - 1
+        return rates[max(i, 0)], days[0] <= day <= days[-1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": FX_HISTORY_VERSION,
+            "days": {
+                str(day): {str(code): k for code, k in rates.items()}
+                for day, rates in sorted(self.days.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> FxHistory:
+        if not isinstance(data, dict) or data.get("version") != FX_HISTORY_VERSION:
+            return cls()
+        days: dict[int, dict[int, float]] = {}
+        raw = data.get("days")
+        for day, rates in (raw if isinstance(raw, dict) else {}).items():
+            try:
+                days[int(day)] = {int(c): float(k) for c, k in dict(rates).items()}
+            except (TypeError, ValueError):
+                continue
+        return cls(days=days)
+
+
+def record_fx_snapshot(store: FxHistoryStore, ts: int, rates: list[MonoCurrencyRate]) -> None:
+    rate_map = _build_rate_map_to_uah(rates)
+    if not rate_map:
+        return
+    raw = store.load()
+    if raw is not None and str(day_of(ts)) in (raw.get("days") or {}):
+        return
+
+    def _apply(current: Any) -> dict[str, Any]:
+        history = FxHistory.from_dict(current)
+        history.record(ts, rate_map)
+        return history.to_dict()
+
+    store.update(_apply)
+
+
+def load_fx_history(store: FxHistoryStore) -> FxHistory:
+    return FxHistory.from_dict(store.load())
+
+
+def normalize_records_by_day(
+    records: list[TxRecord],
+    history: FxHistory,
+    *,
+    fallback_rate_map: dict[int, float] | None = None,
+    converted: dict[str, list[int]] | None = None,
+) -> tuple[list[TxRecord], dict[str, list[int]]]:
+    """
+    Converts foreign-currency records to UAH with the rate of the transaction's day.
+
+    `converted` holds earlier results ({tx_id: [amount, currency_code, uah_amount, day]});
+    a hit for the same amount/currency is reused as is. Returns the records and the
+    newly final conversions to add to it. Currencies without history use
+    `fallback_rate_map` (e.g. today's rates) and are not reported as final.
+    """
+    converted = converted or {}
+    fallback = fallback_rate_map or {}
+    out: list[TxRecord] = []
+    fresh: dict[str, list[int]] = {}
+    for r in records:
+        code = int(r.currencyCode) if r.currencyCode is not None else UAH_CODE
+        if code == UAH_CODE:
+            out.append(r)
+            continue
+
+        hit = converted.get(r.id)
+        if hit is not None and hit[0] == r.amount and hit[1] == code:
+            out.append(replace(r, amount=int(hit[2]), currencyCode=UAH_CODE))
+            continue
+
+        found = history.rate_on(code, day_of(r.time))
+        if found is not None:
+            k, final = found
+        elif code in fallback:
+            k, final = fallback[code], False
+        else:
+            out.append(r)
+            continue
+
+        amount = int(round(float(r.amount) * float(k)))
+        if final:
+            fresh[r.id] = [int(r.amount), code, amount, day_of(r.time)]
+        out.append(replace(r, amount=amount, currencyCode=UAH_CODE))
+    return out, fresh
@@ -41,13 +41,19 @@ def normalize_amount_to_uah_cents(
     amount_cents: int,
     *,
     currency_code: int | None,
-    rates: list[MonoCurrencyRate],
+    rates: list[MonoCurrencyRate] | None = None,
+    rate_map: dict[int, float] | None = None,
 ) -> int:
+    """
+    Pass a prebuilt `rate_map` (_build_rate_map_to_uah / CurrencyRateService) when
+    converting many amounts; `rates` is turned into one on every call.
+    """
     code = int(currency_code) if currency_code is not None else UAH_CODE
     if code == UAH_CODE:
         return int(amount_cents)
 
-    rate_map = _build_rate_map_to_uah(rates)
+    if rate_map is None:
+        rate_map = _build_rate_map_to_uah(rates or [])
     k = rate_map.get(code)
     if k is None:
         return int(amount_cents)
@@ -55,14 +61,9 @@ def normalize_amount_to_uah_cents(
     return int(round(float(amount_cents) * float(k)))
 
 
-def normalize_records_to_uah(
-    records: list[TxRecord],
-    rates: list[MonoCurrencyRate],
-) -> list[TxRecord]:
+def normalize_with_rate_map(records: list[TxRecord], rate_map: dict[int, float]) -> list[TxRecord]:
     if not records:
         return []
-
-    rate_map = _build_rate_map_to_uah(rates)
     if not rate_map:
         return list(records)
 
@@ -82,3 +83,12 @@ def normalize_records_to_uah(
         out.append(replace(r, amount=new_amount, currencyCode=UAH_CODE))
 
     return out
+
+
+def normalize_records_to_uah(
+    records: list[TxRecord],
+    rates: list[MonoCurrencyRate],
+) -> list[TxRecord]:
+    if not records:
+        return []
+    return normalize_with_rate_map(records, _build_rate_map_to_uah(rates))
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable
+
+from mono_ai_budget_bot.currency.client import CurrencySnapshot, MonobankPublicClient
+from mono_ai_budget_bot.currency.models import MonoCurrencyRate
+from mono_ai_budget_bot.currency.normalize import _build_rate_map_to_uah, normalize_with_rate_map
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+# How long before the rates expire readers start a background refresh.
+REFRESH_AHEAD_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class _RatesState:
+    snapshot: CurrencySnapshot
+    rate_map: dict[int, float]
+    refresh_at: float
+
+
+class CurrencyRateService:
+    """
+    Process-wide holder of Monobank public rates: the parsed rates and the rate -> UAH
+    map stay in memory, so readers do no I/O once the first load is done.
+
+    Stale-while-revalidate: from REFRESH_AHEAD_SECONDS before the rates expire (or
+    once the retry delay after a failed refresh passed) the next reader starts a
+    refresh on a daemon thread and keeps getting the current data meanwhile. Only the
+    first load and an explicit force_refresh block the caller.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any] = MonobankPublicClient,
+        *,
+        ttl_seconds: float = MonobankPublicClient.CURRENCY_TTL,
+        retry_seconds: float = MonobankPublicClient.CURRENCY_MIN_INTERVAL,
+        refresh_ahead_seconds: float = REFRESH_AHEAD_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._client_factory = client_factory
+        self._client: Any = None
+        self._ttl = float(ttl_seconds)
+        self._retry = float(retry_seconds)
+        self._ahead = min(float(refresh_ahead_seconds), self._ttl)
+        self._clock = clock
+
+        self._state: _RatesState | None = None
+        self._lock = threading.Lock()
+        self._bg_thread: threading.Thread | None = None
+
+    def _fetch(self, *, force_refresh: bool) -> CurrencySnapshot:
+        if self._client is None:
+            self._client = self._client_factory()
+        client = self._client
+        if hasattr(client, "currency_snapshot"):
+            return client.currency_snapshot(force_refresh=force_refresh)
+        rates = client.currency(force_refresh=force_refresh)
+        return CurrencySnapshot(rates=rates, source="network", requested_refresh=force_refresh)
+
+    def _store(self, snapshot: CurrencySnapshot) -> _RatesState:
+        now = self._clock()
+        if snapshot.fetch_failed_error is not None:
+            refresh_at = now + self._retry
+        else:
+            expires_at = snapshot.expires_at if snapshot.expires_at is not None else now + self._ttl
+            refresh_at = max(now, float(expires_at) - self._ahead)
+        state = _RatesState(
+            snapshot=snapshot,
+            rate_map=_build_rate_map_to_uah(snapshot.rates),
+            refresh_at=refresh_at,
+        )
+        self._state = state
+        return state
+
+    def _revalidate(self) -> None:
+        try:
+            # Another process may already have refreshed the shared disk cache.
+            snapshot = self._fetch(force_refresh=False)
+            expires_at = snapshot.expires_at
+            if expires_at is None or float(expires_at) - self._ahead <= self._clock():
+                snapshot = self._fetch(force_refresh=True)
+            self._store(snapshot)
+        except Exception:
+            state = self._state
+            if state is not None:
+                self._state = replace(state, refresh_at=self._clock() + self._retry)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._bg_thread is not None and self._bg_thread.is_alive():
+                return
+            self._bg_thread = threading.Thread(
+                target=self._run_revalidate, name="currency-rates", daemon=True
+            )
+            self._bg_thread.start()
+
+    def _run_revalidate(self) -> None:
+        with self._lock:
+            self._revalidate()
+
+    def _current(self) -> _RatesState:
+        state = self._state
+        if state is None:
+            with self._lock:
+                state = self._state or self._store(self._fetch(force_refresh=False))
+        if self._clock() >= state.refresh_at:
+            self._refresh_in_background()
+        return state
+
+    def snapshot(self, *, force_refresh: bool = False) -> CurrencySnapshot:
+        """
+        Current rates. Served from memory they are labelled as cache (unless the last
+        refresh failed); force_refresh fetches synchronously, as the client does.
+        """
+        if force_refresh:
+            with self._lock:
+                return self._store(self._fetch(force_refresh=True)).snapshot
+        snapshot = self._current().snapshot
+        if snapshot.source == "network":
+            return replace(snapshot, source="cache", requested_refresh=False)
+        return snapshot
+
+    def rates(self) -> list[MonoCurrencyRate]:
+        return self._current().snapshot.rates
+
+    def rate_map_to_uah(self) -> dict[int, float]:
+        return self._current().rate_map
+
+    def normalize_records_to_uah(self, records: list[TxRecord]) -> list[TxRecord]:
+        return normalize_with_rate_map(records, self._current().rate_map)
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and hasattr(client, "close"):
+            client.close()
+
+
+_services: dict[Any, CurrencyRateService] = {}
+_services_lock = threading.Lock()
+
+
+def currency_rate_service(
+    client_factory: Callable[[], Any] = MonobankPublicClient,
+) -> CurrencyRateService:
+    """
+    The shared CurrencyRateService for `client_factory` (one per process for the real
+    MonobankPublicClient).
+    """
+    with _services_lock:
+        svc = _services.get(client_factory)
+        if svc is None:
+            svc = _services[client_factory] = CurrencyRateService(client_factory)
+        return svc
@@ -41,7 +41,7 @@ _ALLOWED_PRIMITIVES = {
     "top_merchants",
 }
 
-_ALLOWED_PERIODS = {"today", "week", "month"}
+_ALLOWED_PERIODS = {"today", "week", "month", "week_to_date", "month_to_date"}
 
 
 def execute_tool_call(
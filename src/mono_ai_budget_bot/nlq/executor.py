@@ -9,6 +9,7 @@ from mono_ai_budget_bot.analytics.classify import classify_kind
 from mono_ai_budget_bot.analytics.compare import compare_window_to_baseline
 from mono_ai_budget_bot.analytics.coverage import CoverageStatus, classify_coverage
 from mono_ai_budget_bot.analytics.period_report import build_period_report_from_ledger
+from mono_ai_budget_bot.analytics.recurring import RecurringIndex
 from mono_ai_budget_bot.analytics.refunds import detect_refund_pairs, refund_ignore_ids
 from mono_ai_budget_bot.bot import templates
 from mono_ai_budget_bot.bot.formatting import (
@@ -17,7 +18,12 @@ from mono_ai_budget_bot.bot.formatting import (
     format_ts_local,
 )
 from mono_ai_budget_bot.config import load_settings
-from mono_ai_budget_bot.currency import MonobankPublicClient, alpha_to_numeric, convert_amount
+from mono_ai_budget_bot.currency import (
+    MonobankPublicClient,
+    alpha_to_numeric,
+    convert_amount,
+    currency_rate_service,
+)
 from mono_ai_budget_bot.llm.openai_client import OpenAIClient
 from mono_ai_budget_bot.nlq.memory_store import (
     load_memory,
@@ -43,6 +49,7 @@ from mono_ai_budget_bot.nlq.tabular import (
     suggest_merchant_candidates_detailed,
 )
 from mono_ai_budget_bot.nlq.text_norm import norm
+from mono_ai_budget_bot.storage.recurring_store import RecurringStore
 from mono_ai_budget_bot.storage.tx_store import TxStore
 from mono_ai_budget_bot.storage.user_store import UserStore
 
@@ -172,6 +179,46 @@ def _maybe_llm_rank_alias(alias: str, candidates: list[tuple[str, int]]) -> list
         return candidates
 
 
+def _recurring_payments_answer(
+    telegram_user_id: int, scope: str, intent_payload: dict[str, Any]
+) -> str:
+    raw = RecurringStore().load(telegram_user_id)
+    index = RecurringIndex.from_dict(raw) if raw is not None else None
+    if index is None:
+        index = RecurringIndex(offsets={})
+
+    now_ts = int(time.time())
+    if scope == "upcoming":
+        try:
+            days = int(intent_payload.get("days") or 7)
+        except Exception:
+            days = 7
+        until_ts = now_ts + max(1, min(days, 31)) * 86400
+        return templates.nlq_upcoming_charges_message(
+            format_ts_local(until_ts)[:10],
+            [
+                (
+                    s.label,
+                    format_money_grn(s.amount_cents / 100),
+                    format_ts_local(max(int(s.next_ts or now_ts), now_ts))[:10],
+                )
+                for _, s in index.upcoming(now_ts, until_ts)
+            ],
+        )
+
+    return templates.nlq_recurring_payments_message(
+        [
+            (
+                s.label,
+                format_money_grn(s.amount_cents / 100),
+                s.cadence_days,
+                format_ts_local(int(s.next_ts or now_ts))[:10],
+            )
+            for _, s in index.recurring(now_ts)[:10]
+        ]
+    )
+
+
 def execute_intent(telegram_user_id: int, intent_payload: dict[str, Any]) -> str:
     intent = str(intent_payload.get("intent") or "unsupported").strip()
 
@@ -192,18 +239,10 @@ def execute_intent(telegram_user_id: int, intent_payload: dict[str, Any]) -> str
             bad = from_alpha if from_num is None else to_alpha
             return templates.nlq_currency_unknown_currency(bad)
 
-        pub = None
         try:
-            pub = MonobankPublicClient()
-            rates = pub.currency()
+            rates = currency_rate_service(MonobankPublicClient).rates()
         except Exception as e:
             return templates.nlq_currency_rates_fetch_failed(str(e))
-        finally:
-            try:
-                if pub is not None:
-                    pub.close()
-            except Exception:
-                pass
 
         if intent == "currency_rate":
             out = convert_amount(1.0, from_num=from_num, to_num=to_num, rates=rates)
@@ -238,6 +277,10 @@ def execute_intent(telegram_user_id: int, intent_payload: dict[str, Any]) -> str
     if not account_ids:
         return templates.nlq_need_accounts()
 
+    recurring_scope = str(intent_payload.get("recurring_scope") or "").strip()
+    if intent == "recurrence_summary" and recurring_scope in {"series", "upcoming"}:
+        return _recurring_payments_answer(telegram_user_id, recurring_scope, intent_payload)
+
     ts_to = int(intent_payload.get("end_ts") or time.time())
 
     spec = spec_from_intent_payload(intent_payload, now_ts=ts_to)
@@ -7,6 +7,7 @@ import time
 from pathlib import Path
 from typing import Any
 
+from mono_ai_budget_bot.core.file_lock import read_text_locked, write_json_locked
 from mono_ai_budget_bot.nlq.text_norm import norm
 
 BASE_DIR = Path(".cache") / "memory"
@@ -105,16 +106,17 @@ def load_memory(telegram_user_id: int) -> dict[str, Any]:
     BASE_DIR.mkdir(parents=True, exist_ok=True)
     path = BASE_DIR / f"{int(telegram_user_id)}.json"
 
-    if not path.exists():
+    text = read_text_locked(path)
+    if text is None:
         data = _default_memory()
-        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        write_json_locked(path, data)
         return data
 
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = json.loads(text)
     except Exception:
         data = _default_memory()
-        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        write_json_locked(path, data)
         return data
 
     if not isinstance(data, dict):
@@ -152,7 +154,7 @@ def load_memory(telegram_user_id: int) -> dict[str, Any]:
 def save_memory(telegram_user_id: int, data: dict[str, Any]) -> None:
     BASE_DIR.mkdir(parents=True, exist_ok=True)
     path = BASE_DIR / f"{int(telegram_user_id)}.json"
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json_locked(path, data)
 
 
 def _get_learned_bucket(mem: dict[str, Any], bucket: str) -> dict[str, list[str]]:
@@ -538,6 +538,9 @@ def _should_handoff_deterministic_intent(
 ) -> bool:
     text = req.text or ""
 
+    if deterministic_intent.slots.get("recurring_scope"):
+        return False
+
     if _OPEN_ENDED_FINANCE_RE.search(text):
         return True
 
@@ -867,33 +870,38 @@ def _load_narrative_facts(
     req: NLQRequest,
     deterministic_intent: NLQIntent | None,
 ) -> dict[str, object] | None:
-    period = _semantic_period(req, deterministic_intent)
-    try:
-        payload = execute_tool_call(
-            req.telegram_user_id,
-            tool="query_facts",
-            args={
-                "period": period,
-                "keys": [
-                    "totals",
-                    "comparison",
-                    "top_categories_named_real_spend",
-                    "top_merchants_real_spend",
-                    "coverage",
-                    "requested_period_label",
-                    "transactions_count",
-                ],
-            },
-            report_store=ReportStore(),
-            now_ts=req.now_ts,
-        )
-    except Exception:
-        return None
+    periods = [_semantic_period(req, deterministic_intent)]
+    schema = _build_canonical_query_schema(req, deterministic_intent)
+    if str(schema.period.get("label") or "").strip().lower() == "цей місяць":
+        periods.insert(0, "month_to_date")
 
-    facts = payload.get("facts")
-    if not isinstance(facts, dict):
-        return None
-    if not isinstance(facts.get("totals"), dict):
+    for period in periods:
+        try:
+            payload = execute_tool_call(
+                req.telegram_user_id,
+                tool="query_facts",
+                args={
+                    "period": period,
+                    "keys": [
+                        "totals",
+                        "comparison",
+                        "top_categories_named_real_spend",
+                        "top_merchants_real_spend",
+                        "coverage",
+                        "requested_period_label",
+                        "transactions_count",
+                    ],
+                },
+                report_store=ReportStore(),
+                now_ts=req.now_ts,
+            )
+        except Exception:
+            return None
+
+        facts = payload.get("facts")
+        if isinstance(facts, dict) and isinstance(facts.get("totals"), dict):
+            break
+    else:
         return None
 
     safe_payload: dict[str, object] = {
@@ -102,7 +102,7 @@ def tool_call_is_safe(tool: str, args: dict[str, Any]) -> bool:
 
     if tool == "query_facts":
         period = str(args.get("period") or "").strip().lower()
-        if period not in {"today", "week", "month"}:
+        if period not in {"today", "week", "month", "week_to_date", "month_to_date"}:
             return False
         keys = args.get("keys")
         if keys is not None and not isinstance(keys, list):
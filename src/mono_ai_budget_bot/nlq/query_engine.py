@@ -6,7 +6,7 @@ from statistics import median
 from mono_ai_budget_bot.analytics.categories import category_from_mcc
 from mono_ai_budget_bot.analytics.classify import classify_kind
 from mono_ai_budget_bot.nlq.query_spec import QuerySpec
-from mono_ai_budget_bot.nlq.text_norm import norm
+from mono_ai_budget_bot.nlq.text_norm import match_key
 from mono_ai_budget_bot.storage.tx_store import TxRecord
 
 
@@ -32,7 +32,7 @@ class QueryEngine:
         out: list[TxRecord] = []
 
         merchant_terms = [
-            _match_key(x) for x in (f.merchant_contains or []) if isinstance(x, str) and x.strip()
+            match_key(x) for x in (f.merchant_contains or []) if isinstance(x, str) and x.strip()
         ]
         merchant_terms = [x for x in merchant_terms if x]
         recipient = (f.recipient_contains or "").strip().lower() or None
@@ -49,7 +49,7 @@ class QueryEngine:
                     if c != category:
                         continue
                 if merchant_terms:
-                    d = _match_key(r.description or "")
+                    d = match_key(r.description or "")
                     if not any(m in d for m in merchant_terms):
                         continue
 
@@ -87,9 +87,9 @@ class QueryEngine:
             ),
         )
         if spec.targets.merchant_exact and spec.targets.merchant_terms:
-            terms = {_match_key(x) for x in spec.targets.merchant_terms if _match_key(x)}
+            terms = {match_key(x) for x in spec.targets.merchant_terms if match_key(x)}
             filtered = [
-                r for r in filtered if _match_key(str(getattr(r, "description", "") or "")) in terms
+                r for r in filtered if match_key(str(getattr(r, "description", "") or "")) in terms
             ]
         return filtered
 
@@ -192,9 +192,9 @@ class QueryEngine:
         for value in values:
             subset = self.filter_rows(rows, build_filter(value))
             if exact and spec.targets.target_type == "merchant":
-                key = _match_key(value)
+                key = match_key(value)
                 subset = [
-                    r for r in subset if _match_key(str(getattr(r, "description", "") or "")) == key
+                    r for r in subset if match_key(str(getattr(r, "description", "") or "")) == key
                 ]
             out.append(
                 EntityComparison(
@@ -206,7 +206,3 @@ class QueryEngine:
                 )
             )
         return out
-
-
-def _match_key(s: str) -> str:
-    return norm(s).replace(" ", "")
@@ -10,7 +10,7 @@ from mono_ai_budget_bot.nlq.memory_store import (
     resolve_recipient_candidates,
 )
 from mono_ai_budget_bot.nlq.models import ResolutionState, Slots, canonical_intent_family
-from mono_ai_budget_bot.nlq.text_norm import norm
+from mono_ai_budget_bot.nlq.text_norm import match_key, norm
 from mono_ai_budget_bot.nlq.types import NLQIntent, NLQRequest
 
 ResolutionDecision = Literal["matched", "clarify", "not_found", "none"]
@@ -83,10 +83,6 @@ def _dedupe_normalized(values: list[str]) -> list[str]:
     return out
 
 
-def _merchant_key(value: str) -> str:
-    return norm(value).replace(" ", "")
-
-
 def _recipient_name_stems(alias: str) -> list[str]:
     raw = norm(alias)
     if not raw:
@@ -324,7 +320,7 @@ def resolve_merchant_by_evidence(
     normalized_values: list[str] = []
     seen: set[str] = set()
     for item in resolved:
-        key = _merchant_key(item)
+        key = match_key(item)
         if not key or key in seen:
             continue
         seen.add(key)
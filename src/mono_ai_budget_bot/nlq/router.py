@@ -126,6 +126,19 @@ _RECURRENCE_RE = re.compile(
     re.IGNORECASE,
 )
 
+_RECURRING_PAYMENTS_RE = re.compile(
+    r"\b(які\s+(?:\w+\s+){0,2}підписк\w*|мої\s+підписк\w*|список\s+підписок|"
+    r"регулярн\w*\s+(?:платеж\w*|списан\w*)|recurring\s+(?:payments?|charges?)|subscriptions?)\b",
+    re.IGNORECASE,
+)
+
+_UPCOMING_CHARGES_RE = re.compile(
+    r"\b(очікуван\w*\s+(?:\w+\s+)?списан\w*|найближч\w*\s+(?:\w+\s+)?списан\w*|"
+    r"списан\w*\s+(?:\w+\s+)?очіку\w*|(?:що|які)\s+(?:\w+\s+){0,2}спиш\w*|буде\s+списан\w*|"
+    r"upcoming\s+(?:charges?|payments?)|expected\s+charges?)\b",
+    re.IGNORECASE,
+)
+
 _THRESHOLD_RE = re.compile(
     r"\b(більше|более|more\s+than|over|понад|вище|дорожче|менше|меньше|less\s+than|under|дешевше|до)\s*(\d+(?:[.,]\d+)?)\s*(?:грн|uah|₴)?\b",
     re.IGNORECASE,
@@ -704,6 +717,16 @@ def parse_nlq_intent(user_text: str, now_ts: int | None = None) -> dict[str, Any
     elif direction is not None and threshold_uah is not None:
         intent = "threshold_query"
 
+    recurring_scope: str | None = None
+    want_upcoming_charges = _UPCOMING_CHARGES_RE.search(t) is not None
+    want_recurring_payments = _RECURRING_PAYMENTS_RE.search(t) is not None and not want_sum
+    if (want_upcoming_charges or want_recurring_payments) and not merchant and not recipient_alias:
+        intent = "recurrence_summary"
+        entity_kind = "spend"
+        category = None
+        category_targets = []
+        recurring_scope = "upcoming" if want_upcoming_charges else "series"
+
     llm_candidate = False
     slots_confidence = "high"
 
@@ -750,6 +773,7 @@ def parse_nlq_intent(user_text: str, now_ts: int | None = None) -> dict[str, Any
         "slots_confidence": slots_confidence,
         "llm_candidate": llm_candidate,
         "top_n": _extract_top_n(t) if intent in {"top_categories", "top_merchants"} else None,
+        "recurring_scope": recurring_scope,
     }
 
 
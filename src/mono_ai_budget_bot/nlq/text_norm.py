@@ -1,11 +1,5 @@
 from __future__ import annotations
 
-import re
+from mono_ai_budget_bot.core.text_norm import match_key, norm
 
-
-def norm(s: str) -> str:
-    t = (s or "").strip().lower()
-    t = t.replace("_", " ")
-    t = re.sub(r"[^\w]+", " ", t, flags=re.UNICODE)
-    t = re.sub(r"\s+", " ", t, flags=re.UNICODE).strip()
-    return t
+__all__ = ["match_key", "norm"]
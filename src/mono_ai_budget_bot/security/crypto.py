@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 
@@ -10,8 +11,13 @@ def get_master_key() -> bytes:
     return key.encode()
 
 
+@lru_cache(maxsize=4)
+def _fernet_for_key(key: bytes) -> Fernet:
+    return Fernet(key)
+
+
 def get_fernet() -> Fernet:
-    return Fernet(get_master_key())
+    return _fernet_for_key(get_master_key())
 
 
 def encrypt_token(token: str) -> str:
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from mono_ai_budget_bot.core.file_lock import read_text_locked, write_json_locked
+
+
+class CategorizationStore:
+    """
+    Per-user cached transaction categorizations (taxonomy.CategorizationCache):
+      .cache/reports/<telegram_user_id>/categorization.json
+    """
+
+    def __init__(self, root_dir: Path | None = None):
+        self.root_dir = root_dir or (Path(".cache") / "reports")
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, telegram_user_id: int) -> Path:
+        d = self.root_dir / str(telegram_user_id)
+        d.mkdir(parents=True, exist_ok=True)
+        return d / "categorization.json"
+
+    def save(self, telegram_user_id: int, payload: dict[str, Any]) -> Path:
+        path = self._path(telegram_user_id)
+        write_json_locked(path, payload, indent=None)
+        return path
+
+    def load(self, telegram_user_id: int) -> dict[str, Any] | None:
+        text = read_text_locked(self._path(telegram_user_id))
+        if text is None:
+            return None
+        try:
+            data = json.loads(text)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
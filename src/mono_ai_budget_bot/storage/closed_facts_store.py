@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+from mono_ai_budget_bot.core.file_lock import lock_path_for, read_text_locked, write_json_locked
+
+_KEY_RE = re.compile(r"^[A-Za-z0-9_.:-]{1,200}$")
+
+
+class ClosedFactsStore:
+    """
+    Per-user cache of facts for closed (fully past) report windows:
+      .cache/reports/<telegram_user_id>/closed/<key>.json
+
+    Keys are opaque (see analytics.closed_periods); the least recently written
+    entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, root_dir: Path | None = None, *, max_entries: int = 64):
+        self.root_dir = root_dir or (Path(".cache") / "reports")
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = int(max_entries)
+
+    def _dir(self, telegram_user_id: int) -> Path:
+        return self.root_dir / str(telegram_user_id) / "closed"
+
+    def _path(self, telegram_user_id: int, key: str) -> Path:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"invalid closed facts key: {key!r}")
+        return self._dir(telegram_user_id) / f"{key.replace(':', '_')}.json"
+
+    def get(self, telegram_user_id: int, key: str) -> dict[str, Any] | None:
+        text = read_text_locked(self._path(telegram_user_id, key))
+        if text is None:
+            return None
+        try:
+            data = json.loads(text)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def put(self, telegram_user_id: int, key: str, facts: dict[str, Any]) -> None:
+        path = self._path(telegram_user_id, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_locked(path, facts, indent=None)
+        self._evict(telegram_user_id)
+
+    def _evict(self, telegram_user_id: int) -> None:
+        files = list(self._dir(telegram_user_id).glob("*.json"))
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime_ns)
+        for p in files[: len(files) - self.max_entries]:
+            for victim in (p, lock_path_for(p)):
+                try:
+                    victim.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def bind(self, telegram_user_id: int) -> UserClosedFacts:
+        return UserClosedFacts(self, int(telegram_user_id))
+
+
+class UserClosedFacts:
+    """
+    ClosedFactsStore view for one user, as passed into the analytics pipeline.
+    """
+
+    def __init__(self, store: ClosedFactsStore, telegram_user_id: int):
+        self._store = store
+        self._uid = telegram_user_id
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._store.get(self._uid, key)
+
+    def put(self, key: str, facts: dict[str, Any]) -> None:
+        self._store.put(self._uid, key, facts)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from mono_ai_budget_bot.core.file_lock import read_text_locked, update_json_locked
+
+
+class FxAmountStore:
+    """
+    Per-user UAH amounts of foreign-currency transactions, converted with the rate of
+    the transaction's day ({tx_id: [amount, currency_code, uah_amount, utc_day]}):
+      .cache/reports/<telegram_user_id>/fx_amounts.json
+    """
+
+    def __init__(self, root_dir: Path | None = None):
+        self.root_dir = root_dir or (Path(".cache") / "reports")
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, telegram_user_id: int) -> Path:
+        d = self.root_dir / str(telegram_user_id)
+        d.mkdir(parents=True, exist_ok=True)
+        return d / "fx_amounts.json"
+
+    def load(self, telegram_user_id: int) -> dict[str, list[int]]:
+        text = read_text_locked(self._path(telegram_user_id))
+        if text is None:
+            return {}
+        try:
+            data = json.loads(text)
+        except Exception:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            str(k): [int(x) for x in v]
+            for k, v in data.items()
+            if isinstance(v, list) and len(v) == 4
+        }
+
+    def add(
+        self,
+        telegram_user_id: int,
+        converted: dict[str, list[int]],
+        *,
+        keep_from_day: int | None = None,
+    ) -> None:
+        """
+        Merges `converted` in; with `keep_from_day`, entries of earlier days are dropped.
+        """
+        if not converted:
+            return
+
+        def _merge(current: object) -> dict[str, list[int]]:
+            out = dict(current) if isinstance(current, dict) else {}
+            out.update(converted)
+            if keep_from_day is None:
+                return out
+            return {
+                k: v
+                for k, v in out.items()
+                if isinstance(v, list) and len(v) == 4 and int(v[3]) >= keep_from_day
+            }
+
+        update_json_locked(self._path(telegram_user_id), _merge, indent=None)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+from mono_ai_budget_bot.core.file_lock import read_text_locked, update_json_locked
+
+
+class FxHistoryStore:
+    """
+    Daily history of Monobank public rates (currency.history.FxHistory), shared by all
+    users:
+      .cache/mono_public/fx_history.json
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or (Path(".cache") / "mono_public" / "fx_history.json")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> dict[str, Any] | None:
+        text = read_text_locked(self.path)
+        if text is None:
+            return None
+        try:
+            data = json.loads(text)
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def update(self, fn: Callable[[Any], Any]) -> Any:
+        return update_json_locked(self.path, fn, indent=None)
@@ -4,7 +4,13 @@ import json
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+from mono_ai_budget_bot.core.file_lock import (
+    read_text_locked,
+    update_json_locked,
+    write_json_locked,
+)
 
 
 @dataclass(frozen=True)
@@ -50,19 +56,30 @@ class LedgerMetaStore:
         return self._user_dir(telegram_user_id) / "_meta.json"
 
     def load_raw(self, telegram_user_id: int) -> dict[str, Any]:
-        p = self._path(telegram_user_id)
-        if not p.exists():
-            return {}
         try:
-            return json.loads(p.read_text(encoding="utf-8"))
+            text = read_text_locked(self._path(telegram_user_id))
+            return json.loads(text) if text is not None else {}
         except Exception:
             return {}
 
     def save_raw(self, telegram_user_id: int, data: dict[str, Any]) -> None:
-        p = self._path(telegram_user_id)
-        tmp = p.with_suffix(".json.tmp")
-        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-        tmp.replace(p)
+        write_json_locked(self._path(telegram_user_id), data)
+
+    def _update_account(
+        self,
+        telegram_user_id: int,
+        account_id: str,
+        fn: Callable[[dict[str, Any]], None],
+    ) -> None:
+        def _apply(raw: Any) -> dict[str, Any]:
+            raw = raw if isinstance(raw, dict) else {}
+            cur = raw.get(account_id) or {}
+            fn(cur)
+            cur["last_sync_at"] = time.time()
+            raw[account_id] = cur
+            return raw
+
+        update_json_locked(self._path(telegram_user_id), _apply)
 
     def get(self, telegram_user_id: int, account_id: str) -> LedgerAccountMeta:
         raw = self.load_raw(telegram_user_id)
@@ -81,19 +98,15 @@ class LedgerMetaStore:
         )
 
     def update(self, telegram_user_id: int, account_id: str, *, last_ts: int | None) -> None:
-        raw = self.load_raw(telegram_user_id)
-        cur = raw.get(account_id) or {}
+        def _apply(cur: dict[str, Any]) -> None:
+            prev_ts = cur.get("last_ts")
+            prev_ts_int = int(prev_ts) if isinstance(prev_ts, (int, float)) else None
 
-        prev_ts = cur.get("last_ts")
-        prev_ts_int = int(prev_ts) if isinstance(prev_ts, (int, float)) else None
+            if last_ts is not None:
+                if prev_ts_int is None or last_ts > prev_ts_int:
+                    cur["last_ts"] = int(last_ts)
 
-        if last_ts is not None:
-            if prev_ts_int is None or last_ts > prev_ts_int:
-                cur["last_ts"] = int(last_ts)
-
-        cur["last_sync_at"] = time.time()
-        raw[account_id] = cur
-        self.save_raw(telegram_user_id, raw)
+        self._update_account(telegram_user_id, account_id, _apply)
 
     def update_coverage_window(
         self,
@@ -106,24 +119,20 @@ class LedgerMetaStore:
         if coverage_to_ts < coverage_from_ts:
             raise ValueError("coverage_to_ts must be >= coverage_from_ts")
 
-        raw = self.load_raw(telegram_user_id)
-        cur = raw.get(account_id) or {}
-
-        prev_from = cur.get("coverage_from_ts")
-        prev_to = cur.get("coverage_to_ts")
+        def _apply(cur: dict[str, Any]) -> None:
+            prev_from = cur.get("coverage_from_ts")
+            prev_to = cur.get("coverage_to_ts")
 
-        prev_from_int = int(prev_from) if isinstance(prev_from, (int, float)) else None
-        prev_to_int = int(prev_to) if isinstance(prev_to, (int, float)) else None
+            prev_from_int = int(prev_from) if isinstance(prev_from, (int, float)) else None
+            prev_to_int = int(prev_to) if isinstance(prev_to, (int, float)) else None
 
-        if prev_from_int is None or int(coverage_from_ts) < prev_from_int:
-            cur["coverage_from_ts"] = int(coverage_from_ts)
+            if prev_from_int is None or int(coverage_from_ts) < prev_from_int:
+                cur["coverage_from_ts"] = int(coverage_from_ts)
 
-        if prev_to_int is None or int(coverage_to_ts) > prev_to_int:
-            cur["coverage_to_ts"] = int(coverage_to_ts)
+            if prev_to_int is None or int(coverage_to_ts) > prev_to_int:
+                cur["coverage_to_ts"] = int(coverage_to_ts)
 
-        cur["last_sync_at"] = time.time()
-        raw[account_id] = cur
-        self.save_raw(telegram_user_id, raw)
+        self._update_account(telegram_user_id, account_id, _apply)
 
     def get_coverage_window(self, telegram_user_id: int, account_id: str) -> tuple[int, int] | None:
         meta = self.get(telegram_user_id, account_id)
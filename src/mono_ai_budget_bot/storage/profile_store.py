@@ -4,8 +4,17 @@ import json
 from pathlib import Path
 from typing import Any
 
+from mono_ai_budget_bot.core.file_lock import lock_path_for, read_text_locked, write_json_locked
+
 
 class ProfileStore:
+    """
+    Per-user profile (settings and spending summary) and the spending baseline it is
+    derived from (analytics.profile.SpendingBaseline):
+      <base_dir>/<user_id>.json
+      <base_dir>/<user_id>.baseline.json
+    """
+
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -14,13 +23,31 @@ class ProfileStore:
         return self.base_dir / f"{user_id}.json"
 
     def save(self, user_id: int, profile: dict[str, Any]) -> None:
-        self._path(user_id).write_text(
-            json.dumps(profile, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        write_json_locked(self._path(user_id), profile)
 
     def load(self, user_id: int) -> dict[str, Any] | None:
-        p = self._path(user_id)
-        if not p.exists():
+        text = read_text_locked(self._path(user_id))
+        if text is None:
+            return None
+        return json.loads(text)
+
+    def _baseline_path(self, user_id: int) -> Path:
+        return self.base_dir / f"{user_id}.baseline.json"
+
+    def save_baseline(self, user_id: int, payload: dict[str, Any]) -> None:
+        write_json_locked(self._baseline_path(user_id), payload, indent=None)
+
+    def delete_baseline(self, user_id: int) -> None:
+        path = self._baseline_path(user_id)
+        path.unlink(missing_ok=True)
+        lock_path_for(path).unlink(missing_ok=True)
+
+    def load_baseline(self, user_id: int) -> dict[str, Any] | None:
+        text = read_text_locked(self._baseline_path(user_id))
+        if text is None:
+            return None
+        try:
+            data = json.loads(text)
+        except Exception:
             return None
-        return json.loads(p.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
@@ -19,7 +19,7 @@ class ReportStore:
     Per-user local cache:
       .cache/reports/<telegram_user_id>/facts_<period>.json
 
-    period: today | week | month
+    period: today | week | month | week_to_date | month_to_date
     """
 
     def __init__(self, root_dir: Path | None = None):
@@ -4,6 +4,11 @@ import json
 from dataclasses import asdict
 from pathlib import Path
 
+from mono_ai_budget_bot.core.file_lock import (
+    read_text_locked,
+    update_json_locked,
+    write_json_locked,
+)
 from mono_ai_budget_bot.taxonomy.rules import Rule
 
 
@@ -16,11 +21,11 @@ class RulesStore:
         return self.base_dir / f"{int(user_id)}.json"
 
     def load(self, user_id: int) -> list[Rule]:
-        p = self._path(user_id)
-        if not p.exists():
-            return []
         try:
-            raw = json.loads(p.read_text(encoding="utf-8"))
+            text = read_text_locked(self._path(user_id))
+            if text is None:
+                return []
+            raw = json.loads(text)
         except Exception:
             return []
         if not isinstance(raw, list):
@@ -53,13 +58,13 @@ class RulesStore:
         return out
 
     def save(self, user_id: int, rules: list[Rule]) -> None:
-        self._path(user_id).write_text(
-            json.dumps([asdict(r) for r in rules], ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        write_json_locked(self._path(user_id), [asdict(r) for r in rules])
 
     def add(self, user_id: int, rule: Rule) -> None:
-        rules = self.load(user_id)
-        rules = [r for r in rules if r.id != rule.id]
-        rules.append(rule)
-        self.save(user_id, rules)
+        def _upsert(raw):
+            items = raw if isinstance(raw, list) else []
+            items = [x for x in items if not (isinstance(x, dict) and x.get("id") == rule.id)]
+            items.append(asdict(rule))
+            return items
+
+        update_json_locked(self._path(user_id), _upsert)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import json
+import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterable
 
+from mono_ai_budget_bot.core.file_lock import read_locked, write_locked
+
 from .ledger_meta_store import LedgerMetaStore
 
+_TIME_RE = re.compile(r'"time":\s*(-?\d+)')
+
 
 @dataclass(frozen=True)
 class TxRecord:
@@ -19,6 +24,25 @@ class TxRecord:
     currencyCode: int | None
 
 
+def tx_record_to_list(r: TxRecord) -> list[Any]:
+    """
+    Compact JSON form for caches that keep a few raw records.
+    """
+    return [r.id, r.time, r.account_id, r.amount, r.description, r.mcc, r.currencyCode]
+
+
+def tx_record_from_list(v: list[Any]) -> TxRecord:
+    return TxRecord(
+        id=str(v[0]),
+        time=int(v[1]),
+        account_id=str(v[2]),
+        amount=int(v[3]),
+        description=str(v[4] or ""),
+        mcc=int(v[5]) if v[5] is not None else None,
+        currencyCode=int(v[6]) if v[6] is not None else None,
+    )
+
+
 class TxStore:
     """
     Per-user transaction ledger stored as JSONL:
@@ -26,6 +50,10 @@ class TxStore:
       .cache/tx/<telegram_user_id>/<account_id>.jsonl
 
     Each line is a JSON object for a transaction.
+
+    Ledger files are guarded by core.file_lock: appends take an exclusive lock,
+    reads a shared one, so concurrent syncs/readers (threads or processes) never
+    see torn lines or double-append the same tx.
     """
 
     def __init__(self, root_dir: Path | None = None):
@@ -52,7 +80,9 @@ class TxStore:
 
         last: int | None = None
         try:
-            for line in path.read_text(encoding="utf-8").splitlines():
+            with read_locked(path):
+                text = path.read_text(encoding="utf-8")
+            for line in text.splitlines():
                 if not line.strip():
                     continue
                 obj = json.loads(line)
@@ -107,6 +137,9 @@ class TxStore:
         return start_ts, end_ts
 
     def _load_ids_set(self, telegram_user_id: int, account_id: str) -> set[str]:
+        """
+        Caller must hold write_locked() on the ledger path.
+        """
         path = self._path(telegram_user_id, account_id)
         ids: set[str] = set()
         if not path.exists():
@@ -130,18 +163,23 @@ class TxStore:
         Append new transactions (dedupe by tx id). Returns count of appended rows.
         """
         path = self._path(telegram_user_id, account_id)
-        ids = self._load_ids_set(telegram_user_id, account_id)
+        items = list(items)
 
         appended = 0
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as f:
+        with write_locked(path):
+            ids = self._load_ids_set(telegram_user_id, account_id)
+            lines: list[str] = []
             for it in items:
                 tid = str(it.get("id", "")).strip()
                 if not tid or tid in ids:
                     continue
-                f.write(json.dumps(it, ensure_ascii=False) + "\n")
+                lines.append(json.dumps(it, ensure_ascii=False) + "\n")
                 ids.add(tid)
                 appended += 1
+            if lines:
+                with path.open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    f.flush()
         if appended > 0:
             max_t: int | None = None
             for it in items:
@@ -154,6 +192,20 @@ class TxStore:
             self._meta.update(telegram_user_id, account_id, last_ts=max_t)
         return appended
 
+    def ledger_fingerprint(self, telegram_user_id: int, account_ids: list[str]) -> list[list[Any]]:
+        """
+        Cheap change marker for caches derived from the ledger: [account_id, size, mtime_ns].
+        """
+        out: list[list[Any]] = []
+        for acc_id in sorted(account_ids):
+            try:
+                st = self._path(telegram_user_id, acc_id).stat()
+            except FileNotFoundError:
+                out.append([acc_id, 0, 0])
+                continue
+            out.append([acc_id, int(st.st_size), int(st.st_mtime_ns)])
+        return out
+
     def load_range(
         self,
         telegram_user_id: int,
@@ -167,30 +219,77 @@ class TxStore:
             if not path.exists():
                 continue
             try:
-                for line in path.read_text(encoding="utf-8").splitlines():
+                with read_locked(path):
+                    text = path.read_text(encoding="utf-8")
+                for line in text.splitlines():
                     if not line.strip():
                         continue
+                    m = _TIME_RE.search(line)
+                    if m is not None and not (ts_from <= int(m.group(1)) <= ts_to):
+                        continue
                     obj = json.loads(line)
                     t = int(obj.get("time", 0))
                     if t < ts_from or t > ts_to:
                         continue
-                    rows.append(
-                        TxRecord(
-                            id=str(obj.get("id", "")),
-                            time=t,
-                            account_id=str(obj.get("account_id", acc_id)),
-                            amount=int(obj.get("amount", 0)),
-                            description=str(obj.get("description", "") or "").strip(),
-                            mcc=(int(obj["mcc"]) if obj.get("mcc") is not None else None),
-                            currencyCode=(
-                                int(obj["currencyCode"])
-                                if obj.get("currencyCode") is not None
-                                else None
-                            ),
-                        )
-                    )
+                    rows.append(_record_from_obj(obj, acc_id))
             except Exception:
                 continue
 
         rows.sort(key=lambda r: r.time)
         return rows
+
+    def ledger_offsets(self, telegram_user_id: int, account_ids: list[str]) -> dict[str, int]:
+        """
+        Current byte size of each account ledger, i.e. the offset new appends start at.
+        """
+        out: dict[str, int] = {}
+        for acc_id in account_ids:
+            try:
+                out[acc_id] = int(self._path(telegram_user_id, acc_id).stat().st_size)
+            except FileNotFoundError:
+                out[acc_id] = 0
+        return out
+
+    def load_appended(
+        self, telegram_user_id: int, account_id: str, offset: int
+    ) -> tuple[list[TxRecord], int] | None:
+        """
+        Records appended to one account ledger after byte `offset`, plus the new offset.
+
+        Only complete lines are consumed. Returns None when the ledger is shorter than
+        `offset` (wiped or rewritten), so the caller must rebuild from load_range().
+        """
+        path = self._path(telegram_user_id, account_id)
+        if not path.exists():
+            return None if offset > 0 else ([], 0)
+        with read_locked(path):
+            with path.open("rb") as f:
+                f.seek(0, 2)
+                size = f.tell()
+                if size < offset:
+                    return None
+                f.seek(offset)
+                chunk = f.read(size - offset)
+
+        end = chunk.rfind(b"\n") + 1
+        rows: list[TxRecord] = []
+        for line in chunk[:end].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(_record_from_obj(json.loads(line), account_id))
+            except Exception:
+                continue
+        return rows, offset + end
+
+
+def _record_from_obj(obj: dict[str, Any], account_id: str) -> TxRecord:
+    return TxRecord(
+        id=str(obj.get("id", "")),
+        time=int(obj.get("time", 0)),
+        account_id=str(obj.get("account_id", account_id)),
+        amount=int(obj.get("amount", 0)),
+        description=str(obj.get("description", "") or "").strip(),
+        mcc=(int(obj["mcc"]) if obj.get("mcc") is not None else None),
+        currencyCode=(int(obj["currencyCode"]) if obj.get("currencyCode") is not None else None),
+    )
@@ -2,11 +2,28 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from mono_ai_budget_bot.uncat.queue import UncatItem
+from mono_ai_budget_bot.core.file_lock import atomic_write_text, read_locked, write_locked
+
+if TYPE_CHECKING:
+    from mono_ai_budget_bot.uncat.queue import UncatItem
+
+# Log lines after which push()/remove() fold the log back into the snapshot.
+COMPACT_AFTER_OPS = 256
 
 
 class UncatStore:
+    """
+    Per-user uncategorized-purchase queue:
+      .cache/uncat/<telegram_user_id>.json       snapshot (list of items)
+      .cache/uncat/<telegram_user_id>.log.jsonl  ops since the snapshot
+
+    push() prepends items and remove() tombstones tx ids by appending one line each, so
+    incremental refreshes don't rewrite the queue. save() replaces the whole queue and
+    doubles as compaction.
+    """
+
     def __init__(self, base_dir: Path | None = None):
         self.base_dir = base_dir or (Path(".cache") / "uncat")
         self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -14,21 +31,76 @@ class UncatStore:
     def _path(self, user_id: int) -> Path:
         return self.base_dir / f"{user_id}.json"
 
+    def _log_path(self, user_id: int) -> Path:
+        return self.base_dir / f"{user_id}.log.jsonl"
+
+    def _read(self, user_id: int) -> tuple[list[UncatItem], int] | None:
+        # Imported here: uncat.queue depends on taxonomy, which imports storage.
+        from mono_ai_budget_bot.uncat.queue import UncatItem
+
+        path = self._path(user_id)
+        log_path = self._log_path(user_id)
+        if not path.exists() and not log_path.exists():
+            return None
+
+        items: list[UncatItem] = []
+        if path.exists():
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(raw, list):
+                items = [UncatItem.from_dict(x) for x in raw if isinstance(x, dict)]
+
+        n_ops = 0
+        if log_path.exists():
+            for line in log_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    op = json.loads(line)
+                except Exception:
+                    continue
+                if not isinstance(op, dict):
+                    continue
+                n_ops += 1
+                if op.get("op") == "add" and isinstance(op.get("items"), list):
+                    added = [UncatItem.from_dict(x) for x in op["items"] if isinstance(x, dict)]
+                    ids = {x.tx_id for x in added}
+                    items = added + [x for x in items if x.tx_id not in ids]
+                elif op.get("op") == "del" and isinstance(op.get("tx_ids"), list):
+                    gone = {str(x) for x in op["tx_ids"]}
+                    items = [x for x in items if x.tx_id not in gone]
+        return items, n_ops
+
+    def _write_snapshot(self, user_id: int, items: list[UncatItem]) -> None:
+        payload = json.dumps([it.to_dict() for it in items], ensure_ascii=False)
+        atomic_write_text(self._path(user_id), payload)
+        self._log_path(user_id).unlink(missing_ok=True)
+
+    def _append(self, user_id: int, op: dict) -> None:
+        with write_locked(self._path(user_id)):
+            with self._log_path(user_id).open("a", encoding="utf-8") as f:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            state = self._read(user_id)
+            if state is not None and state[1] >= COMPACT_AFTER_OPS:
+                self._write_snapshot(user_id, state[0])
+
+    def exists(self, user_id: int) -> bool:
+        with read_locked(self._path(user_id)):
+            return self._path(user_id).exists() or self._log_path(user_id).exists()
+
     def save(self, user_id: int, items: list[UncatItem]) -> None:
-        self._path(user_id).write_text(
-            json.dumps([it.to_dict() for it in items], ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        with write_locked(self._path(user_id)):
+            self._write_snapshot(user_id, list(items))
 
     def load(self, user_id: int) -> list[UncatItem]:
-        p = self._path(user_id)
-        if not p.exists():
-            return []
-        raw = json.loads(p.read_text(encoding="utf-8"))
-        if not isinstance(raw, list):
-            return []
-        out: list[UncatItem] = []
-        for x in raw:
-            if isinstance(x, dict):
-                out.append(UncatItem.from_dict(x))
-        return out
+        with read_locked(self._path(user_id)):
+            state = self._read(user_id)
+        return state[0] if state is not None else []
+
+    def push(self, user_id: int, items: list[UncatItem]) -> None:
+        """
+        Put `items` (in the given order) at the front of the queue.
+        """
+        if items:
+            self._append(user_id, {"op": "add", "items": [it.to_dict() for it in items]})
+
+    def remove(self, user_id: int, tx_ids: list[str]) -> None:
+        if tx_ids:
+            self._append(user_id, {"op": "del", "tx_ids": [str(x) for x in tx_ids]})
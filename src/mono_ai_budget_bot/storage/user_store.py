@@ -6,8 +6,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Iterator
 
+from mono_ai_budget_bot.core.file_lock import (
+    read_text_locked,
+    update_json_locked,
+    write_json_locked,
+)
 from mono_ai_budget_bot.security.crypto import decrypt_token, encrypt_token
 
+_ENC_PREFIX = "gAAAAA"
+
 
 @dataclass(frozen=True)
 class UserConfig:
@@ -19,12 +26,55 @@ class UserConfig:
     updated_at: float
 
 
+@dataclass(frozen=True)
+class RosterEntry:
+    telegram_user_id: int
+    chat_id: int | None
+    autojobs_enabled: bool
+    selected_accounts_count: int
+    updated_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "chat_id": self.chat_id,
+            "autojobs_enabled": self.autojobs_enabled,
+            "selected_accounts_count": self.selected_accounts_count,
+            "updated_at": self.updated_at,
+        }
+
+    @staticmethod
+    def from_dict(telegram_user_id: int, d: dict[str, Any]) -> RosterEntry:
+        return RosterEntry(
+            telegram_user_id=int(telegram_user_id),
+            chat_id=(int(d["chat_id"]) if d.get("chat_id") is not None else None),
+            autojobs_enabled=bool(d.get("autojobs_enabled", True)),
+            selected_accounts_count=int(d.get("selected_accounts_count") or 0),
+            updated_at=float(d.get("updated_at", 0.0)),
+        )
+
+
+def _roster_entry_from_raw(telegram_user_id: int, data: dict[str, Any]) -> RosterEntry:
+    accounts = data.get("selected_account_ids")
+    return RosterEntry(
+        telegram_user_id=int(telegram_user_id),
+        chat_id=(int(data["chat_id"]) if data.get("chat_id") is not None else None),
+        autojobs_enabled=bool(data.get("autojobs_enabled", True)),
+        selected_accounts_count=len(accounts) if isinstance(accounts, list) else 0,
+        updated_at=float(data.get("updated_at", 0.0)),
+    )
+
+
 class UserStore:
     """
     Local disk store for per-user config (mono token, selected accounts, chat_id, autojobs_enabled).
     Stored under .cache/users/<telegram_user_id>.json
+
+    A secret-free roster index (.cache/users/_roster.json) is maintained on save, so
+    scheduled scans can filter users without parsing every file or decrypting tokens.
     """
 
+    ROSTER_FILE = "_roster.json"
+
     def __init__(self, root_dir: Path | None = None):
         self.root_dir = root_dir or (Path(".cache") / "users")
         self.root_dir.mkdir(parents=True, exist_ok=True)
@@ -32,6 +82,12 @@ class UserStore:
     def _path(self, telegram_user_id: int) -> Path:
         return self.root_dir / f"{telegram_user_id}.json"
 
+    def _roster_path(self) -> Path:
+        return self.root_dir / self.ROSTER_FILE
+
+    def _write_json(self, path: Path, payload: Any, *, indent: int | None = 2) -> None:
+        write_json_locked(path, payload, indent=indent)
+
     def save(
         self,
         telegram_user_id: int,
@@ -43,11 +99,12 @@ class UserStore:
         existing = self.load_raw(telegram_user_id)
 
         if mono_token is not None:
-            token_plain = mono_token
+            token_enc = encrypt_token(mono_token) if mono_token else ""
         else:
-            token_plain = existing.get("mono_token", "")
-
-        token_enc = encrypt_token(token_plain) if token_plain else ""
+            stored = str(existing.get("mono_token", "") or "")
+            if stored and not stored.startswith(_ENC_PREFIX):
+                stored = encrypt_token(stored)
+            token_enc = stored
 
         payload: dict[str, Any] = {
             "telegram_user_id": telegram_user_id,
@@ -67,33 +124,31 @@ class UserStore:
         }
 
         path = self._path(telegram_user_id)
-        tmp = path.with_suffix(".json.tmp")
-        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        tmp.replace(path)
+        self._write_json(path, payload)
+        self._update_roster(_roster_entry_from_raw(telegram_user_id, payload))
         return path
 
     def load_raw(self, telegram_user_id: int) -> dict[str, Any]:
-        path = self._path(telegram_user_id)
-        if not path.exists():
-            return {}
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            text = read_text_locked(self._path(telegram_user_id))
+            return json.loads(text) if text is not None else {}
         except Exception:
             return {}
 
     def load(self, telegram_user_id: int) -> UserConfig | None:
         path = self._path(telegram_user_id)
-        if not path.exists():
-            return None
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
+            text = read_text_locked(path)
+            if text is None:
+                return None
+            data = json.loads(text)
 
             token_stored = str(data.get("mono_token", ""))
 
-            if token_stored and not token_stored.startswith("gAAAAA"):
+            if token_stored and not token_stored.startswith(_ENC_PREFIX):
                 token_enc = encrypt_token(token_stored)
                 data["mono_token"] = token_enc
-                path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+                self._write_json(path, data)
                 token_stored = token_enc
 
             token_plain = decrypt_token(token_stored) if token_stored else ""
@@ -109,15 +164,89 @@ class UserStore:
         except Exception:
             return None
 
-    def iter_all(self) -> Iterator[UserConfig]:
+    def _load_roster_raw(self) -> dict[str, Any] | None:
+        try:
+            text = read_text_locked(self._roster_path())
+            if text is None:
+                return None
+            raw = json.loads(text)
+        except Exception:
+            return None
+        return raw if isinstance(raw, dict) else None
+
+    def _update_roster(self, entry: RosterEntry) -> None:
+        if self._load_roster_raw() is None:
+            self.rebuild_roster()
+            return
+
+        def _apply(raw: Any) -> dict[str, Any]:
+            raw = raw if isinstance(raw, dict) else {}
+            raw[str(entry.telegram_user_id)] = entry.to_dict()
+            return raw
+
+        update_json_locked(self._roster_path(), _apply, indent=None)
+
+    def rebuild_roster(self) -> list[RosterEntry]:
         """
-        Iterate all users in .cache/users directory.
+        Rebuild the roster index from user files (no token decryption).
         """
+        entries: list[RosterEntry] = []
         for p in self.root_dir.glob("*.json"):
             try:
                 telegram_user_id = int(p.stem)
             except Exception:
                 continue
-            cfg = self.load(telegram_user_id)
+            data = self.load_raw(telegram_user_id)
+            if not data:
+                continue
+            entries.append(_roster_entry_from_raw(telegram_user_id, data))
+
+        raw = {str(e.telegram_user_id): e.to_dict() for e in entries}
+        self._write_json(self._roster_path(), raw, indent=None)
+        return entries
+
+    def roster(self) -> list[RosterEntry]:
+        raw = self._load_roster_raw()
+        if raw is None:
+            return self.rebuild_roster()
+
+        out: list[RosterEntry] = []
+        for k, v in raw.items():
+            if not isinstance(v, dict):
+                continue
+            try:
+                out.append(RosterEntry.from_dict(int(k), v))
+            except Exception:
+                continue
+        return out
+
+    def roster_entry(self, telegram_user_id: int) -> RosterEntry | None:
+        data = self.load_raw(telegram_user_id)
+        if not data:
+            return None
+        return _roster_entry_from_raw(telegram_user_id, data)
+
+    def iter_roster(
+        self,
+        *,
+        autojobs_only: bool = False,
+        require_chat: bool = False,
+        require_accounts: bool = False,
+    ) -> Iterator[RosterEntry]:
+        for e in self.roster():
+            if autojobs_only and not e.autojobs_enabled:
+                continue
+            if require_chat and not e.chat_id:
+                continue
+            if require_accounts and e.selected_accounts_count <= 0:
+                continue
+            yield e
+
+    def iter_all(self) -> Iterator[UserConfig]:
+        """
+        Iterate all users from the roster index (decrypts each token; prefer iter_roster).
+        """
+        for e in self.roster():
+            cfg = self.load(e.telegram_user_id)
             if cfg is not None:
                 yield cfg
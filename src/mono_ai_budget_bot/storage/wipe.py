@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from mono_ai_budget_bot.core.file_lock import lock_path_for
+from mono_ai_budget_bot.storage.profile_store import ProfileStore
 from mono_ai_budget_bot.storage.report_store import ReportStore
 from mono_ai_budget_bot.storage.rules_store import RulesStore
 from mono_ai_budget_bot.storage.tx_store import TxStore
@@ -16,6 +18,11 @@ def _safe_unlink(path: Path) -> None:
         return
 
 
+def _unlink_with_lock(path: Path) -> None:
+    _safe_unlink(path)
+    _safe_unlink(lock_path_for(path))
+
+
 def _safe_rmtree(path: Path) -> None:
     if not path.exists():
         return
@@ -48,10 +55,18 @@ def wipe_user_financial_cache(
     rules_store: RulesStore,
     uncat_store: UncatStore,
     uncat_pending_store: UncatPendingStore,
+    profile_store: ProfileStore,
 ) -> None:
+    """
+    Removes everything derived from the user's ledgers. Profile settings are kept, but
+    the spending baseline goes: it resumes from ledger byte offsets, which would point
+    into the re-synced ledgers.
+    """
     _safe_rmtree(tx_store.root_dir / str(int(telegram_user_id)))
     _safe_rmtree(report_store.root_dir / str(int(telegram_user_id)))
 
-    _safe_unlink(rules_store.base_dir / f"{int(telegram_user_id)}.json")
-    _safe_unlink(uncat_store.base_dir / f"{int(telegram_user_id)}.json")
-    _safe_unlink(uncat_pending_store.base_dir / f"{int(telegram_user_id)}.json")
+    _unlink_with_lock(rules_store.base_dir / f"{int(telegram_user_id)}.json")
+    _unlink_with_lock(uncat_store.base_dir / f"{int(telegram_user_id)}.json")
+    _safe_unlink(uncat_store.base_dir / f"{int(telegram_user_id)}.log.jsonl")
+    _unlink_with_lock(uncat_pending_store.base_dir / f"{int(telegram_user_id)}.json")
+    profile_store.delete_baseline(int(telegram_user_id))
@@ -1,3 +1,4 @@
+from mono_ai_budget_bot.taxonomy.compiled import CompiledCategorizer, compiled_categorizer
 from mono_ai_budget_bot.taxonomy.models import (
     TaxKind,
     TaxNode,
@@ -39,6 +40,8 @@ __all__ = [
     "Rule",
     "CATEGORIZATION_PRIORITY",
     "categorize_tx",
+    "CompiledCategorizer",
+    "compiled_categorizer",
     "find_leaf_by_name",
     "TaxPreset",
     "build_taxonomy_preset",
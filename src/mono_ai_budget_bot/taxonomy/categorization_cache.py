@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterable, Sequence
+
+from mono_ai_budget_bot.analytics.categories import category_from_mcc
+from mono_ai_budget_bot.core.text_norm import collapse_ws, compact
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+from mono_ai_budget_bot.taxonomy.compiled import compiled_categorizer
+from mono_ai_budget_bot.taxonomy.ledger_index import LedgerIndex
+from mono_ai_budget_bot.taxonomy.models import TaxonomyMigrationDecision
+from mono_ai_budget_bot.taxonomy.rules import Categorization, Rule
+
+CATEGORIZATION_CACHE_VERSION = 2
+PROGRESS_EVERY = 1000
+
+
+def _tree_fingerprint(tax: dict[str, Any]) -> str:
+    tree = {k: v for k, v in tax.items() if k != "alias_terms"}
+    payload = json.dumps(tree, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _tree_before_migration(tax: dict[str, Any], migration: TaxonomyMigrationDecision) -> str:
+    """
+    Fingerprint of `tax` with the migration's new subcategory taken out again, i.e. the
+    tree a cache refreshed right before the migration was computed under.
+    """
+    undone = copy.deepcopy({k: v for k, v in tax.items() if k != "alias_terms"})
+    nodes = undone.get("nodes")
+    if not isinstance(nodes, dict):
+        return ""
+    nodes.pop(migration.target_leaf_id, None)
+    source = nodes.get(migration.source_leaf_id)
+    if isinstance(source, dict) and isinstance(source.get("children"), list):
+        source["children"] = [c for c in source["children"] if c != migration.target_leaf_id]
+    return _tree_fingerprint(undone)
+
+
+def _alias_pairs(tax: dict[str, Any]) -> list[list[str]]:
+    raw = tax.get("alias_terms")
+    if not isinstance(raw, dict):
+        return []
+    out: list[list[str]] = []
+    for key, terms in raw.items():
+        if not isinstance(key, str) or not isinstance(terms, list):
+            continue
+        out.extend([key, t.strip()] for t in terms if isinstance(t, str) and t.strip())
+    return out
+
+
+def _diff(old: Sequence[Any], new: Sequence[Any]) -> tuple[list[Any], bool]:
+    """
+    Items present on one side only, and whether the shared items changed order
+    (which can change first-match precedence for any transaction).
+    """
+    old_keys = [json.dumps(x, sort_keys=True, default=str) for x in old]
+    new_keys = [json.dumps(x, sort_keys=True, default=str) for x in new]
+    old_set, new_set = set(old_keys), set(new_keys)
+    changed = [x for x, k in zip(old, old_keys, strict=True) if k not in new_set]
+    changed += [x for x, k in zip(new, new_keys, strict=True) if k not in old_set]
+    reordered = [k for k in old_keys if k in new_set] != [k for k in new_keys if k in old_set]
+    return changed, reordered
+
+
+@dataclass
+class CategorizationCache:
+    """
+    Per-transaction categorize_tx() results plus a snapshot of the inputs they were
+    computed under (taxonomy tree fingerprint, rules, alias terms).
+
+    refresh() diffs the snapshot against the current inputs: a changed rule or alias
+    term re-evaluates only the transactions it could match (MCC/needle index); a tree
+    edit or a precedence reorder re-evaluates everything.
+
+    While the inputs are unchanged, add_records() folds in new transactions and
+    prune() drops ones that left the window, so a refresh costs O(new transactions);
+    `offsets` are the ledger byte offsets already folded in (TxStore.load_appended).
+
+    After refresh()/add_records(), `evaluated` holds the records that were
+    (re)categorized and `full_refresh` tells whether that was every record (nothing
+    reusable). Entries are [bucket, leaf_id, reason, tx time].
+    """
+
+    tree: str = ""
+    rules: list[dict[str, Any]] = field(default_factory=list)
+    aliases: list[list[str]] = field(default_factory=list)
+    entries: dict[str, list[Any]] = field(default_factory=dict)
+    offsets: dict[str, int] = field(default_factory=dict)
+    evaluated: list[TxRecord] = field(default_factory=list, compare=False, repr=False)
+    full_refresh: bool = field(default=False, compare=False, repr=False)
+
+    def _stale_ids(
+        self,
+        records: list[TxRecord],
+        *,
+        tax: dict[str, Any],
+        tree: str,
+        rules,
+        aliases,
+        migration: TaxonomyMigrationDecision | None = None,
+    ) -> set[str] | None:
+        """
+        None means "everything"; otherwise the tx ids whose cached result may differ.
+        """
+        stale: set[str] = set()
+        if tree != self.tree:
+            if migration is None or _tree_before_migration(tax, migration) != self.tree:
+                return None
+            stale = self._migrated_ids(records, tax=tax, migration=migration)
+        changed_rules, rules_reordered = _diff(self.rules, rules)
+        changed_aliases, aliases_reordered = _diff(self.aliases, aliases)
+        if rules_reordered or aliases_reordered:
+            return None
+        if not changed_rules and not changed_aliases:
+            return stale
+
+        index = LedgerIndex(records)
+        for rule in changed_rules:
+            stale |= index.could_match_rule(rule)
+        for _key, term in changed_aliases:
+            needle = compact(term)
+            if needle:
+                stale |= index.containing([needle])
+        return stale
+
+    def _migrated_ids(
+        self,
+        records: list[TxRecord],
+        *,
+        tax: dict[str, Any],
+        migration: TaxonomyMigrationDecision,
+    ) -> set[str]:
+        """
+        Transactions a leaf -> parent migration can move: everything cached under the
+        old leaf (which is no longer a valid target), plus MCC-fallback candidates whose
+        MCC category name now resolves to the new subcategory.
+        """
+        source = migration.source_leaf_id
+        stale = {tx_id for tx_id, e in self.entries.items() if e[1] == source}
+
+        node = tax.get("nodes", {}).get(migration.target_leaf_id)
+        name = node.get("name") if isinstance(node, dict) else migration.target_leaf_name
+        target_name = collapse_ws(str(name or ""))
+        by_mcc: dict[int, bool] = {}
+        for r in records:
+            if r.mcc is None:
+                continue
+            mcc = int(r.mcc)
+            hit = by_mcc.get(mcc)
+            if hit is None:
+                hit = by_mcc[mcc] = collapse_ws(category_from_mcc(mcc) or "") == target_name
+            if hit:
+                stale.add(r.id)
+        return stale
+
+    def refresh(
+        self,
+        records: list[TxRecord],
+        *,
+        tax: dict[str, Any],
+        rules: Sequence[Rule],
+        migration: TaxonomyMigrationDecision | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, Categorization]:
+        """
+        Categorizations for `records` by tx id (alias terms come from the taxonomy, as in
+        build_uncat_queue). Entries for transactions no longer in `records` are dropped.
+
+        `migration` names the subcategory migration applied to `tax` since the last
+        refresh, so only the transactions it can move are re-evaluated instead of all
+        of them. `progress(done, total)` is called every PROGRESS_EVERY re-evaluations.
+        """
+        tree = _tree_fingerprint(tax)
+        rule_dicts = [asdict(r) for r in rules]
+        aliases = _alias_pairs(tax)
+
+        stale = None
+        if self.entries:
+            stale = self._stale_ids(
+                records,
+                tax=tax,
+                tree=tree,
+                rules=rule_dicts,
+                aliases=aliases,
+                migration=migration,
+            )
+        categorizer = compiled_categorizer(tax=tax, rules=rules)
+        evaluated: list[TxRecord] = []
+        total = len(records) if stale is None else len(stale)
+
+        interned: dict[tuple[Any, ...], Categorization] = {}
+        entries: dict[str, list[Any]] = {}
+        out: dict[str, Categorization] = {}
+        for tx in records:
+            if tx.id in out:
+                continue
+            cached = self.entries.get(tx.id)
+            if cached is not None and stale is not None and tx.id not in stale:
+                key = (cached[0], cached[1], cached[2])
+                res = interned.get(key)
+                if res is None:
+                    res = interned[key] = Categorization(
+                        bucket=cached[0], leaf_id=cached[1], reason=cached[2]
+                    )
+            else:
+                res = categorizer.categorize(tx)
+                evaluated.append(tx)
+                if progress is not None and len(evaluated) % PROGRESS_EVERY == 0:
+                    progress(len(evaluated), total)
+            out[tx.id] = res
+            entries[tx.id] = [res.bucket, res.leaf_id, res.reason, int(tx.time)]
+
+        self.tree = tree
+        self.rules = rule_dicts
+        self.aliases = aliases
+        self.entries = entries
+        self.evaluated = evaluated
+        if progress is not None:
+            progress(len(evaluated), max(total, len(evaluated)))
+        self.full_refresh = stale is None
+        return out
+
+    def inputs_match(self, *, tax: dict[str, Any], rules: Sequence[Rule]) -> bool:
+        return (
+            self.tree == _tree_fingerprint(tax)
+            and self.rules == [asdict(r) for r in rules]
+            and self.aliases == _alias_pairs(tax)
+        )
+
+    def add_records(
+        self, records: list[TxRecord], *, tax: dict[str, Any], rules: Sequence[Rule]
+    ) -> None:
+        """
+        Categorizes the records not cached yet. Only valid while inputs_match().
+        """
+        categorizer = None
+        evaluated: list[TxRecord] = []
+        for tx in records:
+            if tx.id in self.entries:
+                continue
+            if categorizer is None:
+                categorizer = compiled_categorizer(tax=tax, rules=rules)
+            res = categorizer.categorize(tx)
+            self.entries[tx.id] = [res.bucket, res.leaf_id, res.reason, int(tx.time)]
+            evaluated.append(tx)
+        self.evaluated = evaluated
+        self.full_refresh = False
+
+    def prune(self, before_ts: int) -> None:
+        """
+        Drops entries of transactions older than `before_ts`.
+        """
+        old = [tx_id for tx_id, e in self.entries.items() if int(e[3]) < before_ts]
+        for tx_id in old:
+            del self.entries[tx_id]
+
+    def categorizations(self, tx_ids: Iterable[str] | None = None) -> dict[str, Categorization]:
+        """
+        Cached results by tx id, for `tx_ids` (those cached) or every entry.
+        """
+        ids = self.entries.keys() if tx_ids is None else tx_ids
+        interned: dict[tuple[Any, ...], Categorization] = {}
+        out: dict[str, Categorization] = {}
+        for tx_id in ids:
+            e = self.entries.get(tx_id)
+            if e is None:
+                continue
+            key = (e[0], e[1], e[2])
+            res = interned.get(key)
+            if res is None:
+                res = interned[key] = Categorization(bucket=e[0], leaf_id=e[1], reason=e[2])
+            out[tx_id] = res
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CATEGORIZATION_CACHE_VERSION,
+            "tree": self.tree,
+            "rules": self.rules,
+            "aliases": self.aliases,
+            "offsets": self.offsets,
+            "entries": self.entries,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CategorizationCache | None:
+        if not isinstance(data, dict) or data.get("version") != CATEGORIZATION_CACHE_VERSION:
+            return None
+        try:
+            return cls(
+                tree=str(data["tree"]),
+                rules=[dict(x) for x in data["rules"]],
+                aliases=[[str(k), str(t)] for k, t in data["aliases"]],
+                entries={
+                    str(k): [
+                        str(v[0]),
+                        (str(v[1]) if v[1] is not None else None),
+                        str(v[2]),
+                        int(v[3]),
+                    ]
+                    for k, v in dict(data["entries"]).items()
+                },
+                offsets={str(k): int(v) for k, v in dict(data.get("offsets") or {}).items()},
+            )
+        except Exception:
+            return None
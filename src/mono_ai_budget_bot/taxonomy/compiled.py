@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Sequence
+
+from mono_ai_budget_bot.analytics.categories import category_from_mcc
+from mono_ai_budget_bot.analytics.classify import classify_kind
+from mono_ai_budget_bot.core.text_norm import compact
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+from mono_ai_budget_bot.taxonomy.index import taxonomy_index
+from mono_ai_budget_bot.taxonomy.models import ensure_leaf_target
+from mono_ai_budget_bot.taxonomy.pipeline import _normalize_alias_categories
+from mono_ai_budget_bot.taxonomy.rules import Categorization, Rule, find_leaf_by_name
+
+_MAX_COMPILED = 32
+_MAX_MATCH_MEMO = 50_000
+
+_TURNOVER = Categorization(bucket="turnover", leaf_id=None, reason="transfer_without_rule")
+_PURCHASE_UNCAT = Categorization(
+    bucket="needs_clarify", leaf_id=None, reason="purchase_without_rule"
+)
+_INCOME_UNCAT = Categorization(bucket="needs_clarify", leaf_id=None, reason="income_without_rule")
+
+
+class _Automaton:
+    """
+    Aho-Corasick over the compacted needles: one pass over a description yields the
+    ids of every needle it contains (same result as `needle in haystack` per needle).
+    """
+
+    def __init__(self, needles: Sequence[str]):
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for i, word in enumerate(needles):
+            s = 0
+            for ch in word:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[s][ch] = nxt
+                s = nxt
+            out[s].append(i)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            r = queue.popleft()
+            for ch, u in goto[r].items():
+                queue.append(u)
+                f = fail[r]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[u] = goto[f].get(ch, 0)
+                out[u].extend(out[fail[u]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(x) for x in out]
+
+    def search(self, text: str) -> frozenset[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                found.update(out[s])
+        return frozenset(found)
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    order: int
+    rule: Rule
+    kinds: frozenset[str] | None
+    needles: tuple[int, ...]
+
+
+class CompiledCategorizer:
+    """
+    categorize_tx() with everything that depends only on (taxonomy, rules, aliases)
+    precomputed: alias resolution, rule kind/MCC sets bucketed by MCC, one automaton
+    for all rule/alias needles, and leaf kind lookups. Results and precedence
+    (CATEGORIZATION_PRIORITY) are identical to categorize_tx().
+
+    Build through compiled_categorizer() so instances are shared per content version.
+    """
+
+    def __init__(
+        self,
+        *,
+        tax: dict[str, Any],
+        rules: Sequence[Rule],
+        alias_categories: dict[str, list[str]] | None = None,
+    ):
+        self.tax = copy.deepcopy(tax)
+        needle_ids: dict[str, int] = {}
+
+        def needle(raw: str | None) -> int | None:
+            key = compact(raw)
+            if not key:
+                return None
+            return needle_ids.setdefault(key, len(needle_ids))
+
+        self._any_mcc: list[_CompiledRule] = []
+        self._by_mcc: dict[int, list[_CompiledRule]] = {}
+        for order, r in enumerate(rules):
+            needles: list[int] = []
+            unmatchable = False
+            for text in (r.merchant_contains, r.recipient_contains):
+                if text is None:
+                    continue
+                nid = needle(text)
+                if nid is None:
+                    unmatchable = True
+                else:
+                    needles.append(nid)
+            if unmatchable:
+                continue
+
+            kinds = None
+            if r.tx_kinds is not None:
+                kinds = frozenset(str(x) for x in r.tx_kinds if str(x))
+            cr = _CompiledRule(order=order, rule=r, kinds=kinds, needles=tuple(needles))
+            if r.mcc_in is None:
+                self._any_mcc.append(cr)
+            else:
+                for mcc in {int(x) for x in r.mcc_in}:
+                    self._by_mcc.setdefault(mcc, []).append(cr)
+        self._rules_for_mcc: dict[int | None, tuple[_CompiledRule, ...]] = {
+            None: tuple(self._any_mcc)
+        }
+
+        self._alias_first: dict[int, int] = {}
+        self._alias_leaf: list[str] = []
+        for leaf_id, terms in _normalize_alias_categories(self.tax, alias_categories).items():
+            for term in terms:
+                nid = needle(term)
+                if nid is not None and nid not in self._alias_first:
+                    self._alias_first[nid] = len(self._alias_leaf)
+                self._alias_leaf.append(leaf_id)
+
+        self._automaton = _Automaton(list(needle_ids))
+        self._matches: dict[str, frozenset[int]] = {}
+        self._leaf_out: dict[str, Categorization] = {}
+        self._rule_out: dict[int, Categorization] = {}
+        self._mcc_out: dict[int, Categorization | None] = {}
+
+    def _needles_in(self, description: str) -> frozenset[int]:
+        hit = self._matches.get(description)
+        if hit is None:
+            if len(self._matches) >= _MAX_MATCH_MEMO:
+                self._matches.clear()
+            hit = self._matches[description] = self._automaton.search(compact(description))
+        return hit
+
+    def _candidate_rules(self, mcc: int | None) -> tuple[_CompiledRule, ...]:
+        key = None if mcc is None else int(mcc)
+        out = self._rules_for_mcc.get(key)
+        if out is None:
+            merged = self._by_mcc.get(key, []) + self._any_mcc
+            out = self._rules_for_mcc[key] = tuple(sorted(merged, key=lambda cr: cr.order))
+        return out
+
+    def _expense_or_income(self, leaf_id: str, reason: str) -> Categorization:
+        ensure_leaf_target(self.tax, node_id=leaf_id)
+        kind = taxonomy_index(self.tax).kind_of[leaf_id]
+        bucket = "real_income" if kind == "income" else "real_expense"
+        return Categorization(bucket=bucket, leaf_id=leaf_id, reason=reason)
+
+    def _by_override(self, leaf_id: str) -> Categorization:
+        out = self._leaf_out.get(leaf_id)
+        if out is None:
+            out = self._leaf_out[leaf_id] = self._expense_or_income(leaf_id, "override")
+        return out
+
+    def _by_rule(self, cr: _CompiledRule) -> Categorization:
+        out = self._rule_out.get(cr.order)
+        if out is None:
+            out = self._expense_or_income(cr.rule.leaf_id, f"rule:{cr.rule.id}")
+            self._rule_out[cr.order] = out
+        return out
+
+    def _by_mcc_fallback(self, mcc: int) -> Categorization | None:
+        if mcc in self._mcc_out:
+            return self._mcc_out[mcc]
+        out = None
+        mcc_name = category_from_mcc(mcc)
+        if mcc_name:
+            lid = find_leaf_by_name(self.tax, root_kind="expense", name=mcc_name)
+            if lid:
+                ensure_leaf_target(self.tax, node_id=lid)
+                out = Categorization(bucket="real_expense", leaf_id=lid, reason="mcc_fallback")
+        self._mcc_out[mcc] = out
+        return out
+
+    def categorize(self, tx: TxRecord, *, override_leaf_id: str | None = None) -> Categorization:
+        if override_leaf_id:
+            return self._by_override(override_leaf_id)
+
+        tx_kind = classify_kind(tx.amount, tx.mcc, tx.description)
+        found: frozenset[int] | None = None
+
+        for cr in self._candidate_rules(tx.mcc):
+            if cr.kinds is not None and tx_kind not in cr.kinds:
+                continue
+            if cr.needles:
+                if found is None:
+                    found = self._needles_in(tx.description)
+                if not all(n in found for n in cr.needles):
+                    continue
+            return self._by_rule(cr)
+
+        if self._alias_first:
+            if found is None:
+                found = self._needles_in(tx.description)
+            first = min(
+                (self._alias_first[n] for n in found if n in self._alias_first), default=None
+            )
+            if first is not None:
+                return Categorization(
+                    bucket="real_expense", leaf_id=self._alias_leaf[first], reason="alias"
+                )
+
+        if tx_kind in {"transfer_out", "transfer_in"}:
+            return _TURNOVER
+        if tx_kind == "spend":
+            if tx.mcc is not None:
+                out = self._by_mcc_fallback(int(tx.mcc))
+                if out is not None:
+                    return out
+            return _PURCHASE_UNCAT
+        return _INCOME_UNCAT
+
+    def categorize_many(
+        self,
+        records: Iterable[TxRecord],
+        *,
+        overrides: dict[str, str] | None = None,
+    ) -> list[Categorization]:
+        """
+        categorize() for each record in order; `overrides` maps tx id -> leaf id.
+        """
+        ov = overrides or {}
+        return [self.categorize(tx, override_leaf_id=ov.get(tx.id)) for tx in records]
+
+
+def categorizer_version(
+    *,
+    tax: dict[str, Any],
+    rules: Sequence[Rule],
+    alias_categories: dict[str, list[str]] | None = None,
+) -> str:
+    payload = json.dumps(
+        [tax, [asdict(r) for r in rules], alias_categories],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+_compiled: OrderedDict[str, CompiledCategorizer] = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compiled_categorizer(
+    *,
+    tax: dict[str, Any],
+    rules: Sequence[Rule],
+    alias_categories: dict[str, list[str]] | None = None,
+) -> CompiledCategorizer:
+    """
+    Shared CompiledCategorizer for this (taxonomy, rules, aliases) content; any edit
+    to one of them yields a new version and a fresh compile.
+    """
+    version = categorizer_version(tax=tax, rules=rules, alias_categories=alias_categories)
+    with _compiled_lock:
+        hit = _compiled.get(version)
+        if hit is not None:
+            _compiled.move_to_end(version)
+            return hit
+
+    built = CompiledCategorizer(tax=tax, rules=rules, alias_categories=alias_categories)
+    with _compiled_lock:
+        _compiled[version] = built
+        while len(_compiled) > _MAX_COMPILED:
+            _compiled.popitem(last=False)
+    return built
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count
+from typing import Any
+
+from mono_ai_budget_bot.core.text_norm import collapse_ws
+
+_MAX_INDEXES = 64
+_ROOT_KINDS = ("income", "expense")
+
+_revisions = count(1)
+
+
+@dataclass(frozen=True)
+class TaxonomyIndex:
+    """
+    Derived lookups over one taxonomy dict: leaves per root kind in traversal order
+    (root -> children -> grandchildren), normalized leaf name -> first leaf id, the
+    leaf set and node -> kind. `revision` increases with every (re)build.
+    """
+
+    revision: int
+    leaves: dict[str, tuple[str, ...]]
+    leaf_by_name: dict[str, dict[str, str]]
+    leaf_set: frozenset[str]
+    kind_of: dict[str, str]
+
+
+def _is_leaf(n: dict[str, Any]) -> bool:
+    if bool(n.get("is_root")):
+        return False
+    ch = n.get("children")
+    return not isinstance(ch, list) or len(ch) == 0
+
+
+def _leaves_under(nodes: dict[str, Any], root_id: Any) -> list[str]:
+    rnode = nodes.get(root_id) if isinstance(root_id, str) else None
+    if not isinstance(rnode, dict):
+        return []
+
+    out: list[str] = []
+    ch = rnode.get("children")
+    for cid in ch if isinstance(ch, list) else []:
+        cnode = nodes.get(cid) if isinstance(cid, str) else None
+        if not isinstance(cnode, dict):
+            continue
+        if _is_leaf(cnode):
+            out.append(cid)
+            continue
+        gch = cnode.get("children")
+        for sid in gch if isinstance(gch, list) else []:
+            snode = nodes.get(sid) if isinstance(sid, str) else None
+            if isinstance(snode, dict) and _is_leaf(snode):
+                out.append(sid)
+    return out
+
+
+def build_taxonomy_index(tax: dict[str, Any]) -> TaxonomyIndex:
+    roots = tax.get("roots")
+    nodes = tax.get("nodes")
+    if not isinstance(roots, dict) or not isinstance(nodes, dict):
+        roots, nodes = {}, {}
+
+    leaves: dict[str, tuple[str, ...]] = {}
+    leaf_by_name: dict[str, dict[str, str]] = {}
+    for kind in _ROOT_KINDS:
+        ids = _leaves_under(nodes, roots.get(kind))
+        leaves[kind] = tuple(ids)
+        by_name: dict[str, str] = {}
+        for lid in ids:
+            by_name.setdefault(collapse_ws(str(nodes[lid].get("name") or "")), lid)
+        leaf_by_name[kind] = by_name
+
+    return TaxonomyIndex(
+        revision=next(_revisions),
+        leaves=leaves,
+        leaf_by_name=leaf_by_name,
+        leaf_set=frozenset(lid for ids in leaves.values() for lid in ids),
+        kind_of={str(nid): str(n.get("kind")) for nid, n in nodes.items() if isinstance(n, dict)},
+    )
+
+
+# Keyed by id(tax); each entry keeps the dict alive so the id can't be reused while
+# cached. The taxonomy mutators in models.py call invalidate_taxonomy_index().
+_indexes: OrderedDict[int, tuple[dict[str, Any], TaxonomyIndex]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def taxonomy_index(tax: dict[str, Any]) -> TaxonomyIndex:
+    key = id(tax)
+    with _lock:
+        hit = _indexes.get(key)
+        if hit is not None and hit[0] is tax:
+            _indexes.move_to_end(key)
+            return hit[1]
+
+    index = build_taxonomy_index(tax)
+    with _lock:
+        _indexes[key] = (tax, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_taxonomy_index(tax: dict[str, Any]) -> None:
+    with _lock:
+        hit = _indexes.get(id(tax))
+        if hit is not None and hit[0] is tax:
+            del _indexes[id(tax)]
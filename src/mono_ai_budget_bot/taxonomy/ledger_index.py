@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+from mono_ai_budget_bot.core.text_norm import compact
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+from mono_ai_budget_bot.taxonomy.compiled import compiled_categorizer
+from mono_ai_budget_bot.taxonomy.rules import Rule
+
+_GRAM = 3
+
+
+def _grams(key: str) -> set[str]:
+    return {key[i : i + _GRAM] for i in range(len(key) - _GRAM + 1)}
+
+
+class LedgerIndex:
+    """
+    Inverted index over a set of transactions: character trigrams of the normalized
+    (compact) description -> distinct descriptions -> tx ids, and MCC -> tx ids.
+
+    Substring lookups intersect the needle's trigram postings and only verify the
+    surviving descriptions, so dry-running a rule doesn't scan the ledger.
+    """
+
+    def __init__(self, records: Iterable[TxRecord]):
+        self.records: dict[str, TxRecord] = {}
+        self.by_desc: dict[str, list[str]] = {}
+        self.by_mcc: dict[int, set[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        for r in records:
+            if r.id in self.records:
+                continue
+            self.records[r.id] = r
+            key = compact(r.description or "")
+            ids = self.by_desc.get(key)
+            if ids is None:
+                ids = self.by_desc[key] = []
+                for g in _grams(key):
+                    self._postings.setdefault(g, set()).add(key)
+            ids.append(r.id)
+            if r.mcc is not None:
+                self.by_mcc.setdefault(int(r.mcc), set()).add(r.id)
+
+    def _descriptions_containing(self, needle: str) -> list[str]:
+        if len(needle) < _GRAM:
+            return [d for d in self.by_desc if needle in d]
+
+        postings = []
+        for g in _grams(needle):
+            hit = self._postings.get(g)
+            if not hit:
+                return []
+            postings.append(hit)
+        postings.sort(key=len)
+        keys = set(postings[0]).intersection(*postings[1:])
+        return [d for d in keys if needle in d]
+
+    def containing(self, needles: Sequence[str]) -> set[str]:
+        """
+        Ids of transactions whose normalized description contains every (already
+        normalized) needle.
+        """
+        if not needles:
+            return set(self.records)
+        keys: set[str] | None = None
+        for needle in sorted(needles, key=len, reverse=True):
+            found = set(self._descriptions_containing(needle))
+            keys = found if keys is None else keys & found
+            if not keys:
+                return set()
+        return {tx_id for d in keys or () for tx_id in self.by_desc[d]}
+
+    def could_match_rule(self, rule: Rule | Mapping[str, Any]) -> set[str]:
+        """
+        Superset of the transactions `rule` matches: description needles and MCC are
+        applied, tx_kinds is not.
+        """
+        if isinstance(rule, Rule):
+            rule = asdict(rule)
+        needles = [
+            compact(rule.get(k))
+            for k in ("merchant_contains", "recipient_contains")
+            if rule.get(k) is not None
+        ]
+        if not all(needles):
+            return set()
+
+        ids = self.containing(needles)
+        mcc_in = rule.get("mcc_in")
+        if mcc_in is not None:
+            try:
+                codes = {int(x) for x in mcc_in}
+            except (TypeError, ValueError):
+                return ids
+            ids &= set().union(*(self.by_mcc.get(c, set()) for c in codes))
+        return ids
+
+
+@dataclass(frozen=True)
+class RuleImpact:
+    """
+    Transactions whose categorization (bucket/leaf) a rule change would alter,
+    newest first, and the sum of their absolute amounts in minor units.
+    """
+
+    tx_ids: tuple[str, ...]
+    amount: int
+
+    @property
+    def count(self) -> int:
+        return len(self.tx_ids)
+
+
+def preview_rules_change(
+    index: LedgerIndex,
+    *,
+    tax: dict[str, Any],
+    before: Sequence[Rule],
+    after: Sequence[Rule],
+) -> RuleImpact:
+    """
+    Dry-run of replacing the rule list `before` with `after`. Only the transactions
+    an added or removed rule could match are re-categorized (every rule's candidates
+    if the shared rules changed order, since that changes first-match precedence).
+    """
+    added = [r for r in after if r not in before]
+    removed = [r for r in before if r not in after]
+    shared_before = [r for r in before if r in after]
+    shared_after = [r for r in after if r in before]
+    touched = added + removed
+    if shared_before != shared_after:
+        touched += shared_after
+
+    candidates: set[str] = set()
+    for r in touched:
+        candidates |= index.could_match_rule(r)
+    if not candidates:
+        return RuleImpact(tx_ids=(), amount=0)
+
+    before_cat = compiled_categorizer(tax=tax, rules=before)
+    after_cat = compiled_categorizer(tax=tax, rules=after)
+    changed: list[TxRecord] = []
+    for tx_id in candidates:
+        tx = index.records[tx_id]
+        old = before_cat.categorize(tx)
+        new = after_cat.categorize(tx)
+        if (old.bucket, old.leaf_id) != (new.bucket, new.leaf_id):
+            changed.append(tx)
+
+    changed.sort(key=lambda tx: (-tx.time, tx.id))
+    return RuleImpact(
+        tx_ids=tuple(tx.id for tx in changed),
+        amount=sum(abs(int(tx.amount)) for tx in changed),
+    )
+
+
+def preview_rule_impact(
+    index: LedgerIndex,
+    rule: Rule,
+    *,
+    tax: dict[str, Any],
+    rules: Sequence[Rule],
+) -> RuleImpact:
+    """
+    Dry-run of saving `rule` the way RulesStore.add() does: a rule with the same id
+    is dropped and `rule` goes last.
+    """
+    after = [r for r in rules if r.id != rule.id] + [rule]
+    return preview_rules_change(index, tax=tax, before=list(rules), after=after)
@@ -4,6 +4,8 @@ import hashlib
 from dataclasses import dataclass
 from typing import Any, Literal, Optional
 
+from mono_ai_budget_bot.taxonomy.index import invalidate_taxonomy_index, taxonomy_index
+
 TaxKind = Literal["income", "expense"]
 
 
@@ -192,6 +194,7 @@ def add_category(tax: dict[str, Any], *, root_kind: TaxKind, name: str) -> str:
     if cid not in rch:
         rch.append(cid)
     rnode["children"] = rch
+    invalidate_taxonomy_index(tax)
 
     validate_taxonomy(tax)
     return cid
@@ -223,6 +226,7 @@ def add_subcategory(tax: dict[str, Any], *, parent_id: str, name: str) -> str:
     if sid not in ch:
         ch.append(sid)
     p["children"] = ch
+    invalidate_taxonomy_index(tax)
 
     validate_taxonomy(tax)
     return sid
@@ -408,6 +412,7 @@ def rename_node(tax: dict[str, Any], *, node_id: str, new_name: str) -> str:
             raise ValueError("duplicate category name")
 
     node["name"] = nm
+    invalidate_taxonomy_index(tax)
     validate_taxonomy(tax)
     return nid
 
@@ -439,6 +444,7 @@ def delete_node(tax: dict[str, Any], *, node_id: str) -> str:
     if not isinstance(nodes, dict):
         raise ValueError("taxonomy.nodes is missing")
     nodes.pop(nid, None)
+    invalidate_taxonomy_index(tax)
 
     validate_taxonomy(tax)
     return nid
@@ -450,5 +456,7 @@ def ensure_leaf_target(tax: dict[str, Any], *, node_id: str) -> None:
         raise ValueError("missing node_id")
     if nid in ("income", "expense"):
         raise ValueError("root cannot hold transactions")
+    if nid in taxonomy_index(tax).leaf_set:
+        return
     if not is_leaf(tax, nid):
         raise ValueError("transactions must be assigned to leaf categories only")
@@ -5,7 +5,8 @@ from typing import Any, Sequence
 from mono_ai_budget_bot.analytics.categories import category_from_mcc
 from mono_ai_budget_bot.analytics.classify import classify_kind
 from mono_ai_budget_bot.storage.tx_store import TxRecord
-from mono_ai_budget_bot.taxonomy.models import _node, ensure_leaf_target
+from mono_ai_budget_bot.taxonomy.index import taxonomy_index
+from mono_ai_budget_bot.taxonomy.models import ensure_leaf_target
 from mono_ai_budget_bot.taxonomy.rules import (
     Categorization,
     Rule,
@@ -80,8 +81,7 @@ def _categorize_override(
         return None
 
     ensure_leaf_target(tax, node_id=override_leaf_id)
-    n = _node(tax, override_leaf_id)
-    kind = str(n.get("kind"))
+    kind = taxonomy_index(tax).kind_of[override_leaf_id]
     if kind == "income":
         return Categorization(bucket="real_income", leaf_id=override_leaf_id, reason="override")
     return Categorization(bucket="real_expense", leaf_id=override_leaf_id, reason="override")
@@ -97,8 +97,7 @@ def _categorize_rules(
     for r in rules:
         if _rule_matches(r, tx, tx_kind):
             ensure_leaf_target(tax, node_id=r.leaf_id)
-            n = _node(tax, r.leaf_id)
-            kind = str(n.get("kind"))
+            kind = taxonomy_index(tax).kind_of[r.leaf_id]
             if kind == "income":
                 return Categorization(
                     bucket="real_income", leaf_id=r.leaf_id, reason=f"rule:{r.id}"
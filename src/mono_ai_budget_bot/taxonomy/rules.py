@@ -3,8 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Iterable, Literal, Optional, Sequence
 
+from mono_ai_budget_bot.core.text_norm import collapse_ws, compact
 from mono_ai_budget_bot.storage.tx_store import TxRecord
-from mono_ai_budget_bot.taxonomy.models import TaxKind, _node, is_leaf
+from mono_ai_budget_bot.taxonomy.index import taxonomy_index
+from mono_ai_budget_bot.taxonomy.models import TaxKind
 
 Bucket = Literal["real_income", "real_expense", "turnover", "needs_clarify"]
 
@@ -26,67 +28,23 @@ class Categorization:
     reason: str
 
 
-def _norm(s: str | None) -> str:
-    return " ".join((s or "").strip().lower().split())
-
-
 def _match_contains(hay: str, needle: str) -> bool:
-    h = _norm(hay).replace(" ", "")
-    n = _norm(needle).replace(" ", "")
+    h = compact(hay)
+    n = compact(needle)
     if not n:
         return False
     return n in h
 
 
 def _iter_leaf_ids(tax: dict[str, Any], *, root_kind: TaxKind) -> Iterable[str]:
-    roots = tax.get("roots")
-    nodes = tax.get("nodes")
-    if not isinstance(roots, dict) or not isinstance(nodes, dict):
-        return []
-
-    rid = roots.get(root_kind)
-    if not isinstance(rid, str) or rid not in nodes:
-        return []
-
-    rnode = _node(tax, rid)
-    ch = rnode.get("children")
-    if not isinstance(ch, list):
-        ch = []
-
-    for cid in ch:
-        if not isinstance(cid, str) or cid not in nodes:
-            continue
-        if is_leaf(tax, cid):
-            yield cid
-            continue
-        cnode = _node(tax, cid)
-        gch = cnode.get("children")
-        if not isinstance(gch, list):
-            gch = []
-        for sid in gch:
-            if not isinstance(sid, str) or sid not in nodes:
-                continue
-            if is_leaf(tax, sid):
-                yield sid
+    return taxonomy_index(tax).leaves.get(root_kind, ())
 
 
 def find_leaf_by_name(tax: dict[str, Any], *, root_kind: TaxKind, name: str) -> str | None:
-    target = _norm(name)
+    target = collapse_ws(name)
     if not target:
         return None
-
-    nodes = tax.get("nodes")
-    if not isinstance(nodes, dict):
-        return None
-
-    for lid in _iter_leaf_ids(tax, root_kind=root_kind):
-        n = nodes.get(lid)
-        if not isinstance(n, dict):
-            continue
-        nm = _norm(str(n.get("name") or ""))
-        if nm == target:
-            return lid
-    return None
+    return taxonomy_index(tax).leaf_by_name.get(root_kind, {}).get(target)
 
 
 def _rule_matches(rule: Rule, tx: TxRecord, tx_kind: str) -> bool:
@@ -4,12 +4,13 @@ from mono_ai_budget_bot.uncat.prompting import (
     UncatPromptMetaStore,
     build_uncat_prompt_message,
 )
-from mono_ai_budget_bot.uncat.queue import UncatItem, build_uncat_queue
+from mono_ai_budget_bot.uncat.queue import UncatItem, build_uncat_queue, uncat_queue_delta
 from mono_ai_budget_bot.uncat.ui import LeafOption, list_leaf_options
 
 __all__ = [
     "UncatItem",
     "build_uncat_queue",
+    "uncat_queue_delta",
     "UncatPending",
     "UncatPendingStore",
     "LeafOption",
@@ -4,8 +4,8 @@ from dataclasses import dataclass
 from typing import Any
 
 from mono_ai_budget_bot.storage.tx_store import TxRecord
-from mono_ai_budget_bot.taxonomy.pipeline import categorize_tx
-from mono_ai_budget_bot.taxonomy.rules import Rule
+from mono_ai_budget_bot.taxonomy.compiled import compiled_categorizer
+from mono_ai_budget_bot.taxonomy.rules import Categorization, Rule
 
 
 @dataclass(frozen=True)
@@ -48,7 +48,13 @@ def build_uncat_queue(
     records: list[TxRecord],
     rules: list[Rule] | None = None,
     limit: int = 200,
+    categorized: dict[str, Categorization] | None = None,
 ) -> list[UncatItem]:
+    """
+    `categorized` (tx id -> result, e.g. from CategorizationCache) is used as a lookup;
+    records missing from it are categorized with the compiled categorizer.
+    """
+    categorizer = None
     items: list[UncatItem] = []
     seen: set[str] = set()
 
@@ -57,32 +63,75 @@ def build_uncat_queue(
             continue
         seen.add(tx.id)
 
-        out = categorize_tx(
-            tax=tax,
-            tx=tx,
-            rules=(rules or []),
-            override_leaf_id=None,
-            alias_categories=None,
-        )
+        out = categorized.get(tx.id) if categorized is not None else None
+        if out is None:
+            if categorizer is None:
+                categorizer = compiled_categorizer(tax=tax, rules=(rules or []))
+            out = categorizer.categorize(tx)
 
         if out.bucket != "needs_clarify":
             continue
         if out.reason != "purchase_without_rule":
             continue
 
-        items.append(
-            UncatItem(
-                tx_id=tx.id,
-                time=tx.time,
-                account_id=tx.account_id,
-                amount=tx.amount,
-                description=tx.description,
-                mcc=tx.mcc,
-                reason=out.reason,
-            )
-        )
+        items.append(_item(tx, out.reason))
 
         if len(items) >= int(limit):
             break
 
     return items
+
+
+def _is_uncat(c: Categorization | None) -> bool:
+    return c is not None and c.bucket == "needs_clarify" and c.reason == "purchase_without_rule"
+
+
+def _item(tx: TxRecord, reason: str) -> UncatItem:
+    return UncatItem(
+        tx_id=tx.id,
+        time=tx.time,
+        account_id=tx.account_id,
+        amount=tx.amount,
+        description=tx.description,
+        mcc=tx.mcc,
+        reason=reason,
+    )
+
+
+def uncat_queue_delta(
+    current: list[UncatItem],
+    *,
+    categorized: dict[str, Categorization],
+    evaluated: list[TxRecord],
+    limit: int = 200,
+) -> tuple[list[UncatItem], list[str]] | None:
+    """
+    Incremental update of an existing queue from one categorization refresh:
+    (items to push at the front, tx ids to remove). `evaluated` are the records that
+    were (re)categorized; queue items are checked against `categorized`, so items
+    resolved by a rule or gone from the window drop out.
+
+    Returns None when the queue should be rebuilt with build_uncat_queue() instead:
+    it was at `limit` (older purchases may have been cut off) and now has room.
+    """
+    removed = [it.tx_id for it in current if not _is_uncat(categorized.get(it.tx_id))]
+    if removed and len(current) >= int(limit):
+        return None
+
+    queued = {it.tx_id for it in current}
+    added: list[UncatItem] = []
+    for tx in sorted(evaluated, key=lambda r: r.time, reverse=True):
+        out = categorized.get(tx.id)
+        if tx.id in queued or not _is_uncat(out):
+            continue
+        queued.add(tx.id)
+        added.append(_item(tx, out.reason))
+
+    gone = set(removed)
+    kept = [it for it in current if it.tx_id not in gone]
+    if len(kept) + len(added) > int(limit):
+        pool = sorted(kept + added, key=lambda it: it.time, reverse=True)
+        keep_ids = {it.tx_id for it in pool[: int(limit)]}
+        added = [it for it in added if it.tx_id in keep_ids]
+        removed += [it.tx_id for it in kept if it.tx_id not in keep_ids]
+    return added, removed
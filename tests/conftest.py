@@ -1,7 +1,18 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """
+    Stores default to paths under a relative .cache/; run every test from its own
+    tmp dir so the suite never writes into the repository.
+    """
+    monkeypatch.chdir(tmp_path)
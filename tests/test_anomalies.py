@@ -108,3 +108,105 @@ def test_anomalies_guard_min_spike():
     from mono_ai_budget_bot.analytics.anomalies import MIN_SPIKE_UAH
 
     assert MIN_SPIKE_UAH >= 200.0
+
+
+def _reference_anomalies(rows, now, lookback_days=28):
+    from statistics import median
+
+    from mono_ai_budget_bot.analytics.anomalies import MIN_MULTIPLIER, AnomalyItem
+    from mono_ai_budget_bot.analytics.normalization import category_label, normalize_merchant
+
+    def detect(label_fn):
+        last_day_start, hist_start = now - 86400, now - lookback_days * 86400
+        daily, last_day, seen = {}, {}, set()
+        for r in rows:
+            t = int(r.ts)
+            if not (hist_start <= t < now) or r.kind != "spend":
+                continue
+            label = str(label_fn(r) or "unknown")
+            if label == "unknown":
+                continue
+            cents = abs(int(r.amount))
+            if t < last_day_start:
+                seen.add(label)
+            else:
+                last_day[label] = last_day.get(label, 0) + cents
+            m = daily.setdefault(label, {})
+            m[t // 86400] = m.get(t // 86400, 0) + cents
+
+        out = []
+        for label, last in last_day.items():
+            hist = [v for d, v in daily[label].items() if d * 86400 < last_day_start]
+            med = int(median(hist)) if hist else 0
+            mad = int(median([abs(v - med) for v in hist])) if hist else 0
+            if last < 25000:
+                continue
+            if label not in seen and last >= 20000:
+                out.append(AnomalyItem(label, last, med, "first_time_large"))
+                continue
+            if len(hist) < 3 or med <= 0:
+                continue
+            if last / med < MIN_MULTIPLIER and (last - med) < 30000:
+                continue
+            threshold = max(20000, int(2.0 * med), med + max(15000, int(2.0 * mad)))
+            if last >= threshold:
+                out.append(AnomalyItem(label, last, med, "spike_vs_median"))
+        return sorted(out, key=lambda x: x.last_day_cents - x.baseline_median_cents, reverse=True)
+
+    merged = detect(lambda r: normalize_merchant(r.description))
+    merged += [
+        AnomalyItem(f"категорія: {x.label}", x.last_day_cents, x.baseline_median_cents, x.reason)
+        for x in detect(lambda r: category_label(r.mcc))
+    ]
+    merged.sort(key=lambda x: x.last_day_cents - x.baseline_median_cents, reverse=True)
+    return merged[:5]
+
+
+def _random_rows(seed: int, start: int, end: int, n: int) -> list[Row]:
+    import random
+
+    rnd = random.Random(seed)
+    merchants = ["Silpo", "ATB", "Glovo", "Uber", "Cafe A", "WOG", "Rozetka", ""]
+    mccs = [5411, 5411, 5812, 4121, 5812, 5541, 5732, None]
+    rows = []
+    for i in range(n):
+        k = rnd.randrange(len(merchants))
+        big = rnd.random() < 0.05
+        rows.append(
+            Row(
+                ts=rnd.randrange(start, end),
+                amount=-rnd.randrange(100_00 if big else 1_00, 2000_00 if big else 400_00),
+                mcc=mccs[k],
+                description=merchants[k],
+                kind="spend" if i % 11 else "income",
+            )
+        )
+    return rows
+
+
+def test_rolling_baselines_match_full_scan():
+    base = 400 * 86400
+    rows = _random_rows(3, base - 40 * 86400, base + 10 * 86400, 1500)
+
+    hits = 0
+    for now in [base, base + 1, base + 43210, base + 86399, base + 5 * 86400 + 777]:
+        for lookback in (7, 28):
+            out = detect_anomalies(rows, now_ts=now, lookback_days=lookback)
+            assert out == _reference_anomalies(rows, now, lookback)
+            hits += len(out)
+    assert hits > 0
+
+
+def test_sorted_window_median_and_mad_match_statistics():
+    import random
+    from statistics import median
+
+    from mono_ai_budget_bot.analytics.baselines import SortedWindow
+
+    rnd = random.Random(1)
+    for n in range(1, 40):
+        vals = [rnd.randrange(0, 5000) for _ in range(n)]
+        w = SortedWindow(vals)
+        med = int(median(vals))
+        assert w.median() == med
+        assert w.mad(med) == int(median([abs(v - med) for v in vals]))
@@ -0,0 +1,206 @@
+from dataclasses import asdict
+
+from mono_ai_budget_bot.bot.report_flow_helpers import load_or_update_categorizations
+from mono_ai_budget_bot.storage.categorization_store import CategorizationStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord, TxStore
+from mono_ai_budget_bot.taxonomy import (
+    Rule,
+    add_category,
+    apply_subcategory_migration_choice,
+    build_subcategory_migration_prompt,
+    build_taxonomy_preset,
+    categorize_tx,
+    find_leaf_by_name,
+)
+from mono_ai_budget_bot.taxonomy.categorization_cache import CategorizationCache
+from mono_ai_budget_bot.taxonomy.compiled import CompiledCategorizer
+
+NOW = 1_700_100_000
+
+
+def _records() -> list[TxRecord]:
+    descs = ["Silpo", "Flower shop", "Glovo", "Переказ на картку", "Mystery 42", "ATB"]
+    mccs = [5411, 5992, 5812, 4829, None, 5411]
+    return [
+        TxRecord(
+            id=f"t{i}",
+            time=1_700_000_000 + i * 600,
+            account_id="a",
+            amount=-(500 + i),
+            description=descs[i % len(descs)],
+            mcc=mccs[i % len(mccs)],
+            currencyCode=980,
+        )
+        for i in range(120)
+    ]
+
+
+def _expected(tax, rules, records):
+    return {tx.id: categorize_tx(tax=tax, tx=tx, rules=rules) for tx in records}
+
+
+def _ledger(tmp_path, records) -> TxStore:
+    tx_store = TxStore(tmp_path / "tx")
+    tx_store.append_many(1, "a", [asdict(r) for r in records])
+    return tx_store
+
+
+def _seen_descriptions(monkeypatch) -> list[str]:
+    seen: list[str] = []
+    real = CompiledCategorizer.categorize
+    monkeypatch.setattr(
+        CompiledCategorizer,
+        "categorize",
+        lambda self, tx, **kw: seen.append(tx.description) or real(self, tx, **kw),
+    )
+    return seen
+
+
+def test_only_transactions_a_changed_rule_can_match_are_recategorized(tmp_path, monkeypatch):
+    store = CategorizationStore(tmp_path / "reports")
+    tax = build_taxonomy_preset("min")
+    records = _records()
+    tx_store = _ledger(tmp_path, records)
+    rules: list[Rule] = []
+
+    def run():
+        return load_or_update_categorizations(
+            1,
+            ["a"],
+            tx_store=tx_store,
+            tax=tax,
+            rules=rules,
+            categorization_store=store,
+            now_ts=NOW,
+        ).categorizations()
+
+    assert run() == _expected(tax, rules, records)
+
+    seen = _seen_descriptions(monkeypatch)
+    assert run() == _expected(tax, rules, records)
+    assert seen == []
+
+    flowers = add_category(tax, root_kind="expense", name="Квіти")
+    seen.clear()
+    assert run() == _expected(tax, rules, records)
+    assert len(seen) == len(records)
+
+    seen.clear()
+    rules.append(Rule(id="r1", leaf_id=flowers, merchant_contains="flower"))
+    assert run() == _expected(tax, rules, records)
+    assert set(seen) == {"Flower shop"}
+
+    seen.clear()
+    market = find_leaf_by_name(tax, root_kind="expense", name="Маркет/Побут")
+    rules.append(Rule(id="r2", leaf_id=market, mcc_in=[5411]))
+    tax["alias_terms"] = {"Квіти": ["glovo"]}
+    assert run() == _expected(tax, rules, records)
+    assert set(seen) == {"Silpo", "ATB", "Glovo"}
+
+
+def test_refresh_categorizes_only_appended_transactions_and_prunes_old_ones(tmp_path, monkeypatch):
+    from mono_ai_budget_bot.bot import report_flow_helpers
+
+    store = CategorizationStore(tmp_path / "reports")
+    tax = build_taxonomy_preset("min")
+    records = _records()
+    tx_store = _ledger(tmp_path, records[:100])
+
+    def run(now_ts):
+        return load_or_update_categorizations(
+            1,
+            ["a"],
+            tx_store=tx_store,
+            tax=tax,
+            rules=[],
+            categorization_store=store,
+            now_ts=now_ts,
+        )
+
+    run(NOW)
+    loads: list[int] = []
+    real_load_range = tx_store.load_range
+    monkeypatch.setattr(
+        tx_store, "load_range", lambda *a, **kw: loads.append(1) or real_load_range(*a, **kw)
+    )
+    seen = _seen_descriptions(monkeypatch)
+    tx_store.append_many(1, "a", [asdict(r) for r in records[100:]])
+
+    cache = run(NOW)
+    assert loads == []
+    assert seen == [r.description for r in records[100:]]
+    assert [tx.id for tx in cache.evaluated] == [r.id for r in records[100:]]
+    assert cache.categorizations() == _expected(tax, [], records)
+
+    window = report_flow_helpers.CATEGORIZATION_WINDOW_DAYS * 86400
+    later = records[60].time + window
+    seen.clear()
+    cache = run(later)
+    assert loads == [] and seen == []
+    assert set(cache.categorizations()) == {r.id for r in records[60:]}
+
+
+def _migrate(tax, rules, parent_id, name):
+    _sid, decision = apply_subcategory_migration_choice(
+        tax,
+        parent_id=parent_id,
+        name=name,
+        migrate_to_leaf_id=build_subcategory_migration_prompt(
+            tax, parent_id=parent_id, name=name
+        ).new_subcategory_id,
+    )
+    rules[:] = [
+        Rule(id=r.id, leaf_id=decision.target_leaf_id, merchant_contains=r.merchant_contains)
+        if r.leaf_id == decision.source_leaf_id
+        else r
+        for r in rules
+    ]
+    terms = tax.get("alias_terms", {}).pop(decision.source_leaf_id, None)
+    if terms:
+        tax["alias_terms"][decision.target_leaf_id] = terms
+    return decision
+
+
+def test_subcategory_migration_reevaluates_only_transactions_it_can_move(monkeypatch):
+    tax = build_taxonomy_preset("min")
+    records = _records()
+    food = add_category(tax, root_kind="expense", name="Їжа")
+    rules = [Rule(id="r1", leaf_id=food, merchant_contains="glovo")]
+    tax["alias_terms"] = {food: ["silpo"]}
+
+    cache = CategorizationCache()
+    cache.refresh(records, tax=tax, rules=rules)
+    on_food = {tx_id for tx_id, e in cache.entries.items() if e[1] == food}
+    assert on_food
+
+    decision = _migrate(tax, rules, food, "Кафе/Ресторани")
+    progress: list[tuple[int, int]] = []
+    out = cache.refresh(
+        records,
+        tax=tax,
+        rules=rules,
+        migration=decision,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert out == _expected(tax, rules, records)
+    assert not cache.full_refresh
+    evaluated = {tx.id for tx in cache.evaluated}
+    assert on_food <= evaluated < {tx.id for tx in records}
+    assert all(out[tx_id].leaf_id == decision.target_leaf_id for tx_id in on_food)
+    assert progress[-1] == (len(evaluated), len(evaluated))
+
+
+def test_migration_falls_back_to_full_refresh_when_tree_changed_otherwise():
+    tax = build_taxonomy_preset("min")
+    records = _records()
+    food = add_category(tax, root_kind="expense", name="Їжа")
+    cache = CategorizationCache()
+    cache.refresh(records, tax=tax, rules=[])
+
+    add_category(tax, root_kind="expense", name="Квіти")
+    decision = _migrate(tax, [], food, "Кава")
+    assert cache.refresh(records, tax=tax, rules=[], migration=decision) == _expected(
+        tax, [], records
+    )
+    assert cache.full_refresh
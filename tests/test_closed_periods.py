@@ -0,0 +1,94 @@
+import time
+
+from mono_ai_budget_bot.analytics import period_report
+from mono_ai_budget_bot.analytics.closed_periods import SETTLED_HORIZON_SECONDS
+from mono_ai_budget_bot.analytics.enrich import enrich_period_facts
+from mono_ai_budget_bot.storage.closed_facts_store import ClosedFactsStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+DAY = 86400
+
+
+class _DictCache:
+    def __init__(self):
+        self.data = {}
+        self.hits = 0
+
+    def get(self, key):
+        v = self.data.get(key)
+        if v is not None:
+            self.hits += 1
+            return dict(v)
+        return None
+
+    def put(self, key, facts):
+        self.data[key] = dict(facts)
+
+
+def _records(now: int) -> list[TxRecord]:
+    out = []
+    for i in range(60):
+        out.append(
+            TxRecord(
+                id=f"t{i}",
+                time=now - i * 6 * 3600 - 7,
+                account_id="a",
+                amount=-(1000 + 37 * i),
+                description=f"Shop {i % 5}",
+                mcc=5411 if i % 2 else 5812,
+                currencyCode=980,
+            )
+        )
+    return out
+
+
+def test_previous_window_facts_are_reused_until_its_records_change(monkeypatch):
+    now = int(time.time())
+    records = _records(now)
+    cache = _DictCache()
+
+    calls = []
+    real = period_report.compute_facts
+    monkeypatch.setattr(period_report, "compute_facts", lambda rows: calls.append(1) or real(rows))
+
+    plain = enrich_period_facts(records, days_back=7, now_ts=now)
+    calls.clear()
+    first = enrich_period_facts(records, days_back=7, now_ts=now, closed_facts=cache)
+    second = enrich_period_facts(records, days_back=7, now_ts=now + 60, closed_facts=cache)
+
+    assert first == plain
+    assert second["comparison"]["totals"] == first["comparison"]["totals"]
+    assert (len(calls), cache.hits, len(cache.data)) == (3, 1, 1)
+
+    late = TxRecord("late", now - 10 * DAY, "a", -99999, "Late shop", 5411, 980)
+    third = enrich_period_facts([*records, late], days_back=7, now_ts=now, closed_facts=cache)
+    assert len(cache.data) == 2
+    prev_total = third["comparison"]["prev_period"]["totals"]["real_spend_total_uah"]
+    assert prev_total > first["comparison"]["prev_period"]["totals"]["real_spend_total_uah"]
+
+
+def test_only_settled_windows_are_cached():
+    now = int(time.time())
+    cache = _DictCache()
+
+    enrich_period_facts(_records(now), days_back=1, now_ts=now, closed_facts=cache)
+    assert cache.data == {}
+
+    past = now - SETTLED_HORIZON_SECONDS - DAY
+    enrich_period_facts(_records(past), days_back=1, now_ts=past, closed_facts=cache)
+    assert {k.split("-")[0] for k in cache.data} == {"current1", "previous"}
+
+
+def test_closed_facts_store_roundtrip_and_eviction(tmp_path):
+    store = ClosedFactsStore(tmp_path, max_entries=2)
+    view = store.bind(7)
+
+    view.put("previous-v1-aa", {"x": 1})
+    time.sleep(0.01)
+    view.put("previous-v1-bb", {"x": 2})
+    time.sleep(0.01)
+    view.put("previous-v1-cc", {"x": 3})
+
+    assert view.get("previous-v1-aa") is None
+    assert view.get("previous-v1-cc") == {"x": 3}
+    assert store.get(8, "previous-v1-cc") is None
@@ -0,0 +1,96 @@
+import random
+
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+from mono_ai_budget_bot.taxonomy import (
+    CompiledCategorizer,
+    Rule,
+    add_category,
+    build_taxonomy_preset,
+    categorize_tx,
+    compiled_categorizer,
+    find_leaf_by_name,
+)
+from mono_ai_budget_bot.uncat.queue import build_uncat_queue
+
+
+def _setup():
+    tax = build_taxonomy_preset("min")
+    flowers = add_category(tax, root_kind="expense", name="Квіти")
+    market = find_leaf_by_name(tax, root_kind="expense", name="Маркет/Побут")
+    salary = find_leaf_by_name(tax, root_kind="income", name="Зарплата")
+    rules = [
+        Rule(id="r1", leaf_id=flowers, merchant_contains="квіти", tx_kinds=["transfer_out"]),
+        Rule(id="r2", leaf_id=market, merchant_contains="silpo", mcc_in=[5411, 5499]),
+        Rule(id="r3", leaf_id=salary, recipient_contains="acme corp", tx_kinds=["income"]),
+        Rule(id="r4", leaf_id=market, mcc_in=[5999]),
+        Rule(id="r5", leaf_id=flowers, merchant_contains="  "),
+        Rule(id="r6", leaf_id=flowers, merchant_contains="flower", recipient_contains="shop"),
+    ]
+    aliases = {"Квіти": ["Букет", "roses"], "Маркет/Побут": ["atb", "Букет"], "Нема": ["x"]}
+    return tax, rules, aliases
+
+
+def _ledger(n: int, seed: int) -> list[TxRecord]:
+    rnd = random.Random(seed)
+    descs = [
+        "Переказ за квіти",
+        "SILPO #12",
+        "Сільпо",
+        "ATB market",
+        "Букет троянд",
+        "Flower Shop Kyiv",
+        "Flower power",
+        "ACME Corp salary",
+        "Переказ на картку",
+        "Unknown merchant 123",
+        "roses & co",
+        "",
+    ]
+    mccs = [5411, 5499, 5999, 4829, 5812, 5992, None]
+    return [
+        TxRecord(
+            id=f"t{i}",
+            time=1_700_000_000 + i * 3600,
+            account_id="a",
+            amount=rnd.choice([-1, 1]) * rnd.randrange(100, 90_000),
+            description=rnd.choice(descs),
+            mcc=rnd.choice(mccs),
+            currencyCode=980,
+        )
+        for i in range(n)
+    ]
+
+
+def test_categorize_many_matches_categorize_tx():
+    tax, rules, aliases = _setup()
+    records = _ledger(600, seed=3)
+    for alias_categories in (None, aliases):
+        compiled = CompiledCategorizer(tax=tax, rules=rules, alias_categories=alias_categories)
+        expected = [
+            categorize_tx(tax=tax, tx=tx, rules=rules, alias_categories=alias_categories)
+            for tx in records
+        ]
+        assert compiled.categorize_many(records) == expected
+
+    override = find_leaf_by_name(tax, root_kind="income", name="Зарплата")
+    out = compiled.categorize_many(records[:2], overrides={"t1": override})
+    assert out[1].reason == "override" and out[1].bucket == "real_income"
+    reasons = {c.reason for c in expected}
+    assert {"alias", "rule:r1", "rule:r2", "rule:r4", "mcc_fallback"} <= reasons
+
+
+def test_compiled_categorizer_is_shared_per_content_version():
+    tax, rules, _ = _setup()
+    first = compiled_categorizer(tax=tax, rules=rules)
+    assert compiled_categorizer(tax=tax, rules=list(rules)) is first
+
+    add_category(tax, root_kind="expense", name="Хобі")
+    assert compiled_categorizer(tax=tax, rules=rules) is not first
+
+    records = _ledger(300, seed=4)
+    items = build_uncat_queue(tax=tax, records=records, rules=rules, limit=50)
+    assert [i.tx_id for i in items] == [
+        tx.id
+        for tx in sorted(records, key=lambda r: r.time, reverse=True)
+        if categorize_tx(tax=tax, tx=tx, rules=rules).reason == "purchase_without_rule"
+    ][:50]
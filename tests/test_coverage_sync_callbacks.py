@@ -82,6 +82,12 @@ class DummyProfileStore:
     def save(self, telegram_user_id: int, profile: dict):
         self.data = dict(profile)
 
+    def load_baseline(self, telegram_user_id: int):
+        return None
+
+    def save_baseline(self, telegram_user_id: int, payload: dict):
+        pass
+
 
 class DummyTaxonomyStore:
     def load(self, telegram_user_id: int):
@@ -0,0 +1,156 @@
+from mono_ai_budget_bot.currency import CurrencyRateService, MonoCurrencyRate, currency_rate_service
+from mono_ai_budget_bot.currency.client import CurrencySnapshot
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+
+def _rates(usd: float) -> list[MonoCurrencyRate]:
+    return [
+        MonoCurrencyRate(currencyCodeA=840, currencyCodeB=980, date=1, rateBuy=usd, rateSell=usd),
+        MonoCurrencyRate(currencyCodeA=978, currencyCodeB=980, date=1, rateCross=45.0),
+    ]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    """Mimics MonobankPublicClient's disk cache: fresh for `ttl` after each fetch."""
+
+    def __init__(self, clock: FakeClock, *, ttl: float = 300.0) -> None:
+        self.clock = clock
+        self.ttl = ttl
+        self.usd = 40.0
+        self.expires_at: float | None = None
+        self.calls: list[bool] = []
+        self.fail = False
+
+    def currency_snapshot(self, *, force_refresh: bool = False) -> CurrencySnapshot:
+        self.calls.append(force_refresh)
+        fresh = self.expires_at is not None and self.clock() < self.expires_at
+        if fresh and not force_refresh:
+            return CurrencySnapshot(
+                rates=_rates(self.usd),
+                source="cache",
+                requested_refresh=False,
+                expires_at=self.expires_at,
+            )
+        if self.fail:
+            raise RuntimeError("network down")
+        self.expires_at = self.clock() + self.ttl
+        return CurrencySnapshot(
+            rates=_rates(self.usd),
+            source="network",
+            requested_refresh=force_refresh,
+            expires_at=self.expires_at,
+        )
+
+
+def _service(clock: FakeClock, client: FakeClient) -> CurrencyRateService:
+    return CurrencyRateService(lambda: client, refresh_ahead_seconds=60, clock=clock)
+
+
+def _wait(svc: CurrencyRateService) -> None:
+    if svc._bg_thread is not None:
+        svc._bg_thread.join(timeout=5)
+
+
+def test_rates_are_served_from_memory_after_first_load():
+    clock = FakeClock()
+    client = FakeClient(clock)
+    svc = _service(clock, client)
+
+    assert svc.rate_map_to_uah() == {840: 40.0, 978: 45.0}
+    for _ in range(50):
+        svc.rates()
+        svc.snapshot()
+    assert client.calls == [False]
+    assert svc.snapshot().source == "cache"
+
+    records = [
+        TxRecord("a", 1, "acc", -1000, "x", None, 840),
+        TxRecord("b", 1, "acc", -500, "y", None, 980),
+    ]
+    out = svc.normalize_records_to_uah(records)
+    assert [(r.amount, r.currencyCode) for r in out] == [(-40000, 980), (-500, 980)]
+
+
+def test_refresh_ahead_of_expiry_happens_in_background():
+    clock = FakeClock()
+    client = FakeClient(clock)
+    svc = _service(clock, client)
+    svc.rates()
+
+    clock.now += 239
+    svc.rates()
+    assert svc._bg_thread is None
+
+    client.usd = 41.0
+    clock.now += 2
+    assert svc.rate_map_to_uah()[840] == 40.0
+    _wait(svc)
+    assert client.calls == [False, False, True]
+    assert svc.rate_map_to_uah()[840] == 41.0
+
+
+def test_background_refresh_reuses_rates_refreshed_by_another_process():
+    clock = FakeClock()
+    client = FakeClient(clock)
+    svc = _service(clock, client)
+    svc.rates()
+
+    clock.now += 250
+    client.expires_at = clock.now + 300
+    client.usd = 42.0
+    svc.rates()
+    _wait(svc)
+    assert client.calls == [False, False]
+    assert svc.rate_map_to_uah()[840] == 42.0
+
+
+def test_failed_refresh_keeps_serving_rates_and_retries_later():
+    clock = FakeClock()
+    client = FakeClient(clock)
+    svc = CurrencyRateService(lambda: client, retry_seconds=30, clock=clock)
+    svc.rates()
+
+    client.fail = True
+    clock.now += 301
+    svc.rates()
+    _wait(svc)
+    calls = len(client.calls)
+    assert svc.rate_map_to_uah()[840] == 40.0
+
+    clock.now += 10
+    svc.rates()
+    _wait(svc)
+    assert len(client.calls) == calls
+
+    client.fail = False
+    client.usd = 43.0
+    clock.now += 25
+    svc.rates()
+    _wait(svc)
+    assert svc.rate_map_to_uah()[840] == 43.0
+
+
+def test_force_refresh_fetches_synchronously_and_service_is_shared():
+    clock = FakeClock()
+    client = FakeClient(clock)
+    svc = _service(clock, client)
+    svc.rates()
+
+    client.usd = 44.0
+    snap = svc.snapshot(force_refresh=True)
+    assert (snap.source, snap.requested_refresh) == ("network", True)
+    assert svc.rate_map_to_uah()[840] == 44.0
+
+    def factory():
+        return client
+
+    assert currency_rate_service(factory) is currency_rate_service(factory)
+    assert currency_rate_service(factory) is not currency_rate_service()
@@ -0,0 +1,185 @@
+import random
+
+from mono_ai_budget_bot.analytics.daily_cube import DailyCube, build_daily_cube
+from mono_ai_budget_bot.analytics.enrich import enrich_period_facts, enrich_period_facts_from_cube
+from mono_ai_budget_bot.analytics.period_report import build_period_report_from_ledger
+from mono_ai_budget_bot.bot.report_flow_helpers import DAILY_CUBE_DAYS, load_or_update_daily_cube
+from mono_ai_budget_bot.storage.daily_cube_store import DailyCubeStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord, TxStore
+
+DAY = 86400
+
+
+def _ledger(first_day: int, n_days: int, *, merchants: int, seed: int = 3) -> list[TxRecord]:
+    rnd = random.Random(seed)
+    names = [f"Shop {i}" for i in range(merchants)] + ["Uber trip", "Glovo", "ATB"]
+    mccs = [5411, 5812, 5814, 4121, 5732, None]
+    out = []
+    for i in range(n_days * 6):
+        amount = rnd.randrange(1_00, 3000_00) + i
+        kind = rnd.random()
+        out.append(
+            TxRecord(
+                id=f"t{i}",
+                time=first_day * DAY + rnd.randrange(n_days * DAY),
+                account_id=rnd.choice(["a", "b"]),
+                amount=amount if kind < 0.1 else -amount,
+                description="Salary" if kind < 0.1 else rnd.choice(names),
+                mcc=None if kind < 0.1 else rnd.choice(mccs),
+                currencyCode=980,
+            )
+        )
+    return out
+
+
+def _facts_both_ways(records, cube, *, days_back, now_ts):
+    lookback = [r for r in records if now_ts - (2 * days_back + 1) * DAY <= r.time <= now_ts]
+    expected = enrich_period_facts(lookback, days_back=days_back, now_ts=now_ts)
+
+    loads = []
+
+    def load(ts_from, ts_to):
+        loads.append((ts_from, ts_to))
+        return [r for r in records if ts_from <= r.time <= ts_to]
+
+    got = enrich_period_facts_from_cube(cube, days_back=days_back, now_ts=now_ts, load_records=load)
+    return expected, got, loads
+
+
+def test_cube_facts_match_full_pipeline_for_any_window():
+    first_day, n_days = 1000, 200
+    records = _ledger(first_day, n_days, merchants=8)
+    cube = build_daily_cube(records, first_day=first_day, n_days=n_days)
+
+    for days_back, end_day in ((1, first_day + 150), (7, first_day + 199), (45, first_day + 120)):
+        now_ts = (end_day + 1) * DAY
+        expected, got, loads = _facts_both_ways(records, cube, days_back=days_back, now_ts=now_ts)
+        assert got == expected
+        assert loads and loads[0][0] >= now_ts - 29 * DAY
+
+
+def test_cube_loads_raw_window_when_top_merchants_are_not_exact():
+    first_day, n_days = 2000, 120
+    records = _ledger(first_day, n_days, merchants=200, seed=5)
+    cube = build_daily_cube(records, first_day=first_day, n_days=n_days)
+    assert cube.untracked_merchant_max > 0
+
+    now_ts = (first_day + n_days) * DAY
+    expected, got, loads = _facts_both_ways(records, cube, days_back=59, now_ts=now_ts)
+    assert got == expected
+    assert loads == [(now_ts - 59 * DAY, now_ts)]
+
+
+def _with_refunds(first_day: int, n_days: int, *, seed: int) -> list[TxRecord]:
+    rnd = random.Random(seed)
+    out = _ledger(first_day, n_days, merchants=8, seed=seed)
+    for i in range(n_days // 3):
+        t = first_day * DAY + rnd.randrange(n_days * DAY)
+        amount = rnd.choice([1999_00, 2500_00, 4200_00])
+        out.append(TxRecord(f"p{i}", t, "a", -amount, "Rozetka order", 5732, 980))
+        if rnd.random() < 0.7:
+            dt = rnd.randrange(-2 * DAY, 13 * DAY)
+            out.append(TxRecord(f"r{i}", t + dt, "a", amount, "Rozetka order refund", None, 980))
+    return out
+
+
+def test_cube_pairs_refunds_per_window_like_the_full_pipeline():
+    first_day, n_days = 3000, 150
+    records = _with_refunds(first_day, n_days, seed=11)
+    cube = build_daily_cube(records, first_day=first_day, n_days=n_days)
+    assert cube.refund_records
+
+    edge_pairs = 0
+    for days_back in (5, 14, 30):
+        for end_day in range(first_day + 2 * days_back + 2, first_day + n_days, 3):
+            now_ts = end_day * DAY
+            lookback_from = now_ts - (2 * days_back + 1) * DAY
+            expected, got, _ = _facts_both_ways(records, cube, days_back=days_back, now_ts=now_ts)
+            assert got == expected
+
+            lookback = [r for r in records if lookback_from <= r.time <= now_ts]
+            report = build_period_report_from_ledger(lookback, days_back=days_back, now_ts=now_ts)
+            assert got["totals"] == report["current"]["totals"]
+            assert got["comparison"]["totals"] == report["compare"]["totals"]
+
+            ids = {r.id for r in lookback}
+            edge_pairs += sum(
+                1
+                for r in records
+                if r.id.startswith("r") and (r.id in ids) != (f"p{r.id[1:]}" in ids)
+            )
+    assert edge_pairs > 0
+
+
+def test_cube_folds_appends_and_rolls_forward_without_reloading_the_window(tmp_path):
+    now_ts = 5000 * DAY + 3600
+    tx = TxStore(tmp_path / "tx")
+    cubes = DailyCubeStore(tmp_path / "reports")
+    history = _with_refunds(5000 - 200, 200, seed=7)
+    old = [r for r in history if r.time < now_ts - 20 * DAY]
+    new = [r for r in history if r.time >= now_ts - 20 * DAY]
+
+    def rows(records):
+        return [
+            {
+                "id": r.id,
+                "time": r.time,
+                "amount": r.amount,
+                "description": r.description,
+                "mcc": r.mcc,
+                "currencyCode": r.currencyCode,
+            }
+            for r in records
+        ]
+
+    for acc in ("a", "b"):
+        tx.append_many(1, acc, rows([r for r in old if r.account_id == acc]))
+    first = load_or_update_daily_cube(1, ["a", "b"], tx_store=tx, cube_store=cubes, now_ts=now_ts)
+    assert first.n_days == DAILY_CUBE_DAYS
+    assert DailyCube.from_dict(cubes.load(1)) == first
+
+    loads = []
+    load_range = tx.load_range
+
+    def spy(tg_id, account_ids, ts_from, ts_to):
+        loads.append((ts_from, ts_to))
+        return load_range(tg_id, account_ids, ts_from, ts_to)
+
+    tx.load_range = spy
+    for acc in ("a", "b"):
+        tx.append_many(1, acc, rows([r for r in new if r.account_id == acc]))
+    later = now_ts + 3 * DAY
+    cube = load_or_update_daily_cube(1, ["a", "b"], tx_store=tx, cube_store=cubes, now_ts=later)
+    assert loads and all(ts_to - ts_from < 60 * DAY for ts_from, ts_to in loads)
+    assert cube.first_day == first.first_day + 3
+    assert DailyCube.from_dict(cubes.load(1)) == cube
+
+    full = build_daily_cube(
+        tx.load_range(1, ["a", "b"], cube.start_ts, cube.end_ts - 1),
+        first_day=cube.first_day,
+        n_days=cube.n_days,
+    )
+    assert {k: v for k, v in cube.daily.items() if v} == {k: v for k, v in full.daily.items() if v}
+    assert [r.id for r in cube.refund_records] == [r.id for r in full.refund_records]
+
+    tx.load_range = load_range
+    for days_back in (15, 30, 90):
+        end_ts = (later // DAY + 1) * DAY
+        expected, got, _ = _facts_both_ways(history, cube, days_back=days_back, now_ts=end_ts)
+        assert got == expected
+
+
+def test_cube_rebuilds_when_a_ledger_is_rewritten(tmp_path):
+    now_ts = 5000 * DAY + 3600
+    tx = TxStore(tmp_path / "tx")
+    cubes = DailyCubeStore(tmp_path / "reports")
+    tx.append_many(1, "a", [{"id": "x1", "time": now_ts - DAY, "amount": -5000, "mcc": 5411}])
+
+    first = load_or_update_daily_cube(1, ["a"], tx_store=tx, cube_store=cubes, now_ts=now_ts)
+    assert first.range_sum("spend", first.start_ts, first.end_ts) == 5000
+    again = load_or_update_daily_cube(1, ["a"], tx_store=tx, cube_store=cubes, now_ts=now_ts)
+    assert again == first
+
+    tx._path(1, "a").write_text(f'{{"id":"x2","time":{now_ts - 10},"amount":-700}}\n')
+    rebuilt = load_or_update_daily_cube(1, ["a"], tx_store=tx, cube_store=cubes, now_ts=now_ts)
+    assert rebuilt.range_sum("spend", rebuilt.start_ts, rebuilt.end_ts) == 700
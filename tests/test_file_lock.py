@@ -0,0 +1,146 @@
+import json
+import multiprocessing
+import threading
+import time
+
+from mono_ai_budget_bot.core.file_lock import (
+    RWLock,
+    atomic_write_text,
+    read_locked,
+    update_json_locked,
+    write_locked,
+)
+from mono_ai_budget_bot.storage.rules_store import RulesStore
+from mono_ai_budget_bot.storage.tx_store import TxStore
+from mono_ai_budget_bot.taxonomy.rules import Rule
+
+
+def test_rw_lock_allows_concurrent_readers_and_excludes_writer():
+    lock = RWLock()
+    lock.acquire_read()
+    lock.acquire_read()
+
+    acquired = threading.Event()
+
+    def writer():
+        lock.acquire_write()
+        acquired.set()
+        lock.release_write()
+
+    t = threading.Thread(target=writer)
+    t.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+
+    lock.release_read()
+    lock.release_read()
+    t.join(timeout=2)
+    assert acquired.is_set()
+
+
+def test_readers_of_same_path_do_not_block_each_other(tmp_path):
+    p = tmp_path / "x.json"
+    p.write_text("{}", encoding="utf-8")
+
+    inside = threading.Barrier(2, timeout=2)
+
+    def reader():
+        with read_locked(p):
+            inside.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=3)
+    assert not inside.broken
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    p = tmp_path / "a.json"
+    atomic_write_text(p, "one")
+    atomic_write_text(p, "two")
+
+    assert p.read_text(encoding="utf-8") == "two"
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["a.json"]
+
+
+def _increment_many(path_str: str, n: int) -> None:
+    from pathlib import Path
+
+    for _ in range(n):
+        update_json_locked(Path(path_str), lambda cur: (cur or 0) + 1)
+
+
+def test_update_json_locked_is_safe_across_threads_and_processes(tmp_path):
+    p = tmp_path / "counter.json"
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_increment_many, args=(str(p), 25)) for _ in range(2)]
+    for w in procs:
+        w.start()
+    threads = [threading.Thread(target=_increment_many, args=(str(p), 25)) for _ in range(4)]
+    for w in threads:
+        w.start()
+    for w in [*threads, *procs]:
+        w.join(timeout=60)
+
+    assert json.loads(p.read_text(encoding="utf-8")) == 150
+
+
+def test_concurrent_tx_appends_do_not_duplicate_rows(tmp_path):
+    st = TxStore(tmp_path)
+    items = [{"id": f"t{i}", "time": 1000 + i, "amount": -100} for i in range(50)]
+
+    threads = [threading.Thread(target=st.append_many, args=(1, "acc", items)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    rows = st.load_range(1, ["acc"], 0, 10**10)
+    assert [r.id for r in rows] == [f"t{i}" for i in range(50)]
+    assert st.last_ts(1, "acc") == 1049
+
+
+def test_rules_add_is_not_lost_under_concurrency(tmp_path):
+    st = RulesStore(tmp_path)
+
+    def add(i: int) -> None:
+        st.add(1, Rule(id=f"r{i}", leaf_id="food", merchant_contains=f"m{i}"))
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert sorted(r.id for r in st.load(1)) == sorted(f"r{i}" for i in range(20))
+
+
+def test_write_lock_blocks_readers_until_released(tmp_path):
+    p = tmp_path / "x.json"
+    p.write_text("{}", encoding="utf-8")
+    seen = threading.Event()
+
+    def reader():
+        with read_locked(p):
+            seen.set()
+
+    with write_locked(p):
+        t = threading.Thread(target=reader)
+        t.start()
+        time.sleep(0.05)
+        assert not seen.is_set()
+    t.join(timeout=2)
+    assert seen.is_set()
+
+
+def test_reading_missing_target_creates_no_lock_sidecar(tmp_path):
+    from mono_ai_budget_bot.storage.user_store import UserStore
+
+    users = UserStore(tmp_path / "users")
+    assert users.load(42) is None
+
+    assert RulesStore(tmp_path / "rules").load(42) == []
+    assert list(tmp_path.rglob("*.lock")) == []
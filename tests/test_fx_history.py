@@ -0,0 +1,139 @@
+from pathlib import Path
+
+from mono_ai_budget_bot.bot import report_flow_helpers as rfh
+from mono_ai_budget_bot.currency.client import MonobankPublicClient
+from mono_ai_budget_bot.currency.history import (
+    SECONDS_IN_DAY,
+    FxHistory,
+    load_fx_history,
+    normalize_records_by_day,
+)
+from mono_ai_budget_bot.storage.fx_amount_store import FxAmountStore
+from mono_ai_budget_bot.storage.fx_history_store import FxHistoryStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+DAY = 20_000
+
+
+def _ts(day: int) -> int:
+    return day * SECONDS_IN_DAY + 3600
+
+
+def _tx(tx_id: str, day: int, amount: int, code: int = 840) -> TxRecord:
+    return TxRecord(tx_id, _ts(day), "acc", amount, "x", None, code)
+
+
+def test_transactions_convert_with_the_rate_of_their_day():
+    history = FxHistory()
+    assert history.record(_ts(DAY), {840: 40.0})
+    assert not history.record(_ts(DAY) + 600, {840: 99.0})
+    history.record(_ts(DAY + 3), {840: 42.0, 978: 45.0})
+    history = FxHistory.from_dict(history.to_dict())
+
+    records = [
+        _tx("before", DAY - 5, -100),
+        _tx("same", DAY, -100),
+        _tx("gap", DAY + 2, -100),
+        _tx("last", DAY + 3, -100),
+        _tx("after", DAY + 4, -100),
+        _tx("eur", DAY + 1, -100, 978),
+        _tx("uah", DAY + 1, -100, 980),
+        _tx("pln", DAY + 1, -100, 985),
+    ]
+    out, fresh = normalize_records_by_day(records, history, fallback_rate_map={985: 10.0})
+    assert [(r.amount, r.currencyCode) for r in out] == [
+        (-4000, 980),
+        (-4000, 980),
+        (-4000, 980),
+        (-4200, 980),
+        (-4200, 980),
+        (-4500, 980),
+        (-100, 980),
+        (-1000, 980),
+    ]
+    # Only conversions within the recorded days are final; earlier ones borrow the
+    # first snapshot's rate provisionally.
+    assert set(fresh) == {"same", "gap", "last"}
+
+
+def test_client_records_daily_history_and_user_amounts_stay_stable(monkeypatch, tmp_path: Path):
+    client = MonobankPublicClient(cache_root=tmp_path / "mono_public")
+    usd = {"rate": 40.0}
+    monkeypatch.setattr(
+        client,
+        "_request_json",
+        lambda path: [
+            {"currencyCodeA": 840, "currencyCodeB": 980, "date": 1, "rateCross": usd["rate"]}
+        ],
+    )
+    monkeypatch.setattr(client._limiter, "throttle", lambda *a, **k: None)
+    try:
+        client.currency_snapshot(force_refresh=True)
+        usd["rate"] = 41.0
+        client.currency_snapshot(force_refresh=True)
+    finally:
+        client.close()
+
+    history_store = FxHistoryStore(tmp_path / "mono_public" / "fx_history.json")
+    history = load_fx_history(history_store)
+    assert list(history.days.values()) == [{840: 40.0}]
+
+    today = next(iter(history.days))
+    amount_store = FxAmountStore(tmp_path / "reports")
+    records = [_tx("old", today, -100), _tx("new", today, -200)]
+    out = rfh.normalize_records_for_user(
+        1, records, history_store=history_store, amount_store=amount_store
+    )
+    assert [r.amount for r in out] == [-4000, -8000]
+    assert amount_store.load(1) == {
+        "old": [-100, 840, -4000, today],
+        "new": [-200, 840, -8000, today],
+    }
+
+    history_store.update(lambda _current: None)
+    out = rfh.normalize_records_for_user(
+        1,
+        records + [_tx("later", today + 1, -100)],
+        history_store=history_store,
+        amount_store=amount_store,
+        rate_map={840: 50.0},
+    )
+    assert [r.amount for r in out] == [-4000, -8000, -5000]
+    assert "later" not in amount_store.load(1)
+
+
+def test_kept_conversions_are_pruned_outside_the_window(tmp_path: Path):
+    history_store = FxHistoryStore(tmp_path / "fx_history.json")
+    history = FxHistory(days={DAY - 1: {840: 38.0}, DAY + 10: {840: 40.0}})
+    history_store.update(lambda _current: history.to_dict())
+    amount_store = FxAmountStore(tmp_path / "reports")
+
+    records = [_tx("a", DAY, -100), _tx("b", DAY + 5, -100)]
+    rfh.normalize_records_for_user(
+        1, records, history_store=history_store, amount_store=amount_store
+    )
+    assert set(amount_store.load(1)) == {"a", "b"}
+
+    rfh.normalize_records_for_user(
+        1,
+        [_tx("c", DAY + 9, -100)],
+        history_store=history_store,
+        amount_store=amount_store,
+        keep_from_ts=_ts(DAY + 5),
+    )
+    assert set(amount_store.load(1)) == {"b", "c"}
+
+
+def test_conversions_before_the_first_snapshot_are_not_kept(tmp_path: Path):
+    history_store = FxHistoryStore(tmp_path / "fx_history.json")
+    history_store.update(lambda _current: FxHistory(days={DAY: {840: 40.0}}).to_dict())
+    amount_store = FxAmountStore(tmp_path / "reports")
+
+    out = rfh.normalize_records_for_user(
+        1,
+        [_tx("early", DAY - 3, -100), _tx("known", DAY, -100)],
+        history_store=history_store,
+        amount_store=amount_store,
+    )
+    assert [r.amount for r in out] == [-4000, -4000]
+    assert set(amount_store.load(1)) == {"known"}
@@ -0,0 +1,452 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from mono_ai_budget_bot.bot.interactive_jobs import (
+    INTERACTIVE_MAX_ATTEMPTS,
+    submit_interactive_job,
+)
+from mono_ai_budget_bot.bot.scheduler import build_job_runtime, run_job_worker, user_lease_name
+from mono_ai_budget_bot.core.job_queue import (
+    JOB_KIND_REPORT,
+    JOB_KIND_SYNC,
+    LANE_BOT,
+    PRIORITY_INTERACTIVE,
+    JobQueue,
+)
+from mono_ai_budget_bot.storage.user_store import RosterEntry
+
+
+def test_claim_orders_by_priority_then_age(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    q.enqueue("sync", user_id=1, now=100)
+    q.enqueue("sync", user_id=2, now=101, priority=PRIORITY_INTERACTIVE)
+    q.enqueue("sync", user_id=3, now=102)
+
+    order = []
+    while (job := q.claim("w1", now=200)) is not None:
+        order.append(job.user_id)
+        q.complete(job.id, "w1")
+
+    assert order == [2, 1, 3]
+    assert q.pending_count() == 0
+
+
+def test_claimed_job_is_reclaimable_after_lease_expiry(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3", lease_seconds=60)
+    q.enqueue("report", user_id=7, payload={"period": "week"}, now=100)
+
+    first = q.claim("w1", now=100)
+    assert first is not None
+    assert first.payload == {"period": "week"}
+    assert q.claim("w2", now=130) is None
+
+    again = q.claim("w2", now=161)
+    assert again is not None
+    assert again.id == first.id
+    assert again.attempts == 2
+
+
+def test_delayed_and_failed_jobs_are_not_claimed(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    q.enqueue("sync", user_id=1, delay_seconds=30, now=100)
+    assert q.claim("w", now=110) is None
+
+    job = q.claim("w", now=131)
+    assert job is not None
+    q.fail(job.id, "w", "boom")
+    assert q.claim("w", now=10_000) is None
+
+
+class _Users:
+    def __init__(self, entries):
+        self._entries = {e.telegram_user_id: e for e in entries}
+
+    def iter_roster(self, *, autojobs_only=False, require_chat=False, require_accounts=False):
+        for e in self._entries.values():
+            if require_accounts and e.selected_accounts_count <= 0:
+                continue
+            yield e
+
+    def roster_entry(self, uid):
+        return self._entries.get(uid)
+
+    def load(self, uid):
+        e = self._entries.get(uid)
+        if e is None:
+            return None
+        return SimpleNamespace(
+            telegram_user_id=uid,
+            chat_id=e.chat_id,
+            autojobs_enabled=True,
+            mono_token="tok",
+            selected_account_ids=["acc"] * e.selected_accounts_count,
+        )
+
+
+class _Empty:
+    def load(self, *_):
+        return None
+
+
+def test_scheduler_enqueues_and_worker_runs_per_user_jobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    q = JobQueue(tmp_path / "q.sqlite3")
+    users = _Users(
+        [
+            RosterEntry(1, 10, True, 1, 0.0),
+            RosterEntry(2, 20, True, 0, 0.0),
+        ]
+    )
+    synced: list[tuple[int, int]] = []
+
+    async def sync_user_ledger(tg_id, cfg, *, days_back):
+        synced.append((tg_id, days_back))
+
+    async def recompute(tg_id, account_ids):
+        return None
+
+    runtime = build_job_runtime(
+        bot=None,
+        users=users,
+        report_store=_Empty(),
+        render_report_text=lambda *a, **k: "",
+        logger=logging.getLogger("test"),
+        sync_user_ledger=sync_user_ledger,
+        recompute_reports_for_user=recompute,
+        profile_store=_Empty(),
+        uncat_store=_Empty(),
+        job_queue=q,
+    )
+
+    asyncio.run(runtime["job_refresh_all_users"](days_back=2))
+    asyncio.run(runtime["job_weekly_report"]())
+    assert synced == []
+    assert q.pending_count() == 3
+
+    kinds = []
+
+    async def drain():
+        while (job := q.claim("w")) is not None:
+            kinds.append((job.kind, job.user_id))
+            await runtime["run_queued_job"](job)
+            q.complete(job.id, "w")
+
+    asyncio.run(drain())
+
+    assert sorted(kinds) == [(JOB_KIND_REPORT, 1), (JOB_KIND_SYNC, 1), (JOB_KIND_SYNC, 2)]
+    assert sorted(synced) == [(1, 2), (1, 8)]
+    assert q.pending_count() == 0
+
+
+def test_failing_queued_sync_job_is_retried(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    q = JobQueue(tmp_path / "q.sqlite3")
+    users = _Users([RosterEntry(1, 10, True, 1, 0.0)])
+
+    async def sync_user_ledger(tg_id, cfg, *, days_back):
+        raise RuntimeError("monobank down")
+
+    async def recompute(tg_id, account_ids):
+        return None
+
+    runtime = build_job_runtime(
+        bot=None,
+        users=users,
+        report_store=_Empty(),
+        render_report_text=lambda *a, **k: "",
+        logger=logging.getLogger("test"),
+        sync_user_ledger=sync_user_ledger,
+        recompute_reports_for_user=recompute,
+        profile_store=_Empty(),
+        uncat_store=_Empty(),
+        job_queue=q,
+    )
+    runtime["enqueue_refresh_all_users"](days_back=2)
+
+    async def main():
+        stop = asyncio.Event()
+        task = asyncio.create_task(
+            run_job_worker(
+                q,
+                runtime["run_queued_job"],
+                logger=logging.getLogger("test"),
+                worker_id="me",
+                poll_interval=0.01,
+                stop_event=stop,
+            )
+        )
+        await asyncio.sleep(0.2)
+        stop.set()
+        await task
+
+    asyncio.run(main())
+
+    [row] = q.stats()
+    assert (row["kind"], row["status"], row["count"]) == (JOB_KIND_SYNC, "pending", 1)
+    job = q.claim("x", now=10**10)
+    assert job is not None and job.attempts == 2
+
+
+def test_stale_worker_cannot_complete_or_fail_reclaimed_job(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3", lease_seconds=60)
+    q.enqueue("sync", user_id=1, now=0)
+    first = q.claim("a", now=0)
+    second = q.claim("b", now=61)
+    assert second.id == first.id
+
+    assert not q.complete(first.id, "a")
+    assert q.fail(first.id, "a", "late", now=70) is False
+    [row] = q.stats(now=70)
+    assert (row["status"], row["count"]) == ("running", 1)
+    assert q.complete(second.id, "b")
+    assert q.pending_count() == 0
+
+
+def test_failed_job_is_retried_with_exponential_backoff(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    q.enqueue("sync", user_id=1, max_attempts=3, now=0)
+
+    job = q.claim("w", now=0)
+    assert q.fail(job.id, "w", "boom", now=0) is True
+    assert q.claim("w", now=29) is None
+
+    job = q.claim("w", now=30)
+    assert job is not None and job.attempts == 2
+    assert q.fail(job.id, "w", "boom", now=30) is True
+    assert q.claim("w", now=89) is None
+
+    job = q.claim("w", now=90)
+    assert job.is_last_attempt
+    assert q.fail(job.id, "w", "boom", now=90) is False
+    assert q.claim("w", now=100_000) is None
+
+    [row] = q.stats(now=100)
+    assert (row["status"], row["count"], row["oldest_age_s"]) == ("failed", 1, 100)
+
+
+def test_enqueue_coalesces_pending_duplicates_per_user_and_kind(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    a = q.enqueue("sync", user_id=1, payload={"days_back": 2}, now=10)
+    b = q.enqueue(
+        "sync", user_id=1, payload={"days_back": 8}, priority=PRIORITY_INTERACTIVE, now=20
+    )
+    c = q.enqueue("sync", user_id=2, payload={"days_back": 2}, now=30)
+
+    assert a == b != c
+    job = q.claim("w", now=40)
+    assert job.user_id == 1
+    assert job.priority == PRIORITY_INTERACTIVE
+    assert job.payload == {"days_back": 8}
+
+    d = q.enqueue("sync", user_id=1, payload={"days_back": 2}, now=50)
+    assert d != a
+    assert q.fail(job.id, "w", "boom", now=60) is True
+    assert q.pending_count() == 2
+    claimed = {j.user_id: j for j in (q.claim("w", now=60), q.claim("w", now=60))}
+    assert claimed[1].id == d
+    assert claimed[1].payload == {"days_back": 8}
+
+
+def test_lanes_are_claimed_separately(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    q.enqueue("sync", user_id=1, lane=LANE_BOT, now=0)
+    q.enqueue("sync", user_id=1, now=0)
+
+    assert q.claim("w", now=1).lane == "default"
+    assert q.claim("w", now=1) is None
+    assert q.claim("w", lanes=(LANE_BOT,), now=1).lane == LANE_BOT
+
+
+def test_interactive_jobs_are_enqueued_without_tokens(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    ctx = SimpleNamespace(job_queue=q)
+
+    asyncio.run(
+        submit_interactive_job(
+            ctx, JOB_KIND_SYNC, user_id=5, payload={"chat_id": 50, "days_back": 8}
+        )
+    )
+
+    job = q.claim("w", lanes=(LANE_BOT,))
+    assert job is not None
+    assert (job.kind, job.user_id, job.max_attempts) == (
+        JOB_KIND_SYNC,
+        5,
+        INTERACTIVE_MAX_ATTEMPTS,
+    )
+    assert job.payload == {"chat_id": 50, "days_back": 8}
+
+
+def test_back_to_back_taxonomy_migrations_are_queued_separately(tmp_path):
+    from mono_ai_budget_bot.core.job_queue import JOB_KIND_TAXONOMY_MIGRATION
+
+    q = JobQueue(tmp_path / "q.sqlite3")
+    ctx = SimpleNamespace(job_queue=q)
+    payloads = [
+        {"chat_id": 50, "source_leaf_id": "food", "target_leaf_id": "delivery"},
+        {"chat_id": 50, "source_leaf_id": "fun", "target_leaf_id": "cinema"},
+    ]
+    for payload in payloads:
+        asyncio.run(
+            submit_interactive_job(
+                ctx, JOB_KIND_TAXONOMY_MIGRATION, user_id=5, payload=dict(payload)
+            )
+        )
+
+    jobs = [q.claim("w", lanes=(LANE_BOT,), now=1e12) for _ in payloads]
+    assert all(j is not None and j.kind == JOB_KIND_TAXONOMY_MIGRATION for j in jobs)
+    assert len({j.id for j in jobs}) == 2
+    assert sorted((j.payload for j in jobs), key=lambda p: p["source_leaf_id"]) == payloads
+
+
+def test_lease_is_exclusive_until_expiry(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+
+    assert q.acquire_lease("cron:weekly_report", "a", ttl_seconds=55, now=0)
+    assert not q.acquire_lease("cron:weekly_report", "b", ttl_seconds=55, now=10)
+    assert q.acquire_lease("cron:weekly_report", "a", ttl_seconds=55, now=20)
+    assert q.acquire_lease("cron:weekly_report", "b", ttl_seconds=55, now=76)
+
+    q.release_lease("cron:weekly_report", "a")
+    assert not q.acquire_lease("cron:weekly_report", "a", ttl_seconds=55, now=80)
+    q.release_lease("cron:weekly_report", "b")
+    assert q.acquire_lease("cron:weekly_report", "a", ttl_seconds=55, now=80)
+
+
+def test_worker_defers_job_while_user_is_leased_elsewhere(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3")
+    q.enqueue("sync", user_id=1)
+    assert q.acquire_lease(user_lease_name(1), "other-host:1", ttl_seconds=600)
+
+    ran = []
+
+    async def run(job):
+        ran.append(job.id)
+
+    async def main():
+        stop = asyncio.Event()
+        task = asyncio.create_task(
+            run_job_worker(
+                q,
+                run,
+                logger=logging.getLogger("test"),
+                worker_id="me",
+                poll_interval=0.01,
+                stop_event=stop,
+            )
+        )
+        await asyncio.sleep(0.2)
+        stop.set()
+        await task
+
+    asyncio.run(main())
+
+    assert ran == []
+    [row] = q.stats()
+    assert (row["status"], row["count"]) == ("pending", 1)
+    assert q.claim("x") is None
+
+    q.release_lease(user_lease_name(1), "other-host:1")
+    job = q.claim("x", now=10**10)
+    assert job is not None and job.attempts == 1
+
+
+def test_heartbeat_keeps_job_from_being_reclaimed(tmp_path):
+    q = JobQueue(tmp_path / "q.sqlite3", lease_seconds=60)
+    q.enqueue("sync", user_id=1, now=0)
+    job = q.claim("a", now=0)
+
+    assert q.heartbeat(job.id, "a", now=50)
+    assert q.claim("b", now=70) is None
+    assert not q.heartbeat(job.id, "b", now=70)
+    assert q.claim("b", now=111).id == job.id
+
+
+def test_taxonomy_migration_job_moves_cached_categorizations(tmp_path, monkeypatch):
+    import time
+
+    from mono_ai_budget_bot.bot import interactive_jobs as ij
+    from mono_ai_budget_bot.core.job_queue import JOB_KIND_TAXONOMY_MIGRATION, Job
+    from mono_ai_budget_bot.storage.categorization_store import CategorizationStore
+    from mono_ai_budget_bot.storage.tx_store import TxStore
+    from mono_ai_budget_bot.storage.uncat_store import UncatStore
+    from mono_ai_budget_bot.taxonomy import (
+        Rule,
+        add_category,
+        apply_subcategory_migration_choice,
+        build_taxonomy_preset,
+    )
+    from mono_ai_budget_bot.taxonomy.categorization_cache import CategorizationCache
+
+    now = int(time.time())
+    tx_store = TxStore(tmp_path / "tx")
+    tx_store.append_many(
+        1,
+        "acc",
+        [
+            {"id": f"g{i}", "time": now - i * 60, "amount": -900, "description": "Glovo"}
+            for i in range(5)
+        ],
+    )
+    cat_store = CategorizationStore(tmp_path / "reports")
+    monkeypatch.setattr(ij, "categorization_store", cat_store)
+
+    tax = build_taxonomy_preset("min")
+    food = add_category(tax, root_kind="expense", name="Їжа")
+    rules = [Rule(id="r1", leaf_id=food, merchant_contains="glovo")]
+    cache = CategorizationCache()
+    cache.refresh(tx_store.load_range(1, ["acc"], 0, now + 1), tax=tax, rules=rules)
+    cat_store.save(1, cache.to_dict())
+
+    target, decision = apply_subcategory_migration_choice(
+        tax, parent_id=food, name="Доставка", migrate_to_leaf_id=_subcategory_id(tax, food)
+    )
+    rules = [Rule(id="r1", leaf_id=target, merchant_contains="glovo")]
+
+    sent = []
+
+    async def send_message(chat_id, text, **_kw):
+        sent.append(text)
+        return SimpleNamespace(message_id=len(sent))
+
+    ctx = SimpleNamespace(
+        bot=SimpleNamespace(send_message=send_message),
+        users=SimpleNamespace(load=lambda _uid: SimpleNamespace(selected_account_ids=["acc"])),
+        taxonomy_store=SimpleNamespace(load=lambda _uid: tax),
+        rules_store=SimpleNamespace(load=lambda _uid: rules),
+        tx_store=tx_store,
+        uncat_store=UncatStore(tmp_path / "uncat"),
+        user_locks={1: asyncio.Lock()},
+    )
+    job = Job(
+        id=1,
+        kind=JOB_KIND_TAXONOMY_MIGRATION,
+        user_id=1,
+        payload={
+            "chat_id": 10,
+            "source_leaf_id": decision.source_leaf_id,
+            "source_leaf_name": decision.source_leaf_name,
+            "target_leaf_id": decision.target_leaf_id,
+            "target_leaf_name": decision.target_leaf_name,
+        },
+        priority=PRIORITY_INTERACTIVE,
+        attempts=1,
+        created_at=0.0,
+        lane=LANE_BOT,
+        max_attempts=1,
+    )
+    asyncio.run(ij.build_interactive_job_runner(ctx)(job))
+
+    assert sent[0].startswith("⏳") and "Їжа → Доставка" in sent[0]
+    assert sent[-1] == "✅ Перенесено операцій у *Доставка*: 5"
+    saved = CategorizationCache.from_dict(cat_store.load(1))
+    assert {e[1] for e in saved.entries.values()} == {target}
+
+
+def _subcategory_id(tax, parent_id):
+    from mono_ai_budget_bot.taxonomy import build_subcategory_migration_prompt
+
+    return build_subcategory_migration_prompt(
+        tax, parent_id=parent_id, name="Доставка"
+    ).new_subcategory_id
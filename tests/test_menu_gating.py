@@ -85,6 +85,15 @@ class DummyProfileStore:
     def save(self, telegram_user_id: int, profile: dict):
         self.profile = dict(profile)
 
+    def load_baseline(self, telegram_user_id: int):
+        return None
+
+    def save_baseline(self, telegram_user_id: int, payload: dict):
+        pass
+
+    def delete_baseline(self, telegram_user_id: int):
+        pass
+
 
 class DummyTaxonomyStore:
     def __init__(self, taxonomy: dict | None = None):
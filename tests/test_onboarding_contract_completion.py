@@ -3,7 +3,8 @@ from pathlib import Path
 
 
 def _get_register_handlers_tree() -> ast.FunctionDef:
-    src = Path("src/mono_ai_budget_bot/bot/handlers.py").read_text(encoding="utf-8")
+    path = Path(__file__).resolve().parents[1] / "src/mono_ai_budget_bot/bot/handlers.py"
+    src = path.read_text(encoding="utf-8")
     mod = ast.parse(src)
     for node in mod.body:
         if isinstance(node, ast.FunctionDef) and node.name == "register_handlers":
@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+
+from mono_ai_budget_bot.analytics.compare import compare_categories, compare_totals
+from mono_ai_budget_bot.analytics.compute import compute_facts
+from mono_ai_budget_bot.analytics.from_ledger import rows_from_ledger
+from mono_ai_budget_bot.analytics.period_report import _to_iso_utc
+from mono_ai_budget_bot.analytics.period_to_date import PeriodToDate
+from mono_ai_budget_bot.analytics.refunds import (
+    build_refund_insights,
+    detect_refund_pairs,
+    refund_ignore_ids,
+)
+from mono_ai_budget_bot.bot.report_flow_helpers import load_or_update_period_to_date
+from mono_ai_budget_bot.core.time_ranges import KYIV_TZ, calendar_period_bounds
+from mono_ai_budget_bot.storage.period_to_date_store import PeriodToDateStore
+from mono_ai_budget_bot.storage.tx_store import TxStore
+
+HOUR = 3600
+
+
+def _ts(*args) -> int:
+    return int(datetime(*args, tzinfo=KYIV_TZ).timestamp())
+
+
+def _tx(i: int, t: int, amount: int, *, desc: str = "", mcc: int | None = 5411) -> dict:
+    return {
+        "id": f"t{i}",
+        "time": t,
+        "account_id": "a",
+        "amount": amount,
+        "description": desc or f"Shop {i % 4}",
+        "mcc": mcc,
+        "currencyCode": 980,
+    }
+
+
+def _facts_without_refunds(records, start_ts: int, end_ts: int):
+    pairs = detect_refund_pairs(records)
+    ignore_ids = refund_ignore_ids(pairs)
+    facts = compute_facts(rows_from_ledger([r for r in records if r.id not in ignore_ids]))
+    return facts, build_refund_insights(pairs, start_ts=start_ts, end_ts=end_ts)
+
+
+def _expected(tx: TxStore, start_ts: int, as_of_ts: int, kind: str = "month") -> dict:
+    """
+    Facts of [start_ts, as_of_ts] read from the ledger, compared with the same number
+    of started days at the start of the previous period.
+    """
+    _, end_ts = calendar_period_bounds(kind, start_ts)
+    records = tx.load_range(1, ["a", "b"], start_ts, as_of_ts - 1)
+    facts, facts["refunds"] = _facts_without_refunds(records, start_ts, end_ts)
+
+    prev_start, _ = calendar_period_bounds(kind, start_ts - 1)
+    days = (_day(as_of_ts) - _day(start_ts)).days + 1
+    cut_ts = min(start_ts, int((_day(prev_start) + timedelta(days=days)).timestamp()))
+    prev, _ = _facts_without_refunds(tx.load_range(1, ["a", "b"], prev_start, cut_ts - 1), 0, 0)
+    facts["comparison"] = {
+        "prev_period": {
+            "dt_from": _to_iso_utc(prev_start),
+            "dt_to": _to_iso_utc(cut_ts),
+            "totals": prev["totals"],
+            "categories_real_spend": prev["categories_real_spend"],
+        },
+        "totals": compare_totals(current=facts, prev=prev),
+        "categories": compare_categories(
+            current=facts["categories_real_spend"], prev=prev["categories_real_spend"]
+        ),
+    }
+    return facts
+
+
+def _day(ts: int) -> datetime:
+    return datetime.combine(
+        datetime.fromtimestamp(ts, tz=KYIV_TZ).date(), datetime.min.time(), tzinfo=KYIV_TZ
+    )
+
+
+def test_calendar_period_bounds_follow_kyiv_calendar():
+    ts = _ts(2025, 3, 15, 12)
+    assert calendar_period_bounds("month", ts) == (_ts(2025, 3, 1), _ts(2025, 4, 1))
+    assert calendar_period_bounds("week", ts) == (_ts(2025, 3, 10), _ts(2025, 3, 17))
+    assert calendar_period_bounds("month", _ts(2025, 12, 31, 23, 59)) == (
+        _ts(2025, 12, 1),
+        _ts(2026, 1, 1),
+    )
+
+
+def test_month_to_date_folds_in_appends_only(tmp_path, monkeypatch):
+    tx = TxStore(tmp_path / "tx")
+    acc_store = PeriodToDateStore(tmp_path / "reports")
+    start = _ts(2025, 3, 1)
+    tx.append_many(1, "a", [_tx(0, start - HOUR, -999)])
+    tx.append_many(1, "a", [_tx(i, start + i * HOUR, -(100 + 37 * i)) for i in range(1, 20)])
+    tx.append_many(1, "b", [_tx(20, start + 5 * HOUR, 25000, desc="Salary", mcc=None)])
+
+    now = start + 30 * HOUR
+    first = load_or_update_period_to_date(
+        1, ["a", "b"], "month", tx_store=tx, to_date_store=acc_store, now_ts=now
+    )
+    facts = first.facts()
+    assert facts.pop("period_to_date")["start_ts"] == start
+    assert facts == _expected(tx, start, now + 1)
+
+    reads = []
+    real = tx.load_appended
+    monkeypatch.setattr(
+        tx, "load_appended", lambda uid, aid, off: reads.append(off) or real(uid, aid, off)
+    )
+    tx.append_many(1, "a", [_tx(i, start + i * HOUR, -(5000 + i), mcc=5812) for i in (40, 41)])
+    second = load_or_update_period_to_date(
+        1, ["a", "b"], "month", tx_store=tx, to_date_store=acc_store, now_ts=now + 20 * HOUR
+    )
+    assert reads == [first.offsets["a"], first.offsets["b"]]
+    facts = second.facts()
+    facts.pop("period_to_date")
+    assert facts == _expected(tx, start, now + 20 * HOUR + 1)
+
+
+def test_accumulator_resets_at_the_month_boundary(tmp_path):
+    tx = TxStore(tmp_path / "tx")
+    acc_store = PeriodToDateStore(tmp_path / "reports")
+    april = _ts(2025, 4, 1)
+    tx.append_many(1, "a", [_tx(1, april - 2 * HOUR, -700)])
+    load_or_update_period_to_date(
+        1, ["a"], "month", tx_store=tx, to_date_store=acc_store, now_ts=april - HOUR
+    )
+
+    tx.append_many(1, "a", [_tx(2, april - 30 * 60, -300), _tx(3, april + HOUR, -4200)])
+    rolled = load_or_update_period_to_date(
+        1, ["a"], "month", tx_store=tx, to_date_store=acc_store, now_ts=april + 2 * HOUR
+    )
+    assert (rolled.start_ts, rolled.tx_count, rolled.spend_total) == (april, 1, 4200)
+
+    assert acc_store.load(1, "month")["offsets"] == rolled.offsets
+
+
+def test_to_date_facts_drop_refund_pairs_and_compare_with_the_previous_period(tmp_path):
+    tx = TxStore(tmp_path / "tx")
+    acc_store = PeriodToDateStore(tmp_path / "reports")
+    april = _ts(2025, 4, 1)
+    march = _ts(2025, 3, 1)
+    order = {"desc": "Rozetka order", "mcc": 5732}
+    refund = {"desc": "Rozetka order refund", "mcc": None}
+    tx.append_many(
+        1,
+        "a",
+        [
+            _tx(i, march + i * 7 * HOUR, -(300 + 11 * i), mcc=5812 if i % 3 else 5411)
+            for i in range(90)
+        ]
+        + [
+            _tx(100, march + 2 * 24 * HOUR, -150000, **order),
+            _tx(101, march + 2 * 24 * HOUR + 5 * HOUR, 150000, **refund),
+            _tx(102, april - 10 * HOUR, -99900, **order),
+        ],
+    )
+
+    def refresh(now_ts):
+        return load_or_update_period_to_date(
+            1, ["a", "b"], "month", tx_store=tx, to_date_store=acc_store, now_ts=now_ts
+        )
+
+    refresh(april - HOUR)
+    tx.append_many(
+        1,
+        "a",
+        [
+            _tx(103, april + 2 * HOUR, 99900, **refund),
+            _tx(104, april + 25 * HOUR, -250000, **order),
+            _tx(105, april + 5 * HOUR, -4200, mcc=5812),
+        ],
+    )
+    rolled = refresh(april + 30 * HOUR)
+    assert rolled.previous is not None and rolled.previous.start_ts == march
+    facts = rolled.facts()
+    assert facts["refunds"]["count"] == 0
+    facts.pop("period_to_date")
+    assert facts == _expected(tx, april, april + 30 * HOUR + 1)
+
+    tx.append_many(1, "a", [_tx(106, april + 40 * HOUR, 250000, **refund)])
+    later = refresh(april + 50 * HOUR)
+    facts = later.facts()
+    facts.pop("period_to_date")
+    assert facts == _expected(tx, april, april + 50 * HOUR + 1)
+    assert facts["totals"]["real_spend_total_uah"] == 42.0
+    assert facts["refunds"]["items"]
+    assert facts["comparison"]["prev_period"]["dt_to"] == _to_iso_utc(_ts(2025, 3, 4))
+
+    rebuilt = PeriodToDate.from_dict(acc_store.load(1, "month"))
+    assert rebuilt is not None and rebuilt.facts() == later.facts()
@@ -1,6 +1,14 @@
+import random
 from dataclasses import dataclass
 
-from mono_ai_budget_bot.analytics.profile import compute_baseline
+from mono_ai_budget_bot.analytics.compare import (
+    compare_window_to_baseline,
+    compare_yesterday_to_baseline,
+)
+from mono_ai_budget_bot.analytics.profile import SpendingBaseline, compute_baseline
+from mono_ai_budget_bot.bot.report_flow_helpers import load_or_update_spending_baseline
+from mono_ai_budget_bot.storage.profile_store import ProfileStore
+from mono_ai_budget_bot.storage.tx_store import TxStore
 
 
 @dataclass
@@ -24,3 +32,71 @@ def test_compute_baseline_basic():
     assert b.daily_median_cents == 0
     assert isinstance(b.weekday_median_cents, dict)
     assert isinstance(b.weekday_avg_cents, dict)
+
+
+def test_spending_baseline_matches_compute_baseline_as_days_roll(tmp_path):
+    rnd = random.Random(3)
+    tx_store = TxStore(tmp_path / "tx")
+    profile_store = ProfileStore(tmp_path / "profiles")
+    day0 = 20_000
+    for step in range(40):
+        now = (day0 + step * 3) * 86400 + 50_000
+        batch = []
+        for i in range(rnd.randint(0, 25)):
+            t = now - rnd.randint(0, 120 * 86400)
+            batch.append(
+                {
+                    "id": f"{step}-{i}",
+                    "time": t,
+                    "amount": rnd.choice([-1, -1, -1, 1]) * rnd.randint(100, 90_000),
+                    "description": rnd.choice(["ATB", "Silpo", "Переказ", "Top up"]),
+                    "mcc": rnd.choice([5411, 5812, 4829, None]),
+                }
+            )
+        tx_store.append_many(1, "acc", batch)
+        baseline = load_or_update_spending_baseline(
+            1, ["acc"], tx_store=tx_store, profile_store=profile_store, now_ts=now
+        )
+
+        window = tx_store.load_range(1, ["acc"], baseline.first_day * 86400, now)
+        assert baseline.baseline() == compute_baseline(window)
+        restored = SpendingBaseline.from_dict(profile_store.load_baseline(1))
+        assert restored is not None and restored.baseline() == baseline.baseline()
+
+        assert baseline.compare_yesterday(now) == compare_yesterday_to_baseline(window, now)
+        start = now - 7 * 86400
+        assert baseline.compare_window(start, now, lookback_days=60) == (
+            compare_window_to_baseline(window, start, now, lookback_days=60)
+        )
+
+
+def test_steady_state_refresh_does_not_read_the_90_day_window(tmp_path, monkeypatch):
+    import asyncio
+    import time
+
+    from mono_ai_budget_bot.bot import report_flow_helpers as rfh
+
+    now = int(time.time())
+    tx_store = TxStore(tmp_path / "tx")
+    monkeypatch.setattr(rfh, "tx_store", tx_store)
+
+    def tx(i: int, ts: int) -> dict:
+        return {"id": f"t{i}", "time": ts, "amount": -1000, "description": "ATB", "mcc": 5411}
+
+    tx_store.append_many(1, "acc", [tx(i, now - i * 86400) for i in range(1, 80)])
+    profile_store = ProfileStore(tmp_path / "profile")
+    asyncio.run(rfh.compute_and_cache_reports_for_user(1, ["acc"], profile_store))
+
+    spans: list[int] = []
+    real_load_range = tx_store.load_range
+    monkeypatch.setattr(
+        tx_store,
+        "load_range",
+        lambda uid, accs, ts_from, ts_to: (
+            spans.append(ts_to - ts_from) or real_load_range(uid, accs, ts_from, ts_to)
+        ),
+    )
+    tx_store.append_many(1, "acc", [tx(0, now - 60)])
+    asyncio.run(rfh.compute_and_cache_reports_for_user(1, ["acc"], profile_store))
+
+    assert spans and max(spans) < rfh.CATEGORIZATION_WINDOW_DAYS * 86400
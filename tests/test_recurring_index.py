@@ -0,0 +1,141 @@
+import time
+
+from mono_ai_budget_bot.analytics.recurring import RecurringIndex
+from mono_ai_budget_bot.bot import report_flow_helpers as rfh
+from mono_ai_budget_bot.bot.scheduler import build_activity_proactive_messages
+from mono_ai_budget_bot.nlq.router import parse_nlq_intent
+from mono_ai_budget_bot.storage.recurring_store import RecurringStore
+from mono_ai_budget_bot.storage.tx_store import TxRecord, TxStore
+from mono_ai_budget_bot.storage.user_store import UserConfig
+
+DAY = 86400
+NOW = 20_000 * DAY + 12 * 3600
+
+
+def _tx(tx_id: str, ts: int, amount: int, description: str, mcc: int | None = 5815) -> TxRecord:
+    return TxRecord(tx_id, ts, "acc", amount, description, mcc, 980)
+
+
+def _history() -> list[TxRecord]:
+    rows = []
+    for i in range(6):
+        rows.append(_tx(f"n{i}", NOW - (5 + 30 * i) * DAY, -29_900 - (i % 2) * 100, "NETFLIX.COM"))
+        rows.append(_tx(f"g{i}", NOW - (6 + 7 * i) * DAY, -50_000, "Переказ Тренер", 4829))
+    for i in range(20):
+        rows.append(_tx(f"c{i}", NOW - i * DAY, -6_000, "Coffee Point", 5814))
+    rows.append(_tx("one", NOW - 3 * DAY, -120_000, "IKEA", 5712))
+    rows.append(_tx("in", NOW - 2 * DAY, 2_000_000, "Salary", None))
+    return rows
+
+
+def test_index_detects_series_and_updates_incrementally():
+    rows = _history()
+    full = RecurringIndex(offsets={})
+    full.add_records(rows)
+
+    keys = [k for k, _ in full.recurring(NOW)]
+    assert keys == ["recipient:переказ тренер", "merchant:netflix.com"]
+    netflix = full.series["merchant:netflix.com"]
+    assert netflix.cadence_days == 30 and netflix.confidence >= 0.9
+    assert (netflix.amount_low_cents, netflix.amount_high_cents) == (29_900, 30_000)
+    assert netflix.next_ts == NOW + 25 * DAY
+    assert not full.series["merchant:coffee point"].is_recurring
+    assert not full.series["merchant:ikea"].is_recurring
+
+    upcoming = full.upcoming(NOW, NOW + 7 * DAY)
+    assert [k for k, _ in upcoming] == ["recipient:переказ тренер"]
+    assert upcoming[0][1].next_ts == NOW + DAY
+
+    # Out-of-order batches fold in to the same state.
+    split = RecurringIndex(offsets={})
+    split.add_records(rows[1::2])
+    split.add_records(rows[0::2])
+    assert split.to_dict() == full.to_dict()
+    assert RecurringIndex.from_dict(full.to_dict()) == full
+
+    # Lapsed subscriptions drop out.
+    assert "merchant:netflix.com" not in {k for k, _ in full.recurring(NOW + 90 * DAY)}
+
+
+def test_index_is_maintained_from_appended_ledger_lines(tmp_path, monkeypatch):
+    tx_store = TxStore(tmp_path / "tx")
+    store = RecurringStore(tmp_path / "reports")
+    rows = _history()
+
+    def append(batch):
+        tx_store.append_many(
+            1,
+            "acc",
+            [
+                {
+                    "id": r.id,
+                    "time": r.time,
+                    "amount": r.amount,
+                    "description": r.description,
+                    "mcc": r.mcc,
+                }
+                for r in batch
+            ],
+        )
+
+    append(rows[:10])
+    first = rfh.load_or_update_recurring_index(1, ["acc"], tx_store=tx_store, recurring_store=store)
+    assert first.offsets["acc"] > 0
+
+    append(rows[10:])
+    reads = []
+    original = tx_store.load_appended
+    monkeypatch.setattr(
+        tx_store,
+        "load_appended",
+        lambda uid, acc, offset: reads.append(offset) or original(uid, acc, offset),
+    )
+    index = rfh.load_or_update_recurring_index(1, ["acc"], tx_store=tx_store, recurring_store=store)
+    assert reads == [first.offsets["acc"]]
+
+    expected = RecurringIndex(offsets={})
+    expected.add_records(rows)
+    assert index.series == expected.series
+    assert RecurringIndex.from_dict(store.load(1)) == index
+
+
+def test_subscription_questions_are_answered_from_the_index(tmp_path, monkeypatch):
+    import mono_ai_budget_bot.nlq.executor as ex
+
+    store = RecurringStore(tmp_path / "reports")
+    index = RecurringIndex(offsets={"acc": 0})
+    index.add_records(_history())
+    store.save(1, index.to_dict())
+
+    cfg = UserConfig(
+        telegram_user_id=1,
+        mono_token="t",
+        selected_account_ids=["acc"],
+        chat_id=None,
+        autojobs_enabled=False,
+        updated_at=0.0,
+    )
+    monkeypatch.setattr(ex, "UserStore", lambda: type("U", (), {"load": lambda s, uid: cfg})())
+    monkeypatch.setattr(ex, "RecurringStore", lambda: store)
+    monkeypatch.setattr(ex, "TxStore", lambda: (_ for _ in ()).throw(AssertionError("no scan")))
+    monkeypatch.setattr(time, "time", lambda: NOW)
+
+    parsed = parse_nlq_intent("Які в мене підписки?")
+    assert (parsed["intent"], parsed["recurring_scope"]) == ("recurrence_summary", "series")
+    msg = ex.execute_intent(1, parsed)
+    assert "NETFLIX.COM" in msg and "кожні 30 дн." in msg and "Переказ Тренер" in msg
+
+    parsed = parse_nlq_intent("Які списання очікуються цього тижня?")
+    assert parsed["recurring_scope"] == "upcoming"
+    msg = ex.execute_intent(1, parsed)
+    assert "Переказ Тренер" in msg and "NETFLIX" not in msg
+
+    assert parse_nlq_intent("Скільки я витратив на підписки за місяць?")["intent"] == "spend_sum"
+
+    profile = {"activity_mode": "loud"}
+    facts = {"trends": {}}
+    upcoming = [
+        (s.label, s.amount_cents, int(s.next_ts)) for _, s in index.upcoming(NOW, NOW + 3 * DAY)
+    ]
+    msgs = build_activity_proactive_messages(profile, facts, upcoming)
+    assert any("🔁 Coach nudge" in m and "Переказ Тренер" in m for m in msgs)
@@ -137,3 +137,72 @@ def test_build_refund_insights_counts_only_refunds_in_window():
     assert isinstance(r1["items"], list)
     assert r1["items"][0]["merchant"] == "mcdonalds kyiv"
     assert r1["items"][0]["amount_uah"] == 100.0
+
+
+def _reference_pairs(records, max_days=14):
+    from mono_ai_budget_bot.analytics.classify import classify_kind
+    from mono_ai_budget_bot.analytics.refunds import _amount_close, _match_merchant
+
+    spend = [
+        r
+        for r in records
+        if r.amount < 0
+        and classify_kind(amount=r.amount, mcc=r.mcc, description=r.description.strip()) == "spend"
+    ]
+    pos = [
+        r
+        for r in records
+        if r.amount > 0
+        and classify_kind(amount=r.amount, mcc=r.mcc, description=r.description.strip())
+        in {"income", "transfer_in"}
+    ]
+    spend.sort(key=lambda r: r.time)
+    pos.sort(key=lambda r: r.time)
+
+    max_dt = max_days * 86400
+    used, out = set(), []
+    for p in spend:
+        best, best_score = None, -1
+        for r in pos:
+            if not (p.time - max_dt <= r.time <= p.time + max_dt) or r.id in used:
+                continue
+            if r.account_id != p.account_id:
+                continue
+            if p.mcc is not None and r.mcc is not None and p.mcc != r.mcc:
+                continue
+            if not _amount_close(abs(p.amount), r.amount):
+                continue
+            if not _match_merchant(p.description, r.description):
+                continue
+            score = 5 - int(abs(abs(p.amount) - r.amount) / 100) - int(abs(r.time - p.time) / 21600)
+            if score > best_score:
+                best, best_score = r, score
+        if best is not None:
+            used.add(best.id)
+            out.append((p.id, best.id))
+    return out
+
+
+def test_indexed_pairing_matches_linear_scan():
+    import random
+
+    rnd = random.Random(11)
+    descs = ["McDonalds Kyiv", "McDonalds refund", "Rozetka order", "Rozetka return", "Silpo"]
+    records = []
+    for i in range(1500):
+        amount = rnd.choice([5000, 10000, 10050, 10150, 25000, 99000, 100])
+        records.append(
+            TxRecord(
+                id=f"t{i}",
+                time=rnd.randrange(0, 60 * 86400),
+                account_id=rnd.choice("ab"),
+                amount=amount if rnd.random() < 0.4 else -amount,
+                description=rnd.choice(descs),
+                mcc=rnd.choice([5814, 5732, None]),
+                currencyCode=980,
+            )
+        )
+
+    pairs = detect_refund_pairs(records)
+    assert [(x.purchase_id, x.refund_id) for x in pairs] == _reference_pairs(records)
+    assert len(pairs) > 50
@@ -0,0 +1,148 @@
+import random
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from mono_ai_budget_bot.bot import report_flow_helpers as rfh
+from mono_ai_budget_bot.core.text_norm import compact
+from mono_ai_budget_bot.storage.tx_store import TxRecord, TxStore
+from mono_ai_budget_bot.taxonomy import (
+    Rule,
+    add_category,
+    build_taxonomy_preset,
+    categorize_tx,
+    find_leaf_by_name,
+)
+from mono_ai_budget_bot.taxonomy.ledger_index import (
+    LedgerIndex,
+    preview_rule_impact,
+    preview_rules_change,
+)
+
+_WORDS = ["Silpo", "АТБ", "Glovo", "Bolt", "Переказ", "Netflix", "Кава", "ab", "x"]
+
+
+def _records(n: int = 400, seed: int = 7) -> list[TxRecord]:
+    rnd = random.Random(seed)
+    return [
+        TxRecord(
+            id=f"t{i}",
+            time=1_700_000_000 + i * 60,
+            account_id="a",
+            amount=-rnd.randint(100, 50_000),
+            description=" ".join(rnd.sample(_WORDS, rnd.randint(1, 3))),
+            mcc=rnd.choice([5411, 5812, 4121, 4829, None]),
+            currencyCode=980,
+        )
+        for i in range(n)
+    ]
+
+
+def _brute_force(tax, before, after, records):
+    changed = []
+    for tx in records:
+        old = categorize_tx(tax=tax, tx=tx, rules=before)
+        new = categorize_tx(tax=tax, tx=tx, rules=after)
+        if (old.bucket, old.leaf_id) != (new.bucket, new.leaf_id):
+            changed.append(tx)
+    return {tx.id for tx in changed}, sum(abs(tx.amount) for tx in changed)
+
+
+def test_index_substring_lookup_matches_full_scan():
+    records = _records()
+    index = LedgerIndex(records)
+    for needle in ["silpo", "атбglovo", "ab", "x", "eka", "кава", "nomatch", "переказnetflix"]:
+        expected = {r.id for r in records if needle in compact(r.description)}
+        assert index.containing([needle]) == expected
+    assert index.containing(["silpo", "bolt"]) == {
+        r.id
+        for r in records
+        if "silpo" in compact(r.description) and "bolt" in compact(r.description)
+    }
+
+
+def test_preview_matches_recategorizing_the_whole_ledger():
+    tax = build_taxonomy_preset("min")
+    records = _records()
+    index = LedgerIndex(records)
+    coffee = add_category(tax, root_kind="expense", name="Кава")
+    market = find_leaf_by_name(tax, root_kind="expense", name="Маркет/Побут")
+    rules = [Rule(id="r1", leaf_id=market, merchant_contains="silpo")]
+
+    rule = Rule(id="r2", leaf_id=coffee, merchant_contains="кава", mcc_in=[5812, 5411])
+    impact = preview_rule_impact(index, rule, tax=tax, rules=rules)
+    ids, amount = _brute_force(tax, rules, rules + [rule], records)
+    assert set(impact.tx_ids) == ids and impact.count > 0
+    assert impact.amount == amount
+    times = [index.records[t].time for t in impact.tx_ids]
+    assert times == sorted(times, reverse=True)
+
+    edited = [rule, Rule(id="r3", leaf_id=coffee, merchant_contains="silpo")]
+    impact = preview_rules_change(index, tax=tax, before=rules, after=edited)
+    assert (set(impact.tx_ids), impact.amount) == _brute_force(tax, rules, edited, records)
+
+    unchanged = preview_rule_impact(index, rules[0], tax=tax, rules=rules)
+    assert unchanged.count == 0 and unchanged.amount == 0
+
+
+def test_user_ledger_index_is_reused_until_the_ledger_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(rfh, "_ledger_indexes", OrderedDict())
+    tx_store = TxStore(tmp_path / "tx")
+    now = int(time.time())
+    tx_store.append_many(
+        1,
+        "acc",
+        [
+            {"id": "a1", "time": now - 60, "amount": -1500, "description": "Silpo", "mcc": 5411},
+            {"id": "a2", "time": now - 120, "amount": -700, "description": "Glovo", "mcc": 5812},
+        ],
+    )
+    users = SimpleNamespace(load=lambda _uid: SimpleNamespace(selected_account_ids=["acc"]))
+    tax = build_taxonomy_preset("min")
+    coffee = add_category(tax, root_kind="expense", name="Кава")
+    rule = Rule(id="r1", leaf_id=coffee, merchant_contains="glovo")
+
+    first = rfh.load_ledger_index(1, ["acc"], tx_store=tx_store, now_ts=now)
+    assert rfh.load_ledger_index(1, ["acc"], tx_store=tx_store, now_ts=now) is first
+
+    impact = rfh.preview_rules_for_user(
+        1, tax=tax, before=[], after=[rule], users=users, tx_store=tx_store
+    )
+    assert impact is not None and impact.tx_ids == ("a2",) and impact.amount == 700
+
+    tx_store.append_many(
+        1,
+        "acc",
+        [{"id": "a3", "time": now - 30, "amount": -300, "description": "GLOVO 2", "mcc": None}],
+    )
+    assert rfh.load_ledger_index(1, ["acc"], tx_store=tx_store, now_ts=now) is not first
+    impact = rfh.preview_rules_for_user(
+        1, tax=tax, before=[], after=[rule], users=users, tx_store=tx_store
+    )
+    assert impact is not None and impact.tx_ids == ("a3", "a2") and impact.amount == 1000
+
+    no_accounts = SimpleNamespace(load=lambda _uid: None)
+    assert (
+        rfh.preview_rules_for_user(
+            1, tax=tax, before=[], after=[rule], users=no_accounts, tx_store=tx_store
+        )
+        is None
+    )
+
+
+def test_ledger_index_cache_keeps_only_recently_used_users(tmp_path, monkeypatch):
+    monkeypatch.setattr(rfh, "_ledger_indexes", OrderedDict())
+    monkeypatch.setattr(rfh, "_MAX_LEDGER_INDEXES", 2)
+    tx_store = TxStore(tmp_path / "tx")
+    now = int(time.time())
+    for uid in (1, 2, 3):
+        tx_store.append_many(
+            uid, "acc", [{"id": f"u{uid}", "time": now - 60, "amount": -100, "mcc": 5411}]
+        )
+
+    first = rfh.load_ledger_index(1, ["acc"], tx_store=tx_store, now_ts=now)
+    rfh.load_ledger_index(2, ["acc"], tx_store=tx_store, now_ts=now)
+    assert rfh.load_ledger_index(1, ["acc"], tx_store=tx_store, now_ts=now) is first
+    rfh.load_ledger_index(3, ["acc"], tx_store=tx_store, now_ts=now)
+
+    assert list(rfh._ledger_indexes) == [1, 3]
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from mono_ai_budget_bot.bot.send_queue import (
+    PRIORITY_BROADCAST,
+    PRIORITY_INTERACTIVE,
+    SendQueue,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class RetryAfterError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class RecordingBot:
+    def __init__(self, fail_first_with: Exception | None = None):
+        self.sent: list[tuple[int, str, dict]] = []
+        self._fail = fail_first_with
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        if self._fail is not None:
+            err, self._fail = self._fail, None
+            raise err
+        self.sent.append((chat_id, text, kwargs))
+        return {"chat_id": chat_id, "text": text}
+
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    b = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+    assert b.try_take()
+    assert b.try_take()
+    assert not b.try_take()
+    assert b.wait_time() == pytest.approx(0.5)
+
+    clock.t = 0.5
+    assert b.try_take()
+    assert not b.try_take()
+
+    clock.t = 10.0
+    assert b.is_full()
+
+
+def test_token_bucket_block_for_delays_next_token():
+    clock = FakeClock()
+    b = TokenBucket(rate=1.0, capacity=1, clock=clock)
+    b.block_for(3.0)
+    assert b.wait_time() == pytest.approx(4.0)
+
+
+def test_send_queue_delivers_interactive_before_broadcast():
+    bot = RecordingBot()
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=1000.0)
+        futs = [q.submit(i, f"b{i}", priority=PRIORITY_BROADCAST) for i in range(3)]
+        futs.append(q.submit(99, "hello", priority=PRIORITY_INTERACTIVE))
+        await asyncio.gather(*futs)
+        await q.stop()
+        return q
+
+    q = asyncio.run(run())
+
+    assert bot.sent[0][1] == "hello"
+    assert [x[1] for x in bot.sent[1:]] == ["b0", "b1", "b2"]
+    assert q.stats.sent == 4
+    assert q.stats.latency_count == 4
+
+
+def test_send_queue_reschedules_on_retry_after_instead_of_dropping():
+    bot = RecordingBot(fail_first_with=RetryAfterError(0))
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=1000.0)
+        res = await q.send(1, "report", parse_mode=None)
+        await q.stop()
+        return q, res
+
+    q, res = asyncio.run(run())
+
+    assert res == {"chat_id": 1, "text": "report"}
+    assert bot.sent == [(1, "report", {"parse_mode": None})]
+    assert q.stats.retried == 1
+    assert q.stats.failed == 0
+
+
+def test_send_queue_propagates_non_retryable_errors():
+    bot = RecordingBot(fail_first_with=RuntimeError("chat not found"))
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=1000.0)
+        try:
+            with pytest.raises(RuntimeError):
+                await q.send(1, "x")
+        finally:
+            await q.stop()
+        return q
+
+    q = asyncio.run(run())
+    assert q.stats.failed == 1
+
+
+def test_send_queue_spaces_messages_to_same_chat():
+    bot = RecordingBot()
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=20.0)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        await asyncio.gather(q.submit(5, "a"), q.submit(5, "b"), q.submit(5, "c"))
+        elapsed = loop.time() - t0
+        await q.stop()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+
+    assert [x[1] for x in bot.sent] == ["a", "b", "c"]
+    assert elapsed >= 0.09
+
+
+def test_queued_bot_routes_send_message_and_delegates_other_attrs():
+    bot = RecordingBot()
+    bot.id = 42
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=1000.0)
+        qb = q.as_bot(priority=PRIORITY_INTERACTIVE)
+        await qb.send_message(chat_id=7, text="hi", reply_markup=None)
+        await q.stop()
+        return qb
+
+    qb = asyncio.run(run())
+    assert bot.sent == [(7, "hi", {"reply_markup": None})]
+    assert qb.id == 42
+
+
+def test_direct_bot_calls_share_the_global_bucket_without_double_counting_queued_sends():
+    clock = FakeClock()
+    calls: list[str] = []
+
+    async def make_request(_bot, method):
+        calls.append(method.__api_method__)
+        return "ok"
+
+    def method(name: str):
+        return type("Method", (), {"__api_method__": name})()
+
+    async def run():
+        q = SendQueue(None, global_rate=1.0, global_burst=2, per_chat_rate=1000.0, clock=clock)
+
+        class SessionBot:
+            async def send_message(self, chat_id, text, **_kw):
+                return await q.throttle_request(make_request, self, method("sendMessage"))
+
+        q._bot = SessionBot()
+        await q.send(1, "queued")
+        await q.throttle_request(make_request, None, method("getUpdates"))
+        await q.throttle_request(make_request, None, method("editMessageText"))
+        waiting = q._global.wait_time()
+        await q.stop()
+        return waiting
+
+    assert asyncio.run(run()) == pytest.approx(1.0)
+    assert calls == ["sendMessage", "getUpdates", "editMessageText"]
+
+
+def test_stop_cancels_pending_messages():
+    bot = RecordingBot()
+
+    async def run():
+        q = SendQueue(bot, global_rate=1000.0, global_burst=1000, per_chat_rate=0.001)
+        first, second = q.submit(5, "a"), q.submit(5, "b")
+        await first
+        await q.stop()
+        return second, q.depth
+
+    second, depth = asyncio.run(run())
+    assert second.cancelled()
+    assert depth == 0
+    assert [x[1] for x in bot.sent] == ["a"]
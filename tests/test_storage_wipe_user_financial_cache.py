@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from mono_ai_budget_bot.analytics.profile import compute_baseline
+from mono_ai_budget_bot.bot.report_flow_helpers import load_or_update_spending_baseline
+from mono_ai_budget_bot.storage.profile_store import ProfileStore
 from mono_ai_budget_bot.storage.report_store import ReportStore
 from mono_ai_budget_bot.storage.rules_store import RulesStore
 from mono_ai_budget_bot.storage.tx_store import TxStore
@@ -18,6 +21,7 @@ def test_wipe_user_financial_cache_removes_user_files(tmp_path: Path) -> None:
     rules_store = RulesStore(base_dir=tmp_path / "rules")
     uncat_store = UncatStore(base_dir=tmp_path / "uncat")
     uncat_pending_store = UncatPendingStore(base_dir=tmp_path / "uncat_pending")
+    profile_store = ProfileStore(tmp_path / "profiles")
 
     (tx_store.root_dir / str(user_id)).mkdir(parents=True, exist_ok=True)
     (tx_store.root_dir / str(user_id) / "a.jsonl").write_text("{}", encoding="utf-8")
@@ -26,9 +30,11 @@ def test_wipe_user_financial_cache_removes_user_files(tmp_path: Path) -> None:
     (report_store.root_dir / str(user_id)).mkdir(parents=True, exist_ok=True)
     (report_store.root_dir / str(user_id) / "facts_week.json").write_text("{}", encoding="utf-8")
 
-    (rules_store.base_dir / f"{user_id}.json").write_text("{}", encoding="utf-8")
+    rules_store.save(user_id, [])
     (uncat_store.base_dir / f"{user_id}.json").write_text("{}", encoding="utf-8")
     (uncat_pending_store.base_dir / f"{user_id}.json").write_text("{}", encoding="utf-8")
+    profile_store.save(user_id, {"persona": "x"})
+    profile_store.save_baseline(user_id, {"version": 1})
 
     wipe_user_financial_cache(
         user_id,
@@ -37,6 +43,7 @@ def test_wipe_user_financial_cache_removes_user_files(tmp_path: Path) -> None:
         rules_store=rules_store,
         uncat_store=uncat_store,
         uncat_pending_store=uncat_pending_store,
+        profile_store=profile_store,
     )
 
     assert not (tx_store.root_dir / str(user_id)).exists()
@@ -44,3 +51,40 @@ def test_wipe_user_financial_cache_removes_user_files(tmp_path: Path) -> None:
     assert not (rules_store.base_dir / f"{user_id}.json").exists()
     assert not (uncat_store.base_dir / f"{user_id}.json").exists()
     assert not (uncat_pending_store.base_dir / f"{user_id}.json").exists()
+    assert list(rules_store.base_dir.glob("*.lock")) == []
+    assert profile_store.load_baseline(user_id) is None
+    assert profile_store.load(user_id) == {"persona": "x"}
+
+
+def test_spending_baseline_is_rebuilt_after_wipe_and_resync(tmp_path: Path) -> None:
+    now = 500 * 86400 + 3600
+    tx_store = TxStore(root_dir=tmp_path / "tx")
+    profile_store = ProfileStore(tmp_path / "profiles")
+
+    def tx(i: int, amount: int) -> dict:
+        return {"id": f"t{i}", "time": now - (i % 40 + 1) * 86400, "amount": amount, "mcc": 5411}
+
+    tx_store.append_many(1, "acc", [tx(i, -1000 - i) for i in range(30)])
+    load_or_update_spending_baseline(
+        1, ["acc"], tx_store=tx_store, profile_store=profile_store, now_ts=now
+    )
+
+    wipe_user_financial_cache(
+        1,
+        tx_store=tx_store,
+        report_store=ReportStore(root_dir=tmp_path / "reports"),
+        rules_store=RulesStore(base_dir=tmp_path / "rules"),
+        uncat_store=UncatStore(base_dir=tmp_path / "uncat"),
+        uncat_pending_store=UncatPendingStore(base_dir=tmp_path / "uncat_pending"),
+        profile_store=profile_store,
+    )
+    # The re-synced ledger is longer than the old one, so stale offsets would resume
+    # in the middle of it.
+    tx_store.append_many(1, "acc", [tx(i, -5000 - i) for i in range(100, 160)])
+    baseline = load_or_update_spending_baseline(
+        1, ["acc"], tx_store=tx_store, profile_store=profile_store, now_ts=now
+    )
+
+    window = tx_store.load_range(1, ["acc"], baseline.first_day * 86400, now)
+    assert len(window) == 60
+    assert baseline.baseline() == compute_baseline(window)
@@ -0,0 +1,47 @@
+from mono_ai_budget_bot.taxonomy import (
+    add_category,
+    add_subcategory,
+    build_taxonomy_preset,
+    find_leaf_by_name,
+    leaf_ids,
+)
+from mono_ai_budget_bot.taxonomy.index import taxonomy_index
+from mono_ai_budget_bot.taxonomy.models import delete_node, rename_node
+
+
+def test_index_matches_leaf_traversal_and_is_cached_per_taxonomy():
+    tax = build_taxonomy_preset("min")
+    index = taxonomy_index(tax)
+    assert taxonomy_index(tax) is index
+
+    for kind in ("income", "expense"):
+        assert list(index.leaves[kind]) == leaf_ids(tax, root_kind=kind)
+    market = find_leaf_by_name(tax, root_kind="expense", name="  маркет/побут ")
+    assert market is not None and tax["nodes"][market]["name"] == "Маркет/Побут"
+    assert find_leaf_by_name(tax, root_kind="income", name="Маркет/Побут") is None
+    assert index.kind_of[market] == "expense"
+
+    other = build_taxonomy_preset("min")
+    assert taxonomy_index(other) is not index
+
+
+def test_taxonomy_mutations_invalidate_the_index():
+    tax = build_taxonomy_preset("min")
+    first = taxonomy_index(tax)
+
+    food = add_category(tax, root_kind="expense", name="Їжа")
+    second = taxonomy_index(tax)
+    assert second.revision > first.revision
+    assert find_leaf_by_name(tax, root_kind="expense", name="їжа") == food
+
+    cafe = add_subcategory(tax, parent_id=food, name="Кава")
+    assert food not in taxonomy_index(tax).leaf_set
+    assert find_leaf_by_name(tax, root_kind="expense", name="Їжа") is None
+
+    rename_node(tax, node_id=cafe, new_name="Кав'ярні")
+    assert find_leaf_by_name(tax, root_kind="expense", name="Кава") is None
+    assert find_leaf_by_name(tax, root_kind="expense", name="кав'ярні") == cafe
+
+    delete_node(tax, node_id=cafe)
+    assert find_leaf_by_name(tax, root_kind="expense", name="Кав'ярні") is None
+    assert find_leaf_by_name(tax, root_kind="expense", name="Їжа") == food
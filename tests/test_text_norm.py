@@ -0,0 +1,48 @@
+import re
+
+from mono_ai_budget_bot.analytics.normalization import normalize_merchant
+from mono_ai_budget_bot.core import text_norm
+from mono_ai_budget_bot.nlq.text_norm import norm
+from mono_ai_budget_bot.taxonomy.rules import _match_contains
+
+SAMPLES = [
+    "",
+    None,
+    "  Silpo  #1234 ",
+    "АТБ-Маркет   Kyiv UA",
+    "Coffee_Point №77",
+    "Uber   *trip 0a1b2c3d",
+    "Переказ на картку",
+    "McDonald's & Co. POS 554433",
+]
+
+
+def _old_norm(s):
+    t = (s or "").strip().lower()
+    t = t.replace("_", " ")
+    t = re.sub(r"[^\w]+", " ", t, flags=re.UNICODE)
+    return re.sub(r"\s+", " ", t, flags=re.UNICODE).strip()
+
+
+def test_memoized_normalizers_match_previous_behaviour():
+    for s in SAMPLES:
+        assert norm(s) == _old_norm(s)
+        assert text_norm.match_key(s) == _old_norm(s).replace(" ", "")
+        old_ws = " ".join((s or "").strip().lower().split())
+        assert text_norm.collapse_ws(s) == old_ws
+        assert text_norm.compact(s) == old_ws.replace(" ", "")
+
+    assert normalize_merchant("  Silpo  #1234 ") == "silpo"
+    assert normalize_merchant("АТБ-Маркет   Kyiv UA") == "атб-маркет"
+    assert normalize_merchant(None) == "unknown"
+    assert _match_contains("Coffee  Point #7", "coffeepoint")
+
+
+def test_cache_stats_count_hits_and_misses():
+    text_norm.clear_caches()
+    for _ in range(5):
+        norm("Silpo #12")
+    stats = text_norm.cache_stats()
+    assert stats["norm"] == {"hits": 4, "misses": 1, "size": 1, "maxsize": text_norm.MAXSIZE}
+    assert stats["match_key"]["misses"] == 0
+    assert "refund_tokens" in stats
@@ -39,3 +39,81 @@ def test_trends_filters_one_day_noise_by_active_days():
 
     assert out["growing"] == []
     assert out["declining"] == []
+
+
+def _reference_buckets(rows, now, w=7):
+    from mono_ai_budget_bot.analytics.normalization import category_label, normalize_merchant
+
+    def sum_by(start, end, fn):
+        totals, days = {}, {}
+        for r in rows:
+            t = int(r.ts)
+            if not (start <= t < end) or r.kind != "spend":
+                continue
+            label = fn(r) or "unknown"
+            if label == "unknown":
+                continue
+            totals[label] = totals.get(label, 0) + abs(int(r.amount))
+            days.setdefault(label, set()).add(t // 86400)
+        return totals, days
+
+    cur_start, prev_start = now - w * 86400, now - 2 * w * 86400
+    out = {}
+    for dim, fn in (
+        ("category", lambda r: category_label(r.mcc)),
+        ("merchant", lambda r: normalize_merchant(r.description)),
+    ):
+        out[("cur", dim)] = sum_by(cur_start, now, fn)
+        out[("prev", dim)] = sum_by(prev_start, cur_start, fn)
+    return out
+
+
+def _ledger_rows(now: int, days: int = 60) -> list[Row]:
+    import random
+
+    rnd = random.Random(7)
+    merchants = ["Silpo #123", "ATB 004512", "Glovo kyiv", "Uber trip", "Cafe A", "WOG pos", ""]
+    mccs = [5411, 5411, 5812, 4121, 5812, 5541, 0]
+    rows = []
+    for i in range(days * 20):
+        k = rnd.randrange(len(merchants))
+        rows.append(
+            Row(
+                ts=now - rnd.randrange(days * 86400),
+                amount=-rnd.randrange(1000, 90000),
+                mcc=mccs[k],
+                description=merchants[k],
+                kind="spend" if i % 9 else "income",
+            )
+        )
+    return rows
+
+
+def test_fused_trends_match_multi_pass_reference():
+    from mono_ai_budget_bot.analytics.normalization import category_label, normalize_merchant
+    from mono_ai_budget_bot.analytics.trends import _aggregate_windows
+
+    now = 100 * 86400
+    rows = _ledger_rows(now)
+
+    buckets = _aggregate_windows(
+        rows,
+        cur_start=now - 7 * 86400,
+        cur_end=now,
+        prev_start=now - 14 * 86400,
+        prev_end=now - 7 * 86400,
+    )
+    assert buckets == _reference_buckets(rows, now)
+
+    kw = {"min_prev_uah": 50.0, "min_abs_delta_uah": 50.0}
+    out = compute_trends(rows, now_ts=now, window_days=7, **kw)
+    pre = compute_trends(
+        rows,
+        now_ts=now,
+        window_days=7,
+        category_labels=[category_label(r.mcc) for r in rows],
+        merchant_labels=[normalize_merchant(r.description) for r in rows],
+        **kw,
+    )
+    assert pre == out
+    assert out["growing"] or out["declining"]
@@ -0,0 +1,138 @@
+import mono_ai_budget_bot.bot.scheduler as sched
+from mono_ai_budget_bot.core.ttl_store import ExpiringStore
+
+
+def test_expiring_store_get_respects_expiry():
+    st = ExpiringStore()
+    st.set((1, "a"), 200, now_ts=100)
+
+    assert st.get((1, "a"), now_ts=150) == 200
+    assert st.get((1, "a"), now_ts=200) is None
+    assert len(st) == 0
+
+
+def test_expiring_store_evicts_only_expired_entries():
+    st = ExpiringStore()
+    st.set("old", 110, now_ts=100)
+    st.set("new", 500, now_ts=100)
+
+    assert st.evict_expired(120) == 1
+    assert "old" not in st
+    assert "new" in st
+
+
+def test_expiring_store_reset_key_keeps_latest_expiry():
+    st = ExpiringStore()
+    st.set("k", 110, now_ts=100)
+    st.set("k", 300, now_ts=105)
+
+    st.evict_expired(200)
+    assert st.get("k", now_ts=200) == 300
+
+
+def test_expiring_store_memory_bounded_by_active_entries():
+    st = ExpiringStore()
+    for i in range(5000):
+        st.set(("u", i), i + 10, now_ts=i)
+
+    assert len(st) <= 11
+    assert len(st._heap) <= 2 * len(st) + 65
+
+
+def test_expiring_store_snapshot_roundtrip(tmp_path):
+    p = tmp_path / "state.json"
+    st = ExpiringStore(p)
+    st.set((7, "activity:abc"), 1000, now_ts=100)
+    st.set((8, "activity:def"), 150, now_ts=100)
+    st.snapshot(now_ts=200)
+
+    restored = ExpiringStore(p)
+    assert restored.get((7, "activity:abc"), now_ts=300) == 1000
+    assert (8, "activity:def") not in restored
+
+
+def test_expiring_store_flush_only_when_dirty(tmp_path):
+    p = tmp_path / "state.json"
+    st = ExpiringStore(p)
+    assert not st.flush(now_ts=100)
+    assert not p.exists()
+
+    st.set("k", 1000, now_ts=100)
+    assert st.flush(now_ts=100)
+    assert not st.dirty
+    assert not st.flush(now_ts=100)
+
+
+def test_expiring_store_snapshots_merge_across_processes(tmp_path):
+    p = tmp_path / "state.json"
+    a = ExpiringStore(p)
+    b = ExpiringStore(p)
+    a.set((1, "x"), 1000, now_ts=100)
+    b.set((2, "y"), 2000, now_ts=100)
+    b.set((1, "x"), 500, now_ts=100)
+    a.snapshot(now_ts=100)
+    b.snapshot(now_ts=100)
+
+    restored = ExpiringStore(p)
+    assert restored.get((1, "x"), now_ts=200) == 1000
+    assert restored.get((2, "y"), now_ts=200) == 2000
+
+
+def test_flush_picks_up_entries_another_process_wrote(tmp_path):
+    p = tmp_path / "state.json"
+    bot = ExpiringStore(p)
+    worker = ExpiringStore(p)
+
+    worker.set((1, "nudge"), 1000, now_ts=100)
+    assert worker.flush(now_ts=100)
+    assert bot.get((1, "nudge"), now_ts=100) is None
+
+    assert not bot.flush(now_ts=100)
+    assert bot.get((1, "nudge"), now_ts=100) == 1000
+    assert not bot.dirty
+
+
+def test_proactive_check_sees_marks_flushed_by_another_process(tmp_path):
+    sched._PROACTIVE_COOLDOWN_STATE.clear()
+    sched._PROACTIVE_DEDUPE_STATE.clear()
+    try:
+        sched.configure_proactive_state(tmp_path, now_ts=1000)
+        other = ExpiringStore(tmp_path / "dedupe.json")
+        key = (1, f"activity:{sched._proactive_signature('hello')}")
+        other.set(key, 5000, now_ts=1000)
+        other.flush(now_ts=1000)
+
+        assert not sched.should_send_proactive_output(
+            user_id=1, kind="activity", text="hello", now_ts=1001
+        )
+    finally:
+        sched._PROACTIVE_COOLDOWN_STATE.path = None
+        sched._PROACTIVE_DEDUPE_STATE.path = None
+        sched._PROACTIVE_COOLDOWN_STATE.clear()
+        sched._PROACTIVE_DEDUPE_STATE.clear()
+
+
+def test_proactive_dedupe_survives_restart(tmp_path):
+    sched._PROACTIVE_COOLDOWN_STATE.clear()
+    sched._PROACTIVE_DEDUPE_STATE.clear()
+    try:
+        sched.configure_proactive_state(tmp_path, now_ts=1000)
+        sched.mark_proactive_output_sent(user_id=1, kind="activity", text="hello", now_ts=1000)
+        assert not (tmp_path / "dedupe.json").exists()
+        sched.flush_proactive_state(now_ts=1000)
+
+        sched._PROACTIVE_COOLDOWN_STATE.clear()
+        sched._PROACTIVE_DEDUPE_STATE.clear()
+        sched.configure_proactive_state(tmp_path, now_ts=1001)
+
+        assert not sched.should_send_proactive_output(
+            user_id=1, kind="activity", text="hello", now_ts=1001
+        )
+        assert sched.should_send_proactive_output(
+            user_id=1, kind="activity", text="hello", now_ts=1000 + 6 * 60 * 60
+        )
+    finally:
+        sched._PROACTIVE_COOLDOWN_STATE.path = None
+        sched._PROACTIVE_DEDUPE_STATE.path = None
+        sched._PROACTIVE_COOLDOWN_STATE.clear()
+        sched._PROACTIVE_DEDUPE_STATE.clear()
@@ -103,3 +103,86 @@ def test_uncat_queue_excludes_purchase_when_matching_rule_exists():
     rules = [Rule(id="r1", leaf_id=leaf_id, merchant_contains="aston")]
     q = build_uncat_queue(tax=tax, records=records, rules=rules, limit=200)
     assert q == []
+
+
+def test_uncat_store_log_replays_pushes_and_tombstones(tmp_path: Path, monkeypatch):
+    from mono_ai_budget_bot.storage import uncat_store as uncat_store_mod
+    from mono_ai_budget_bot.uncat.queue import UncatItem
+
+    def item(tx_id: str) -> UncatItem:
+        return UncatItem(tx_id, 1, "a", -100, f"Shop {tx_id}", None, "purchase_without_rule")
+
+    st = UncatStore(tmp_path / "uncat")
+    assert not st.exists(1)
+    st.save(1, [item("a"), item("b")])
+    st.push(1, [item("c"), item("d")])
+    st.remove(1, ["a"])
+    st.push(1, [item("b")])
+    assert [x.tx_id for x in st.load(1)] == ["b", "c", "d"]
+    assert (tmp_path / "uncat" / "1.log.jsonl").exists()
+
+    monkeypatch.setattr(uncat_store_mod, "COMPACT_AFTER_OPS", 4)
+    st.remove(1, ["d"])
+    assert not (tmp_path / "uncat" / "1.log.jsonl").exists()
+    assert [x.tx_id for x in st.load(1)] == ["b", "c"]
+
+
+def test_uncat_queue_is_maintained_from_categorization_deltas(tmp_path: Path):
+    from dataclasses import asdict
+
+    from mono_ai_budget_bot.bot.report_flow_helpers import (
+        load_or_update_categorizations,
+        update_uncat_queue,
+    )
+    from mono_ai_budget_bot.storage.categorization_store import CategorizationStore
+    from mono_ai_budget_bot.storage.tx_store import TxStore
+    from mono_ai_budget_bot.taxonomy.rules import Rule
+
+    tax = new_taxonomy()
+    leaf_id = add_category(tax, root_kind="expense", name="Кафе")
+    cat_store = CategorizationStore(tmp_path / "reports")
+    tx_store = TxStore(tmp_path / "tx")
+    st = UncatStore(tmp_path / "uncat")
+    rules: list[Rule] = []
+
+    def tx(i: int, desc: str) -> TxRecord:
+        return TxRecord(f"p{i}", 100 + i, "a", -1000 - i, desc, None, 980)
+
+    def refresh(records, limit=200):
+        tx_store.append_many(1, "a", [asdict(r) for r in records])
+        cache = load_or_update_categorizations(
+            1,
+            ["a"],
+            tx_store=tx_store,
+            tax=tax,
+            rules=rules,
+            categorization_store=cat_store,
+            now_ts=1000,
+        )
+        update_uncat_queue(
+            1,
+            cache,
+            load_records=lambda: tx_store.load_range(1, ["a"], 0, 1000),
+            tax=tax,
+            rules=rules,
+            uncat_store=st,
+            limit=limit,
+        )
+        expected = build_uncat_queue(tax=tax, records=records, rules=rules, limit=limit)
+        assert {x.tx_id for x in st.load(1)} == {x.tx_id for x in expected}
+        return [x.tx_id for x in st.load(1)]
+
+    records = [tx(i, "Aston express" if i % 2 else f"Kiosk {i}") for i in range(6)]
+    assert refresh(records) == ["p5", "p4", "p3", "p2", "p1", "p0"]
+
+    records.append(tx(6, "Kiosk 6"))
+    assert refresh(records) == ["p6", "p5", "p4", "p3", "p2", "p1", "p0"]
+    assert (tmp_path / "uncat" / "1.log.jsonl").exists()
+
+    rules.append(Rule(id="r1", leaf_id=leaf_id, merchant_contains="aston"))
+    assert refresh(records) == ["p6", "p4", "p2", "p0"]
+
+    records.append(tx(7, "Kiosk 7"))
+    assert refresh(records, limit=3) == ["p7", "p6", "p4"]
+    rules.append(Rule(id="r2", leaf_id=leaf_id, merchant_contains="kiosk 6"))
+    assert refresh(records, limit=3) == ["p7", "p4", "p2"]
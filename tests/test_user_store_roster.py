@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from cryptography.fernet import Fernet
+
+import mono_ai_budget_bot.storage.user_store as user_store_mod
+from mono_ai_budget_bot.storage.user_store import UserStore
+
+
+@pytest.fixture(autouse=True)
+def master_key(monkeypatch):
+    monkeypatch.setenv("MASTER_KEY", Fernet.generate_key().decode())
+
+
+def test_roster_is_maintained_on_save(tmp_path):
+    st = UserStore(tmp_path)
+    st.save(1, mono_token="tok-1", selected_account_ids=["a", "b"], chat_id=10)
+    st.save(2, mono_token="tok-2", selected_account_ids=[], chat_id=None)
+    st.save(2, autojobs_enabled=False)
+
+    roster = {e.telegram_user_id: e for e in st.roster()}
+    assert roster[1].chat_id == 10
+    assert roster[1].selected_accounts_count == 2
+    assert roster[1].autojobs_enabled is True
+    assert roster[2].autojobs_enabled is False
+    assert roster[2].selected_accounts_count == 0
+
+    raw = (tmp_path / UserStore.ROSTER_FILE).read_text(encoding="utf-8")
+    assert "tok-1" not in raw
+    assert "mono_token" not in raw
+
+
+def test_iter_roster_filters_without_decrypting(tmp_path, monkeypatch):
+    st = UserStore(tmp_path)
+    st.save(1, mono_token="tok-1", selected_account_ids=["a"], chat_id=10)
+    st.save(2, mono_token="tok-2", selected_account_ids=["a"], chat_id=None)
+    st.save(3, mono_token="tok-3", selected_account_ids=[], chat_id=30)
+
+    def _boom(_):
+        raise AssertionError("roster scan must not decrypt tokens")
+
+    monkeypatch.setattr(user_store_mod, "decrypt_token", _boom)
+
+    ids = [
+        e.telegram_user_id
+        for e in st.iter_roster(autojobs_only=True, require_chat=True, require_accounts=True)
+    ]
+    assert ids == [1]
+
+
+def test_roster_rebuilt_from_user_files_when_missing(tmp_path):
+    st = UserStore(tmp_path)
+    st.save(5, mono_token="tok", selected_account_ids=["x"], chat_id=50)
+    (tmp_path / UserStore.ROSTER_FILE).unlink()
+
+    entries = UserStore(tmp_path).roster()
+    assert [(e.telegram_user_id, e.chat_id) for e in entries] == [(5, 50)]
+    assert (tmp_path / UserStore.ROSTER_FILE).exists()
+
+
+def test_save_without_token_keeps_existing_ciphertext(tmp_path):
+    st = UserStore(tmp_path)
+    st.save(1, mono_token="secret", selected_account_ids=["a"])
+    before = json.loads((tmp_path / "1.json").read_text(encoding="utf-8"))["mono_token"]
+
+    st.save(1, chat_id=77)
+
+    after = json.loads((tmp_path / "1.json").read_text(encoding="utf-8"))["mono_token"]
+    assert after == before
+    cfg = st.load(1)
+    assert cfg is not None
+    assert cfg.mono_token == "secret"
+    assert cfg.chat_id == 77
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from mono_ai_budget_bot.analytics import vectorized
+from mono_ai_budget_bot.analytics.anomalies import detect_anomalies
+from mono_ai_budget_bot.analytics.compare import compare_window_to_baseline
+from mono_ai_budget_bot.analytics.compute import compute_facts
+from mono_ai_budget_bot.analytics.from_ledger import rows_from_ledger
+from mono_ai_budget_bot.analytics.profile import compute_baseline
+from mono_ai_budget_bot.analytics.trends import _aggregate_windows, compute_trends
+from mono_ai_budget_bot.storage.tx_store import TxRecord
+
+pytest.importorskip("numpy")
+
+DAY = 86400
+NOW = 20000 * DAY + 13 * 3600
+
+
+def _ledger(n: int, *, seed: int, days: int = 60) -> list[TxRecord]:
+    rnd = random.Random(seed)
+    names = [
+        "Silpo",
+        "ATB Market",
+        "Uber trip",
+        "Glovo",
+        "Coffee Point",
+        "Переказ на картку",
+        "Bolt",
+        "Rozetka",
+        "",
+    ]
+    names += [f"Shop {i}" for i in range(25)]
+    mccs = [5411, 5812, 5814, 4121, 5732, 4829, 6011, 5999, None]
+    out = []
+    for i in range(n):
+        amount = rnd.choice([-5000, -12000, -250, 30000]) if i % 5 == 0 else 0
+        amount = amount or -rnd.randrange(100, 400_00)
+        if rnd.random() < 0.08:
+            amount = rnd.randrange(100, 5000_00)
+        out.append(
+            TxRecord(
+                id=f"t{i}",
+                time=NOW - rnd.randrange(days * DAY),
+                account_id=rnd.choice(["a", "b", "c"]),
+                amount=amount,
+                description=rnd.choice(names),
+                mcc=rnd.choice(mccs),
+                currencyCode=980,
+            )
+        )
+    out.sort(key=lambda r: r.time)
+    return out
+
+
+@pytest.fixture
+def both_backends(monkeypatch):
+    def run(fn, *args, **kwargs):
+        monkeypatch.setattr(vectorized, "MIN_ROWS", 10**9)
+        expected = fn(*args, **kwargs)
+        monkeypatch.setattr(vectorized, "MIN_ROWS", 0)
+        return expected, fn(*args, **kwargs)
+
+    return run
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_compute_facts_parity(both_backends, seed):
+    rows = rows_from_ledger(_ledger(3000, seed=seed))
+    expected, got = both_backends(compute_facts, rows)
+    assert got == expected
+    assert list(got["top_merchants_real_spend"]) == list(expected["top_merchants_real_spend"])
+    assert both_backends(compute_facts, [])[1] == compute_facts([])
+
+
+@pytest.mark.parametrize("seed", [4, 5])
+def test_trends_parity(both_backends, seed):
+    rows = rows_from_ledger(_ledger(3000, seed=seed, days=20))
+    window = {
+        "cur_start": NOW - 7 * DAY,
+        "cur_end": NOW,
+        "prev_start": NOW - 14 * DAY,
+        "prev_end": NOW - 7 * DAY,
+    }
+    expected = _aggregate_windows(rows, **window)
+    got = vectorized.trend_buckets(rows, **window)
+    assert got == expected
+    for key in expected:
+        assert list(got[key][0]) == list(expected[key][0])
+
+    kw = {"min_prev_uah": 20.0, "min_abs_delta_uah": 20.0}
+    expected, got = both_backends(compute_trends, rows, now_ts=NOW, window_days=7, **kw)
+    assert got == expected
+    assert expected["growing"] or expected["declining"]
+
+
+@pytest.mark.parametrize("seed", [6, 7, 8])
+def test_anomaly_baselines_parity(both_backends, seed):
+    from mono_ai_budget_bot.analytics.baselines import DailyBaselines
+
+    rows = rows_from_ledger(_ledger(2500, seed=seed, days=40))
+    for now in (NOW, NOW - 3 * DAY - 7 * 3600, (NOW // DAY) * DAY):
+        engine = DailyBaselines(now_ts=now, lookback_days=21)
+        engine.add_rows(rows)
+        assert vectorized.label_baselines(rows, now, lookback_days=21) == engine.touched()
+
+        expected, got = both_backends(
+            detect_anomalies, rows, now_ts=now, lookback_days=21, min_threshold_cents=5000
+        )
+        assert got == expected
+
+
+@pytest.mark.parametrize("seed", [9, 10])
+def test_baseline_and_window_compare_parity(both_backends, seed):
+    records = _ledger(3000, seed=seed, days=90)
+
+    for window_days in (7, 28, 90):
+        expected, got = both_backends(compute_baseline, records, window_days=window_days)
+        assert got == expected
+
+    cases = [
+        {"start_ts": NOW - 7 * DAY, "end_ts": NOW},
+        {"start_ts": NOW - DAY, "end_ts": NOW, "category": "Маркет/Побут"},
+        {"start_ts": NOW - 14 * DAY, "end_ts": NOW, "merchant_contains": "shop"},
+        {"start_ts": NOW - 3 * DAY, "end_ts": NOW - DAY, "lookback_days": 30},
+    ]
+    for kw in cases:
+        expected, got = both_backends(compare_window_to_baseline, records, **kw)
+        assert got == expected